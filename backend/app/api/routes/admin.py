@@ -1,10 +1,21 @@
-from fastapi import APIRouter, Depends
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
 
 from app.core.database import get_session
-from app.schemas.outbreak import OutbreakList
+from app.core.http_clients import http_clients
+from app.schemas.outbreak import DistrictSummaryList, OutbreakList, OutbreakScanResult, SimilarCaseResult
 from app.schemas.follow_up import FollowUpMetrics
+from app.services.facility_live_status import facility_live_state
+from app.services.facility_search_cache import facility_search_cache
 from app.services.followup_reminder_service import calculate_followup_metrics
+from app.services.outbreak_alert_map import outbreak_alert_map
+from app.services.outbreak_counter import outbreak_counter
+from app.services.outbreak_scan import outbreak_scanner
 from app.services.outbreak_service import OutbreakService
+from app.services.outbreak_tiles import FORMATS, outbreak_tile_cache
+from app.services.place_lookup import place_lookup
+from app.services.similar_cases import similar_case_index
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
@@ -23,7 +34,100 @@ async def list_outbreaks(
     return {"outbreaks": outbreaks}
 
 
+@router.get("/outbreak-scan", response_model=OutbreakScanResult)
+async def outbreak_scan():
+    return outbreak_scanner.latest or {}
+
+
+@router.get("/outbreak-scan/metrics")
+async def outbreak_scan_metrics():
+    return outbreak_scanner.metrics()
+
+
+@router.get("/outbreak-tiles/{z}/{x}/{y}.{fmt}")
+async def outbreak_tile(
+    z: int,
+    x: int,
+    y: int,
+    fmt: Literal["png", "bin"],
+    if_none_match: str | None = Header(default=None),
+):
+    if not outbreak_tile_cache.min_zoom <= z <= outbreak_tile_cache.max_zoom or not (
+        0 <= x < 2**z and 0 <= y < 2**z
+    ):
+        raise HTTPException(status_code=404, detail="Tile out of range")
+    if not outbreak_tile_cache.ready:
+        raise HTTPException(status_code=503, detail="Outbreak tiles are still loading")
+    etag, body = outbreak_tile_cache.tile(z, x, y, fmt)
+    # no-cache: clients revalidate every pan and get a 304 for tiles that did not change.
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if if_none_match and etag in {tag.strip() for tag in if_none_match.split(",")}:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type=FORMATS[fmt], headers=headers)
+
+
+@router.get("/outbreak-tiles/metrics")
+async def outbreak_tile_metrics():
+    return outbreak_tile_cache.metrics()
+
+
+@router.get("/similar-cases", response_model=SimilarCaseResult)
+async def similar_cases(
+    symptoms: str = Query(..., min_length=1),
+    days: int = Query(30, ge=1),
+    district_code: str | None = None,
+    threshold: float = Query(0.45, ge=0, le=1),
+    limit: int = Query(10, ge=1, le=100),
+):
+    if not similar_case_index.ready:
+        raise HTTPException(status_code=503, detail="Similar-case index is still loading")
+    return similar_case_index.query(
+        symptoms, days=days, district_code=district_code, similarity_threshold=threshold, limit=limit
+    )
+
+
+@router.get("/similar-cases/metrics")
+async def similar_case_metrics():
+    return similar_case_index.metrics()
+
+
+@router.get("/districts", response_model=DistrictSummaryList)
+async def district_summary(window_hours: int = 48, session=Depends(get_session)):
+    service = OutbreakService(session)
+    return {"districts": await service.district_summary(window_hours=window_hours)}
+
+
 @router.get("/followups/metrics", response_model=FollowUpMetrics)
 async def followup_metrics(session=Depends(get_session)):
     metrics = await calculate_followup_metrics(session)
     return metrics
+
+
+@router.get("/http-clients/metrics")
+async def http_client_metrics():
+    return http_clients.metrics()
+
+
+@router.get("/facility-search-cache/metrics")
+async def facility_search_cache_metrics():
+    return facility_search_cache.metrics()
+
+
+@router.get("/facility-status/metrics")
+async def facility_status_metrics():
+    return facility_live_state.metrics()
+
+
+@router.get("/outbreak-counter/metrics")
+async def outbreak_counter_metrics():
+    return outbreak_counter.metrics()
+
+
+@router.get("/outbreak-alert-map/metrics")
+async def outbreak_alert_map_metrics():
+    return outbreak_alert_map.metrics()
+
+
+@router.get("/place-lookup/metrics")
+async def place_lookup_metrics():
+    return place_lookup.metrics()
@@ -1,9 +1,23 @@
-from fastapi import APIRouter, Depends
+import secrets
+from typing import AsyncIterator
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_session
-from app.schemas.facility import FacilityList, FacilitySearch
+from app.core.config import get_settings
+from app.core.database import AsyncSessionFactory, get_session
+from app.schemas.facility import (
+    FacilityBatchResult,
+    FacilityBatchSearch,
+    FacilityList,
+    FacilitySearch,
+    FacilityStatusAccepted,
+    FacilityStatusBatch,
+)
+from app.services.facility_live_status import facility_live_state
 from app.services.facility_service import FacilitySearchService
+from app.services.place_lookup import AmbiguousPlace, place_lookup
 
 router = APIRouter(prefix="/facilities", tags=["facilities"])
 
@@ -13,14 +27,68 @@ async def search_facilities(
     payload: FacilitySearch, session: AsyncSession = Depends(get_session)
 ):
     service = FacilitySearchService(session)
+    filters = {
+        "facility_types": payload.facility_types,
+        "open_now": payload.open_now,
+        "emergency_only": payload.emergency_only,
+        "max_wait_minutes": payload.max_wait_minutes,
+    }
+    if payload.user_lat is None:
+        try:
+            place = place_lookup.resolve(payload.pincode, payload.village, payload.district)
+        except AmbiguousPlace as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
+        if place is None:
+            raise HTTPException(status_code=404, detail="Unknown pincode or village")
+        return await service.find_nearest_for_place(
+            place,
+            urgency_level=payload.urgency_level,
+            radius_km=payload.radius_km,
+            max_results=payload.max_results,
+            **filters,
+        )
     return await service.find_nearest(
         user_lat=payload.user_lat,
         user_lng=payload.user_lng,
         urgency_level=payload.urgency_level,
         radius_km=payload.radius_km,
         max_results=payload.max_results,
-        facility_types=payload.facility_types,
-        open_now=payload.open_now,
-        emergency_only=payload.emergency_only,
-        max_wait_minutes=payload.max_wait_minutes,
+        **filters,
     )
+
+
+async def _batch_lines(payload: FacilityBatchSearch) -> AsyncIterator[str]:
+    # The stream outlives the request's dependencies, so it owns its session.
+    async with AsyncSessionFactory() as session:
+        service = FacilitySearchService(session)
+        async for result in service.find_nearest_batch(
+            origins=[origin.model_dump() for origin in payload.origins],
+            radius_km=payload.radius_km,
+            max_results=payload.max_results,
+            facility_types=payload.facility_types,
+            open_now=payload.open_now,
+            emergency_only=payload.emergency_only,
+            max_wait_minutes=payload.max_wait_minutes,
+        ):
+            yield FacilityBatchResult.model_validate(result).model_dump_json(by_alias=True) + "\n"
+
+
+@router.post("/search/batch")
+async def search_facilities_batch(payload: FacilityBatchSearch):
+    """Nearest facilities for many origins, streamed as NDJSON (one line per origin)."""
+    return StreamingResponse(_batch_lines(payload), media_type="application/x-ndjson")
+
+
+@router.post("/status", response_model=FacilityStatusAccepted, status_code=202)
+async def report_facility_status(
+    payload: FacilityStatusBatch, x_facility_token: str | None = Header(default=None)
+):
+    """Live queue/bed/ER reports; applied in memory and flushed to the database in batches."""
+    token = get_settings().facility_status_token
+    # Reports feed emergency ranking, so the endpoint stays closed until a token is set.
+    if not token:
+        raise HTTPException(status_code=503, detail="Facility status reporting is not configured")
+    if x_facility_token is None or not secrets.compare_digest(x_facility_token, token):
+        raise HTTPException(status_code=401, detail="Invalid facility token")
+    applied, ignored = facility_live_state.apply(update.model_dump() for update in payload.updates)
+    return {"applied": applied, "ignored": ignored}
@@ -6,6 +6,7 @@ from app.services.followup_reminder_service import FollowUpReminderService
 from app.schemas.visual import VisualAnalysisResponse
 from app.services.followup_service import FollowUpService
 from app.services.groq_service import GroqTriageService
+from app.services.place_lookup import AmbiguousPlace, place_lookup
 from app.services.symptom_mapper import SymptomMapper
 from app.services.translation_service import TranslationService
 from app.services.triage_engine import TriageEngine
@@ -37,6 +38,15 @@ async def run_triage(payload: SymptomInput, session=Depends(get_session)):
             mapped_text = translator.translate(mapped_text, payload.language, "en")
 
         patient_id = payload.patient_id or "anonymous"
+        location = payload.location.model_dump() if payload.location else None
+        if location is None and (payload.pincode or payload.village):
+            try:
+                place = place_lookup.resolve(payload.pincode, payload.village, payload.district)
+            except AmbiguousPlace:
+                # The location only adds context; triage the symptoms without it.
+                place = None
+            if place is not None:
+                location = {"lat": place.lat, "lng": place.lng}
         result = await engine.analyze(
             symptoms=f"{mapped_text}{followup_text}",
             patient_id=patient_id,
@@ -46,7 +56,7 @@ async def run_triage(payload: SymptomInput, session=Depends(get_session)):
             },
             severity_score=float(payload.severity) if payload.severity else None,
             reported_duration_days=payload.duration_days,
-            location=payload.location.model_dump() if payload.location else None,
+            location=location,
         )
         triage = result["triage"]
         # Schedule follow-up if patient_id provided and triage saved
@@ -114,6 +124,8 @@ async def run_triage(payload: SymptomInput, session=Depends(get_session)):
             "estimated_distance_to_facility": None,
             "cost_estimate_inr": cost_estimate,
             "follow_up_reminder_token": reminder.token if reminder else None,
+            "community_alert": result.get("community_alert"),
+            "community_alert_map_age_seconds": result.get("community_alert_map_age_seconds"),
         }
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
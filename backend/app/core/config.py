@@ -24,6 +24,99 @@ class Settings(BaseSettings):
     production_url: str | None = None
     public_app_url: str | None = None
     skip_db_check: bool = False
+    # Facility search uses PostGIS on Postgres once scripts/migrate_facilities_postgis.py
+    # has run, and the bounding-box query otherwise; "bbox" or "postgis" overrides that.
+    facility_spatial_backend: str | None = None
+
+    facility_catalog_refresh_minutes: int = 10
+    # When set, workers map this snapshot (scripts/build_facility_snapshot.py)
+    # instead of each loading the catalog from the database.
+    facility_snapshot_path: str | None = None
+
+    # Search candidates cached per geohash cell (precision 6 is ~1.2 x 0.6 km).
+    facility_search_cache_enabled: bool = True
+    facility_search_cache_precision: int = 6
+    facility_search_cache_ttl_seconds: int = 60
+    facility_search_cache_max_entries: int = 5000
+
+    # Live queue/bed reports: shared token for the ingestion API (reports are
+    # rejected until it is set), and how often the in-memory state is flushed
+    # to facility_live_status and synced back from it (other workers' reports).
+    facility_status_token: str | None = None
+    facility_status_flush_seconds: int = 15
+
+    # Per-facility isochrone grids from scripts/build_road_router.py; searches
+    # fall back to straight-line travel estimates when unset.
+    road_router_path: str | None = None
+
+    # Pincode/village table from scripts/build_place_lookup.py, and how often it
+    # is checked against facilities.last_updated for staleness.
+    place_lookup_path: str | None = None
+    place_lookup_check_minutes: int = 15
+
+    # District/block boundary GeoJSON; triage sessions and outbreak events are
+    # tagged with district and block codes when set.
+    admin_boundaries_path: str | None = None
+
+    # In-memory outbreak counts used by triage-time detection (windows longer
+    # than outbreak_counter_window_hours fall back to scanning outbreak_events).
+    outbreak_counter_enabled: bool = True
+    outbreak_counter_cell_degrees: float = 0.01
+    outbreak_counter_bucket_minutes: int = 15
+    outbreak_counter_window_hours: int = 48
+    outbreak_counter_sync_seconds: int = 30
+
+    # Triage reads community alerts from a map rebuilt on this interval
+    # (app/services/outbreak_alert_map.py) over the counter window.
+    outbreak_alert_map_enabled: bool = True
+    outbreak_alert_map_seconds: int = 60
+    outbreak_alert_radius_km: float = 5.0
+    outbreak_alert_min_cases: int = 15
+    outbreak_alert_similarity: float = 0.45
+
+    # Hourly outbreak rollups behind /admin/outbreaks, compacted on this interval.
+    outbreak_rollup_enabled: bool = True
+    outbreak_rollup_compact_minutes: int = 10
+
+    # Density tiles behind /admin/outbreak-tiles, folded in from the rollups on
+    # this interval over the last outbreak_tile_window_hours compacted hours.
+    outbreak_tiles_enabled: bool = True
+    outbreak_tile_refresh_minutes: int = 5
+    outbreak_tile_window_hours: int = 48
+    outbreak_tile_min_zoom: int = 3
+    outbreak_tile_max_zoom: int = 12
+
+    # Space-time scan (app/services/outbreak_scan.py): how often it runs, the
+    # history it compares against, the largest circle, and Monte Carlo settings.
+    outbreak_scan_enabled: bool = True
+    outbreak_scan_minutes: int = 30
+    outbreak_scan_baseline_days: int = 28
+    outbreak_scan_max_radius_km: float = 10.0
+    outbreak_scan_replicates: int = 99
+    outbreak_scan_alpha: float = 0.05
+
+    # Raw outbreak_events older than this are purged once their hours are rolled
+    # up (never below what the in-memory indexes reload), in bounded batches.
+    outbreak_event_retention_days: int = 35
+    outbreak_retention_minutes: int = 60
+    outbreak_retention_batch_size: int = 5000
+    outbreak_retention_max_batches: int = 200
+
+    # MinHash/LSH index behind /admin/similar-cases: window held in memory,
+    # snapshot file, and how often it catches up and is saved.
+    similar_case_index_enabled: bool = True
+    similar_case_window_days: int = 30
+    similar_case_snapshot_path: str | None = None
+    similar_case_sync_seconds: int = 60
+    similar_case_snapshot_minutes: int = 15
+
+    # Due follow-up reminders are checked, sent and marked this many at a time.
+    followup_dispatch_page_size: int = 500
+
+    overpass_url: str = "https://overpass-api.de/api/interpreter"
+    overpass_tile_precision: int = 4
+    overpass_cache_ttl_hours: int = 168
+    overpass_ingest: bool = False
 
     twilio_account_sid: str | None = None
     twilio_auth_token: str | None = None
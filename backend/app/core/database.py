@@ -2,7 +2,9 @@ from __future__ import annotations
 
 import asyncio
 
-from sqlalchemy import text
+from sqlalchemy import Insert, Table, text
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
 from app.core.config import get_settings
@@ -32,6 +34,34 @@ AsyncSessionFactory = async_sessionmaker(
 )
 
 
+def upsert_statement(
+    session: AsyncSession, table: Table, key_columns: list[str], newer_column: str | None = None
+) -> Insert:
+    """INSERT ... ON CONFLICT DO UPDATE for ``table``, to be executed with a list of rows.
+
+    Every column outside ``key_columns`` is overwritten from the incoming row;
+    with ``newer_column``, only when the incoming value is not older than the
+    stored one. SQLite and Postgres share the syntax; passing many rows lets
+    the driver batch them (executemany).
+    """
+    if session.get_bind().dialect.name == "postgresql":
+        statement = postgresql_insert(table)
+    else:
+        statement = sqlite_insert(table)
+    where = None
+    if newer_column is not None:
+        where = table.c[newer_column] <= statement.excluded[newer_column]
+    return statement.on_conflict_do_update(
+        index_elements=key_columns,
+        set_={
+            column.name: statement.excluded[column.name]
+            for column in table.columns
+            if column.name not in key_columns
+        },
+        where=where,
+    )
+
+
 async def get_session() -> AsyncSession:
     async with AsyncSessionFactory() as session:
         yield session
@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass, field
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+try:  # HTTP/2 needs the optional h2 package (httpx[http2]).
+    import h2  # noqa: F401
+
+    HTTP2_AVAILABLE = True
+except ImportError:  # pragma: no cover
+    HTTP2_AVAILABLE = False
+
+
+@dataclass
+class Destination:
+    name: str
+    timeout: httpx.Timeout
+    max_connections: int = 10
+    max_keepalive_connections: int = 5
+    keepalive_expiry: float = 60.0
+    http2: bool = True
+
+
+@dataclass
+class DestinationStats:
+    requests: int = 0
+    errors: int = 0
+    in_flight: int = 0
+    peak_in_flight: int = 0
+    total_ms: float = 0.0
+    connections_opened: int = 0
+    _seen_connections: set[int] = field(default_factory=set, repr=False)
+
+    def start(self) -> float:
+        self.requests += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        return time.perf_counter()
+
+    def finish(self, started: float, failed: bool) -> None:
+        self.in_flight -= 1
+        self.total_ms += (time.perf_counter() - started) * 1000
+        if failed:
+            self.errors += 1
+
+    def track_connections(self, pool: object | None) -> None:
+        for connection in getattr(pool, "connections", None) or []:
+            if id(connection) not in self._seen_connections:
+                self._seen_connections.add(id(connection))
+                self.connections_opened += 1
+
+
+def _pool_snapshot(transport: httpx.AsyncBaseTransport | httpx.BaseTransport) -> dict:
+    # httpx does not expose pool state publicly; read it defensively from httpcore.
+    pool = getattr(transport, "_pool", None)
+    connections = list(getattr(pool, "connections", None) or [])
+    idle = sum(1 for connection in connections if connection.is_idle())
+    return {"open_connections": len(connections), "idle_connections": idle}
+
+
+class _MeteredAsyncTransport(httpx.AsyncBaseTransport):
+    def __init__(self, inner: httpx.AsyncHTTPTransport, stats: DestinationStats) -> None:
+        self.inner = inner
+        self.stats = stats
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = self.stats.start()
+        failed = True
+        try:
+            response = await self.inner.handle_async_request(request)
+            failed = response.status_code >= 500
+            return response
+        finally:
+            self.stats.finish(started, failed)
+            self.stats.track_connections(getattr(self.inner, "_pool", None))
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+
+class _MeteredSyncTransport(httpx.BaseTransport):
+    def __init__(self, inner: httpx.HTTPTransport, stats: DestinationStats) -> None:
+        self.inner = inner
+        self.stats = stats
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        started = self.stats.start()
+        failed = True
+        try:
+            response = self.inner.handle_request(request)
+            failed = response.status_code >= 500
+            return response
+        finally:
+            self.stats.finish(started, failed)
+            self.stats.track_connections(getattr(self.inner, "_pool", None))
+
+    def close(self) -> None:
+        self.inner.close()
+
+
+class HttpClientRegistry:
+    """Process-wide pooled HTTP clients, one per outbound destination.
+
+    Clients are created lazily, keep connections alive between requests, use
+    HTTP/2 when h2 is installed, and are closed on application shutdown. Each
+    destination has its own timeouts and pool limits so a slow integration
+    cannot exhaust connections meant for another.
+    """
+
+    def __init__(self) -> None:
+        self._destinations: dict[str, Destination] = {}
+        self._stats: dict[str, DestinationStats] = {}
+        self._async_clients: dict[str, httpx.AsyncClient] = {}
+        self._sync_clients: dict[str, httpx.Client] = {}
+
+    def register(self, destination: Destination) -> None:
+        self._destinations[destination.name] = destination
+        self._stats.setdefault(destination.name, DestinationStats())
+
+    def _transport_kwargs(self, destination: Destination) -> dict:
+        return {
+            "limits": httpx.Limits(
+                max_connections=destination.max_connections,
+                max_keepalive_connections=destination.max_keepalive_connections,
+                keepalive_expiry=destination.keepalive_expiry,
+            ),
+            "http2": destination.http2 and HTTP2_AVAILABLE,
+        }
+
+    def get(self, name: str) -> httpx.AsyncClient:
+        client = self._async_clients.get(name)
+        if client is None or client.is_closed:
+            destination = self._destinations[name]
+            transport = _MeteredAsyncTransport(
+                httpx.AsyncHTTPTransport(**self._transport_kwargs(destination)),
+                self._stats[name],
+            )
+            client = httpx.AsyncClient(transport=transport, timeout=destination.timeout)
+            self._async_clients[name] = client
+        return client
+
+    def get_sync(self, name: str) -> httpx.Client:
+        """Blocking client for SDKs that only accept ``httpx.Client`` (e.g. Groq)."""
+        client = self._sync_clients.get(name)
+        if client is None or client.is_closed:
+            destination = self._destinations[name]
+            transport = _MeteredSyncTransport(
+                httpx.HTTPTransport(**self._transport_kwargs(destination)),
+                self._stats[name],
+            )
+            client = httpx.Client(transport=transport, timeout=destination.timeout)
+            self._sync_clients[name] = client
+        return client
+
+    def metrics(self) -> dict[str, dict]:
+        result = {}
+        for name, destination in self._destinations.items():
+            stats = self._stats[name]
+            pools = [
+                _pool_snapshot(client._transport.inner)
+                for client in (self._async_clients.get(name), self._sync_clients.get(name))
+                if client is not None and not client.is_closed
+            ]
+            result[name] = {
+                "requests": stats.requests,
+                "errors": stats.errors,
+                "in_flight": stats.in_flight,
+                "peak_in_flight": stats.peak_in_flight,
+                "avg_latency_ms": round(stats.total_ms / stats.requests, 2) if stats.requests else 0.0,
+                "connections_opened": stats.connections_opened,
+                "open_connections": sum(p["open_connections"] for p in pools),
+                "idle_connections": sum(p["idle_connections"] for p in pools),
+                "max_connections": destination.max_connections,
+                "http2": destination.http2 and HTTP2_AVAILABLE,
+            }
+        return result
+
+    async def aclose(self) -> None:
+        for client in self._async_clients.values():
+            await client.aclose()
+        for client in self._sync_clients.values():
+            client.close()
+        self._async_clients.clear()
+        self._sync_clients.clear()
+        logger.info("HTTP clients closed.")
+
+
+http_clients = HttpClientRegistry()
+http_clients.register(
+    Destination("overpass", timeout=httpx.Timeout(12.0, connect=5.0), max_connections=4)
+)
+http_clients.register(
+    Destination("groq", timeout=httpx.Timeout(20.0, connect=5.0), max_connections=20)
+)
+http_clients.register(
+    Destination("twilio", timeout=httpx.Timeout(10.0, connect=5.0), max_connections=10)
+)
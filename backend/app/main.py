@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import logging
+import os
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
@@ -8,9 +9,23 @@ from fastapi.responses import JSONResponse
 
 from app.api.routes import admin, facilities, followups, health, i18n, medications, triage, visual
 from app.core.config import get_settings
-from app.core.database import health_check, init_db
+from app.core.database import AsyncSessionFactory, health_check, init_db
+from app.core.http_clients import http_clients
 from app.core.security import RateLimiter, rate_limit_middleware, request_id_middleware
+from app.services.admin_areas import admin_areas
+from app.services.facility_catalog import facility_catalog
+from app.services.facility_live_status import facility_live_state
+from app.services.facility_service import facility_spatial_backend
 from app.services.followup_scheduler import followup_scheduler
+from app.services.outbreak_alert_map import outbreak_alert_map
+from app.services.outbreak_counter import outbreak_counter
+from app.services.outbreak_retention import purge_outbreak_events
+from app.services.outbreak_rollup import compact_outbreak_hours
+from app.services.outbreak_scan import outbreak_scanner
+from app.services.outbreak_tiles import outbreak_tile_cache
+from app.services.place_lookup import place_lookup
+from app.services.road_routing import road_router
+from app.services.similar_cases import similar_case_index
 
 settings = get_settings()
 logger = logging.getLogger("app")
@@ -43,9 +58,200 @@ async def root():
     return {"message": "Rural Health Triage API is running", "docs": "/docs"}
 
 
+async def refresh_facility_catalog() -> None:
+    try:
+        snapshot_path = settings.facility_snapshot_path
+        if snapshot_path and os.path.exists(snapshot_path):
+            facility_catalog.load_snapshot(snapshot_path)
+            return
+        async with AsyncSessionFactory() as session:
+            await facility_catalog.refresh(session)
+    except Exception as exc:  # pragma: no cover
+        logger.warning("Facility catalog refresh failed: %s", exc)
+
+
+async def detect_spatial_backend() -> None:
+    try:
+        async with AsyncSessionFactory() as session:
+            await facility_spatial_backend.detect(session)
+    except Exception as exc:  # pragma: no cover
+        logger.warning("Spatial backend detection failed, using bbox: %s", exc)
+
+
+async def sync_facility_status() -> None:
+    try:
+        async with AsyncSessionFactory() as session:
+            await facility_live_state.sync(session)
+    except Exception as exc:  # pragma: no cover
+        logger.warning("Facility status sync failed: %s", exc)
+
+
+async def flush_facility_status() -> None:
+    try:
+        async with AsyncSessionFactory() as session:
+            await facility_live_state.flush(session)
+    except Exception as exc:  # pragma: no cover
+        logger.warning("Facility status flush failed: %s", exc)
+
+
+async def check_place_lookup() -> None:
+    try:
+        async with AsyncSessionFactory() as session:
+            await place_lookup.check_staleness(session)
+    except Exception as exc:  # pragma: no cover
+        logger.warning("Place lookup staleness check failed: %s", exc)
+
+
+async def sync_outbreak_counter() -> None:
+    try:
+        async with AsyncSessionFactory() as session:
+            await outbreak_counter.sync(session)
+    except Exception as exc:  # pragma: no cover
+        logger.warning("Outbreak counter sync failed: %s", exc)
+
+
+async def refresh_outbreak_alert_map() -> None:
+    try:
+        async with AsyncSessionFactory() as session:
+            await outbreak_alert_map.refresh(session)
+    except Exception as exc:  # pragma: no cover
+        logger.warning("Outbreak alert map refresh failed: %s", exc)
+
+
+async def compact_outbreak_rollups() -> None:
+    try:
+        async with AsyncSessionFactory() as session:
+            await compact_outbreak_hours(session)
+    except Exception as exc:  # pragma: no cover
+        logger.warning("Outbreak rollup compaction failed: %s", exc)
+
+
+async def refresh_outbreak_tiles() -> None:
+    try:
+        async with AsyncSessionFactory() as session:
+            await outbreak_tile_cache.refresh(session)
+    except Exception as exc:  # pragma: no cover
+        logger.warning("Outbreak tile refresh failed: %s", exc)
+
+
+async def purge_outbreak_history() -> None:
+    try:
+        async with AsyncSessionFactory() as session:
+            await purge_outbreak_events(session)
+    except Exception as exc:  # pragma: no cover
+        logger.warning("Outbreak event purge failed: %s", exc)
+
+
+async def run_outbreak_scan() -> None:
+    try:
+        async with AsyncSessionFactory() as session:
+            await outbreak_scanner.run(session)
+    except Exception as exc:  # pragma: no cover
+        logger.warning("Outbreak scan failed: %s", exc)
+
+
+async def sync_similar_cases() -> None:
+    try:
+        async with AsyncSessionFactory() as session:
+            await similar_case_index.sync(session)
+    except Exception as exc:  # pragma: no cover
+        logger.warning("Similar-case index sync failed: %s", exc)
+
+
+def load_similar_cases() -> None:
+    snapshot = settings.similar_case_snapshot_path
+    try:
+        if snapshot and os.path.exists(snapshot):
+            similar_case_index.load(snapshot)
+    except Exception as exc:  # pragma: no cover
+        # The index is left empty, so the first sync reads the whole window.
+        logger.warning("Similar-case snapshot load failed, rebuilding from the database: %s", exc)
+
+
+async def save_similar_cases() -> None:
+    try:
+        if settings.similar_case_snapshot_path and similar_case_index.ready:
+            similar_case_index.save(settings.similar_case_snapshot_path)
+    except Exception as exc:  # pragma: no cover
+        logger.warning("Similar-case snapshot failed: %s", exc)
+
+
 @app.on_event("startup")
 async def startup_event():
     await init_db()
+    followup_scheduler.add_interval_job(
+        refresh_facility_catalog,
+        seconds=settings.facility_catalog_refresh_minutes * 60,
+        job_id="facility_catalog_refresh",
+    )
+    followup_scheduler.add_interval_job(
+        flush_facility_status,
+        seconds=settings.facility_status_flush_seconds,
+        job_id="facility_status_flush",
+    )
+    followup_scheduler.add_interval_job(
+        sync_facility_status,
+        seconds=settings.facility_status_flush_seconds,
+        job_id="facility_status_sync",
+    )
+    if settings.outbreak_counter_enabled:
+        followup_scheduler.add_interval_job(
+            sync_outbreak_counter,
+            seconds=settings.outbreak_counter_sync_seconds,
+            job_id="outbreak_counter_sync",
+        )
+    if settings.outbreak_alert_map_enabled:
+        followup_scheduler.add_interval_job(
+            refresh_outbreak_alert_map,
+            seconds=settings.outbreak_alert_map_seconds,
+            job_id="outbreak_alert_map",
+        )
+    if settings.outbreak_rollup_enabled:
+        followup_scheduler.add_interval_job(
+            compact_outbreak_rollups,
+            seconds=settings.outbreak_rollup_compact_minutes * 60,
+            job_id="outbreak_rollup_compaction",
+        )
+        followup_scheduler.add_interval_job(
+            purge_outbreak_history,
+            seconds=settings.outbreak_retention_minutes * 60,
+            job_id="outbreak_event_retention",
+        )
+        if settings.outbreak_tiles_enabled:
+            followup_scheduler.add_interval_job(
+                refresh_outbreak_tiles,
+                seconds=settings.outbreak_tile_refresh_minutes * 60,
+                job_id="outbreak_tiles",
+            )
+    if settings.outbreak_scan_enabled:
+        followup_scheduler.add_interval_job(
+            run_outbreak_scan,
+            seconds=settings.outbreak_scan_minutes * 60,
+            job_id="outbreak_scan",
+        )
+    if settings.similar_case_index_enabled:
+        load_similar_cases()
+        followup_scheduler.add_interval_job(
+            sync_similar_cases,
+            seconds=settings.similar_case_sync_seconds,
+            job_id="similar_case_sync",
+        )
+        followup_scheduler.add_interval_job(
+            save_similar_cases,
+            seconds=settings.similar_case_snapshot_minutes * 60,
+            job_id="similar_case_snapshot",
+        )
+    if settings.road_router_path and os.path.exists(settings.road_router_path):
+        road_router.load(settings.road_router_path)
+    if settings.admin_boundaries_path and os.path.exists(settings.admin_boundaries_path):
+        admin_areas.load(settings.admin_boundaries_path)
+    if settings.place_lookup_path and os.path.exists(settings.place_lookup_path):
+        place_lookup.load(settings.place_lookup_path)
+        followup_scheduler.add_interval_job(
+            check_place_lookup,
+            seconds=settings.place_lookup_check_minutes * 60,
+            job_id="place_lookup_staleness",
+        )
     if settings.skip_db_check:
         logger.warning("Skipping DB health check (SKIP_DB_CHECK=true).")
         followup_scheduler.start()
@@ -54,14 +260,32 @@ async def startup_event():
         await init_db()
         await health_check()
         logger.info("Database connection verified.")
-        followup_scheduler.start()
     except Exception as exc:  # pragma: no cover
         logger.exception("Database connection failed: %s", exc)
+    else:
+        await detect_spatial_backend()
+        await refresh_facility_catalog()
+        await check_place_lookup()
+        if settings.outbreak_counter_enabled:
+            await sync_outbreak_counter()
+        if settings.outbreak_alert_map_enabled:
+            await refresh_outbreak_alert_map()
+        if settings.outbreak_rollup_enabled and settings.outbreak_tiles_enabled:
+            await refresh_outbreak_tiles()
+        if settings.similar_case_index_enabled:
+            await sync_similar_cases()
+        await sync_facility_status()
+    # Each job guards its own database access, so a failed load above (or a
+    # missing optional table) must not keep reminder dispatch from running.
+    followup_scheduler.start()
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     followup_scheduler.shutdown()
+    await flush_facility_status()
+    await save_similar_cases()
+    await http_clients.aclose()
 
 
 @app.exception_handler(Exception)
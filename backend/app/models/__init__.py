@@ -6,4 +6,4 @@ class Base(DeclarativeBase):
 
 
 # Ensure models are imported so metadata is populated for create_all.
-from app.models import facility, follow_up, medication, outbreak, patient, symptom_translation, triage  # noqa: E402,F401
+from app.models import facility, facility_status, follow_up, medication, outbreak, overpass_tile, patient, symptom_translation, triage  # noqa: E402,F401
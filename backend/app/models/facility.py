@@ -20,13 +20,13 @@ class FacilityType(str, enum.Enum):
 class Facility(Base):
     __tablename__ = "facilities"
     __table_args__ = (
-        Index(
-            "ix_facilities_geo",
-            "latitude",
-            "longitude",
-            postgresql_using="gist",
-        ),
+        # Plain B-tree: serves the latitude/longitude BETWEEN prefilter in
+        # FacilitySearchService._query_nearby on SQLite and Postgres alike.
+        Index("ix_facilities_geo", "latitude", "longitude"),
     )
+    # On Postgres a geography(Point) column "geog" with a GiST index is added by
+    # scripts/migrate_facilities_postgis.py and kept in sync by a trigger, so the
+    # ORM never writes it directly.
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     name: Mapped[str] = mapped_column(String(200))
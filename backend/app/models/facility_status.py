@@ -0,0 +1,17 @@
+from sqlalchemy import Boolean, DateTime, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models import Base
+
+
+class FacilityLiveStatus(Base):
+    """Latest live report per facility, flushed in batches from the in-memory state table."""
+
+    __tablename__ = "facility_live_status"
+
+    facility_id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    queue_length: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    beds_free: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    er_open: Mapped[bool | None] = mapped_column(Boolean, nullable=True)
+    wait_minutes: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    reported_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True))
@@ -1,6 +1,6 @@
 import uuid
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, String, func
+from sqlalchemy import Boolean, DateTime, ForeignKey, Index, String, func, text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.models import Base
@@ -8,6 +8,17 @@ from app.models import Base
 
 class FollowUpReminder(Base):
     __tablename__ = "follow_up_reminders"
+    # Dispatch pages through unsent reminders by (scheduled_time, id)
+    # (scripts/migrate_followup_due_index.py).
+    __table_args__ = (
+        Index(
+            "ix_follow_up_reminders_due",
+            "scheduled_time",
+            "id",
+            postgresql_where=text("sent_at IS NULL"),
+            sqlite_where=text("sent_at IS NULL"),
+        ),
+    )
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     token: Mapped[str] = mapped_column(String(64), unique=True, index=True)
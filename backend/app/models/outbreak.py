@@ -1,6 +1,6 @@
 import uuid
 
-from sqlalchemy import DateTime, Float, String, func, JSON
+from sqlalchemy import BigInteger, DateTime, Float, Index, Integer, String, func, JSON
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.models import Base
@@ -8,6 +8,14 @@ from app.models import Base
 
 class OutbreakEvent(Base):
     __tablename__ = "outbreak_events"
+    # Window scans filter on created_at; the exact detection fallback adds a lat/lng box.
+    # On Postgres the table can be range-partitioned by week on created_at
+    # (scripts/migrate_outbreak_partitions.py).
+    __table_args__ = (
+        Index("ix_outbreak_events_district_created", "district_code", "created_at"),
+        Index("ix_outbreak_events_created", "created_at"),
+        Index("ix_outbreak_events_lat_lng_created", "lat", "lng", "created_at"),
+    )
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     created_at: Mapped[DateTime] = mapped_column(
@@ -17,3 +25,45 @@ class OutbreakEvent(Base):
     lng: Mapped[float] = mapped_column(Float)
     symptoms_text: Mapped[str] = mapped_column(String(500))
     symptoms_tokens: Mapped[list] = mapped_column(JSON, default=list)
+    # Canonical symptom bits (app/services/symptom_vocabulary.py); NULL on rows
+    # written before the column existed until scripts/migrate_symptom_masks.py runs.
+    symptoms_mask: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    # Resolved from lat/lng at write time (app/services/admin_areas.py).
+    district_code: Mapped[str | None] = mapped_column(String(16), nullable=True)
+    block_code: Mapped[str | None] = mapped_column(String(16), nullable=True)
+
+
+# Hourly rollups written by app/services/outbreak_rollup.py. Cells are the
+# 0.01-degree squares get_active_outbreaks groups by, stored as integer
+# hundredths; hours are whole hours since the Unix epoch (UTC).
+class OutbreakCellHour(Base):
+    __tablename__ = "outbreak_cell_hours"
+
+    hour: Mapped[int] = mapped_column(Integer, primary_key=True)
+    cell_lat: Mapped[int] = mapped_column(Integer, primary_key=True)
+    cell_lng: Mapped[int] = mapped_column(Integer, primary_key=True)
+    # "" for events without a resolved district.
+    district_code: Mapped[str] = mapped_column(String(16), primary_key=True, default="")
+    events: Mapped[int] = mapped_column(Integer)
+    sum_lat: Mapped[float] = mapped_column(Float)
+    sum_lng: Mapped[float] = mapped_column(Float)
+
+
+class OutbreakCellHourToken(Base):
+    __tablename__ = "outbreak_cell_hour_tokens"
+
+    hour: Mapped[int] = mapped_column(Integer, primary_key=True)
+    cell_lat: Mapped[int] = mapped_column(Integer, primary_key=True)
+    cell_lng: Mapped[int] = mapped_column(Integer, primary_key=True)
+    token: Mapped[str] = mapped_column(String(120), primary_key=True)
+    count: Mapped[int] = mapped_column(Integer)
+
+
+class OutbreakRollupHour(Base):
+    """Marks an hour as compacted; hours without a marker are read from outbreak_events."""
+
+    __tablename__ = "outbreak_rollup_hours"
+
+    hour: Mapped[int] = mapped_column(Integer, primary_key=True)
+    events: Mapped[int] = mapped_column(Integer)
+    compacted_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now())
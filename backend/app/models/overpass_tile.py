@@ -0,0 +1,14 @@
+from sqlalchemy import DateTime, String, JSON
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models import Base
+
+
+class OverpassTile(Base):
+    """Overpass API results for one geohash tile, cached for the fallback search."""
+
+    __tablename__ = "overpass_tiles"
+
+    geohash: Mapped[str] = mapped_column(String(12), primary_key=True)
+    fetched_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True))
+    elements: Mapped[list] = mapped_column(JSON, default=list)
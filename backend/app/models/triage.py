@@ -20,6 +20,7 @@ class TriageSession(Base):
         Index("ix_triage_created_at", "created_at"),
         Index("ix_triage_patient_created", "patient_id", "created_at"),
         Index("ix_triage_location_created", "location_lat", "location_lng", "created_at"),
+        Index("ix_triage_district_created", "district_code", "created_at"),
     )
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
@@ -34,6 +35,9 @@ class TriageSession(Base):
     image_analysis: Mapped[dict | None] = mapped_column(JSON, nullable=True)
     location_lat: Mapped[float | None] = mapped_column(Numeric(10, 8), nullable=True)
     location_lng: Mapped[float | None] = mapped_column(Numeric(11, 8), nullable=True)
+    # Resolved from the location at write time (app/services/admin_areas.py).
+    district_code: Mapped[str | None] = mapped_column(String(16), nullable=True)
+    block_code: Mapped[str | None] = mapped_column(String(16), nullable=True)
     offline_mode: Mapped[bool] = mapped_column(default=False)
     visited_hospital: Mapped[bool] = mapped_column(default=False)
     ai_model_used: Mapped[str] = mapped_column(String(80))
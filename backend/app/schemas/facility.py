@@ -1,16 +1,21 @@
+from datetime import datetime
 from typing import Literal
 
-from pydantic import BaseModel, ConfigDict, Field, conint
+from pydantic import BaseModel, ConfigDict, Field, conint, model_validator
 
 UrgencyLevel = Literal["EMERGENCY", "URGENT", "ROUTINE", "SELF_CARE"]
 FacilityType = Literal["PHC", "CHC", "SDH", "DH", "MEDICAL_COLLEGE", "PRIVATE"]
+LocationSource = Literal["gps", "pincode", "village"]
 
 
 class FacilitySearch(BaseModel):
-    """Example: {"user_lat":12.9716,"user_lng":77.5946,"urgency_level":"URGENT"}"""
+    """Example: {"user_lat":12.9716,"user_lng":77.5946,"urgency_level":"URGENT"} or {"pincode":"226001",...}"""
 
-    user_lat: float = Field(ge=-90, le=90)
-    user_lng: float = Field(ge=-180, le=180)
+    user_lat: float | None = Field(default=None, ge=-90, le=90)
+    user_lng: float | None = Field(default=None, ge=-180, le=180)
+    pincode: str | None = Field(default=None, max_length=10)
+    village: str | None = Field(default=None, max_length=120)
+    district: str | None = Field(default=None, max_length=120)
     urgency_level: UrgencyLevel
     radius_km: conint(ge=1, le=200) = 50
     max_results: conint(ge=1, le=50) = 5
@@ -28,11 +33,20 @@ class FacilitySearch(BaseModel):
                     "urgency_level": "URGENT",
                     "radius_km": 20,
                     "max_results": 5,
-                }
+                },
+                {"pincode": "226001", "urgency_level": "ROUTINE"},
             ]
         }
     )
 
+    @model_validator(mode="after")
+    def require_location(self) -> "FacilitySearch":
+        if (self.user_lat is None) != (self.user_lng is None):
+            raise ValueError("user_lat and user_lng must be given together.")
+        if self.user_lat is None and not (self.pincode or self.village):
+            raise ValueError("Give user_lat/user_lng, a pincode or a village.")
+        return self
+
 
 class FacilityResponse(BaseModel):
     """Example: {"name":"District Hospital","distance_km":2.3,"is_open_now":true}"""
@@ -51,12 +65,16 @@ class FacilityResponse(BaseModel):
     operating_hours: dict | None = None
     specialties: list[str] | None = None
     bed_capacity: int | None = None
+    beds_free: int | None = None
+    queue_length: int | None = None
+    status_reported_at: str | None = None
     estimated_wait_time: int | None = None
     is_active: bool
     last_updated: str | None = None
     distance_km: float | None = None
     travel_time: int | None = None
     travel_time_mins: int | None = None
+    travel_time_source: Literal["road", "straight_line"] | None = None
     is_open_now: bool | None = None
     directions_url: str | None = None
     call_url: str | None = None
@@ -65,8 +83,67 @@ class FacilityResponse(BaseModel):
 
 
 class FacilityList(BaseModel):
-    """Example: {"total_found":2,"search_radius":20,"facilities":[...]}"""
+    """Example: {"total_found":2,"search_radius":40,"requested_radius":20,"widen_steps":1,"facilities":[...]}"""
+
+    total_found: int
+    search_radius: int
+    requested_radius: int | None = None
+    widen_steps: int = 0
+    location_source: LocationSource = "gps"
+    facilities: list[FacilityResponse]
+
+
+class BatchOrigin(BaseModel):
+    """Example: {"ref":"hh-114","user_lat":12.97,"user_lng":77.59,"urgency_level":"ROUTINE"}"""
+
+    ref: str | None = Field(default=None, max_length=64)
+    user_lat: float = Field(ge=-90, le=90)
+    user_lng: float = Field(ge=-180, le=180)
+    urgency_level: UrgencyLevel
+
+
+class FacilityBatchSearch(BaseModel):
+    """Example: {"origins":[{"ref":"hh-114","user_lat":12.97,"user_lng":77.59,"urgency_level":"ROUTINE"}],"max_results":1}"""
+
+    origins: list[BatchOrigin] = Field(min_length=1, max_length=5000)
+    radius_km: conint(ge=1, le=200) = 50
+    max_results: conint(ge=1, le=10) = 1
+    facility_types: list[FacilityType] | None = None
+    open_now: bool | None = None
+    emergency_only: bool | None = None
+    max_wait_minutes: conint(ge=0, le=240) | None = None
+
 
+class FacilityBatchResult(BaseModel):
+    """One NDJSON line of a batch search, in the same order as the request's origins."""
+
+    ref: str | None = None
+    user_location: dict[str, float]
     total_found: int
     search_radius: int
+    widen_steps: int = 0
     facilities: list[FacilityResponse]
+
+
+class FacilityStatusUpdate(BaseModel):
+    """Example: {"facility_id":"f-102","queue_length":14,"beds_free":3,"er_open":true}"""
+
+    facility_id: str = Field(min_length=1, max_length=36)
+    queue_length: conint(ge=0, le=1000) | None = None
+    beds_free: conint(ge=0, le=10000) | None = None
+    er_open: bool | None = None
+    wait_minutes: conint(ge=0, le=1440) | None = None
+    reported_at: datetime | None = None
+
+
+class FacilityStatusBatch(BaseModel):
+    """Example: {"updates":[{"facility_id":"f-102","queue_length":14}]}"""
+
+    updates: list[FacilityStatusUpdate] = Field(min_length=1, max_length=1000)
+
+
+class FacilityStatusAccepted(BaseModel):
+    """Example: {"applied":1,"ignored":0}"""
+
+    applied: int
+    ignored: int
@@ -10,6 +10,8 @@ class OutbreakCluster(BaseModel):
     radius_km: int
     window_hours: int
     top_symptoms: list[str]
+    district_code: str | None = None
+    district_name: str | None = None
 
 
 class OutbreakList(BaseModel):
@@ -35,3 +37,68 @@ class OutbreakList(BaseModel):
             ]
         }
     )
+
+
+class ScanCluster(BaseModel):
+    """Example: {"center_lat":26.85,"center_lng":80.95,"radius_km":2.4,"window_hours":12,"cases":31,"p_value":0.01}"""
+
+    center_lat: float = Field(ge=-90, le=90)
+    center_lng: float = Field(ge=-180, le=180)
+    radius_km: float
+    cells: int
+    window_hours: int
+    cases: int
+    expected: float
+    relative_risk: float | None = None
+    llr: float
+    p_value: float
+    district_code: str | None = None
+    district_name: str | None = None
+
+
+class OutbreakScanResult(BaseModel):
+    """Latest space-time scan; ``computed_at`` is None until the first run finishes."""
+
+    computed_at: str | None = None
+    events: int = 0
+    cells: int = 0
+    baseline_days: int | None = None
+    window_hours: list[int] = []
+    max_radius_km: float | None = None
+    replicates: int | None = None
+    alpha: float | None = None
+    runtime_ms: float | None = None
+    clusters: list[ScanCluster] = []
+
+
+class SimilarCaseMatch(BaseModel):
+    symptoms: list[str]
+    similarity: float
+    cases: int
+
+
+class SimilarCaseResult(BaseModel):
+    """Example: {"query_symptoms":["fever","vomiting"],"days":30,"district_code":"157","total_cases":212}"""
+
+    query_symptoms: list[str]
+    days: int
+    district_code: str | None = None
+    district_name: str | None = None
+    total_cases: int
+    candidates_examined: int
+    matches: list[SimilarCaseMatch]
+
+
+class DistrictSummary(BaseModel):
+    """Example: {"district_code":"157","district_name":"Lucknow","triage_sessions":42,"outbreak_events":30}"""
+
+    district_code: str | None
+    district_name: str | None = None
+    triage_sessions: int
+    by_urgency: dict[str, int]
+    outbreak_events: int
+    window_hours: int
+
+
+class DistrictSummaryList(BaseModel):
+    districts: list[DistrictSummary]
@@ -22,6 +22,10 @@ class SymptomInput(BaseModel):
     patient_age: conint(ge=0, le=120)
     patient_gender: Gender
     location: Location | None = None
+    # Used for facility and outbreak context when no GPS location is available.
+    pincode: str | None = Field(default=None, max_length=10)
+    village: str | None = Field(default=None, max_length=120)
+    district: str | None = Field(default=None, max_length=120)
     language: SupportedLanguage
     follow_up_answers: dict[str, str] | None = None
     patient_id: str | None = None
@@ -75,6 +79,22 @@ class FollowUpResponse(BaseModel):
     source: str = "hybrid"
 
 
+class CommunityAlert(BaseModel):
+    """Example: {"outbreak_detected":true,"cases":18,"radius_km":5,"map_age_seconds":42.0}"""
+
+    outbreak_detected: bool
+    radius_km: float
+    cases: int
+    window_hours: int
+    alert_message: str
+    recommended_action: str
+    symptom_cluster: list[str]
+    source: str | None = None
+    map_computed_at: str | None = None
+    map_age_seconds: float | None = None
+    map_stale: bool | None = None
+
+
 class TriageResponse(BaseModel):
     """Example: {"urgency_level":"URGENT","confidence_score":0.82}"""
 
@@ -87,6 +107,9 @@ class TriageResponse(BaseModel):
     estimated_distance_to_facility: float | None = None
     cost_estimate_inr: dict | None = None
     follow_up_reminder_token: str | None = None
+    community_alert: CommunityAlert | None = None
+    # Age of the precomputed alert map consulted for this request.
+    community_alert_map_age_seconds: float | None = None
 
     model_config = ConfigDict(
         json_schema_extra={
@@ -0,0 +1,221 @@
+"""Offline reverse geocoding of points to district and block codes.
+
+District and block boundaries are read from a local GeoJSON file; features
+with a block code are blocks (and carry their district), the rest are
+districts. Each layer is indexed on a fixed lat/lng grid:
+
+* cells entirely inside one polygon resolve with a single dict lookup;
+* cells crossed by a boundary keep the polygons whose edges touch them, and
+  only those are tested with an even-odd point-in-polygon check over their
+  precomputed edge arrays.
+
+Codes are resolved when triage sessions and outbreak events are written, so
+district reporting is a ``GROUP BY district_code`` rather than a geometry query.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import math
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+GRID_DEGREES = 0.05
+# Cell centres tested per vectorised point-in-polygon batch while indexing.
+INDEX_BATCH_POINTS = 4096
+
+DISTRICT_CODE_KEYS = ("district_code", "dtcode", "dt_code", "dist_code", "lgd_district_code", "censuscode")
+DISTRICT_NAME_KEYS = ("district_name", "district", "dtname", "dist_name")
+BLOCK_CODE_KEYS = ("block_code", "sdtcode", "sdt_code", "subdistrict_code", "lgd_block_code")
+BLOCK_NAME_KEYS = ("block_name", "block", "sdtname", "subdistrict")
+
+
+@dataclass(frozen=True)
+class AdminArea:
+    district_code: str | None
+    district_name: str | None = None
+    block_code: str | None = None
+    block_name: str | None = None
+
+
+def _property(properties: dict, keys: tuple[str, ...]) -> str | None:
+    lowered = {str(key).lower(): value for key, value in properties.items()}
+    for key in keys:
+        value = lowered.get(key)
+        if value not in (None, ""):
+            return str(value).strip()
+    return None
+
+
+def _rings(geometry: dict) -> list[np.ndarray]:
+    if geometry["type"] == "Polygon":
+        polygons = [geometry["coordinates"]]
+    elif geometry["type"] == "MultiPolygon":
+        polygons = geometry["coordinates"]
+    else:
+        return []
+    return [np.asarray(ring, dtype=np.float64)[:, :2] for polygon in polygons for ring in polygon if len(ring) >= 3]
+
+
+class _Polygon:
+    """All rings of one area as edge arrays; even-odd crossing covers holes and multipart areas."""
+
+    __slots__ = ("area", "x1", "y1", "x2", "y2", "slope", "bounds")
+
+    def __init__(self, area: AdminArea, rings: list[np.ndarray]) -> None:
+        starts = np.concatenate(rings)
+        ends = np.concatenate([np.roll(ring, -1, axis=0) for ring in rings])
+        self.area = area
+        self.x1, self.y1 = starts[:, 0], starts[:, 1]
+        self.x2, self.y2 = ends[:, 0], ends[:, 1]
+        dy = ends[:, 1] - starts[:, 1]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.slope = np.where(dy == 0, 0.0, (ends[:, 0] - starts[:, 0]) / dy)
+        self.bounds = (starts[:, 1].min(), starts[:, 1].max(), starts[:, 0].min(), starts[:, 0].max())
+
+    def contains(self, lat: float, lng: float) -> bool:
+        min_lat, max_lat, min_lng, max_lng = self.bounds
+        if not (min_lat <= lat <= max_lat and min_lng <= lng <= max_lng):
+            return False
+        crosses = ((self.y1 > lat) != (self.y2 > lat)) & (lng < self.x1 + (lat - self.y1) * self.slope)
+        return bool(np.count_nonzero(crosses) & 1)
+
+    def contains_many(self, lat: np.ndarray, lng: np.ndarray) -> np.ndarray:
+        inside = np.zeros(len(lat), dtype=bool)
+        for start in range(0, len(lat), INDEX_BATCH_POINTS):
+            y = lat[start : start + INDEX_BATCH_POINTS, None]
+            x = lng[start : start + INDEX_BATCH_POINTS, None]
+            crosses = ((self.y1 > y) != (self.y2 > y)) & (x < self.x1 + (y - self.y1) * self.slope)
+            inside[start : start + INDEX_BATCH_POINTS] = np.count_nonzero(crosses, axis=1) & 1
+        return inside
+
+
+class _GridLayer:
+    def __init__(self, polygons: list[_Polygon], degrees: float) -> None:
+        self.polygons = polygons
+        self.degrees = degrees
+        self.cols = int(math.ceil(360 / degrees))
+        # cell -> polygon covering it entirely, or the polygons whose boundary crosses it
+        self.interior: dict[int, int] = {}
+        self.boundary: dict[int, list[int]] = {}
+        for number, polygon in enumerate(polygons):
+            self._index(number, polygon)
+
+    def _cell(self, lat: float, lng: float) -> int:
+        return int((lat + 90) // self.degrees) * self.cols + int((lng + 180) // self.degrees)
+
+    def _index(self, number: int, polygon: _Polygon) -> None:
+        d = self.degrees
+        x1, y1, x2, y2 = polygon.x1, polygon.y1, polygon.x2, polygon.y2
+        rows_lo = ((np.minimum(y1, y2) + 90) // d).astype(np.int64)
+        rows_hi = ((np.maximum(y1, y2) + 90) // d).astype(np.int64)
+        cols_lo = ((np.minimum(x1, x2) + 180) // d).astype(np.int64)
+        cols_hi = ((np.maximum(x1, x2) + 180) // d).astype(np.int64)
+        single = (rows_lo == rows_hi) & (cols_lo == cols_hi)
+        crossed = set((rows_lo[single] * self.cols + cols_lo[single]).tolist())
+        for r0, r1, c0, c1 in zip(rows_lo[~single], rows_hi[~single], cols_lo[~single], cols_hi[~single]):
+            crossed.update(r * self.cols + c for r in range(r0, r1 + 1) for c in range(c0, c1 + 1))
+        for cell in crossed:
+            self.boundary.setdefault(cell, []).append(number)
+
+        min_lat, max_lat, min_lng, max_lng = polygon.bounds
+        rows = np.arange(int((min_lat + 90) // d), int((max_lat + 90) // d) + 1)
+        cols = np.arange(int((min_lng + 180) // d), int((max_lng + 180) // d) + 1)
+        cells = (rows[:, None] * self.cols + cols[None, :]).ravel()
+        open_cells = np.array([cell for cell in cells.tolist() if cell not in crossed], dtype=np.int64)
+        if not len(open_cells):
+            return
+        centre_lat = (open_cells // self.cols + 0.5) * d - 90
+        centre_lng = (open_cells % self.cols + 0.5) * d - 180
+        for cell in open_cells[polygon.contains_many(centre_lat, centre_lng)].tolist():
+            self.interior[cell] = number
+
+    def resolve(self, lat: float, lng: float) -> AdminArea | None:
+        cell = self._cell(lat, lng)
+        number = self.interior.get(cell)
+        if number is not None:
+            return self.polygons[number].area
+        for number in self.boundary.get(cell, ()):
+            if self.polygons[number].contains(lat, lng):
+                return self.polygons[number].area
+        return None
+
+
+class AdminAreaIndex:
+    """Resolves a point to its block (preferred) or district from boundary polygons."""
+
+    def __init__(self) -> None:
+        self._blocks: _GridLayer | None = None
+        self._districts: _GridLayer | None = None
+        self.district_names: dict[str, str] = {}
+        self.block_names: dict[str, str] = {}
+
+    @property
+    def loaded(self) -> bool:
+        return self._blocks is not None or self._districts is not None
+
+    @classmethod
+    def from_geojson(cls, collection: dict, degrees: float = GRID_DEGREES) -> "AdminAreaIndex":
+        blocks: list[_Polygon] = []
+        districts: list[_Polygon] = []
+        for feature in collection.get("features", []):
+            properties = feature.get("properties") or {}
+            rings = _rings(feature.get("geometry") or {"type": None})
+            area = AdminArea(
+                district_code=_property(properties, DISTRICT_CODE_KEYS),
+                district_name=_property(properties, DISTRICT_NAME_KEYS),
+                block_code=_property(properties, BLOCK_CODE_KEYS),
+                block_name=_property(properties, BLOCK_NAME_KEYS),
+            )
+            if not rings or not (area.district_code or area.block_code):
+                continue
+            (blocks if area.block_code else districts).append(_Polygon(area, rings))
+
+        index = cls()
+        index._blocks = _GridLayer(blocks, degrees) if blocks else None
+        index._districts = _GridLayer(districts, degrees) if districts else None
+        for polygon in blocks + districts:
+            area = polygon.area
+            if area.district_code and area.district_name:
+                index.district_names.setdefault(area.district_code, area.district_name)
+            if area.block_code and area.block_name:
+                index.block_names.setdefault(area.block_code, area.block_name)
+        return index
+
+    def load(self, path: str) -> None:
+        started = time.perf_counter()
+        with open(path, encoding="utf-8") as handle:
+            loaded = self.from_geojson(json.load(handle))
+        self.__dict__.update(loaded.__dict__)
+        logger.info(
+            "Admin boundaries loaded: %s blocks, %s districts in %.1f s",
+            len(self._blocks.polygons) if self._blocks else 0,
+            len(self._districts.polygons) if self._districts else 0,
+            time.perf_counter() - started,
+        )
+
+    def resolve(self, lat: float | None, lng: float | None) -> AdminArea | None:
+        if lat is None or lng is None:
+            return None
+        lat, lng = float(lat), float(lng)
+        for layer in (self._blocks, self._districts):
+            if layer is not None:
+                area = layer.resolve(lat, lng)
+                if area is not None:
+                    return area
+        return None
+
+    def codes(self, lat: float | None, lng: float | None) -> dict[str, str | None]:
+        """``district_code``/``block_code`` column values for a point (None when unresolved)."""
+        area = self.resolve(lat, lng)
+        return {
+            "district_code": area.district_code if area else None,
+            "block_code": area.block_code if area else None,
+        }
+
+
+admin_areas = AdminAreaIndex()
@@ -0,0 +1,394 @@
+from __future__ import annotations
+
+import logging
+import os
+import time
+from typing import Any, Callable, Iterable, Iterator, Sequence
+
+import numpy as np
+from sqlalchemy import JSON, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.facility import FacilityType
+from app.services.facility_ranking import (
+    DEFAULT_WAIT_MINS,
+    MAX_SEARCH_RADIUS_KM,
+    RankedSearch,
+    penalty_by_type_code,
+    search_rings,
+)
+from app.services.geo import bounding_box, haversine_km_vec
+from app.services.operating_hours import SCHEDULE_KEY, ClockReading, CompiledSchedule, compile_hours
+from app.services.road_routing import road_router
+
+logger = logging.getLogger(__name__)
+
+# Raw SQL reads of facilities need these typed so JSON arrives decoded on every driver.
+FACILITY_RESULT_TYPES = {"operating_hours": JSON, "specialties": JSON}
+
+FACILITY_TYPE_CODES = {facility_type.value: code for code, facility_type in enumerate(FacilityType)}
+UNKNOWN_TYPE_CODE = len(FACILITY_TYPE_CODES)
+# Open-state codes per compiled schedule; facilities without hours are "unknown".
+OPEN_UNKNOWN, OPEN_CLOSED, OPEN_OPEN = -1, 0, 1
+
+
+class FacilityCatalog:
+    """Active facilities held as columnar NumPy arrays, sorted by latitude.
+
+    Searches slice the latitude band with ``searchsorted``, then run distance,
+    filtering and top-k selection as array operations. Only the rows that end
+    up in the response are materialised as dicts.
+    """
+
+    def __init__(
+        self,
+        lat: np.ndarray,
+        lng: np.ndarray,
+        type_code: np.ndarray,
+        emergency: np.ndarray,
+        wait: np.ndarray,
+        schedule_id: np.ndarray,
+        schedules: Sequence[CompiledSchedule],
+        rows: Sequence[dict],
+    ) -> None:
+        self.lat = lat
+        self.lng = lng
+        self.type_code = type_code
+        self.emergency = emergency
+        self.wait = wait
+        self.schedule_id = schedule_id
+        self.schedules = list(schedules)
+        self.rows = rows
+        self._index: dict[str, int] | None = None
+        # Live status fields (facility_live_status) merged over the stored rows.
+        self._overrides: dict[int, dict] = {}
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[dict]) -> "FacilityCatalog":
+        rows = sorted(rows, key=lambda row: float(row["latitude"]))
+        schedule_index: dict[int, int] = {}
+        schedules: list[CompiledSchedule] = []
+        schedule_ids = np.full(len(rows), -1, dtype=np.int32)
+        for idx, row in enumerate(rows):
+            schedule = compile_hours(row.get("operating_hours"))
+            if schedule is None:
+                continue
+            key = id(schedule)
+            if key not in schedule_index:
+                schedule_index[key] = len(schedules)
+                schedules.append(schedule)
+            schedule_ids[idx] = schedule_index[key]
+
+        return cls(
+            lat=np.array([float(row["latitude"]) for row in rows], dtype=np.float64),
+            lng=np.array([float(row["longitude"]) for row in rows], dtype=np.float64),
+            type_code=np.array(
+                [
+                    FACILITY_TYPE_CODES.get(str(row.get("facility_type", "")).upper(), UNKNOWN_TYPE_CODE)
+                    for row in rows
+                ],
+                dtype=np.int8,
+            ),
+            emergency=np.array([bool(row.get("emergency_available")) for row in rows], dtype=bool),
+            # -1 marks an unknown wait time.
+            wait=np.array(
+                [
+                    -1 if row.get("estimated_wait_time") is None else row["estimated_wait_time"]
+                    for row in rows
+                ],
+                dtype=np.int32,
+            ),
+            schedule_id=schedule_ids,
+            schedules=schedules,
+            rows=rows,
+        )
+
+    def __len__(self) -> int:
+        return len(self.lat)
+
+    def row(self, idx: int) -> dict:
+        row = dict(self.rows[idx])
+        schedule_id = self.schedule_id[idx]
+        row[SCHEDULE_KEY] = self.schedules[schedule_id] if schedule_id >= 0 else None
+        override = self._overrides.get(idx)
+        if override:
+            row.update(override)
+        return row
+
+    def index_of(self, facility_id: str) -> int | None:
+        if self._index is None:
+            self._index = {str(self.rows[idx]["id"]): idx for idx in range(len(self))}
+        return self._index.get(str(facility_id))
+
+    def apply_live(self, idx: int, fields: dict) -> None:
+        """Overlay live status on one facility, in its columns and materialised row.
+
+        Snapshot columns are read-only mappings, so the first write copies the
+        column into process memory.
+        """
+        if "estimated_wait_time" in fields:
+            if not self.wait.flags.writeable:
+                self.wait = self.wait.copy()
+            wait = fields["estimated_wait_time"]
+            self.wait[idx] = -1 if wait is None else wait
+        if "emergency_available" in fields:
+            if not self.emergency.flags.writeable:
+                self.emergency = self.emergency.copy()
+            self.emergency[idx] = bool(fields["emergency_available"])
+        self._overrides.setdefault(idx, {}).update(fields)
+
+    def open_states(self, idx: np.ndarray, clock: ClockReading) -> np.ndarray:
+        """Open-state codes for the given rows, evaluating each distinct schedule once."""
+        by_schedule = np.array(
+            [OPEN_OPEN if schedule.is_open(clock) else OPEN_CLOSED for schedule in self.schedules]
+            + [OPEN_UNKNOWN],
+            dtype=np.int8,
+        )
+        # schedule_id -1 (no hours) indexes the trailing OPEN_UNKNOWN entry.
+        return by_schedule[self.schedule_id[idx]]
+
+    def candidates_within(self, lat: float, lng: float, radius_km: float) -> tuple[np.ndarray, np.ndarray]:
+        """Row indices within ``radius_km`` and their distances, in catalog order."""
+        min_lat, max_lat, min_lng, max_lng = bounding_box(lat, lng, radius_km)
+        lo = int(np.searchsorted(self.lat, min_lat, side="left"))
+        hi = int(np.searchsorted(self.lat, max_lat, side="right"))
+        idx = np.arange(lo, hi)
+        lng_band = self.lng[lo:hi]
+        idx = idx[(lng_band >= min_lng) & (lng_band <= max_lng)]
+        distances = haversine_km_vec(lat, lng, self.lat[idx], self.lng[idx])
+        within = distances <= radius_km
+        return idx[within], distances[within]
+
+    def filter_mask(
+        self,
+        idx: np.ndarray,
+        urgency: str,
+        clock: ClockReading,
+        facility_types: list[str] | None = None,
+        open_now: bool | None = None,
+        emergency_only: bool | None = None,
+        max_wait_minutes: int | None = None,
+    ) -> np.ndarray:
+        """Vectorised equivalent of FacilitySearchService.filter_by_urgency."""
+        mask = np.ones(len(idx), dtype=bool)
+        if emergency_only or urgency == "EMERGENCY":
+            mask &= self.emergency[idx]
+        if urgency == "URGENT" or open_now is True:
+            states = self.open_states(idx, clock)
+            if urgency == "URGENT":
+                mask &= states != OPEN_CLOSED
+            if open_now is True:
+                mask &= states == OPEN_OPEN
+        if facility_types:
+            codes = [FACILITY_TYPE_CODES.get(t.upper(), UNKNOWN_TYPE_CODE) for t in facility_types]
+            mask &= np.isin(self.type_code[idx], codes)
+        if max_wait_minutes is not None:
+            mask &= np.maximum(self.wait[idx], 0) <= max_wait_minutes
+        return mask
+
+    def nearest(
+        self,
+        lat: float,
+        lng: float,
+        urgency: str,
+        radius_km: float,
+        max_results: int,
+        clock: ClockReading,
+        **filters: Any,
+    ) -> tuple[list[dict], int]:
+        """Return the closest qualifying facilities and the count inside the radius."""
+        idx, distances = self.candidates_within(lat, lng, radius_km)
+        total_found = len(idx)
+        mask = self.filter_mask(idx, urgency, clock, **filters)
+        idx, distances = idx[mask], distances[mask]
+        if len(idx) > max_results:
+            top = np.argpartition(distances, max_results - 1)[:max_results]
+            idx, distances = idx[top], distances[top]
+        order = np.argsort(distances, kind="stable")
+
+        facilities = []
+        for position in order:
+            facility = self.row(int(idx[position]))
+            facility["distance_km"] = float(distances[position])
+            facilities.append(facility)
+        return facilities, total_found
+
+    def scores(
+        self, idx: np.ndarray, distances: np.ndarray, urgency: str, drive: np.ndarray | None = None
+    ) -> np.ndarray:
+        """Vectorised facility_ranking.facility_score for the given rows.
+
+        ``drive`` holds road-network minutes per row, NaN where the straight-line
+        estimate applies.
+        """
+        if urgency == "EMERGENCY":
+            speed = np.full(len(idx), 50.0)
+        else:
+            speed = np.where(self.emergency[idx], 45.0, 35.0)
+        travel = distances / speed * 60
+        if drive is not None:
+            travel = np.where(np.isnan(drive), travel, drive)
+        wait = self.wait[idx]
+        return (
+            travel
+            + np.where(wait < 0, DEFAULT_WAIT_MINS, wait)
+            + penalty_by_type_code(urgency)[self.type_code[idx]]
+        )
+
+    def drive_minutes(self, idx: np.ndarray, lat: float, lng: float) -> np.ndarray | None:
+        if not road_router.loaded:
+            return None
+        return road_router.drive_minutes(road_router.grids_for_rows(self, idx), lat, lng)
+
+    def ranked(
+        self,
+        lat: float,
+        lng: float,
+        urgency: str,
+        radius_km: int,
+        max_results: int,
+        clock: ClockReading,
+        **filters: Any,
+    ) -> RankedSearch:
+        """Best-scoring qualifying facilities, widening the radius until enough qualify."""
+        return self._ranked(
+            lat,
+            lng,
+            urgency,
+            radius_km,
+            max_results,
+            lambda idx: self.filter_mask(idx, urgency, clock, **filters),
+        )
+
+    def ranked_many(
+        self,
+        origins: Iterable[tuple[float, float, str]],
+        radius_km: int,
+        max_results: int,
+        clock: ClockReading,
+        **filters: Any,
+    ) -> Iterator[RankedSearch]:
+        """``ranked`` for many ``(lat, lng, urgency)`` origins sharing one set of filters.
+
+        The filters are evaluated over the whole catalog once per urgency level,
+        so each origin only costs its latitude-band slice and the scoring.
+        """
+        everything = np.arange(len(self))
+        qualifies: dict[str, np.ndarray] = {}
+        for lat, lng, urgency in origins:
+            if urgency not in qualifies:
+                qualifies[urgency] = self.filter_mask(everything, urgency, clock, **filters)
+            yield self._ranked(lat, lng, urgency, radius_km, max_results, qualifies[urgency].__getitem__)
+
+    def ranked_static(
+        self, origins: Iterable[tuple[float, float]], urgency: str, radius_km: int, max_results: int
+    ) -> Iterator[RankedSearch]:
+        """``ranked`` ignoring opening hours, for lists precomputed ahead of query time.
+
+        Only the emergency requirement is applied; callers re-filter the
+        precomputed rows against the clock when they serve them.
+        """
+        if urgency == "EMERGENCY":
+            qualifies = self.emergency
+        else:
+            qualifies = np.ones(len(self), dtype=bool)
+        for lat, lng in origins:
+            yield self._ranked(lat, lng, urgency, radius_km, max_results, qualifies.__getitem__)
+
+    def _ranked(
+        self,
+        lat: float,
+        lng: float,
+        urgency: str,
+        radius_km: int,
+        max_results: int,
+        mask_for: Callable[[np.ndarray], np.ndarray],
+    ) -> RankedSearch:
+        for step, ring in enumerate(search_rings(radius_km)):
+            idx, distances = self.candidates_within(lat, lng, ring)
+            mask = mask_for(idx)
+            if int(mask.sum()) >= max_results or ring >= MAX_SEARCH_RADIUS_KM:
+                break
+        total_found = len(idx)
+        idx, distances = idx[mask], distances[mask]
+        drive = self.drive_minutes(idx, lat, lng)
+        scores = self.scores(idx, distances, urgency, drive)
+        if len(idx) > max_results:
+            top = np.argpartition(scores, max_results - 1)[:max_results]
+            idx, distances, scores = idx[top], distances[top], scores[top]
+            drive = drive[top] if drive is not None else None
+        order = np.lexsort((distances, scores))
+
+        facilities = []
+        for position in order:
+            facility = self.row(int(idx[position]))
+            facility["distance_km"] = float(distances[position])
+            if drive is not None and not np.isnan(drive[position]):
+                facility["drive_minutes"] = float(drive[position])
+            facilities.append(facility)
+        return RankedSearch(facilities, total_found, ring, step)
+
+
+class FacilityCatalogStore:
+    """Holds the process-wide catalog; searches fall back to SQL until it is loaded."""
+
+    def __init__(self) -> None:
+        self._catalog: FacilityCatalog | None = None
+        self.loaded_at: float | None = None
+        self._snapshot_key: tuple[int, int] | None = None
+        self._listeners: list[Callable[[FacilityCatalog | None, FacilityCatalog], None]] = []
+
+    def current(self) -> FacilityCatalog | None:
+        return self._catalog
+
+    def add_listener(self, listener: Callable[[FacilityCatalog | None, FacilityCatalog], None]) -> None:
+        """Call ``listener(old, new)`` whenever the catalog is replaced."""
+        self._listeners.append(listener)
+
+    def replace(self, catalog: FacilityCatalog) -> None:
+        previous, self._catalog = self._catalog, catalog
+        self.loaded_at = time.time()
+        for listener in self._listeners:
+            try:
+                listener(previous, catalog)
+            except Exception as exc:  # pragma: no cover
+                logger.warning("Facility catalog listener failed: %s", exc)
+
+    async def refresh(self, session: AsyncSession) -> FacilityCatalog:
+        started = time.perf_counter()
+        catalog = FacilityCatalog.from_rows(await load_active_facilities(session))
+        self.replace(catalog)
+        logger.info(
+            "Facility catalog loaded: %s facilities in %.1f ms",
+            len(catalog),
+            (time.perf_counter() - started) * 1000,
+        )
+        return catalog
+
+    def load_snapshot(self, path: str) -> bool:
+        """Map the snapshot at ``path`` unless the one already mapped is current.
+
+        Writers swap snapshots in with ``os.replace``, which gives the file a new
+        inode; mappings of the previous file stay valid until they are dropped.
+        """
+        from app.services.facility_snapshot import open_snapshot
+
+        stat = os.stat(path)
+        key = (stat.st_ino, stat.st_mtime_ns)
+        if key == self._snapshot_key:
+            return False
+        catalog, header = open_snapshot(path)
+        self.replace(catalog)
+        self._snapshot_key = key
+        logger.info("Facility snapshot mapped: %s facilities from %s", header["count"], path)
+        return True
+
+
+async def load_active_facilities(session: AsyncSession) -> list[dict]:
+    result = await session.execute(
+        text("SELECT * FROM facilities WHERE is_active = true").columns(**FACILITY_RESULT_TYPES)
+    )
+    return [dict(row) for row in result.mappings().all()]
+
+
+facility_catalog = FacilityCatalogStore()
@@ -0,0 +1,433 @@
+"""Streaming import of facility registries (CSV or GeoJSON) into ``facilities``.
+
+Records are parsed one at a time, normalised, and upserted in batches keyed
+on the facility id, so memory stays flat regardless of file size and a
+re-run converges on the same table. Progress is checkpointed after every
+committed batch; a resumed run skips the records already committed.
+"""
+from __future__ import annotations
+
+import csv
+import json
+import logging
+import os
+import re
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any, Callable, Iterator
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.database import upsert_statement
+from app.models.facility import Facility, FacilityType
+
+logger = logging.getLogger(__name__)
+
+IMPORT_COLUMNS = [
+    "id", "name", "facility_type", "latitude", "longitude", "address", "district", "state",
+    "pincode", "contact_number", "emergency_available", "operating_hours", "specialties",
+    "bed_capacity", "estimated_wait_time", "is_active", "last_updated",
+]
+# SQLite caps bound parameters per statement (32766 since 3.32).
+SQLITE_MAX_VARIABLES = 32766
+# Stable namespace so registry rows without an id get the same id on every run.
+REGISTRY_NAMESPACE = uuid.UUID("6f1f4c2e-5b7a-4d43-9a0e-3c1d2b8e7f10")
+
+# Registry spellings of facility types, compared after lower-casing and
+# stripping everything but letters.
+TYPE_ALIASES = {
+    "phc": FacilityType.PHC,
+    "primaryhealthcentre": FacilityType.PHC,
+    "primaryhealthcenter": FacilityType.PHC,
+    "uphc": FacilityType.PHC,
+    "chc": FacilityType.CHC,
+    "communityhealthcentre": FacilityType.CHC,
+    "communityhealthcenter": FacilityType.CHC,
+    "sdh": FacilityType.SDH,
+    "subdistricthospital": FacilityType.SDH,
+    "subdivisionalhospital": FacilityType.SDH,
+    "dh": FacilityType.DH,
+    "districthospital": FacilityType.DH,
+    "medicalcollege": FacilityType.MEDICAL_COLLEGE,
+    "medicalcollegehospital": FacilityType.MEDICAL_COLLEGE,
+    "private": FacilityType.PRIVATE,
+    "privatehospital": FacilityType.PRIVATE,
+    "privateclinic": FacilityType.PRIVATE,
+}
+FIELD_ALIASES = {
+    "id": ["id", "facility_id", "registry_id"],
+    "name": ["name", "facility_name"],
+    "facility_type": ["facility_type", "type", "category"],
+    "latitude": ["latitude", "lat"],
+    "longitude": ["longitude", "lng", "lon", "long"],
+    "address": ["address", "addr"],
+    "district": ["district"],
+    "state": ["state"],
+    "pincode": ["pincode", "pin", "postcode"],
+    "contact_number": ["contact_number", "phone", "contact"],
+    "emergency_available": ["emergency_available", "emergency"],
+    "operating_hours": ["operating_hours", "hours"],
+    "specialties": ["specialties", "specialities"],
+    "bed_capacity": ["bed_capacity", "beds"],
+    "estimated_wait_time": ["estimated_wait_time", "wait_minutes"],
+}
+TRUE_VALUES = {"1", "true", "yes", "y", "t"}
+SEPARATORS = re.compile(r"[\s,]*")
+
+
+class ImportRowError(ValueError):
+    """A registry record that cannot be turned into a facility row."""
+
+
+def _field(record: dict, name: str) -> Any:
+    for key in FIELD_ALIASES[name]:
+        value = record.get(key)
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def normalize_facility_type(value: Any) -> str:
+    key = re.sub(r"[^a-z]", "", str(value or "").lower())
+    facility_type = TYPE_ALIASES.get(key)
+    if facility_type is None:
+        raise ImportRowError(f"unknown facility type {value!r}")
+    return facility_type.value
+
+
+def _int_or_none(value: Any, name: str) -> int | None:
+    if value is None:
+        return None
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        raise ImportRowError(f"{name} is not a number: {value!r}") from None
+
+
+def _json_field(value: Any) -> Any:
+    if isinstance(value, str):
+        value = value.strip()
+        if value.startswith(("{", "[")):
+            return json.loads(value)
+    return value
+
+
+def normalize_record(record: dict, imported_at: datetime) -> dict:
+    """Map one registry record onto ``facilities`` columns, or raise ImportRowError."""
+    name = str(_field(record, "name") or "").strip()
+    if not name:
+        raise ImportRowError("missing name")
+    try:
+        latitude = float(_field(record, "latitude"))
+        longitude = float(_field(record, "longitude"))
+    except (TypeError, ValueError):
+        raise ImportRowError("missing or invalid coordinates") from None
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        raise ImportRowError(f"coordinates out of range: {latitude}, {longitude}")
+    facility_type = normalize_facility_type(_field(record, "facility_type"))
+
+    facility_id = str(_field(record, "id") or "").strip()
+    if not facility_id or len(facility_id) > 36:
+        facility_id = str(uuid.uuid5(REGISTRY_NAMESPACE, f"{facility_id}|{name}|{latitude:.6f}|{longitude:.6f}"))
+
+    hours = _json_field(_field(record, "operating_hours"))
+    if isinstance(hours, str):
+        hours = {"24/7": True} if hours.replace(" ", "").upper() in {"24/7", "24X7"} else None
+    specialties = _json_field(_field(record, "specialties"))
+    if isinstance(specialties, str):
+        specialties = [part.strip() for part in specialties.split(";") if part.strip()]
+    emergency = _field(record, "emergency_available")
+    if isinstance(emergency, str):
+        emergency = emergency.strip().lower() in TRUE_VALUES
+    elif emergency is None:
+        emergency = facility_type in {FacilityType.DH.value, FacilityType.MEDICAL_COLLEGE.value}
+    pincode = re.sub(r"\D", "", str(_field(record, "pincode") or ""))[:6]
+
+    return {
+        "id": facility_id,
+        "name": name[:200],
+        "facility_type": facility_type,
+        "latitude": latitude,
+        "longitude": longitude,
+        "address": str(_field(record, "address") or "Address unavailable"),
+        "district": str(_field(record, "district") or "")[:120],
+        "state": str(_field(record, "state") or "")[:120],
+        "pincode": pincode,
+        "contact_number": str(_field(record, "contact_number") or "")[:15],
+        "emergency_available": bool(emergency),
+        "operating_hours": hours or None,
+        "specialties": specialties or [],
+        "bed_capacity": _int_or_none(_field(record, "bed_capacity"), "bed_capacity"),
+        "estimated_wait_time": _int_or_none(_field(record, "estimated_wait_time"), "estimated_wait_time"),
+        "is_active": True,
+        "last_updated": imported_at,
+    }
+
+
+def iter_csv_records(path: str) -> Iterator[dict]:
+    with open(path, newline="", encoding="utf-8-sig") as handle:
+        for record in csv.DictReader(handle):
+            yield {key.strip().lower(): value for key, value in record.items() if key}
+
+
+def _feature_record(feature: dict) -> dict:
+    record = {key.lower(): value for key, value in (feature.get("properties") or {}).items()}
+    geometry = feature.get("geometry") or {}
+    if geometry.get("type") == "Point":
+        record["longitude"], record["latitude"] = geometry["coordinates"][:2]
+    return record
+
+
+def iter_geojson_records(path: str, chunk_size: int = 1 << 16) -> Iterator[dict]:
+    """Yield the features of a GeoJSON FeatureCollection without loading the file.
+
+    The file is read in chunks and each feature is decoded as soon as it is
+    complete, so only one feature is buffered at a time.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, encoding="utf-8-sig") as handle:
+        buffer = ""
+        in_features = False
+        while True:
+            chunk = handle.read(chunk_size)
+            buffer += chunk
+            if not in_features:
+                match = re.search(r'"features"\s*:\s*\[', buffer)
+                if match is None:
+                    if not chunk:
+                        raise ImportRowError("no FeatureCollection \"features\" array found")
+                    continue
+                buffer = buffer[match.end():]
+                in_features = True
+            position = 0
+            while True:
+                position = SEPARATORS.match(buffer, position).end()
+                if position >= len(buffer) or buffer[position] == "]":
+                    break
+                try:
+                    feature, position = decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError:
+                    break  # Feature continues in the next chunk.
+                yield _feature_record(feature)
+            buffer = buffer[position:]
+            if buffer.startswith("]"):
+                return
+            if not chunk:
+                raise ImportRowError("truncated GeoJSON feature at end of file")
+
+
+def iter_geojson_seq_records(path: str) -> Iterator[dict]:
+    """Newline-delimited GeoJSON (GeoJSONSeq): one feature per line."""
+    with open(path, encoding="utf-8-sig") as handle:
+        for line in handle:
+            line = line.strip().lstrip("\x1e")
+            if line:
+                yield _feature_record(json.loads(line))
+
+
+def iter_records(path: str, fmt: str | None = None) -> Iterator[dict]:
+    if fmt is None:
+        extension = os.path.splitext(path)[1].lower()
+        fmt = {".csv": "csv", ".geojsonl": "geojsonseq", ".geojsons": "geojsonseq", ".ndjson": "geojsonseq"}.get(
+            extension, "geojson"
+        )
+    readers = {"csv": iter_csv_records, "geojson": iter_geojson_records, "geojsonseq": iter_geojson_seq_records}
+    if fmt not in readers:
+        raise ValueError(f"Unsupported import format {fmt!r}")
+    return readers[fmt](path)
+
+
+@dataclass
+class ImportCheckpoint:
+    """Records consumed so far, tied to the source file's size and mtime."""
+
+    path: str
+    source: str
+    fingerprint: list[int]
+    consumed: int = 0
+
+    @classmethod
+    def open(cls, path: str, source: str) -> "ImportCheckpoint":
+        stat = os.stat(source)
+        fingerprint = [stat.st_size, stat.st_mtime_ns]
+        try:
+            with open(path, encoding="utf-8") as handle:
+                saved = json.load(handle)
+        except (OSError, ValueError):
+            saved = {}
+        consumed = saved.get("consumed", 0) if saved.get("fingerprint") == fingerprint else 0
+        return cls(path=path, source=source, fingerprint=fingerprint, consumed=consumed)
+
+    def save(self, consumed: int) -> None:
+        self.consumed = consumed
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump({"source": self.source, "fingerprint": self.fingerprint, "consumed": consumed}, handle)
+        os.replace(tmp_path, self.path)
+
+    def clear(self) -> None:
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+@dataclass
+class ImportStats:
+    consumed: int = 0
+    upserted: int = 0
+    rejected: int = 0
+    skipped: int = 0
+    started: float = field(default_factory=time.perf_counter)
+
+    @property
+    def rows_per_second(self) -> float:
+        elapsed = time.perf_counter() - self.started
+        return self.upserted / elapsed if elapsed > 0 else 0.0
+
+
+class FacilityBatchWriter:
+    """Upserts batches of normalised rows.
+
+    ``copy`` (Postgres default) streams the batch into a temp staging table with
+    asyncpg's COPY and merges it with one ``INSERT ... SELECT ... ON CONFLICT``;
+    ``executemany`` sends a parameterised upsert per batch, on either database;
+    ``multirow`` (SQLite default, SQLite only) builds one multi-row
+    ``INSERT ... VALUES`` statement with SQLite's ``?`` placeholders.
+    """
+
+    def __init__(self, session: AsyncSession, method: str = "auto") -> None:
+        self.session = session
+        self.dialect = session.get_bind().dialect
+        if method == "auto":
+            method = "copy" if self.dialect.name == "postgresql" else "multirow"
+        if method == "copy" and self.dialect.name != "postgresql":
+            raise ValueError("COPY is only available on Postgres.")
+        if method == "multirow" and self.dialect.name != "sqlite":
+            raise ValueError("multirow is only available on SQLite; use copy or executemany.")
+        self.method = method
+        columns = Facility.__table__.columns
+        self._processors = [
+            columns[name].type.dialect_impl(self.dialect).bind_processor(self.dialect) for name in IMPORT_COLUMNS
+        ]
+        self._multirow_sql: dict[int, str] = {}
+
+    @property
+    def max_batch(self) -> int | None:
+        if self.dialect.name == "sqlite":
+            return SQLITE_MAX_VARIABLES // len(IMPORT_COLUMNS)
+        return None
+
+    async def write(self, rows: list[dict]) -> None:
+        if self.method == "copy":
+            await self._copy(rows)
+        elif self.method == "executemany":
+            await self.session.execute(upsert_statement(self.session, Facility.__table__, ["id"]), rows)
+        else:
+            await self._multirow(rows)
+
+    async def _multirow(self, rows: list[dict]) -> None:
+        # Rendered by hand: compiling a 2000-row VALUES clause through the ORM
+        # costs more than executing it. Values still go through column types.
+        sql = self._multirow_sql.get(len(rows))
+        if sql is None:
+            placeholder = "(" + ", ".join(["?"] * len(IMPORT_COLUMNS)) + ")"
+            updates = ", ".join(f"{name} = excluded.{name}" for name in IMPORT_COLUMNS if name != "id")
+            sql = self._multirow_sql[len(rows)] = (
+                f"INSERT INTO facilities ({', '.join(IMPORT_COLUMNS)}) VALUES "
+                + ", ".join([placeholder] * len(rows))
+                + f" ON CONFLICT (id) DO UPDATE SET {updates}"
+            )
+        params = []
+        for row in rows:
+            for name, process in zip(IMPORT_COLUMNS, self._processors):
+                value = row[name]
+                params.append(process(value) if process and value is not None else value)
+        connection = await self.session.connection()
+        await connection.exec_driver_sql(sql, tuple(params))
+
+    async def _copy(self, rows: list[dict]) -> None:
+        connection = await self.session.connection()
+        columns = ", ".join(IMPORT_COLUMNS)
+        # The session may hand back a different pooled connection after each
+        # commit, so make sure this one has the staging table.
+        await connection.execute(
+            text(
+                "CREATE TEMP TABLE IF NOT EXISTS facilities_import "
+                f"ON COMMIT DELETE ROWS AS SELECT {columns} FROM facilities WITH NO DATA"
+            )
+        )
+        raw = await connection.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            "facilities_import",
+            records=[self._copy_record(row) for row in rows],
+            columns=IMPORT_COLUMNS,
+        )
+        updates = ", ".join(f"{name} = EXCLUDED.{name}" for name in IMPORT_COLUMNS if name != "id")
+        await connection.execute(
+            text(
+                f"INSERT INTO facilities ({columns}) SELECT {columns} FROM facilities_import "
+                f"ON CONFLICT (id) DO UPDATE SET {updates}"
+            )
+        )
+
+    @staticmethod
+    def _copy_record(row: dict) -> tuple:
+        # COPY bypasses SQLAlchemy types: JSON goes as text, Numeric as Decimal.
+        values = dict(row)
+        values["latitude"] = Decimal(str(row["latitude"]))
+        values["longitude"] = Decimal(str(row["longitude"]))
+        values["operating_hours"] = json.dumps(row["operating_hours"]) if row["operating_hours"] else None
+        values["specialties"] = json.dumps(row["specialties"])
+        return tuple(values[name] for name in IMPORT_COLUMNS)
+
+
+async def import_facilities(
+    session_factory: async_sessionmaker[AsyncSession],
+    source: str,
+    fmt: str | None = None,
+    batch_size: int = 5000,
+    method: str = "auto",
+    checkpoint_path: str | None = None,
+    progress: Callable[[ImportStats], None] | None = None,
+) -> ImportStats:
+    """Stream ``source`` into ``facilities``; resumes from ``checkpoint_path`` when it matches."""
+    checkpoint = ImportCheckpoint.open(checkpoint_path or f"{source}.import-state.json", source)
+    stats = ImportStats(skipped=checkpoint.consumed)
+    imported_at = datetime.now(timezone.utc)
+    async with session_factory() as session:
+        writer = FacilityBatchWriter(session, method)
+        if writer.max_batch:
+            batch_size = min(batch_size, writer.max_batch)
+        batch: dict[str, dict] = {}
+
+        async def commit_batch() -> None:
+            if batch:
+                await writer.write(list(batch.values()))
+                await session.commit()
+                stats.upserted += len(batch)
+                batch.clear()
+            checkpoint.save(stats.consumed)
+            if progress:
+                progress(stats)
+
+        for position, record in enumerate(iter_records(source, fmt)):
+            stats.consumed = position + 1
+            if position < checkpoint.consumed:
+                continue
+            try:
+                row = normalize_record(record, imported_at)
+            except (ImportRowError, ValueError) as exc:
+                stats.rejected += 1
+                if stats.rejected <= 20:
+                    logger.warning("Record %s rejected: %s", position + 1, exc)
+                continue
+            # A later duplicate id in the same batch wins, as it would across batches.
+            batch[row["id"]] = row
+            if len(batch) >= batch_size:
+                await commit_batch()
+        await commit_batch()
+    checkpoint.clear()
+    return stats
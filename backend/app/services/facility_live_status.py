@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Iterable
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import upsert_statement
+from app.models.facility_status import FacilityLiveStatus
+from app.services.facility_catalog import FacilityCatalog, facility_catalog
+from app.services.facility_search_cache import facility_search_cache
+
+logger = logging.getLogger(__name__)
+
+# Used to estimate a wait from queue length when a facility does not report one.
+MINUTES_PER_QUEUED_PATIENT = 6
+FLUSH_BATCH_SIZE = 500
+
+
+@dataclass(slots=True)
+class LiveStatus:
+    facility_id: str
+    reported_at: datetime
+    queue_length: int | None = None
+    beds_free: int | None = None
+    er_open: bool | None = None
+    wait_minutes: int | None = None
+
+    def merge(self, update: dict) -> None:
+        for name in ("queue_length", "beds_free", "er_open", "wait_minutes"):
+            if update.get(name) is not None:
+                setattr(self, name, update[name])
+        self.reported_at = update["reported_at"]
+
+    def fields(self) -> dict:
+        """Facility row fields this status overrides."""
+        fields = {
+            "queue_length": self.queue_length,
+            "beds_free": self.beds_free,
+            "status_reported_at": self.reported_at.isoformat(),
+        }
+        wait = self.wait_minutes
+        if wait is None and self.queue_length is not None:
+            wait = self.queue_length * MINUTES_PER_QUEUED_PATIENT
+        if wait is not None:
+            fields["estimated_wait_time"] = wait
+        if self.er_open is not None:
+            fields["emergency_available"] = self.er_open
+        return fields
+
+    def as_row(self) -> dict:
+        return {
+            "facility_id": self.facility_id,
+            "queue_length": self.queue_length,
+            "beds_free": self.beds_free,
+            "er_open": self.er_open,
+            "wait_minutes": self.wait_minutes,
+            "reported_at": self.reported_at,
+        }
+
+
+class FacilityLiveState:
+    """In-memory table of live facility status (queue, beds, ER open).
+
+    Updates are applied in memory only: they overwrite the matching catalog
+    columns and rows in place, and mark the affected search-cache cells for
+    invalidation on their next lookup. A scheduler job writes the changed
+    facilities to ``facility_live_status`` in batches, so the request path
+    never waits on the database. Reports land on whichever worker received
+    them, so each worker also syncs from the table on a schedule to pick up
+    the others' flushed reports.
+    """
+
+    def __init__(self) -> None:
+        self._status: dict[str, LiveStatus] = {}
+        self._dirty: set[str] = set()
+        self.updates_applied = 0
+        self.updates_ignored = 0
+        self.rows_flushed = 0
+        self.rows_synced = 0
+        self.last_flush_at: float | None = None
+        self.last_sync_at: float | None = None
+
+    def get(self, facility_id: str) -> LiveStatus | None:
+        return self._status.get(str(facility_id))
+
+    def apply(self, updates: Iterable[dict]) -> tuple[int, int]:
+        """Apply updates and return ``(applied, ignored)``.
+
+        Updates for facilities missing from the loaded catalog, and reports
+        older than the one already held, are ignored.
+        """
+        catalog = facility_catalog.current()
+        applied = ignored = 0
+        moved: list[tuple[float, float]] = []
+        for update in updates:
+            facility_id = str(update["facility_id"])
+            reported_at = update.get("reported_at") or datetime.now(timezone.utc)
+            if reported_at.tzinfo is None:
+                reported_at = reported_at.replace(tzinfo=timezone.utc)
+            update = {**update, "reported_at": reported_at}
+            idx = catalog.index_of(facility_id) if catalog is not None else None
+            if catalog is not None and idx is None:
+                ignored += 1
+                continue
+            status = self._status.get(facility_id)
+            if status is None:
+                status = self._status[facility_id] = LiveStatus(facility_id, reported_at)
+            elif reported_at < status.reported_at:
+                ignored += 1
+                continue
+            status.merge(update)
+            self._dirty.add(facility_id)
+            applied += 1
+            if idx is not None:
+                catalog.apply_live(idx, status.fields())
+                moved.append((float(catalog.lat[idx]), float(catalog.lng[idx])))
+        facility_search_cache.defer_invalidation(moved)
+        self.updates_applied += applied
+        self.updates_ignored += ignored
+        return applied, ignored
+
+    def overlay_rows(self, rows: list[dict]) -> list[dict]:
+        """Merge live status into facility rows read straight from SQL."""
+        if not self._status:
+            return rows
+        for row in rows:
+            status = self._status.get(str(row["id"]))
+            if status is not None:
+                row.update(status.fields())
+        return rows
+
+    def catalog_replaced(self, old: FacilityCatalog | None, new: FacilityCatalog) -> None:
+        for facility_id, status in self._status.items():
+            idx = new.index_of(facility_id)
+            if idx is not None:
+                new.apply_live(idx, status.fields())
+
+    async def sync(self, session: AsyncSession) -> int:
+        """Apply flushed reports newer than the ones held (on startup: all of them).
+
+        The table holds one row per reporting facility, so it is read whole.
+        """
+        result = await session.execute(select(FacilityLiveStatus))
+        updates = []
+        for row in result.scalars().all():
+            reported_at = row.reported_at
+            if reported_at.tzinfo is None:
+                reported_at = reported_at.replace(tzinfo=timezone.utc)
+            status = self._status.get(row.facility_id)
+            if status is not None and reported_at <= status.reported_at:
+                continue
+            updates.append(
+                {
+                    "facility_id": row.facility_id,
+                    "queue_length": row.queue_length,
+                    "beds_free": row.beds_free,
+                    "er_open": row.er_open,
+                    "wait_minutes": row.wait_minutes,
+                    "reported_at": reported_at,
+                }
+            )
+        applied, _ = self.apply(updates)
+        # Rows read back are already in the database.
+        self._dirty.difference_update(update["facility_id"] for update in updates)
+        self.rows_synced += applied
+        self.last_sync_at = time.time()
+        return applied
+
+    async def flush(self, session: AsyncSession) -> int:
+        """Write every facility changed since the last flush, in batches."""
+        if not self._dirty:
+            return 0
+        dirty, self._dirty = self._dirty, set()
+        rows = [self._status[facility_id].as_row() for facility_id in dirty]
+        # Another worker may already have flushed a newer report for the facility.
+        statement = upsert_statement(session, FacilityLiveStatus.__table__, ["facility_id"], "reported_at")
+        try:
+            for start in range(0, len(rows), FLUSH_BATCH_SIZE):
+                await session.execute(statement, rows[start : start + FLUSH_BATCH_SIZE])
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            self._dirty |= dirty
+            raise
+        self.rows_flushed += len(rows)
+        self.last_flush_at = time.time()
+        return len(rows)
+
+    def metrics(self) -> dict:
+        return {
+            "facilities_reporting": len(self._status),
+            "pending_flush": len(self._dirty),
+            "updates_applied": self.updates_applied,
+            "updates_ignored": self.updates_ignored,
+            "rows_flushed": self.rows_flushed,
+            "rows_synced": self.rows_synced,
+            "last_flush_at": self.last_flush_at,
+            "last_sync_at": self.last_sync_at,
+        }
+
+
+facility_live_state = FacilityLiveState()
+facility_catalog.add_listener(facility_live_state.catalog_replaced)
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import heapq
+from dataclasses import dataclass
+from typing import Iterable
+
+import numpy as np
+
+from app.models.facility import FacilityType
+
+MAX_SEARCH_RADIUS_KM = 200
+RING_GROWTH = 2
+DEFAULT_WAIT_MINS = 30
+
+# Minutes added to a facility's score by urgency and facility type. Emergencies
+# favour hospitals that can treat them; routine care favours primary care so
+# district hospitals are not crowded with cases a PHC can handle.
+_ROUTINE_PENALTY = {"PHC": 0, "CHC": 0, "SDH": 10, "DH": 15, "MEDICAL_COLLEGE": 20, "PRIVATE": 10}
+CAPABILITY_PENALTY_MINS = {
+    "EMERGENCY": {"PHC": 30, "CHC": 15, "SDH": 5, "DH": 0, "MEDICAL_COLLEGE": 0, "PRIVATE": 5},
+    "URGENT": {"PHC": 10, "CHC": 0, "SDH": 0, "DH": 0, "MEDICAL_COLLEGE": 5, "PRIVATE": 5},
+    "ROUTINE": _ROUTINE_PENALTY,
+    "SELF_CARE": _ROUTINE_PENALTY,
+}
+UNKNOWN_TYPE_PENALTY_MINS = 10
+
+
+@dataclass
+class RankedSearch:
+    facilities: list[dict]
+    total_found: int
+    search_radius: int
+    widen_steps: int
+
+
+def average_speed_kmh(urgency: str, emergency_available: bool) -> float:
+    if urgency == "EMERGENCY":
+        return 50
+    if emergency_available:
+        return 45
+    return 35
+
+
+def travel_minutes(distance_km: float, urgency: str, emergency_available: bool) -> float:
+    return distance_km / average_speed_kmh(urgency, emergency_available) * 60
+
+
+def capability_penalty(urgency: str, facility_type: str) -> float:
+    penalties = CAPABILITY_PENALTY_MINS.get(urgency, _ROUTINE_PENALTY)
+    return penalties.get(str(facility_type).upper(), UNKNOWN_TYPE_PENALTY_MINS)
+
+
+def facility_score(facility: dict, urgency: str) -> float:
+    """Estimated minutes until the patient is seen, plus a capability penalty.
+
+    Travel uses the road-network drive time when one was attached to the
+    facility (``drive_minutes``) and the straight-line estimate otherwise.
+    """
+    wait = facility.get("estimated_wait_time")
+    travel = facility.get("drive_minutes")
+    if travel is None:
+        travel = travel_minutes(
+            float(facility.get("distance_km", 0)), urgency, bool(facility.get("emergency_available"))
+        )
+    return (
+        travel
+        + (DEFAULT_WAIT_MINS if wait is None else wait)
+        + capability_penalty(urgency, facility.get("facility_type", ""))
+    )
+
+
+def penalty_by_type_code(urgency: str) -> np.ndarray:
+    """Capability penalties indexed by catalog type code (last entry: unknown type)."""
+    return np.array(
+        [capability_penalty(urgency, facility_type.value) for facility_type in FacilityType]
+        + [UNKNOWN_TYPE_PENALTY_MINS],
+        dtype=np.float64,
+    )
+
+
+def search_rings(radius_km: int) -> list[int]:
+    """Radii to try in turn: the requested one, then doubling up to the maximum."""
+    rings = [radius_km]
+    while rings[-1] < MAX_SEARCH_RADIUS_KM:
+        rings.append(min(MAX_SEARCH_RADIUS_KM, rings[-1] * RING_GROWTH))
+    return rings
+
+
+def top_k(facilities: Iterable[dict], k: int, urgency: str) -> list[dict]:
+    """Best ``k`` facilities by score, kept in a bounded heap rather than a full sort."""
+    scored = (
+        (facility_score(facility, urgency), float(facility.get("distance_km", 0)), n, facility)
+        for n, facility in enumerate(facilities)
+    )
+    return [item[-1] for item in heapq.nsmallest(k, scored)]
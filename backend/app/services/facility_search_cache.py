@@ -0,0 +1,271 @@
+from __future__ import annotations
+
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Hashable, Iterable
+
+import numpy as np
+
+from app.core.config import get_settings
+from app.services.facility_catalog import FacilityCatalog, facility_catalog
+from app.services.facility_ranking import (
+    DEFAULT_WAIT_MINS,
+    RankedSearch,
+    average_speed_kmh,
+    capability_penalty,
+    search_rings,
+)
+from app.services.geo import geohash_bounds, geohash_encode, haversine_km, haversine_km_vec
+from app.services.operating_hours import ClockReading
+from app.services.road_routing import road_router
+
+logger = logging.getLogger(__name__)
+
+# Past this many changed facilities an invalidation clears the cache outright.
+MAX_POINT_INVALIDATIONS = 1000
+
+
+def cell_geometry(cell: str) -> tuple[float, float, float]:
+    """Centre of a geohash cell and the distance from it to the farthest corner."""
+    min_lat, max_lat, min_lng, max_lng = geohash_bounds(cell)
+    lat = (min_lat + max_lat) / 2
+    lng = (min_lng + max_lng) / 2
+    return lat, lng, haversine_km(lat, lng, max_lat, max_lng)
+
+
+def search_key(cell: str, urgency: str, radius_km: int, max_results: int, **filters: Any) -> tuple:
+    types = filters.get("facility_types")
+    return (
+        cell,
+        urgency,
+        radius_km,
+        max_results,
+        tuple(sorted(t.upper() for t in types)) if types else None,
+        filters.get("open_now"),
+        filters.get("emergency_only"),
+        filters.get("max_wait_minutes"),
+    )
+
+
+@dataclass
+class CellCandidates:
+    """Facilities around one geohash cell, prepared for any origin inside it.
+
+    ``cover_km`` is measured from the cell centre and spans the widest search
+    ring an origin in the cell can reach plus the cell's half-diagonal, so
+    distances computed from the user's own position are exact for every ring.
+    """
+
+    centre_lat: float
+    centre_lng: float
+    cover_km: float
+    cover_ring: int
+    # Every facility inside the cover, for total_found.
+    lat: np.ndarray
+    lng: np.ndarray
+    # Facilities passing the filters, with the urgency-specific score terms.
+    rows: list[dict]
+    q_lat: np.ndarray
+    q_lng: np.ndarray
+    q_speed: np.ndarray
+    q_base: np.ndarray
+    # Road-router grid per candidate (-1: straight-line estimate only).
+    q_grid: np.ndarray
+    # Open-state epoch: the filtered set holds until this minute of this day.
+    day: Any
+    open_until: int
+    built_at: float = field(default_factory=time.monotonic)
+
+    @classmethod
+    def build(
+        cls,
+        cell: str,
+        urgency: str,
+        cover_ring: int,
+        lat: np.ndarray,
+        lng: np.ndarray,
+        rows: list[dict],
+        clock: ClockReading,
+        minutes_valid: int,
+    ) -> "CellCandidates":
+        centre_lat, centre_lng, half_diagonal = cell_geometry(cell)
+        wait = [row.get("estimated_wait_time") for row in rows]
+        return cls(
+            centre_lat=centre_lat,
+            centre_lng=centre_lng,
+            cover_km=cover_ring + half_diagonal,
+            cover_ring=cover_ring,
+            lat=lat,
+            lng=lng,
+            rows=rows,
+            q_lat=np.array([float(row["latitude"]) for row in rows], dtype=np.float64),
+            q_lng=np.array([float(row["longitude"]) for row in rows], dtype=np.float64),
+            q_speed=np.array(
+                [average_speed_kmh(urgency, bool(row.get("emergency_available"))) for row in rows],
+                dtype=np.float64,
+            ),
+            q_base=np.array(
+                [
+                    (DEFAULT_WAIT_MINS if minutes is None else minutes)
+                    + capability_penalty(urgency, row.get("facility_type", ""))
+                    for row, minutes in zip(rows, wait)
+                ],
+                dtype=np.float64,
+            ),
+            q_grid=road_router.grid_ids(row["id"] for row in rows),
+            day=clock.day,
+            open_until=clock.minute_of_week + minutes_valid,
+        )
+
+    def is_current(self, clock: ClockReading) -> bool:
+        return clock.day == self.day and clock.minute_of_week < self.open_until
+
+    def search(self, lat: float, lng: float, radius_km: int, max_results: int) -> RankedSearch:
+        """Rank the cached candidates from the user's own position."""
+        distances = haversine_km_vec(lat, lng, self.q_lat, self.q_lng)
+        for step, ring in enumerate(search_rings(radius_km)):
+            within = distances <= ring
+            if int(within.sum()) >= max_results or ring >= self.cover_ring:
+                break
+        total_found = int((haversine_km_vec(lat, lng, self.lat, self.lng) <= ring).sum())
+        idx = np.flatnonzero(within)
+        distances = distances[idx]
+        drive = road_router.drive_minutes(self.q_grid[idx], lat, lng)
+        travel = np.where(np.isnan(drive), distances / self.q_speed[idx] * 60, drive)
+        scores = travel + self.q_base[idx]
+        if len(idx) > max_results:
+            top = np.argpartition(scores, max_results - 1)[:max_results]
+            idx, distances, scores, drive = idx[top], distances[top], scores[top], drive[top]
+        order = np.lexsort((distances, scores))
+        facilities = []
+        for position in order:
+            facility = {**self.rows[int(idx[position])], "distance_km": float(distances[position])}
+            if not np.isnan(drive[position]):
+                facility["drive_minutes"] = float(drive[position])
+            facilities.append(facility)
+        return RankedSearch(facilities, total_found, ring, step)
+
+
+class FacilitySearchCache:
+    """LRU of facility search candidates keyed by geohash cell, urgency and filters.
+
+    An entry is dropped when its TTL lapses, when the open state of any facility
+    it covers can change (its open-state epoch ends), or when a facility inside
+    its cover is added, moved or updated.
+    """
+
+    def __init__(self, max_entries: int = 5000, ttl_seconds: float = 60, precision: int = 6) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.precision = precision
+        self._entries: OrderedDict[Hashable, CellCandidates] = OrderedDict()
+        self._pending: set[tuple[float, float]] = set()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.invalidated = 0
+
+    def cell_for(self, lat: float, lng: float) -> str:
+        return geohash_encode(lat, lng, self.precision)
+
+    def get(self, key: Hashable, clock: ClockReading) -> CellCandidates | None:
+        if self._pending:
+            self._apply_pending()
+        entry = self._entries.get(key)
+        if entry is not None and (
+            time.monotonic() - entry.built_at > self.ttl_seconds or not entry.is_current(clock)
+        ):
+            del self._entries[key]
+            self.expired += 1
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key: Hashable, entry: CellCandidates) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self.invalidated += len(self._entries)
+        self._entries.clear()
+
+    def invalidate_points(self, points: Iterable[tuple[float, float]]) -> int:
+        """Drop every entry whose cover contains one of ``points`` (old or new positions)."""
+        points = list(points)
+        if not points or not self._entries:
+            return 0
+        keys = list(self._entries)
+        entries = list(self._entries.values())
+        centre_lat = np.array([entry.centre_lat for entry in entries], dtype=np.float64)
+        centre_lng = np.array([entry.centre_lng for entry in entries], dtype=np.float64)
+        cover_km = np.array([entry.cover_km for entry in entries], dtype=np.float64)
+        stale = np.zeros(len(keys), dtype=bool)
+        for lat, lng in points:
+            stale |= haversine_km_vec(float(lat), float(lng), centre_lat, centre_lng) <= cover_km
+        for position in np.flatnonzero(stale):
+            del self._entries[keys[position]]
+        self.invalidated += int(stale.sum())
+        return int(stale.sum())
+
+    def defer_invalidation(self, points: Iterable[tuple[float, float]]) -> None:
+        """Queue positions for invalidation on the next lookup, so writers stay O(1)."""
+        self._pending.update(points)
+
+    def _apply_pending(self) -> None:
+        points, self._pending = list(self._pending), set()
+        if len(points) > MAX_POINT_INVALIDATIONS:
+            self.clear()
+        else:
+            self.invalidate_points(points)
+
+    def catalog_replaced(self, old: FacilityCatalog | None, new: FacilityCatalog) -> None:
+        if not self._entries:
+            return
+        if old is None or not isinstance(old.rows, list) or not isinstance(new.rows, list):
+            # Snapshot swaps are bulk rebuilds; diffing them would decode every row.
+            self.clear()
+            return
+        before = {row["id"]: row for row in old.rows}
+        points = []
+        for row in new.rows:
+            previous = before.pop(row["id"], None)
+            if previous != row:
+                points.append((row["latitude"], row["longitude"]))
+                if previous is not None:
+                    points.append((previous["latitude"], previous["longitude"]))
+            if len(points) > MAX_POINT_INVALIDATIONS:
+                self.clear()
+                return
+        points.extend((row["latitude"], row["longitude"]) for row in before.values())
+        dropped = self.invalidate_points(points)
+        if dropped:
+            logger.info("Facility search cache: %s entries invalidated by catalog refresh", dropped)
+
+    def metrics(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "invalidated": self.invalidated,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+settings = get_settings()
+facility_search_cache = FacilitySearchCache(
+    max_entries=settings.facility_search_cache_max_entries,
+    ttl_seconds=settings.facility_search_cache_ttl_seconds,
+    precision=settings.facility_search_cache_precision,
+)
+facility_catalog.add_listener(facility_search_cache.catalog_replaced)
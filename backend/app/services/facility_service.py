@@ -1,17 +1,166 @@
 from __future__ import annotations
 
-import math
-from datetime import datetime, timedelta, timezone
-from typing import Any
+import logging
+from typing import Any, AsyncIterator, Callable
 
 import httpx
+import numpy as np
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import get_settings
+from app.services.facility_catalog import FACILITY_RESULT_TYPES, facility_catalog
+from app.services.facility_live_status import facility_live_state
+from app.services.facility_ranking import (
+    DEFAULT_WAIT_MINS,
+    MAX_SEARCH_RADIUS_KM,
+    RankedSearch,
+    average_speed_kmh,
+    search_rings,
+    top_k,
+)
+from app.services.facility_search_cache import (
+    CellCandidates,
+    cell_geometry,
+    facility_search_cache,
+    search_key,
+)
+from app.services.geo import bounding_box, haversine_km
+from app.services.operating_hours import MINUTES_PER_WEEK, ClockReading, schedule_of
+from app.services.overpass_cache import OverpassTileCache, element_to_facility
+from app.services.place_lookup import Place, place_lookup
+from app.services.road_routing import road_router
+
+logger = logging.getLogger(__name__)
+
+# Nearest rows first fetched per search ring on the SQL path, before filtering and
+# scoring; doubled while it cuts off the ring and too few rows qualify.
+SQL_CANDIDATE_POOL = 100
+
+FACILITY_COLUMNS = """
+    f.id, f.name, f.facility_type, f.latitude, f.longitude, f.address, f.district,
+    f.state, f.pincode, f.contact_number, f.emergency_available, f.operating_hours,
+    f.specialties, f.bed_capacity, f.estimated_wait_time, f.is_active, f.last_updated
+"""
+
+# The BETWEEN prefilter on (latitude, longitude) is served by ix_facilities_geo on
+# both SQLite and Postgres; the exact great-circle distance is only evaluated for
+# rows inside the box. The cosine term is clamped because rounding can push it
+# just past 1 for points at the search origin, which acos rejects on Postgres.
+NEARBY_FACILITIES_SQL = text(
+    """
+    SELECT *,
+           (6371 * acos(CASE
+               WHEN cos_angle > 1 THEN 1
+               WHEN cos_angle < -1 THEN -1
+               ELSE cos_angle
+           END)) AS distance_km
+    FROM (
+        SELECT *,
+               (cos(radians(:user_lat)) *
+                cos(radians(latitude)) *
+                cos(radians(longitude) - radians(:user_lng)) +
+                sin(radians(:user_lat)) *
+                sin(radians(latitude))) AS cos_angle
+        FROM facilities
+        WHERE latitude BETWEEN :min_lat AND :max_lat
+        AND longitude BETWEEN :min_lng AND :max_lng
+        AND is_active = true
+    ) AS candidates
+    WHERE (6371 * acos(CASE
+        WHEN cos_angle > 1 THEN 1
+        WHEN cos_angle < -1 THEN -1
+        ELSE cos_angle
+    END)) <= :radius_km
+    ORDER BY distance_km ASC
+    LIMIT :max_results
+    """
+).columns(**FACILITY_RESULT_TYPES)
+
+
+# Requires scripts/migrate_facilities_postgis.py: the geography column and its GiST
+# index let ST_DWithin prune by radius and the <-> operator walk the index in
+# distance order, so Postgres stops after max_results rows without sorting.
+POSTGIS_NEARBY_FACILITIES_SQL = text(
+    f"""
+    SELECT {FACILITY_COLUMNS},
+           ST_Distance(f.geog, origin.geog) / 1000.0 AS distance_km
+    FROM facilities AS f,
+         (SELECT ST_SetSRID(ST_MakePoint(:user_lng, :user_lat), 4326)::geography AS geog)
+         AS origin
+    WHERE f.is_active = true
+    AND ST_DWithin(f.geog, origin.geog, :radius_m)
+    ORDER BY f.geog <-> origin.geog
+    LIMIT :max_results
+    """
+).columns(**FACILITY_RESULT_TYPES)
+
+
+# scripts/migrate_facilities_postgis.py builds this index last, after the backfill.
+POSTGIS_READY_SQL = text("SELECT to_regclass('ix_facilities_geog') IS NOT NULL")
+
+
+def choose_spatial_backend(dialect: str, postgis_ready: bool, override: str | None = None) -> str:
+    """The nearby-facility query to run: PostGIS on a migrated Postgres, else bbox.
+
+    ``override`` (FACILITY_SPATIAL_BACKEND) forces "bbox", or "postgis" where it
+    is usable.
+    """
+    usable = dialect == "postgresql" and postgis_ready
+    if override == "bbox":
+        return "bbox"
+    if override == "postgis" and not usable:
+        logger.warning("FACILITY_SPATIAL_BACKEND=postgis needs a migrated Postgres database; using bbox.")
+    elif override not in (None, "", "postgis"):
+        logger.warning("Unknown FACILITY_SPATIAL_BACKEND=%s; choosing automatically.", override)
+    return "postgis" if usable else "bbox"
+
+
+class SpatialBackend:
+    """The nearby-facility query for this database, detected once at startup."""
+
+    def __init__(self) -> None:
+        self.name = "bbox"
+
+    async def detect(self, session: AsyncSession) -> str:
+        dialect = session.get_bind().dialect.name
+        postgis_ready = False
+        if dialect == "postgresql":
+            postgis_ready = bool((await session.execute(POSTGIS_READY_SQL)).scalar())
+        self.name = choose_spatial_backend(dialect, postgis_ready, get_settings().facility_spatial_backend)
+        logger.info("Facility search uses the %s query.", self.name)
+        return self.name
+
+
+facility_spatial_backend = SpatialBackend()
+
+
+def nearby_query_params(
+    user_lat: float, user_lng: float, radius_km: float, max_results: int
+) -> dict[str, Any]:
+    min_lat, max_lat, min_lng, max_lng = bounding_box(user_lat, user_lng, radius_km)
+    return {
+        "user_lat": user_lat,
+        "user_lng": user_lng,
+        "min_lat": min_lat,
+        "max_lat": max_lat,
+        "min_lng": min_lng,
+        "max_lng": max_lng,
+        "radius_km": radius_km,
+        "max_results": max_results,
+    }
+
 
 class FacilitySearchService:
-    def __init__(self, db_session: AsyncSession):
+    def __init__(
+        self,
+        db_session: AsyncSession,
+        spatial_backend: str | None = None,
+        http_client: httpx.AsyncClient | None = None,
+    ):
         self.db = db_session
+        self.http_client = http_client
+        self.spatial_backend = spatial_backend or facility_spatial_backend.name
 
     async def find_nearest(
         self,
@@ -25,76 +174,329 @@ class FacilitySearchService:
         emergency_only: bool | None = None,
         max_wait_minutes: int | None = None,
     ) -> dict:
-        facilities = await self._query_nearby(
-            user_lat=user_lat,
-            user_lng=user_lng,
-            radius_km=radius_km,
-            max_results=max_results * 2,
+        clock = ClockReading.at()
+        filters = {
+            "facility_types": facility_types,
+            "open_now": open_now,
+            "emergency_only": emergency_only,
+            "max_wait_minutes": max_wait_minutes,
+        }
+        search = await self._search(
+            user_lat, user_lng, urgency_level, radius_km, max_results, clock=clock, **filters
         )
-        if not facilities:
+        if not search.total_found:
             facilities = await self._fetch_overpass(
                 user_lat=user_lat, user_lng=user_lng, radius_km=radius_km
             )
-
-        filtered = self.filter_by_urgency(
-            facilities,
-            urgency_level,
-            facility_types=facility_types,
-            open_now=open_now,
-            emergency_only=emergency_only,
-            max_wait_minutes=max_wait_minutes,
-        )
+            filtered = self.filter_by_urgency(facilities, urgency_level, clock=clock, **filters)
+            search = RankedSearch(
+                facilities=top_k(
+                    road_router.annotate(filtered, user_lat, user_lng), max_results, urgency_level
+                ),
+                total_found=len(facilities),
+                search_radius=radius_km,
+                widen_steps=0,
+            )
 
         enriched = []
-        for facility in filtered[:max_results]:
+        for facility in search.facilities:
             enriched_facility = await self.enrich_facility_data(
-                facility, user_lat=user_lat, user_lng=user_lng, urgency=urgency_level
+                facility,
+                user_lat=user_lat,
+                user_lng=user_lng,
+                urgency=urgency_level,
+                clock=clock,
             )
             enriched.append(enriched_facility)
 
         return {
             "facilities": enriched,
-            "total_found": len(facilities),
-            "search_radius": radius_km,
+            "total_found": search.total_found,
+            "search_radius": search.search_radius,
+            "requested_radius": radius_km,
+            "widen_steps": search.widen_steps,
             "user_location": {"lat": user_lat, "lng": user_lng},
         }
 
+    async def find_nearest_batch(
+        self,
+        origins: list[dict],
+        radius_km: int = 50,
+        max_results: int = 1,
+        **filters: Any,
+    ) -> AsyncIterator[dict]:
+        """Yield one search result per origin, in order, as soon as each is ready.
+
+        Origins carry ``user_lat``, ``user_lng``, ``urgency_level`` and an optional
+        ``ref``. With the catalog loaded the whole batch is answered from memory;
+        otherwise each origin runs the SQL search. The Overpass fallback is not
+        used, so a batch never fans out into external requests.
+        """
+        clock = ClockReading.at()
+        catalog = facility_catalog.current()
+        if catalog is not None:
+            searches = catalog.ranked_many(
+                ((o["user_lat"], o["user_lng"], o["urgency_level"]) for o in origins),
+                radius_km,
+                max_results,
+                clock=clock,
+                **filters,
+            )
+        else:
+            searches = None
+
+        for origin in origins:
+            if searches is not None:
+                search = next(searches)
+            else:
+                search = await self._ranked_sql_search(
+                    origin["user_lat"],
+                    origin["user_lng"],
+                    origin["urgency_level"],
+                    radius_km,
+                    max_results,
+                    clock=clock,
+                    **filters,
+                )
+            yield {
+                "ref": origin.get("ref"),
+                "user_location": {"lat": origin["user_lat"], "lng": origin["user_lng"]},
+                "total_found": search.total_found,
+                "search_radius": search.search_radius,
+                "widen_steps": search.widen_steps,
+                "facilities": [
+                    await self.enrich_facility_data(
+                        facility,
+                        user_lat=origin["user_lat"],
+                        user_lng=origin["user_lng"],
+                        urgency=origin["urgency_level"],
+                        clock=clock,
+                    )
+                    for facility in search.facilities
+                ],
+            }
+
+    async def find_nearest_for_place(
+        self,
+        place: Place,
+        urgency_level: str,
+        radius_km: int = 50,
+        max_results: int = 5,
+        **filters: Any,
+    ) -> dict:
+        """Nearest facilities to a pincode or village centroid.
+
+        Serves the place's precomputed list for the urgency tier after checking
+        it against the clock, live status and filters. Falls back to a normal
+        search from the centroid when the table is stale, the catalog is not
+        loaded, or too few stored facilities remain within the radius.
+        """
+        clock = ClockReading.at()
+        catalog = facility_catalog.current()
+        facility_ids = place_lookup.facility_ids_for(place, urgency_level)
+        facilities: list[dict] = []
+        if catalog is not None and facility_ids is not None:
+            for facility_id in facility_ids:
+                idx = catalog.index_of(facility_id)
+                if idx is None:
+                    continue
+                facility = catalog.row(idx)
+                facility["distance_km"] = haversine_km(
+                    place.lat, place.lng, float(facility["latitude"]), float(facility["longitude"])
+                )
+                if facility["distance_km"] <= radius_km:
+                    facilities.append(facility)
+            facilities = self.filter_by_urgency(facilities, urgency_level, clock=clock, **filters)
+
+        if len(facilities) >= max_results:
+            ranked = top_k(road_router.annotate(facilities, place.lat, place.lng), max_results, urgency_level)
+            result = {
+                "facilities": [
+                    await self.enrich_facility_data(
+                        facility, user_lat=place.lat, user_lng=place.lng, urgency=urgency_level, clock=clock
+                    )
+                    for facility in ranked
+                ],
+                "total_found": len(facilities),
+                "search_radius": radius_km,
+                "requested_radius": radius_km,
+                "widen_steps": 0,
+                "user_location": {"lat": place.lat, "lng": place.lng},
+            }
+        else:
+            result = await self.find_nearest(
+                place.lat, place.lng, urgency_level, radius_km, max_results, **filters
+            )
+        result["location_source"] = place.kind
+        return result
+
+    async def _search(
+        self,
+        user_lat: float,
+        user_lng: float,
+        urgency: str,
+        radius_km: int,
+        max_results: int,
+        clock: ClockReading,
+        **filters: Any,
+    ) -> RankedSearch:
+        if not get_settings().facility_search_cache_enabled:
+            catalog = facility_catalog.current()
+            if catalog is not None:
+                return catalog.ranked(
+                    user_lat, user_lng, urgency, radius_km, max_results, clock=clock, **filters
+                )
+            return await self._ranked_sql_search(
+                user_lat, user_lng, urgency, radius_km, max_results, clock=clock, **filters
+            )
+
+        cell = facility_search_cache.cell_for(user_lat, user_lng)
+        key = search_key(cell, urgency, radius_km, max_results, **filters)
+        entry = facility_search_cache.get(key, clock)
+        if entry is None:
+            entry = await self._cell_candidates(
+                cell, urgency, radius_km, max_results, clock=clock, **filters
+            )
+            facility_search_cache.put(key, entry)
+        return entry.search(user_lat, user_lng, radius_km, max_results)
+
+    async def _cell_candidates(
+        self,
+        cell: str,
+        urgency: str,
+        radius_km: int,
+        max_results: int,
+        clock: ClockReading,
+        **filters: Any,
+    ) -> CellCandidates:
+        """Gather candidates around a cache cell's centre for every origin in the cell.
+
+        Rings widen until enough qualifying facilities lie within ``ring`` of any
+        point in the cell, and each ring is fetched out to ``ring`` plus the
+        cell's half-diagonal so per-user distances stay exact.
+        """
+        centre_lat, centre_lng, half_diagonal = cell_geometry(cell)
+        catalog = facility_catalog.current()
+        limit = max(SQL_CANDIDATE_POOL, max_results * 10)
+        for ring in search_rings(radius_km):
+            cover_km = ring + half_diagonal
+            if catalog is not None:
+                idx, distances = catalog.candidates_within(centre_lat, centre_lng, cover_km)
+                mask = catalog.filter_mask(idx, urgency, clock, **filters)
+                guaranteed = int((mask & (distances <= ring - half_diagonal)).sum())
+            else:
+                inner_km = ring - half_diagonal
+                rows, qualifying, limit = await self._query_ring(
+                    centre_lat,
+                    centre_lng,
+                    cover_km,
+                    limit,
+                    urgency,
+                    clock,
+                    lambda found: sum(1 for row in found if row["distance_km"] <= inner_km) >= max_results,
+                    **filters,
+                )
+                guaranteed = sum(1 for row in qualifying if row["distance_km"] <= inner_km)
+            if guaranteed >= max_results or ring >= MAX_SEARCH_RADIUS_KM:
+                break
+
+        if catalog is not None:
+            lat, lng = catalog.lat[idx], catalog.lng[idx]
+            qualifying = [catalog.row(int(i)) for i in idx[mask]]
+            schedules = [catalog.schedules[i] for i in np.unique(catalog.schedule_id[idx]) if i >= 0]
+        else:
+            lat = np.array([float(row["latitude"]) for row in rows], dtype=np.float64)
+            lng = np.array([float(row["longitude"]) for row in rows], dtype=np.float64)
+            schedules = [schedule for schedule in map(schedule_of, rows) if schedule is not None]
+
+        minutes_valid = MINUTES_PER_WEEK
+        if urgency == "URGENT" or filters.get("open_now") is True:
+            minutes_valid = min(
+                (schedule.minutes_until_change(clock) for schedule in set(schedules)),
+                default=MINUTES_PER_WEEK,
+            )
+        return CellCandidates.build(
+            cell, urgency, ring, lat, lng, qualifying, clock=clock, minutes_valid=minutes_valid
+        )
+
+    async def _ranked_sql_search(
+        self,
+        user_lat: float,
+        user_lng: float,
+        urgency: str,
+        radius_km: int,
+        max_results: int,
+        clock: ClockReading,
+        **filters: Any,
+    ) -> RankedSearch:
+        limit = max(SQL_CANDIDATE_POOL, max_results * 10)
+        for step, ring in enumerate(search_rings(radius_km)):
+            facilities, filtered, limit = await self._query_ring(
+                user_lat,
+                user_lng,
+                ring,
+                limit,
+                urgency,
+                clock,
+                lambda found: len(found) >= max_results,
+                **filters,
+            )
+            if len(filtered) >= max_results or ring >= MAX_SEARCH_RADIUS_KM:
+                break
+        return RankedSearch(
+            facilities=top_k(road_router.annotate(filtered, user_lat, user_lng), max_results, urgency),
+            total_found=len(facilities),
+            search_radius=ring,
+            widen_steps=step,
+        )
+
+    async def _query_ring(
+        self,
+        user_lat: float,
+        user_lng: float,
+        radius_km: float,
+        limit: int,
+        urgency: str,
+        clock: ClockReading,
+        enough: Callable[[list[dict]], bool],
+        **filters: Any,
+    ) -> tuple[list[dict], list[dict], int]:
+        """Nearest rows within ``radius_km`` and those passing the filters, plus the LIMIT used.
+
+        While the LIMIT is binding and the qualifying rows are not ``enough``,
+        the LIMIT doubles and the ring is fetched again: in a dense area the
+        nearest rows can all sit close in and fail the filters, and a wider
+        ring alone would return the same rows.
+        """
+        while True:
+            rows = await self._query_nearby(user_lat, user_lng, radius_km, limit)
+            qualifying = self.filter_by_urgency(rows, urgency, clock=clock, **filters)
+            if len(rows) < limit or enough(qualifying):
+                return rows, qualifying, limit
+            limit *= 2
+
     async def _query_nearby(
         self, user_lat: float, user_lng: float, radius_km: int, max_results: int
     ) -> list[dict]:
-        sql = text(
-            """
-            SELECT *,
-                   (6371 * acos(
-                       cos(radians(:user_lat)) *
-                       cos(radians(latitude)) *
-                       cos(radians(longitude) - radians(:user_lng)) +
-                       sin(radians(:user_lat)) *
-                       sin(radians(latitude))
-                   )) AS distance_km
-            FROM facilities
-            WHERE is_active = true
-            AND (6371 * acos(
-                cos(radians(:user_lat)) *
-                cos(radians(latitude)) *
-                cos(radians(longitude) - radians(:user_lng)) +
-                sin(radians(:user_lat)) *
-                sin(radians(latitude))
-            )) <= :radius_km
-            ORDER BY distance_km ASC
-            LIMIT :max_results
-            """
-        )
-        result = await self.db.execute(
-            sql,
-            {
-                "user_lat": user_lat,
-                "user_lng": user_lng,
-                "radius_km": radius_km,
-                "max_results": max_results,
-            },
-        )
-        return [dict(row) for row in result.mappings().all()]
+        if self.spatial_backend == "postgis":
+            result = await self.db.execute(
+                POSTGIS_NEARBY_FACILITIES_SQL,
+                {
+                    "user_lat": user_lat,
+                    "user_lng": user_lng,
+                    "radius_m": radius_km * 1000,
+                    "max_results": max_results,
+                },
+            )
+        else:
+            result = await self.db.execute(
+                NEARBY_FACILITIES_SQL,
+                nearby_query_params(user_lat, user_lng, radius_km, max_results),
+            )
+        rows = [dict(row) for row in result.mappings().all()]
+        for row in rows:
+            schedule_of(row)
+        return facility_live_state.overlay_rows(rows)
 
     def filter_by_urgency(
         self,
@@ -104,14 +506,16 @@ class FacilitySearchService:
         open_now: bool | None = None,
         emergency_only: bool | None = None,
         max_wait_minutes: int | None = None,
+        clock: ClockReading | None = None,
     ) -> list[dict]:
+        clock = clock or ClockReading.at()
         filtered = facilities
         if emergency_only or urgency == "EMERGENCY":
             filtered = [f for f in filtered if f.get("emergency_available")]
         if urgency == "URGENT":
-            filtered = [f for f in filtered if self.is_open_now(f) is not False]
+            filtered = [f for f in filtered if self.is_open_now(f, clock) is not False]
         if open_now is True:
-            filtered = [f for f in filtered if self.is_open_now(f) is True]
+            filtered = [f for f in filtered if self.is_open_now(f, clock) is True]
         if facility_types:
             types = {t.upper() for t in facility_types}
             filtered = [f for f in filtered if str(f.get("facility_type", "")).upper() in types]
@@ -124,13 +528,24 @@ class FacilitySearchService:
         return filtered
 
     async def enrich_facility_data(
-        self, facility: dict, user_lat: float, user_lng: float, urgency: str
+        self,
+        facility: dict,
+        user_lat: float,
+        user_lng: float,
+        urgency: str,
+        clock: ClockReading | None = None,
     ) -> dict:
         distance = float(facility.get("distance_km", 0))
-        travel_time_mins = max(
-            1, int((distance / self._average_speed_kmh(facility, urgency)) * 60)
-        )
-        is_open, opens_at = self.check_operating_hours(facility.get("operating_hours"))
+        drive_minutes = facility.get("drive_minutes")
+        if drive_minutes is not None:
+            travel_time_mins = max(1, round(drive_minutes))
+            travel_time_source = "road"
+        else:
+            travel_time_mins = max(
+                1, int((distance / self._average_speed_kmh(facility, urgency)) * 60)
+            )
+            travel_time_source = "straight_line"
+        is_open, opens_at = self.check_operating_hours(facility, clock)
 
         google_maps_url = (
             "https://www.google.com/maps/dir/?api=1"
@@ -139,9 +554,13 @@ class FacilitySearchService:
             "&travelmode=driving"
         )
         call_url = f"tel:{facility.get('contact_number')}"
-        wait_time_indicator = self.get_wait_time_indicator(
-            facility.get("estimated_wait_time", 30)
-        )
+        last_updated = facility.get("last_updated")
+        if last_updated is not None and not isinstance(last_updated, str):
+            last_updated = last_updated.isoformat()
+        estimated_wait = facility.get("estimated_wait_time")
+        if estimated_wait is None:
+            estimated_wait = DEFAULT_WAIT_MINS
+        wait_time_indicator = self.get_wait_time_indicator(estimated_wait)
 
         return {
             "id": str(facility["id"]),
@@ -152,6 +571,7 @@ class FacilitySearchService:
             "distance_km": round(distance, 1),
             "travel_time_mins": travel_time_mins,
             "travel_time": travel_time_mins,
+            "travel_time_source": travel_time_source,
             "address": facility["address"],
             "district": facility.get("district", "") or "",
             "state": facility.get("state", "") or "",
@@ -163,10 +583,13 @@ class FacilitySearchService:
             "emergency_available": facility["emergency_available"],
             "specialties": facility.get("specialties") or [],
             "bed_capacity": facility.get("bed_capacity"),
-            "estimated_wait_time": facility.get("estimated_wait_time", 30),
+            "beds_free": facility.get("beds_free"),
+            "queue_length": facility.get("queue_length"),
+            "status_reported_at": facility.get("status_reported_at"),
+            "estimated_wait_time": estimated_wait,
             "operating_hours": facility.get("operating_hours"),
             "is_active": bool(facility.get("is_active", True)),
-            "last_updated": facility.get("last_updated"),
+            "last_updated": last_updated,
             "directions_url": google_maps_url,
             "call_url": call_url,
         }
@@ -179,115 +602,42 @@ class FacilitySearchService:
         return {"level": "high", "text": "High wait", "color": "red"}
 
     def check_operating_hours(
-        self, hours_json: dict | None
+        self, facility: dict, clock: ClockReading | None = None
     ) -> tuple[bool | None, str | None]:
-        now = datetime.now(timezone(timedelta(hours=5, minutes=30)))
-        current_day = now.strftime("%A").lower()
-        current_time = now.time()
-
-        if not hours_json:
+        schedule = schedule_of(facility)
+        if schedule is None:
             return None, None
-        if hours_json.get("24/7"):
-            return True, None
-
-        today_hours = hours_json.get(current_day)
-        if not today_hours:
-            return False, "Closed today"
-
-        open_time, close_time = today_hours.split("-")
-        open_hour = datetime.strptime(open_time, "%H:%M").time()
-        close_hour = datetime.strptime(close_time, "%H:%M").time()
-
-        if open_hour <= current_time <= close_hour:
-            return True, None
-        if current_time < open_hour:
-            return False, f"Opens at {open_time}"
-        return False, "Closed now"
+        return schedule.status(clock or ClockReading.at())
 
-    def is_open_now(self, facility: dict) -> bool | None:
-        is_open, _ = self.check_operating_hours(facility.get("operating_hours"))
-        return is_open
+    def is_open_now(self, facility: dict, clock: ClockReading | None = None) -> bool | None:
+        schedule = schedule_of(facility)
+        if schedule is None:
+            return None
+        return schedule.is_open(clock or ClockReading.at())
 
     def _average_speed_kmh(self, facility: dict, urgency: str) -> float:
-        if urgency == "EMERGENCY":
-            return 50
-        if facility.get("emergency_available"):
-            return 45
-        return 35
+        return average_speed_kmh(urgency, bool(facility.get("emergency_available")))
 
     async def _fetch_overpass(
         self, user_lat: float, user_lng: float, radius_km: int
     ) -> list[dict]:
-        radius_m = int(radius_km * 1000)
-        query = f"""
-        [out:json][timeout:10];
-        (
-          node["amenity"~"hospital|clinic|doctors|health_centre"](around:{radius_m},{user_lat},{user_lng});
-          way["amenity"~"hospital|clinic|doctors|health_centre"](around:{radius_m},{user_lat},{user_lng});
-          relation["amenity"~"hospital|clinic|doctors|health_centre"](around:{radius_m},{user_lat},{user_lng});
-        );
-        out center tags;
-        """
-        try:
-            async with httpx.AsyncClient(timeout=12) as client:
-                resp = await client.post(
-                    "https://overpass-api.de/api/interpreter",
-                    content=query,
-                    headers={"Content-Type": "text/plain"},
-                )
-                resp.raise_for_status()
-                data = resp.json()
-        except Exception:
-            return []
+        cache = OverpassTileCache(self.db, client=self.http_client)
+        elements = await cache.elements_near(user_lat, user_lng, radius_km)
 
         facilities = []
-        for element in data.get("elements", []):
-            lat = element.get("lat") or element.get("center", {}).get("lat")
-            lng = element.get("lon") or element.get("center", {}).get("lon")
-            if lat is None or lng is None:
+        for element in elements:
+            facility = element_to_facility(element)
+            if facility is None:
                 continue
-            tags = element.get("tags") or {}
-            facility_type = self._map_amenity(tags.get("amenity", ""))
-            distance = self._haversine_km(user_lat, user_lng, lat, lng)
-            facilities.append(
-                {
-                    "id": f"osm-{element.get('id')}",
-                    "name": tags.get("name") or "Health Facility",
-                    "facility_type": facility_type,
-                    "latitude": lat,
-                    "longitude": lng,
-                    "address": tags.get("addr:street") or tags.get("addr:full") or "Address unavailable",
-                    "district": tags.get("addr:district") or tags.get("addr:city") or "",
-                    "state": tags.get("addr:state") or "",
-                    "pincode": tags.get("addr:postcode") or "",
-                    "contact_number": tags.get("phone") or tags.get("contact:phone") or "",
-                    "emergency_available": facility_type in {"DH", "MEDICAL_COLLEGE"},
-                    "operating_hours": {"24/7": True} if "24/7" in (tags.get("opening_hours") or "") else None,
-                    "specialties": [tags.get("healthcare")] if tags.get("healthcare") else [],
-                    "bed_capacity": None,
-                    "estimated_wait_time": 30,
-                    "is_active": True,
-                    "last_updated": None,
-                    "distance_km": distance,
-                }
+            distance = self._haversine_km(
+                user_lat, user_lng, facility["latitude"], facility["longitude"]
             )
+            if distance > radius_km:
+                continue
+            facility["distance_km"] = distance
+            facilities.append(facility)
+        facilities.sort(key=lambda f: f["distance_km"])
         return facilities
 
-    def _map_amenity(self, amenity: str) -> str:
-        if amenity == "hospital":
-            return "DH"
-        if amenity in {"clinic", "health_centre"}:
-            return "CHC"
-        return "PHC"
-
     def _haversine_km(self, lat1: float, lng1: float, lat2: float, lng2: float) -> float:
-        r = 6371
-        dlat = math.radians(lat2 - lat1)
-        dlng = math.radians(lng2 - lng1)
-        a = (
-            math.sin(dlat / 2) ** 2
-            + math.cos(math.radians(lat1))
-            * math.cos(math.radians(lat2))
-            * math.sin(dlng / 2) ** 2
-        )
-        return 2 * r * math.asin(math.sqrt(a))
+        return haversine_km(lat1, lng1, lat2, lng2)
@@ -0,0 +1,161 @@
+"""Binary, memory-mappable snapshot of the facility catalog.
+
+Layout (little-endian)::
+
+    magic      8 bytes   b"LLIQFAC1"
+    header_len u32
+    header     JSON      count, column dtypes/offsets, string table extent,
+                         distinct operating-hours timetables, build metadata
+    columns    fixed-width NumPy arrays, each 64-byte aligned
+    strings    one UTF-8 JSON record per facility, addressed by row_offsets
+
+Every uvicorn worker maps the same file read-only, so the columns and string
+table live once in the OS page cache and opening a snapshot costs one header
+parse. Writers build the file beside the target and ``os.replace`` it in, so
+readers only ever see a complete snapshot.
+"""
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import struct
+import time
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any
+
+import numpy as np
+
+from app.services.facility_catalog import FacilityCatalog
+from app.services.operating_hours import compile_hours
+
+MAGIC = b"LLIQFAC1"
+VERSION = 1
+ALIGNMENT = 64
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Unsupported type in facility row: {type(value)!r}")
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+class SnapshotRows:
+    """Read-only row access backed by the snapshot's string table."""
+
+    def __init__(self, buffer: mmap.mmap, row_offsets: np.ndarray, strings_start: int) -> None:
+        self._buffer = buffer
+        self._row_offsets = row_offsets
+        self._strings_start = strings_start
+
+    def __len__(self) -> int:
+        return len(self._row_offsets) - 1
+
+    def __getitem__(self, idx: int) -> dict:
+        start = self._strings_start + int(self._row_offsets[idx])
+        end = self._strings_start + int(self._row_offsets[idx + 1])
+        return json.loads(self._buffer[start:end])
+
+
+def write_snapshot(path: str, catalog: FacilityCatalog, metadata: dict | None = None) -> int:
+    """Write ``catalog`` to ``path`` atomically and return the file size in bytes."""
+    records = [
+        json.dumps(catalog.rows[idx], default=_json_default, separators=(",", ":")).encode("utf-8")
+        for idx in range(len(catalog))
+    ]
+    row_offsets = np.zeros(len(records) + 1, dtype="<u8")
+    if records:
+        row_offsets[1:] = np.cumsum([len(record) for record in records])
+
+    arrays = {
+        "lat": catalog.lat.astype("<f8"),
+        "lng": catalog.lng.astype("<f8"),
+        "type_code": catalog.type_code.astype("i1"),
+        "emergency": catalog.emergency.astype("?"),
+        "wait": catalog.wait.astype("<i4"),
+        "schedule_id": catalog.schedule_id.astype("<i4"),
+        "row_offsets": row_offsets,
+    }
+    # Rows refer to timetables by position, so store them in catalog order.
+    schedule_sources: list[dict | None] = [None] * len(catalog.schedules)
+    for idx in range(len(catalog)):
+        schedule_id = int(catalog.schedule_id[idx])
+        if schedule_id >= 0 and schedule_sources[schedule_id] is None:
+            schedule_sources[schedule_id] = catalog.rows[idx].get("operating_hours")
+
+    header: dict[str, Any] = {
+        "version": VERSION,
+        "count": len(catalog),
+        "columns": {},
+        "schedules": schedule_sources,
+        "created_at": time.time(),
+        "metadata": metadata or {},
+    }
+    # Offsets depend on the header length, which depends on the offsets; the
+    # header is padded to a fixed size to break the cycle.
+    header_size = _align(len(json.dumps(header, default=_json_default)) + 512 + 64 * len(arrays))
+    offset = _align(len(MAGIC) + 4 + header_size)
+    for name, array in arrays.items():
+        header["columns"][name] = [array.dtype.str, offset, array.nbytes]
+        offset = _align(offset + array.nbytes)
+    header["strings"] = [offset, int(row_offsets[-1])]
+    header_bytes = json.dumps(header, default=_json_default).encode("utf-8")
+    if len(header_bytes) > header_size:
+        raise ValueError("Snapshot header exceeds reserved space.")
+
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, "wb") as handle:
+        handle.write(MAGIC)
+        handle.write(struct.pack("<I", header_size))
+        handle.write(header_bytes.ljust(header_size, b" "))
+        for name, array in arrays.items():
+            handle.seek(header["columns"][name][1])
+            handle.write(array.tobytes())
+        handle.seek(header["strings"][0])
+        for record in records:
+            handle.write(record)
+        handle.flush()
+        os.fsync(handle.fileno())
+        size = handle.tell()
+    os.replace(tmp_path, path)
+    return size
+
+
+def open_snapshot(path: str) -> tuple[FacilityCatalog, dict]:
+    """Map a snapshot read-only and return a catalog over it plus its header."""
+    with open(path, "rb") as handle:
+        buffer = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+    if buffer[: len(MAGIC)] != MAGIC:
+        raise ValueError(f"{path} is not a facility snapshot.")
+    (header_size,) = struct.unpack_from("<I", buffer, len(MAGIC))
+    start = len(MAGIC) + 4
+    header = json.loads(buffer[start : start + header_size])
+    if header["version"] != VERSION:
+        raise ValueError(f"Unsupported facility snapshot version {header['version']}.")
+
+    count = header["count"]
+    columns = {}
+    for name, (dtype, offset, nbytes) in header["columns"].items():
+        array = np.frombuffer(buffer, dtype=np.dtype(dtype), count=nbytes // np.dtype(dtype).itemsize, offset=offset)
+        columns[name] = array
+    schedules = [compile_hours(source) for source in header["schedules"]]
+    rows = SnapshotRows(buffer, columns["row_offsets"], header["strings"][0])
+
+    catalog = FacilityCatalog(
+        lat=columns["lat"][:count],
+        lng=columns["lng"][:count],
+        type_code=columns["type_code"][:count],
+        emergency=columns["emergency"][:count],
+        wait=columns["wait"][:count],
+        schedule_id=columns["schedule_id"][:count],
+        schedules=schedules,
+        rows=rows,
+    )
+    return catalog, header
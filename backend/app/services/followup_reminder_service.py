@@ -5,10 +5,12 @@ import uuid
 from datetime import datetime, timedelta, timezone
 from typing import Iterable
 
-from sqlalchemy import select, text
+from sqlalchemy import Row, case, or_, select, text, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 
 from app.core.config import get_settings
+from app.core.http_clients import http_clients
 from app.models.follow_up import FollowUpReminder
 from app.models.triage import TriageSession
 from app.models.patient import Patient
@@ -17,6 +19,10 @@ from app.services.translation_service import TranslationService
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Sent reminders are marked and committed after this many sends, which bounds
+# the messages that go out again if dispatch dies mid-page.
+SEND_COMMIT_SIZE = 25
+
 
 class FollowUpReminderService:
     def __init__(self, session: AsyncSession):
@@ -68,73 +74,118 @@ class FollowUpReminderService:
         await self.session.refresh(reminder)
         return reminder
 
-    async def get_due_reminders(self) -> list[FollowUpReminder]:
-        now = datetime.now(timezone.utc)
+    async def _due_page(self, now: datetime, after: tuple | None, limit: int) -> list[Row]:
+        """Unsent due reminders after the keyset ``after``, with the reason to skip each, if any."""
+        triage = aliased(TriageSession)
+        newer = aliased(TriageSession)
+        # Skip if new triage started after scheduled time.
+        newer_triage = (
+            select(newer.id)
+            .where(newer.patient_id == FollowUpReminder.patient_id)
+            .where(newer.created_at > FollowUpReminder.scheduled_time)
+            .exists()
+        )
+        skip_reason = case(
+            (or_(Patient.id.is_(None), Patient.opted_out.is_(True)), "opted_out"),
+            (newer_triage, "new_triage"),
+            (triage.visited_hospital.is_(True), "visited_hospital"),
+            else_=None,
+        )
         stmt = (
-            select(FollowUpReminder)
+            select(
+                FollowUpReminder.id,
+                FollowUpReminder.scheduled_time,
+                FollowUpReminder.deep_link,
+                FollowUpReminder.message_language,
+                Patient.phone_number,
+                skip_reason.label("skip_reason"),
+            )
+            .outerjoin(Patient, Patient.id == FollowUpReminder.patient_id)
+            .outerjoin(triage, triage.id == FollowUpReminder.triage_session_id)
             .where(FollowUpReminder.sent_at.is_(None))
             .where(FollowUpReminder.scheduled_time <= now)
+            .order_by(FollowUpReminder.scheduled_time, FollowUpReminder.id)
+            .limit(limit)
         )
+        if after is not None:
+            stmt = stmt.where(tuple_(FollowUpReminder.scheduled_time, FollowUpReminder.id) > tuple_(*after))
         result = await self.session.execute(stmt)
-        return list(result.scalars().all())
+        return list(result.all())
 
-    async def _should_skip(self, reminder: FollowUpReminder) -> tuple[bool, str | None]:
-        patient = await self.session.get(Patient, reminder.patient_id)
-        if not patient or patient.opted_out:
-            return True, "opted_out"
+    async def dispatch_due(self, page_size: int | None = None) -> int:
+        """Send or skip every due reminder, ``page_size`` at a time; returns the number sent.
 
-        # Skip if new triage started after scheduled time.
-        stmt = (
-            select(TriageSession.id)
-            .where(TriageSession.patient_id == reminder.patient_id)
-            .where(TriageSession.created_at > reminder.scheduled_time)
-            .limit(1)
-        )
-        result = await self.session.execute(stmt)
-        if result.scalar_one_or_none():
-            return True, "new_triage"
+        Each page is one query. Skipped reminders are marked with one UPDATE and
+        committed before anything is sent; sent reminders are marked with one
+        UPDATE per delivery channel and committed every ``SEND_COMMIT_SIZE``
+        sends, so no transaction stays open across the sends and a crash
+        re-sends at most that many. Reminders whose send failed stay unsent and
+        are retried on the next run.
+        """
+        page_size = page_size or settings.followup_dispatch_page_size
+        now = datetime.now(timezone.utc)
+        after = None
+        sent_count = 0
+        while True:
+            rows = await self._due_page(now, after, page_size)
+            if not rows:
+                break
+            after = (rows[-1].scheduled_time, rows[-1].id)
+            skipped = [row.id for row in rows if row.skip_reason]
+            if skipped:
+                await self.session.execute(
+                    update(FollowUpReminder)
+                    .where(FollowUpReminder.id.in_(skipped))
+                    .values(sent_at=datetime.now(timezone.utc), response_status="skipped")
+                    .execution_options(synchronize_session=False)
+                )
+            await self.session.commit()
+            for row in rows:
+                if row.skip_reason:
+                    logger.info("Follow-up skipped (%s) for %s", row.skip_reason, row.id)
 
-        triage = await self.session.get(TriageSession, reminder.triage_session_id)
-        if triage and triage.visited_hospital:
-            return True, "visited_hospital"
-        return False, None
+            sent: dict[str, list[str]] = {}
+            pending = 0
+            for row in rows:
+                if row.skip_reason:
+                    continue
+                message = self._build_message(row.deep_link, row.message_language)
+                delivered = await self._send_message(row.phone_number, message)
+                if delivered:
+                    sent.setdefault(delivered, []).append(row.id)
+                    pending += 1
+                if pending >= SEND_COMMIT_SIZE:
+                    sent_count += await self._mark_sent(sent)
+                    sent, pending = {}, 0
+            sent_count += await self._mark_sent(sent)
+            if len(rows) < page_size:
+                break
+        return sent_count
 
-    async def dispatch_due(self) -> int:
-        due = await self.get_due_reminders()
-        if not due:
+    async def _mark_sent(self, sent: dict[str, list[str]]) -> int:
+        """Record delivered reminders, grouped by channel, and commit."""
+        if not sent:
             return 0
-        sent_count = 0
-        for reminder in due:
-            skip, reason = await self._should_skip(reminder)
-            if skip:
-                reminder.sent_at = datetime.now(timezone.utc)
-                reminder.response_status = "skipped"
-                await self.session.commit()
-                logger.info("Follow-up skipped (%s) for %s", reason, reminder.id)
-                continue
-
-            patient = await self.session.get(Patient, reminder.patient_id)
-            if not patient:
-                continue
-
-            message = self._build_message(reminder, patient)
-            delivered = await self._send_message(patient.phone_number, message)
-            if delivered:
-                reminder.sent_at = datetime.now(timezone.utc)
-                reminder.channel = delivered
-                await self.session.commit()
-                sent_count += 1
-        return sent_count
+        sent_at = datetime.now(timezone.utc)
+        for channel, ids in sent.items():
+            await self.session.execute(
+                update(FollowUpReminder)
+                .where(FollowUpReminder.id.in_(ids))
+                .values(sent_at=sent_at, channel=channel)
+                .execution_options(synchronize_session=False)
+            )
+        await self.session.commit()
+        return sum(len(ids) for ids in sent.values())
 
-    def _build_message(self, reminder: FollowUpReminder, patient: Patient) -> str:
+    def _build_message(self, deep_link: str, language: str | None) -> str:
         base = (
             "Hello! It's time for a quick check-in.\n\n"
             "How are your symptoms now?\n"
             "1) Better\n2) Same\n3) Worse\n\n"
-            f"Reply here: {reminder.deep_link}"
+            f"Reply here: {deep_link}"
         )
-        if reminder.message_language and reminder.message_language != "en":
-            return self.translator.translate(base, "en", reminder.message_language)
+        if language and language != "en":
+            return self.translator.translate(base, "en", language)
         return base
 
     async def _send_message(self, phone_number: str, message: str) -> str | None:
@@ -143,20 +194,13 @@ class FollowUpReminderService:
             return None
         if settings.twilio_account_sid and settings.twilio_auth_token:
             try:
-                from twilio.rest import Client
-
-                client = Client(settings.twilio_account_sid, settings.twilio_auth_token)
                 if settings.twilio_whatsapp_from:
-                    client.messages.create(
-                        from_=settings.twilio_whatsapp_from,
-                        to=f"whatsapp:{phone_number}",
-                        body=message,
+                    await self._twilio_send(
+                        settings.twilio_whatsapp_from, f"whatsapp:{phone_number}", message
                     )
                     return "whatsapp"
                 if settings.twilio_sms_from:
-                    client.messages.create(
-                        from_=settings.twilio_sms_from, to=phone_number, body=message
-                    )
+                    await self._twilio_send(settings.twilio_sms_from, phone_number, message)
                     return "sms"
             except Exception as exc:
                 logger.error("Twilio send failed: %s", exc)
@@ -164,6 +208,16 @@ class FollowUpReminderService:
         logger.info("Follow-up message (simulated) to %s: %s", phone_number, message)
         return "simulated"
 
+    async def _twilio_send(self, from_: str, to: str, body: str) -> None:
+        # Twilio's Messages REST API, called through the shared pooled client
+        # instead of the SDK's blocking per-call HTTP client.
+        response = await http_clients.get("twilio").post(
+            f"https://api.twilio.com/2010-04-01/Accounts/{settings.twilio_account_sid}/Messages.json",
+            auth=(settings.twilio_account_sid, settings.twilio_auth_token),
+            data={"From": from_, "To": to, "Body": body},
+        )
+        response.raise_for_status()
+
     async def record_response(
         self, token: str, status: str, new_symptoms: str | None, need_help: bool | None
     ) -> FollowUpReminder | None:
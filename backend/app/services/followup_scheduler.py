@@ -31,6 +31,15 @@ class FollowUpScheduler:
         self._started = True
         logger.info("Follow-up scheduler started.")
 
+    def add_interval_job(self, func, seconds: int, job_id: str) -> None:
+        """Run ``func`` every ``seconds`` on this scheduler alongside follow-up dispatch."""
+        self.scheduler.add_job(
+            func,
+            IntervalTrigger(seconds=seconds),
+            id=job_id,
+            replace_existing=True,
+        )
+
     def shutdown(self) -> None:
         if not self._started:
             return
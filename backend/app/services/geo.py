@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import math
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371
+KM_PER_DEGREE_LAT = 111.0
+
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    dlat = math.radians(lat2 - lat1)
+    dlng = math.radians(lng2 - lng1)
+    a = (
+        math.sin(dlat / 2) ** 2
+        + math.cos(math.radians(lat1))
+        * math.cos(math.radians(lat2))
+        * math.sin(dlng / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def haversine_km_vec(lat: float, lng: float, lats: np.ndarray, lngs: np.ndarray) -> np.ndarray:
+    lat1 = np.radians(lat)
+    lat2 = np.radians(lats)
+    dlat = lat2 - lat1
+    dlng = np.radians(lngs) - np.radians(lng)
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlng / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def bounding_box(lat: float, lng: float, radius_km: float) -> tuple[float, float, float, float]:
+    """Return (min_lat, max_lat, min_lng, max_lng) enclosing a radius around a point.
+
+    The box is slightly larger than the circle, so callers still apply an exact
+    distance check to whatever falls inside it.
+    """
+    lat_delta = radius_km / KM_PER_DEGREE_LAT
+    cos_lat = math.cos(math.radians(min(89.0, abs(lat) + lat_delta)))
+    lng_delta = min(180.0, radius_km / (KM_PER_DEGREE_LAT * max(cos_lat, 1e-6)))
+    return (
+        max(-90.0, lat - lat_delta),
+        min(90.0, lat + lat_delta),
+        max(-180.0, lng - lng_delta),
+        min(180.0, lng + lng_delta),
+    )
+
+
+_GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+_GEOHASH_INDEX = {char: idx for idx, char in enumerate(_GEOHASH_ALPHABET)}
+
+
+def geohash_encode(lat: float, lng: float, precision: int) -> str:
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    value = 0
+    even = True
+    while len(chars) < precision:
+        rng, coord = (lng_range, lng) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        if coord >= mid:
+            value = (value << 1) | 1
+            rng[0] = mid
+        else:
+            value <<= 1
+            rng[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_GEOHASH_ALPHABET[value])
+            bits = 0
+            value = 0
+    return "".join(chars)
+
+
+def geohash_bounds(geohash: str) -> tuple[float, float, float, float]:
+    """Return (min_lat, max_lat, min_lng, max_lng) of a geohash cell."""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        value = _GEOHASH_INDEX[char]
+        for shift in range(4, -1, -1):
+            rng = lng_range if even else lat_range
+            mid = (rng[0] + rng[1]) / 2
+            if (value >> shift) & 1:
+                rng[0] = mid
+            else:
+                rng[1] = mid
+            even = not even
+    return lat_range[0], lat_range[1], lng_range[0], lng_range[1]
+
+
+def geohash_cell_size(precision: int) -> tuple[float, float]:
+    """Return the (lat, lng) size in degrees of cells at a geohash precision."""
+    lng_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lng_bits)
+
+
+def geohashes_covering(
+    min_lat: float, max_lat: float, min_lng: float, max_lng: float, precision: int
+) -> list[str]:
+    lat_step, lng_step = geohash_cell_size(precision)
+    start_lat = math.floor((min_lat + 90.0) / lat_step) * lat_step - 90.0
+    start_lng = math.floor((min_lng + 180.0) / lng_step) * lng_step - 180.0
+    cells = []
+    lat = start_lat
+    while lat <= max_lat:
+        lng = start_lng
+        while lng <= max_lng:
+            cells.append(
+                geohash_encode(
+                    min(89.999999, lat + lat_step / 2), min(179.999999, lng + lng_step / 2), precision
+                )
+            )
+            lng += lng_step
+        lat += lat_step
+    return list(dict.fromkeys(cells))
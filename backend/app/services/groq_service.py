@@ -10,6 +10,7 @@ from typing import Any
 from groq import Groq
 
 from app.core.config import get_settings
+from app.core.http_clients import http_clients
 from app.services.triage_engine import evaluate_triage
 
 logger = logging.getLogger(__name__)
@@ -64,7 +65,7 @@ class GroqTriageService:
         settings = get_settings()
         self.api_key = api_key or settings.groq_api_key
         try:
-            self.client = Groq(api_key=self.api_key)
+            self.client = Groq(api_key=self.api_key, http_client=http_clients.get_sync("groq"))
         except TypeError as exc:
             logger.error("Groq client init failed: %s", exc)
             self.client = None
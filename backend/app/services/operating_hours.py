@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import json
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+
+IST = timezone(timedelta(hours=5, minutes=30))
+DAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+# Facility record key holding the compiled operating_hours.
+SCHEDULE_KEY = "compiled_schedule"
+
+
+@dataclass(frozen=True)
+class ClockReading:
+    """A single wall-clock read, shared by every schedule lookup in a request."""
+
+    minute_of_week: int
+    day: date
+
+    @classmethod
+    def at(cls, now: datetime | None = None) -> "ClockReading":
+        now = (now or datetime.now(IST)).astimezone(IST)
+        minute = now.weekday() * MINUTES_PER_DAY + now.hour * 60 + now.minute
+        return cls(minute_of_week=minute, day=now.date())
+
+
+@dataclass(frozen=True)
+class CompiledSchedule:
+    """Weekly opening intervals as sorted, non-overlapping minute-of-week ranges.
+
+    Intervals are half-open ``[start, end)``, with ``end`` one minute past the
+    closing time: a facility listed as ``"09:00-17:00"`` is still open at 17:00,
+    as it was before schedules were compiled. Overnight ranges such as
+    ``"20:00-08:00"`` spill into the next day, and a Sunday overnight range wraps
+    around to Monday morning.
+    """
+
+    always_open: bool
+    starts: tuple[int, ...]
+    ends: tuple[int, ...]
+    holidays: frozenset[date]
+
+    def is_open(self, clock: ClockReading) -> bool:
+        if self.always_open:
+            return True
+        if clock.day in self.holidays:
+            return False
+        idx = bisect_right(self.starts, clock.minute_of_week) - 1
+        return idx >= 0 and clock.minute_of_week < self.ends[idx]
+
+    def minutes_until_change(self, clock: ClockReading) -> int:
+        """Minutes until ``is_open`` can next flip, capped at midnight (holidays are per day)."""
+        minute = clock.minute_of_week
+        until_midnight = MINUTES_PER_DAY - minute % MINUTES_PER_DAY
+        if self.always_open:
+            return MINUTES_PER_WEEK
+        idx = bisect_right(self.starts, minute) - 1
+        if idx >= 0 and minute < self.ends[idx]:
+            boundary = self.ends[idx]
+        elif idx + 1 < len(self.starts):
+            boundary = self.starts[idx + 1]
+        elif self.starts:
+            boundary = self.starts[0] + MINUTES_PER_WEEK
+        else:
+            return until_midnight
+        return min(until_midnight, boundary - minute)
+
+    def status(self, clock: ClockReading) -> tuple[bool, str | None]:
+        if self.is_open(clock):
+            return True, None
+        if clock.day in self.holidays:
+            return False, "Closed today"
+        minute = clock.minute_of_week
+        day_start = minute - minute % MINUTES_PER_DAY
+        day_end = day_start + MINUTES_PER_DAY
+        next_idx = bisect_right(self.starts, minute)
+        if next_idx < len(self.starts) and self.starts[next_idx] < day_end:
+            opens = self.starts[next_idx] - day_start
+            return False, f"Opens at {opens // 60:02d}:{opens % 60:02d}"
+        first_today = bisect_right(self.starts, day_start - 1)
+        if first_today < len(self.starts) and self.starts[first_today] < day_end:
+            return False, "Closed now"
+        return False, "Closed today"
+
+
+ALWAYS_OPEN = CompiledSchedule(always_open=True, starts=(), ends=(), holidays=frozenset())
+
+
+def _parse_minutes(value: str) -> int:
+    hours, minutes = value.strip().split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+def _day_ranges(value: object) -> list[tuple[int, int]]:
+    if not isinstance(value, str) or value.strip().lower() in {"", "closed"}:
+        return []
+    ranges = []
+    for part in value.split(","):
+        open_time, close_time = part.split("-")
+        ranges.append((_parse_minutes(open_time), _parse_minutes(close_time)))
+    return ranges
+
+
+def _merge(intervals: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    merged: list[tuple[int, int]] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _compile(hours_json: dict) -> CompiledSchedule:
+    if hours_json.get("24/7"):
+        return ALWAYS_OPEN
+
+    intervals: list[tuple[int, int]] = []
+    for day_index, day in enumerate(DAYS):
+        day_offset = day_index * MINUTES_PER_DAY
+        for open_minute, close_minute in _day_ranges(hours_json.get(day)):
+            if close_minute <= open_minute:
+                close_minute += MINUTES_PER_DAY
+            start = day_offset + open_minute
+            # The closing minute itself counts as open.
+            end = day_offset + close_minute + 1
+            if end > MINUTES_PER_WEEK:
+                intervals.append((0, end - MINUTES_PER_WEEK))
+                end = MINUTES_PER_WEEK
+            intervals.append((start, end))
+
+    holidays = frozenset(
+        date.fromisoformat(value) for value in hours_json.get("holidays") or []
+    )
+    merged = _merge(intervals)
+    return CompiledSchedule(
+        always_open=False,
+        starts=tuple(start for start, _ in merged),
+        ends=tuple(end for _, end in merged),
+        holidays=holidays,
+    )
+
+
+@lru_cache(maxsize=4096)
+def _compile_cached(canonical: str) -> CompiledSchedule:
+    return _compile(json.loads(canonical))
+
+
+def compile_hours(hours_json: dict | None) -> CompiledSchedule | None:
+    """Compile an ``operating_hours`` JSON blob, or return None when it is absent.
+
+    Called when facility rows load, not per request (see ``schedule_of``).
+    Facilities share a handful of distinct timetables, so compiled schedules are
+    memoised on the canonical JSON and each distinct timetable is parsed once.
+    """
+    if not hours_json:
+        return None
+    return _compile_cached(json.dumps(hours_json, sort_keys=True))
+
+
+def schedule_of(facility: dict) -> CompiledSchedule | None:
+    """The schedule kept on a facility record under ``SCHEDULE_KEY``.
+
+    Catalog and database rows carry it from load; any other record has it
+    compiled on first use and stored back.
+    """
+    if SCHEDULE_KEY not in facility:
+        facility[SCHEDULE_KEY] = compile_hours(facility.get("operating_hours"))
+    return facility[SCHEDULE_KEY]
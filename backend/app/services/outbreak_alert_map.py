@@ -0,0 +1,329 @@
+"""Precomputed outbreak alerts for triage.
+
+A scheduled job rebuilds a map keyed by (grid cell, symptom mask). It holds
+the number of similar events within the alert radius over the counter window,
+and only entries at or above ``min_cases`` are kept. Triage looks up the
+requester's cell and symptom mask in a dict instead of running detection per
+request.
+
+The build reads per-cell mask totals from the in-memory outbreak counter (or
+one window query when the counter is off or still syncing). It works in three
+steps:
+
+1. Spread every cell's total events to the cells within the radius. The
+   "hot" cells that reach ``min_cases`` are the only possible alert cells.
+2. For each symptom mask seen in the window with enough similar events
+   overall, sum the similar events around each hot cell through a
+   precomputed neighbour matrix.
+3. Keep the (cell, mask) pairs that reach ``min_cases``.
+
+Distances are between cell centres, as in the counter. A mask nobody
+reported in the window is not in the map; such requests are counted live
+from the counter when it is ready.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+import numpy as np
+from sqlalchemy import case, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.models.outbreak import OutbreakEvent
+from app.services import symptom_vocabulary
+from app.services.geo import KM_PER_DEGREE_LAT, haversine_km_vec
+from app.services.outbreak_counter import OutbreakCounter, outbreak_counter
+
+logger = logging.getLogger(__name__)
+
+Cell = tuple[int, int]
+# Packs (row, col) into one int64 key; rows and cols stay well inside ±2**20.
+_COLS = 1 << 21
+# A map older than this many refresh intervals is reported as stale.
+STALE_INTERVALS = 3
+# Cells handled per step; bounds the (cells x offsets) arrays to a few MB.
+CHUNK_CELLS = 8192
+
+
+def _keys(rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+    return rows * _COLS + cols
+
+
+def _ragged(indptr: np.ndarray, rows: np.ndarray) -> np.ndarray:
+    """Concatenated ``range(indptr[r], indptr[r + 1])`` for each row ``r``."""
+    starts = indptr[rows]
+    lengths = indptr[rows + 1] - starts
+    total = int(lengths.sum())
+    if not total:
+        return np.zeros(0, dtype=np.int64)
+    shifts = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return np.arange(total) + shifts
+
+
+class OutbreakAlertMap:
+    def __init__(
+        self,
+        cell_degrees: float = 0.01,
+        window_hours: int = 48,
+        radius_km: float = 5,
+        min_cases: int = 15,
+        similarity_threshold: float = 0.45,
+        refresh_seconds: int = 60,
+    ) -> None:
+        self.cell_degrees = cell_degrees
+        self.window_hours = window_hours
+        self.radius_km = radius_km
+        self.min_cases = min_cases
+        self.similarity_threshold = similarity_threshold
+        self.refresh_seconds = refresh_seconds
+        self._alerts: dict[tuple[int, int, int], int] = {}
+        self._masks: frozenset[int] = frozenset()
+        self.computed_at: datetime | None = None
+        self.source: str | None = None
+        self.hot_cells = 0
+        self.build_ms = 0.0
+        self.lookups = 0
+        self.alerts_served = 0
+        self.live_counts = 0
+
+    def _cell(self, lat: float, lng: float) -> Cell:
+        return math.floor(lat / self.cell_degrees), math.floor(lng / self.cell_degrees)
+
+    def _offsets(self, max_abs_lat: float) -> tuple[np.ndarray, np.ndarray]:
+        lat_cells = math.ceil(self.radius_km / KM_PER_DEGREE_LAT / self.cell_degrees) + 1
+        km_per_lng_degree = KM_PER_DEGREE_LAT * max(math.cos(math.radians(max_abs_lat)), 0.01)
+        lng_cells = math.ceil(self.radius_km / km_per_lng_degree / self.cell_degrees) + 1
+        rows, cols = np.meshgrid(
+            np.arange(-lat_cells, lat_cells + 1), np.arange(-lng_cells, lng_cells + 1), indexing="ij"
+        )
+        return rows.ravel(), cols.ravel()
+
+    def _within_radius(
+        self, rows: np.ndarray, cols: np.ndarray, d_rows: np.ndarray, d_cols: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Keys of each cell's offset cells, and whether their centres lie within the radius."""
+        # Centre-to-centre distance depends only on the row and the offset.
+        distinct_rows, row_index = np.unique(rows, return_inverse=True)
+        lat = (distinct_rows[:, None] + 0.5) * self.cell_degrees
+        other_lat = (distinct_rows[:, None] + d_rows[None, :] + 0.5) * self.cell_degrees
+        within = haversine_km_vec(lat, 0.0, other_lat, d_cols[None, :] * self.cell_degrees) <= self.radius_km
+        keys = _keys(rows[:, None] + d_rows[None, :], cols[:, None] + d_cols[None, :])
+        return keys, within[row_index]
+
+    def build(self, totals: dict[Cell, Counter], source: str = "counter", now: datetime | None = None) -> None:
+        """Recompute the map from per-cell symptom-mask counts over the window."""
+        started = time.perf_counter()
+        entries = [(cell, mask, count) for cell, masks in totals.items() for mask, count in masks.items() if count > 0]
+        alerts: dict[tuple[int, int, int], int] = {}
+        hot_cells = 0
+        distinct: list[int] = []
+        if entries:
+            cells = sorted({cell for cell, _, _ in entries})
+            cell_index = {cell: i for i, cell in enumerate(cells)}
+            src_rows = np.array([row for row, _ in cells], dtype=np.int64)
+            src_cols = np.array([col for _, col in cells], dtype=np.int64)
+            distinct = sorted({mask for _, mask, _ in entries})
+            mask_index = {mask: i for i, mask in enumerate(distinct)}
+            entry_cell = np.array([cell_index[cell] for cell, _, _ in entries], dtype=np.int64)
+            entry_mask = np.array([mask_index[mask] for _, mask, _ in entries], dtype=np.int64)
+            entry_count = np.array([count for _, _, count in entries], dtype=np.float64)
+            d_rows, d_cols = self._offsets(float(np.abs(src_rows).max() + 1) * self.cell_degrees)
+
+            # 1. Cells with at least min_cases events of any kind within the radius.
+            cell_total = np.bincount(entry_cell, weights=entry_count, minlength=len(cells))
+            spread_keys, spread_totals = [], []
+            for chunk in range(0, len(cells), CHUNK_CELLS):
+                part = slice(chunk, chunk + CHUNK_CELLS)
+                keys, near = self._within_radius(src_rows[part], src_cols[part], d_rows, d_cols)
+                part_keys, inverse = np.unique(keys[near], return_inverse=True)
+                spread_keys.append(part_keys)
+                spread_totals.append(
+                    np.bincount(inverse, weights=np.broadcast_to(cell_total[part, None], near.shape)[near])
+                )
+            target_keys, inverse = np.unique(np.concatenate(spread_keys), return_inverse=True)
+            hot = target_keys[np.bincount(inverse, weights=np.concatenate(spread_totals)) >= self.min_cases]
+            hot_cells = len(hot)
+
+            # Query masks whose similar-mask sets coincide share one result.
+            mask_array = np.array(distinct, dtype=np.uint64)
+            queries: dict[bytes, tuple[np.ndarray, list[int]]] = {}
+            for query in distinct:
+                similar = symptom_vocabulary.similarity_many(query, mask_array) >= self.similarity_threshold
+                queries.setdefault(similar.tobytes(), (similar, []))[1].append(query)
+
+            src_keys = _keys(src_rows, src_cols)
+            for chunk in range(0, hot_cells, CHUNK_CELLS):
+                alerts.update(
+                    self._chunk_alerts(
+                        hot[chunk : chunk + CHUNK_CELLS],
+                        src_keys,
+                        (entry_cell, entry_mask, entry_count),
+                        list(queries.values()),
+                        d_rows,
+                        d_cols,
+                    )
+                )
+
+        self._alerts = alerts
+        self._masks = frozenset(distinct)
+        self.hot_cells = hot_cells
+        self.source = source
+        self.computed_at = now or datetime.now(timezone.utc)
+        self.build_ms = (time.perf_counter() - started) * 1000
+
+    def _chunk_alerts(
+        self,
+        hot: np.ndarray,
+        src_keys: np.ndarray,
+        entries: tuple[np.ndarray, np.ndarray, np.ndarray],
+        queries: list[tuple[np.ndarray, list[int]]],
+        d_rows: np.ndarray,
+        d_cols: np.ndarray,
+    ) -> dict[tuple[int, int, int], int]:
+        # 2. Source cell -> hot cells within the radius, as CSR over the source cells.
+        entry_cell, entry_mask, entry_count = entries
+        hot_rows, hot_cols = hot // _COLS, hot % _COLS
+        n_keys, near = self._within_radius(hot_rows, hot_cols, d_rows, d_cols)
+        position = np.clip(np.searchsorted(src_keys, n_keys), 0, len(src_keys) - 1)
+        near &= src_keys[position] == n_keys
+        pair_hot = np.broadcast_to(np.arange(len(hot))[:, None], near.shape)[near]
+        pair_src = position[near]
+        order = np.argsort(pair_src, kind="stable")
+        pair_hot = pair_hot[order]
+        adjacency = np.searchsorted(pair_src[order], np.arange(len(src_keys) + 1))
+        # Entries grouped by mask, limited to cells next to these hot cells.
+        keep = np.flatnonzero(np.diff(adjacency)[entry_cell] > 0)
+        keep = keep[np.argsort(entry_mask[keep], kind="stable")]
+        by_mask = np.searchsorted(entry_mask[keep], np.arange(len(queries[0][0]) + 1))
+
+        alerts = {}
+        for similar, masks in queries:
+            # 3. Similar events spread to the hot cells around them.
+            chosen = keep[_ragged(by_mask, np.flatnonzero(similar))]
+            if entry_count[chosen].sum() < self.min_cases:
+                continue
+            cells = entry_cell[chosen]
+            pairs = _ragged(adjacency, cells)
+            weights = np.repeat(entry_count[chosen], adjacency[cells + 1] - adjacency[cells])
+            cases = np.bincount(pair_hot[pairs], weights=weights, minlength=len(hot))
+            for index in np.flatnonzero(cases >= self.min_cases).tolist():
+                cell = (int(hot_rows[index]), int(hot_cols[index]))
+                alerts.update({(*cell, mask): int(cases[index]) for mask in masks})
+        return alerts
+
+    async def refresh(self, session: AsyncSession, counter: OutbreakCounter | None = None) -> None:
+        counter = counter or outbreak_counter
+        if counter.ready and counter.cell_degrees == self.cell_degrees and counter.window_hours == self.window_hours:
+            counter.expire()
+            # Copied on the event loop: the counter keeps recording while the build runs.
+            totals, source = {cell: Counter(masks) for cell, masks in counter._totals.items()}, "counter"
+        else:
+            totals, source = await self._window_totals(session), "database"
+        await asyncio.to_thread(self.build, totals, source)
+        logger.debug("Outbreak alert map: %s alerts in %.0f ms", len(self._alerts), self.build_ms)
+
+    async def _window_totals(self, session: AsyncSession) -> dict[Cell, Counter]:
+        cutoff = datetime.now(timezone.utc) - timedelta(hours=self.window_hours)
+        totals: dict[Cell, Counter] = {}
+        result = await session.stream(
+            select(
+                OutbreakEvent.lat,
+                OutbreakEvent.lng,
+                OutbreakEvent.symptoms_mask,
+                case((OutbreakEvent.symptoms_mask.is_(None), OutbreakEvent.symptoms_text), else_=None),
+            ).where(OutbreakEvent.created_at >= cutoff)
+        )
+        async for lat, lng, mask, text in result:
+            if not mask:
+                mask = symptom_vocabulary.encode(text)
+            totals.setdefault(self._cell(lat, lng), Counter())[mask] += 1
+        return totals
+
+    @property
+    def ready(self) -> bool:
+        return self.computed_at is not None
+
+    def age_seconds(self, now: datetime | None = None) -> float | None:
+        if self.computed_at is None:
+            return None
+        return ((now or datetime.now(timezone.utc)) - self.computed_at).total_seconds()
+
+    def cases(
+        self, lat: float, lng: float, mask: int, counter: OutbreakCounter | None = None, now: datetime | None = None
+    ) -> tuple[int, str]:
+        """Similar cases around a point for a symptom mask, and where the count came from."""
+        row, col = self._cell(lat, lng)
+        counter = counter or outbreak_counter
+        if mask and mask not in self._masks and counter.ready:
+            # Symptom combinations nobody reported in the window are not precomputed.
+            self.live_counts += 1
+            count = counter.count_similar(
+                lat, lng, mask, self.radius_km, self.window_hours, self.similarity_threshold, now=now
+            )
+            return count, "counter"
+        return self._alerts.get((row, col, mask), 0), "map"
+
+    def lookup(self, lat: float, lng: float, symptoms: str, counter: OutbreakCounter | None = None) -> dict[str, Any]:
+        """Community alert for a triage request, with the map's freshness."""
+        self.lookups += 1
+        age = self.age_seconds()
+        mask = symptom_vocabulary.encode(symptoms)
+        freshness = {
+            "map_computed_at": self.computed_at.isoformat() if self.computed_at else None,
+            "map_age_seconds": round(age, 1) if age is not None else None,
+            "map_stale": age is None or age > STALE_INTERVALS * self.refresh_seconds,
+        }
+        cases, source = self.cases(lat, lng, mask, counter)
+        if cases < self.min_cases:
+            return {"outbreak_detected": False, **freshness}
+        self.alerts_served += 1
+        return {
+            "outbreak_detected": True,
+            "radius_km": self.radius_km,
+            "cases": cases,
+            "window_hours": self.window_hours,
+            "alert_message": "Possible localized outbreak detected in your area.",
+            "recommended_action": "Notify local health officer and increase monitoring.",
+            "symptom_cluster": symptom_vocabulary.terms(mask),
+            "source": source,
+            **freshness,
+        }
+
+    def metrics(self) -> dict:
+        age = self.age_seconds()
+        return {
+            "ready": self.ready,
+            "computed_at": self.computed_at.isoformat() if self.computed_at else None,
+            "age_seconds": round(age, 1) if age is not None else None,
+            "stale": age is None or age > STALE_INTERVALS * self.refresh_seconds,
+            "source": self.source,
+            "build_ms": round(self.build_ms, 1),
+            "alerts": len(self._alerts),
+            "hot_cells": self.hot_cells,
+            "symptom_masks": len(self._masks),
+            "lookups": self.lookups,
+            "alerts_served": self.alerts_served,
+            "live_counts": self.live_counts,
+        }
+
+
+def _build_alert_map() -> OutbreakAlertMap:
+    settings = get_settings()
+    return OutbreakAlertMap(
+        cell_degrees=settings.outbreak_counter_cell_degrees,
+        window_hours=settings.outbreak_counter_window_hours,
+        radius_km=settings.outbreak_alert_radius_km,
+        min_cases=settings.outbreak_alert_min_cases,
+        similarity_threshold=settings.outbreak_alert_similarity,
+        refresh_seconds=settings.outbreak_alert_map_seconds,
+    )
+
+
+outbreak_alert_map = _build_alert_map()
@@ -0,0 +1,279 @@
+"""Replay an outbreak event log through the detector in simulated time.
+
+Events are replayed in time order against an in-memory ``OutbreakCounter``,
+the structure triage-time detection reads. Each event is first checked the way
+triage checks a request, then recorded. The clock is the event's own
+timestamp, so a month of history replays in seconds and never touches the
+database.
+
+Two detectors can be replayed:
+
+* ``counter``: the exact per-request count (``count_similar``);
+* ``map``: the precomputed alert map (app/services/outbreak_alert_map.py),
+  refreshed every ``map_seconds`` of simulated time, including its refresh lag.
+
+Rebuilding the whole map every simulated minute would make a replay slower
+than the detector it models. The map's entry for a (cell, mask) is the count
+from the cell centre over the events recorded before the last build. So the
+replay keeps a second counter that takes in events only at build times, and
+evaluates each entry the first time a report asks for it after a build. Masks
+the map has not seen fall back to the live counter, as in production.
+
+Alerts are scored against known outbreaks, whether injected into a synthetic
+log or listed in a ground-truth file. An alert belongs to an outbreak when
+the alerting event lies within the outbreak's radius between its start and
+``window_hours`` after its end. Any other alert is a false alarm. Repeated
+false alarms from the same radius-sized grid square on the same day count as
+one episode. Detection latency is the time from an outbreak's start to its
+first alert.
+"""
+from __future__ import annotations
+
+import math
+import random
+import statistics
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from app.services import symptom_vocabulary
+from app.services.geo import KM_PER_DEGREE_LAT, haversine_km_vec
+from app.services.outbreak_counter import OutbreakCounter
+
+DETECTORS = ("counter", "map")
+# Symptom combinations for background (non-outbreak) reports.
+BACKGROUND_SYMPTOMS = [
+    "fever",
+    "cough and cold",
+    "headache",
+    "fever with body ache",
+    "stomach pain",
+    "cough fever sore throat",
+    "back pain",
+    "rash with itching",
+    "loose motions",
+    "fever vomiting",
+    "dizziness and weakness",
+    "joint pain",
+]
+OUTBREAK_SYMPTOMS = [
+    "fever, vomiting and loose motions",
+    "fever with rash and joint pain",
+    "cough fever and shortness of breath",
+    "fever chills and body ache",
+]
+
+
+@dataclass(frozen=True)
+class DetectorParams:
+    radius_km: float = 5
+    window_hours: int = 48
+    min_cases: int = 15
+    similarity_threshold: float = 0.45
+
+
+@dataclass(frozen=True)
+class TrueOutbreak:
+    lat: float
+    lng: float
+    radius_km: float
+    start: datetime
+    end: datetime
+    symptoms: str = ""
+
+
+@dataclass
+class EventLog:
+    """Events as parallel arrays sorted by time; ``at`` is Unix seconds."""
+
+    at: np.ndarray
+    lat: np.ndarray
+    lng: np.ndarray
+    mask: np.ndarray
+
+    @classmethod
+    def from_rows(cls, rows: list[tuple[datetime, float, float, int]]) -> EventLog:
+        rows = sorted(rows, key=lambda row: row[0])
+        return cls(
+            at=np.array([_utc(row[0]).timestamp() for row in rows], dtype=np.float64),
+            lat=np.array([row[1] for row in rows], dtype=np.float64),
+            lng=np.array([row[2] for row in rows], dtype=np.float64),
+            mask=np.array([row[3] for row in rows], dtype=np.int64),
+        )
+
+    def __len__(self) -> int:
+        return len(self.at)
+
+
+def _utc(at: datetime) -> datetime:
+    return at if at.tzinfo else at.replace(tzinfo=timezone.utc)
+
+
+def synthetic_log(
+    events: int = 100_000,
+    days: int = 14,
+    outbreaks: int = 5,
+    cases_per_outbreak: int = 40,
+    centre: tuple[float, float] = (26.85, 80.95),
+    spread_degrees: float = 1.0,
+    seed: int = 7,
+) -> tuple[EventLog, list[TrueOutbreak]]:
+    """Background reports over a region plus injected outbreaks with known extent."""
+    rng = random.Random(seed)
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    span = days * 86400
+    background = [symptom_vocabulary.encode(symptoms) for symptoms in BACKGROUND_SYMPTOMS]
+    rows = []
+    for _ in range(events):
+        rows.append(
+            (
+                start + timedelta(seconds=rng.uniform(0, span)),
+                centre[0] + rng.uniform(-spread_degrees, spread_degrees),
+                centre[1] + rng.uniform(-spread_degrees, spread_degrees),
+                rng.choice(background),
+            )
+        )
+    truth = []
+    for _ in range(outbreaks):
+        lat = centre[0] + rng.uniform(-spread_degrees, spread_degrees) * 0.8
+        lng = centre[1] + rng.uniform(-spread_degrees, spread_degrees) * 0.8
+        began = start + timedelta(seconds=rng.uniform(span * 0.1, span * 0.8))
+        hours = rng.uniform(12, 48)
+        symptoms = rng.choice(OUTBREAK_SYMPTOMS)
+        mask = symptom_vocabulary.encode(symptoms)
+        for _ in range(cases_per_outbreak):
+            # About 1.5 km spread around the source.
+            rows.append(
+                (
+                    began + timedelta(hours=rng.uniform(0, hours)),
+                    lat + rng.gauss(0, 1.5 / KM_PER_DEGREE_LAT),
+                    lng + rng.gauss(0, 1.5 / KM_PER_DEGREE_LAT),
+                    mask,
+                )
+            )
+        truth.append(TrueOutbreak(lat, lng, 5.0, began, began + timedelta(hours=hours), symptoms))
+    return EventLog.from_rows(rows), truth
+
+
+def alerts(
+    log: EventLog,
+    params: DetectorParams,
+    detector: str = "counter",
+    map_seconds: int = 60,
+    cell_degrees: float = 0.01,
+    bucket_minutes: int = 15,
+) -> np.ndarray:
+    """Whether each event, checked just before it is recorded, would have raised an alert."""
+    if detector not in DETECTORS:
+        raise ValueError(f"Unknown detector {detector!r}; expected one of {', '.join(DETECTORS)}.")
+    counter = OutbreakCounter(cell_degrees, bucket_minutes, params.window_hours)
+    # The counter as of the last map build, and the events recorded since.
+    snapshot = OutbreakCounter(cell_degrees, bucket_minutes, params.window_hours)
+    pending: list[tuple[str, float, float, int, datetime]] = []
+    built_at = datetime.min.replace(tzinfo=timezone.utc)
+    next_build = -math.inf
+    map_masks: frozenset[int] = frozenset()
+    map_entries: dict[tuple[int, int, int], int] = {}
+    alerted = np.zeros(len(log), dtype=bool)
+
+    for i, (at, lat, lng, mask) in enumerate(
+        zip(log.at.tolist(), log.lat.tolist(), log.lng.tolist(), log.mask.tolist())
+    ):
+        now = datetime.fromtimestamp(at, tz=timezone.utc)
+        if detector == "map":
+            if at >= next_build:
+                for event in pending:
+                    snapshot.record(*event, now=now)
+                pending.clear()
+                snapshot.expire(now)
+                built_at, next_build = now, at + map_seconds
+                map_masks = frozenset(mask for totals in snapshot._totals.values() for mask in totals)
+                map_entries.clear()
+            if mask and mask not in map_masks:
+                cases = counter.count_similar(
+                    lat, lng, mask, params.radius_km, params.window_hours, params.similarity_threshold, now=now
+                )
+            else:
+                row, col = counter._cell(lat, lng)
+                cases = map_entries.get((row, col, mask))
+                if cases is None:
+                    cases = map_entries[(row, col, mask)] = snapshot.count_similar(
+                        (row + 0.5) * cell_degrees,
+                        (col + 0.5) * cell_degrees,
+                        mask,
+                        params.radius_km,
+                        params.window_hours,
+                        params.similarity_threshold,
+                        now=built_at,
+                    )
+            pending.append((f"replay:{i}", lat, lng, mask, now))
+        else:
+            cases = counter.count_similar(
+                lat, lng, mask, params.radius_km, params.window_hours, params.similarity_threshold, now=now
+            )
+        alerted[i] = cases >= params.min_cases
+        counter.record(f"replay:{i}", lat, lng, mask, now, now=now)
+    return alerted
+
+
+def replay(
+    log: EventLog,
+    params: DetectorParams,
+    outbreaks: list[TrueOutbreak] | None = None,
+    detector: str = "counter",
+    map_seconds: int = 60,
+    cell_degrees: float = 0.01,
+    bucket_minutes: int = 15,
+) -> dict:
+    """Stream the log through the detector; returns alert, latency and throughput figures."""
+    started = time.perf_counter()
+    alerted = alerts(log, params, detector, map_seconds, cell_degrees, bucket_minutes)
+    elapsed = time.perf_counter() - started
+    result = {
+        "detector": detector,
+        **asdict(params),
+        "events": len(log),
+        "alerts": int(alerted.sum()),
+        "seconds": round(elapsed, 3),
+        "events_per_second": round(len(log) / elapsed) if elapsed else None,
+        "speedup": round((log.at[-1] - log.at[0]) / elapsed) if len(log) > 1 and elapsed else None,
+    }
+    result.update(score(log, alerted, outbreaks or [], params))
+    return result
+
+
+def score(log: EventLog, alerted: np.ndarray, outbreaks: list[TrueOutbreak], params: DetectorParams) -> dict:
+    """Detection latency per outbreak, and false alarms among the remaining alerts."""
+    explained = np.zeros(len(log), dtype=bool)
+    latencies: list[float] = []
+    for outbreak in outbreaks:
+        start = _utc(outbreak.start).timestamp()
+        end = _utc(outbreak.end).timestamp() + params.window_hours * 3600
+        during = (log.at >= start) & (log.at <= end)
+        inside = np.zeros(len(log), dtype=bool)
+        inside[during] = (
+            haversine_km_vec(outbreak.lat, outbreak.lng, log.lat[during], log.lng[during]) <= outbreak.radius_km
+        )
+        explained |= inside
+        hits = np.flatnonzero(inside & alerted)
+        if len(hits):
+            latencies.append((log.at[hits[0]] - start) / 3600)
+
+    false_alarms = alerted & ~explained
+    square = params.radius_km / KM_PER_DEGREE_LAT
+    episodes = {
+        (math.floor(lat / square), math.floor(lng / square), int(at // 86400))
+        for at, lat, lng in zip(
+            log.at[false_alarms].tolist(), log.lat[false_alarms].tolist(), log.lng[false_alarms].tolist()
+        )
+    }
+    return {
+        "outbreaks": len(outbreaks),
+        "outbreaks_detected": len(latencies),
+        "median_latency_hours": round(statistics.median(latencies), 2) if latencies else None,
+        "max_latency_hours": round(max(latencies), 2) if latencies else None,
+        "false_alarm_events": int(false_alarms.sum()),
+        "false_alarm_episodes": len(episodes),
+    }
@@ -0,0 +1,222 @@
+"""In-memory sliding-window counts of outbreak events for triage-time detection.
+
+Events are counted per (grid cell, time bucket, symptom mask). Recording an
+event is a few dict updates; buckets older than the window are dropped as
+time advances. Detection pools the cells whose centres lie within the radius
+(using per-cell running totals when the whole window is asked for, and the
+buckets overlapping a shorter window otherwise), then scores the distinct
+masks in one vectorised popcount pass. Its cost follows the number of occupied
+cells and distinct symptom combinations, not the number of events, so it
+stays flat as an outbreak grows.
+
+Positions are quantised to the cell size (default 0.01°, about 1 km) and the
+window to whole buckets, so counts near the radius or window edge can differ
+slightly from the exact per-event scan in ``OutbreakService``.
+
+Each worker syncs from ``outbreak_events`` on startup and periodically after
+that, so events written by other workers are counted too; event ids make
+syncing idempotent.
+"""
+from __future__ import annotations
+
+import logging
+import math
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from sqlalchemy import case, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.models.outbreak import OutbreakEvent
+from app.services import symptom_vocabulary
+from app.services.geo import KM_PER_DEGREE_LAT, haversine_km
+
+logger = logging.getLogger(__name__)
+
+# Re-read this far behind the last sync so rows committed late by other workers are not missed.
+SYNC_OVERLAP_SECONDS = 120
+SYNC_BATCH_SIZE = 5000
+
+Cell = tuple[int, int]
+
+
+class OutbreakCounter:
+    def __init__(self, cell_degrees: float = 0.01, bucket_minutes: int = 15, window_hours: int = 48) -> None:
+        self.cell_degrees = cell_degrees
+        self.bucket_seconds = bucket_minutes * 60
+        self.window_hours = window_hours
+        # cell -> bucket -> symptom mask -> events
+        self._cells: dict[Cell, dict[int, Counter]] = {}
+        # cell -> symptom mask -> events across the whole window, so full-window
+        # detection does not walk the buckets
+        self._totals: dict[Cell, Counter] = {}
+        # bucket -> cells holding it, and ids recorded in it (for expiry and dedupe)
+        self._bucket_cells: dict[int, set[Cell]] = {}
+        self._bucket_ids: dict[int, list[str]] = {}
+        self._seen: set[str] = set()
+        self._oldest_bucket: int | None = None
+        self.synced_until: datetime | None = None
+        self.ready = False
+        self.events = 0
+        self.detections = 0
+        self.last_detect_ms = 0.0
+
+    def _cell(self, lat: float, lng: float) -> Cell:
+        return math.floor(lat / self.cell_degrees), math.floor(lng / self.cell_degrees)
+
+    def _bucket(self, at: datetime) -> int:
+        return int(at.timestamp() // self.bucket_seconds)
+
+    def record(
+        self, event_id: str, lat: float, lng: float, mask: int, at: datetime, now: datetime | None = None
+    ) -> bool:
+        """Count one event; returns False for duplicates and events outside the window.
+
+        ``now`` defaults to the wall clock; replays pass their simulated time.
+        """
+        if event_id in self._seen:
+            return False
+        if at.tzinfo is None:
+            at = at.replace(tzinfo=timezone.utc)
+        bucket = self._bucket(at)
+        if bucket < self._bucket((now or datetime.now(timezone.utc)) - timedelta(hours=self.window_hours)):
+            return False
+        cell = self._cell(lat, lng)
+        self._cells.setdefault(cell, {}).setdefault(bucket, Counter())[mask] += 1
+        self._totals.setdefault(cell, Counter())[mask] += 1
+        self._bucket_cells.setdefault(bucket, set()).add(cell)
+        self._bucket_ids.setdefault(bucket, []).append(event_id)
+        self._seen.add(event_id)
+        if self._oldest_bucket is None or bucket < self._oldest_bucket:
+            self._oldest_bucket = bucket
+        self.events += 1
+        return True
+
+    def expire(self, now: datetime | None = None) -> int:
+        """Drop buckets that slid out of the window; returns the number of events dropped."""
+        now = now or datetime.now(timezone.utc)
+        cutoff = self._bucket(now - timedelta(hours=self.window_hours))
+        dropped = 0
+        while self._oldest_bucket is not None and self._oldest_bucket < cutoff:
+            bucket = self._oldest_bucket
+            for cell in self._bucket_cells.pop(bucket, ()):
+                buckets = self._cells[cell]
+                totals = self._totals[cell]
+                totals.subtract(buckets.pop(bucket))
+                for mask in [key for key, count in totals.items() if count <= 0]:
+                    del totals[mask]
+                if not buckets:
+                    del self._cells[cell]
+                    del self._totals[cell]
+            ids = self._bucket_ids.pop(bucket, [])
+            self._seen.difference_update(ids)
+            dropped += len(ids)
+            self._oldest_bucket = min(self._bucket_ids) if self._bucket_ids else None
+        self.events -= dropped
+        return dropped
+
+    def count_similar(
+        self,
+        lat: float,
+        lng: float,
+        mask: int,
+        radius_km: float,
+        window_hours: int,
+        similarity_threshold: float,
+        now: datetime | None = None,
+    ) -> int:
+        """Events within ``radius_km`` and ``window_hours`` whose symptoms score at least the threshold."""
+        started = time.perf_counter()
+        now = now or datetime.now(timezone.utc)
+        self.expire(now)
+        first_bucket = self._bucket(now - timedelta(hours=window_hours))
+        whole_window = window_hours >= self.window_hours
+        lat_cells = math.ceil(radius_km / KM_PER_DEGREE_LAT / self.cell_degrees) + 1
+        km_per_lng_degree = KM_PER_DEGREE_LAT * max(math.cos(math.radians(lat)), 0.01)
+        lng_cells = math.ceil(radius_km / km_per_lng_degree / self.cell_degrees) + 1
+        centre_row, centre_col = self._cell(lat, lng)
+        pooled: Counter = Counter()
+        for row in range(centre_row - lat_cells, centre_row + lat_cells + 1):
+            for col in range(centre_col - lng_cells, centre_col + lng_cells + 1):
+                buckets = self._cells.get((row, col))
+                if buckets is None:
+                    continue
+                cell_lat = (row + 0.5) * self.cell_degrees
+                cell_lng = (col + 0.5) * self.cell_degrees
+                if haversine_km(lat, lng, cell_lat, cell_lng) > radius_km:
+                    continue
+                if whole_window:
+                    pooled.update(self._totals[(row, col)])
+                else:
+                    for bucket, counts in buckets.items():
+                        if bucket >= first_bucket:
+                            pooled.update(counts)
+        matches = 0
+        if pooled:
+            masks = np.fromiter(pooled.keys(), dtype=np.uint64, count=len(pooled))
+            counts = np.fromiter(pooled.values(), dtype=np.int64, count=len(pooled))
+            similar = symptom_vocabulary.similarity_many(mask, masks) >= similarity_threshold
+            matches = int(counts[similar].sum())
+        self.detections += 1
+        self.last_detect_ms = (time.perf_counter() - started) * 1000
+        return matches
+
+    async def sync(self, session: AsyncSession) -> int:
+        """Count events written since the last sync (on startup: the whole window)."""
+        now = datetime.now(timezone.utc)
+        since = now - timedelta(hours=self.window_hours)
+        if self.synced_until is not None:
+            since = max(since, self.synced_until - timedelta(seconds=SYNC_OVERLAP_SECONDS))
+        statement = (
+            select(
+                OutbreakEvent.id,
+                OutbreakEvent.lat,
+                OutbreakEvent.lng,
+                OutbreakEvent.symptoms_mask,
+                case((OutbreakEvent.symptoms_mask.is_(None), OutbreakEvent.symptoms_text), else_=None).label(
+                    "symptoms_text"
+                ),
+                OutbreakEvent.created_at,
+            )
+            .where(OutbreakEvent.created_at >= since)
+            .execution_options(yield_per=SYNC_BATCH_SIZE)
+        )
+        added = 0
+        result = await session.stream(statement)
+        async for row in result:
+            mask = row.symptoms_mask
+            if not mask:
+                mask = symptom_vocabulary.encode(row.symptoms_text)
+            if row.created_at is not None and self.record(row.id, row.lat, row.lng, mask, row.created_at):
+                added += 1
+        self.expire(now)
+        self.synced_until = now
+        self.ready = True
+        return added
+
+    def metrics(self) -> dict:
+        return {
+            "ready": self.ready,
+            "events": self.events,
+            "cells": len(self._cells),
+            "buckets": len(self._bucket_ids),
+            "distinct_symptom_masks": len({mask for totals in self._totals.values() for mask in totals}),
+            "synced_until": self.synced_until.isoformat() if self.synced_until else None,
+            "detections": self.detections,
+            "last_detect_ms": round(self.last_detect_ms, 3),
+        }
+
+
+def _build_counter() -> OutbreakCounter:
+    settings = get_settings()
+    return OutbreakCounter(
+        cell_degrees=settings.outbreak_counter_cell_degrees,
+        bucket_minutes=settings.outbreak_counter_bucket_minutes,
+        window_hours=settings.outbreak_counter_window_hours,
+    )
+
+
+outbreak_counter = _build_counter()
@@ -0,0 +1,168 @@
+"""Retention for raw outbreak events.
+
+Raw ``outbreak_events`` are kept for ``outbreak_event_retention_days``. Older
+history lives on in the hourly rollups (app/services/outbreak_rollup.py), so
+the purge never deletes an event whose hour has not been compacted yet.
+
+On Postgres, ``scripts/migrate_outbreak_partitions.py`` turns the table into
+weekly range partitions on ``created_at``. The purge then drops whole expired
+partitions, which is instant and leaves no dead tuples, and creates the next
+few weeks' partitions ahead of time. Whatever remains past the cutoff, and
+everything on SQLite, is deleted oldest first in bounded batches with a commit
+after each, so the purge never holds long locks.
+"""
+from __future__ import annotations
+
+import logging
+import re
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from app.core.config import get_settings
+from app.models.outbreak import OutbreakEvent, OutbreakRollupHour
+from app.services.outbreak_rollup import hour_start
+
+logger = logging.getLogger(__name__)
+
+PARTITION_PREFIX = "outbreak_events_w"
+# Weekly partitions created ahead of the current week.
+PARTITIONS_AHEAD = 2
+_PARTITION_NAME = re.compile(rf"^{PARTITION_PREFIX}(\d{{8}})$")
+
+
+def week_start(at: datetime) -> datetime:
+    """Monday 00:00 UTC of the week containing ``at``."""
+    at = at.astimezone(timezone.utc) if at.tzinfo else at.replace(tzinfo=timezone.utc)
+    day = at.replace(hour=0, minute=0, second=0, microsecond=0)
+    return day - timedelta(days=day.weekday())
+
+
+def partition_ranges(start: datetime, end: datetime) -> list[tuple[str, datetime, datetime]]:
+    """``(name, lower, upper)`` for the weekly partitions covering ``[start, end)``."""
+    ranges = []
+    lower = week_start(start)
+    while lower < end:
+        upper = lower + timedelta(days=7)
+        ranges.append((f"{PARTITION_PREFIX}{lower:%Y%m%d}", lower, upper))
+        lower = upper
+    return ranges
+
+
+async def is_partitioned(connection: AsyncConnection) -> bool:
+    if connection.dialect.name != "postgresql":
+        return False
+    found = await connection.scalar(
+        text(
+            "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+            "WHERE c.relname = 'outbreak_events' AND pg_table_is_visible(c.oid)"
+        )
+    )
+    return found is not None
+
+
+async def ensure_partitions(connection: AsyncConnection, start: datetime, end: datetime) -> int:
+    """Create the weekly partitions covering ``[start, end)`` that do not exist yet."""
+    created = 0
+    existing = set(await partition_names(connection))
+    for name, lower, upper in partition_ranges(start, end):
+        if name in existing:
+            continue
+        await connection.execute(
+            text(
+                f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF outbreak_events "
+                f"FOR VALUES FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')"
+            )
+        )
+        created += 1
+    return created
+
+
+async def partition_names(connection: AsyncConnection) -> list[str]:
+    rows = await connection.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent WHERE p.relname = 'outbreak_events'"
+        )
+    )
+    return [name for (name,) in rows.all()]
+
+
+async def drop_expired_partitions(connection: AsyncConnection, cutoff: datetime) -> list[str]:
+    """Drop weekly partitions that end at or before ``cutoff``."""
+    dropped = []
+    for name in sorted(await partition_names(connection)):
+        match = _PARTITION_NAME.match(name)
+        if not match:
+            continue
+        lower = datetime.strptime(match.group(1), "%Y%m%d").replace(tzinfo=timezone.utc)
+        if lower + timedelta(days=7) <= cutoff:
+            await connection.execute(text(f"DROP TABLE {name}"))
+            dropped.append(name)
+    return dropped
+
+
+def minimum_retention_days() -> int:
+    """Raw history the in-memory indexes rebuild from on startup."""
+    settings = get_settings()
+    days = -(-settings.outbreak_counter_window_hours // 24)
+    if settings.similar_case_index_enabled:
+        days = max(days, settings.similar_case_window_days)
+    return days
+
+
+async def purge_outbreak_events(
+    session: AsyncSession,
+    retention_days: int | None = None,
+    batch_size: int | None = None,
+    max_batches: int | None = None,
+    now: datetime | None = None,
+) -> dict:
+    """Drop or delete raw events past retention whose hours are already rolled up."""
+    settings = get_settings()
+    retention_days = retention_days or settings.outbreak_event_retention_days
+    batch_size = batch_size or settings.outbreak_retention_batch_size
+    max_batches = max_batches or settings.outbreak_retention_max_batches
+    now = now or datetime.now(timezone.utc)
+
+    floor = minimum_retention_days()
+    if retention_days < floor:
+        logger.warning(
+            "outbreak_event_retention_days=%s is below the %s days the in-memory indexes reload; using %s",
+            retention_days,
+            floor,
+            floor,
+        )
+        retention_days = floor
+    cutoff = now - timedelta(days=retention_days)
+    last_compacted = await session.scalar(select(func.max(OutbreakRollupHour.hour)))
+    if last_compacted is None:
+        return {"cutoff": None, "partitions_dropped": [], "deleted": 0}
+    cutoff = min(cutoff, hour_start(last_compacted + 1))
+
+    connection = await session.connection()
+    dropped: list[str] = []
+    if await is_partitioned(connection):
+        dropped = await drop_expired_partitions(connection, cutoff)
+        await ensure_partitions(connection, now, now + timedelta(weeks=PARTITIONS_AHEAD + 1))
+        await session.commit()
+
+    deleted = 0
+    for _ in range(max_batches):
+        batch = (
+            select(OutbreakEvent.id)
+            .where(OutbreakEvent.created_at < cutoff)
+            .order_by(OutbreakEvent.created_at)
+            .limit(batch_size)
+        )
+        result = await session.execute(delete(OutbreakEvent).where(OutbreakEvent.id.in_(batch)))
+        await session.commit()
+        deleted += result.rowcount or 0
+        if (result.rowcount or 0) < batch_size:
+            break
+    if dropped or deleted:
+        logger.info(
+            "Outbreak retention: dropped %s partitions, deleted %s events before %s", len(dropped), deleted, cutoff
+        )
+    return {"cutoff": cutoff.isoformat(), "partitions_dropped": dropped, "deleted": deleted}
@@ -0,0 +1,327 @@
+"""Hourly rollups of outbreak events for the admin outbreak dashboard.
+
+A scheduled compactor aggregates each completed hour of ``outbreak_events``
+into per-cell event counts and coordinate sums (``outbreak_cell_hours``) and
+per-cell token counts (``outbreak_cell_hour_tokens``), then marks the hour
+in ``outbreak_rollup_hours``. Each hour is read once.
+
+``active_outbreaks`` answers from grouped sums over the compacted hours in
+the window. Only the spans not yet compacted, normally the partial hour at
+each edge, are read from raw events. Cells are the ``round(lat, 2)`` /
+``round(lng, 2)`` squares of the original per-event algorithm, so the
+clusters, case counts and centres match it. Tied token counts are ordered
+by token.
+"""
+from __future__ import annotations
+
+import logging
+import math
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Iterable
+
+import numpy as np
+from sqlalchemy import and_, delete, func, insert, or_, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.outbreak import OutbreakCellHour, OutbreakCellHourToken, OutbreakEvent, OutbreakRollupHour
+from app.services.admin_areas import admin_areas
+
+logger = logging.getLogger(__name__)
+
+SECONDS_PER_HOUR = 3600
+# Hours are compacted once they ended this long ago, so in-flight commits land first.
+COMPACT_GRACE_SECONDS = 300
+# Hours compacted per run; a backlog catches up over successive runs.
+COMPACT_MAX_HOURS = 168
+MAX_TOKEN_LENGTH = 120
+# Cells per token query; keeps the tuple IN list well under bind-parameter limits.
+TOKEN_QUERY_CELLS = 500
+
+Cell = tuple[int, int]
+
+
+def cell_of(lat: float, lng: float) -> Cell:
+    """The ``round(x, 2)`` cell of a point, as integer hundredths."""
+    return round(round(lat, 2) * 100), round(round(lng, 2) * 100)
+
+
+def hour_of(at: datetime) -> int:
+    if at.tzinfo is None:
+        at = at.replace(tzinfo=timezone.utc)
+    return int(at.timestamp() // SECONDS_PER_HOUR)
+
+
+def hour_start(hour: int) -> datetime:
+    return datetime.fromtimestamp(hour * SECONDS_PER_HOUR, tz=timezone.utc)
+
+
+@dataclass
+class CellAggregate:
+    events: int = 0
+    sum_lat: float = 0.0
+    sum_lng: float = 0.0
+    districts: Counter = field(default_factory=Counter)
+    tokens: Counter = field(default_factory=Counter)
+
+    def add(self, lat: float, lng: float, tokens: Iterable[str], district_code: str | None) -> None:
+        self.events += 1
+        self.sum_lat += lat
+        self.sum_lng += lng
+        self.tokens.update(token[:MAX_TOKEN_LENGTH] for token in tokens)
+        if district_code:
+            self.districts[district_code] += 1
+
+
+def _event_columns():
+    return select(
+        OutbreakEvent.lat,
+        OutbreakEvent.lng,
+        OutbreakEvent.symptoms_tokens,
+        OutbreakEvent.district_code,
+        OutbreakEvent.created_at,
+    )
+
+
+async def compact_outbreak_hours(session: AsyncSession, now: datetime | None = None) -> int:
+    """Roll up completed hours not compacted yet; returns the number of hours marked."""
+    now = now or datetime.now(timezone.utc)
+    end = hour_of(now - timedelta(seconds=COMPACT_GRACE_SECONDS))
+    last = await session.scalar(select(func.max(OutbreakRollupHour.hour)))
+    if last is not None:
+        start = last + 1
+    else:
+        first_event = await session.scalar(select(func.min(OutbreakEvent.created_at)))
+        if first_event is None:
+            return 0
+        start = hour_of(first_event)
+    end = min(end, start + COMPACT_MAX_HOURS)
+    if start >= end:
+        return 0
+
+    cells: dict[tuple[int, Cell, str], CellAggregate] = {}
+    per_hour: Counter = Counter()
+    rows = await session.stream(
+        _event_columns().where(
+            OutbreakEvent.created_at >= hour_start(start), OutbreakEvent.created_at < hour_start(end)
+        )
+    )
+    async for row in rows:
+        hour = hour_of(row.created_at)
+        key = (hour, cell_of(row.lat, row.lng), row.district_code or "")
+        cells.setdefault(key, CellAggregate()).add(row.lat, row.lng, row.symptoms_tokens or (), None)
+        per_hour[hour] += 1
+
+    tokens: Counter = Counter()
+    for (hour, cell, _), aggregate in cells.items():
+        for token, count in aggregate.tokens.items():
+            tokens[(hour, cell, token)] += count
+    try:
+        if cells:
+            await session.execute(
+                insert(OutbreakCellHour),
+                [
+                    {
+                        "hour": hour,
+                        "cell_lat": cell[0],
+                        "cell_lng": cell[1],
+                        "district_code": district_code,
+                        "events": aggregate.events,
+                        "sum_lat": aggregate.sum_lat,
+                        "sum_lng": aggregate.sum_lng,
+                    }
+                    for (hour, cell, district_code), aggregate in cells.items()
+                ],
+            )
+        if tokens:
+            await session.execute(
+                insert(OutbreakCellHourToken),
+                [
+                    {"hour": hour, "cell_lat": cell[0], "cell_lng": cell[1], "token": token, "count": count}
+                    for (hour, cell, token), count in tokens.items()
+                ],
+            )
+        await session.execute(
+            insert(OutbreakRollupHour),
+            [{"hour": hour, "events": per_hour[hour]} for hour in range(start, end)],
+        )
+        await session.commit()
+    except Exception:
+        await session.rollback()
+        raise
+    logger.info("Compacted outbreak hours %s-%s: %s events", start, end - 1, sum(per_hour.values()))
+    return end - start
+
+
+async def drop_rollups_before(session: AsyncSession, hour: int) -> None:
+    """Delete rollups (and their markers) for hours before ``hour``."""
+    for model in (OutbreakCellHourToken, OutbreakCellHour, OutbreakRollupHour):
+        await session.execute(delete(model).where(model.hour < hour))
+    await session.commit()
+
+
+def _raw_ranges(cutoff: datetime, compacted: list[int]) -> list[tuple[datetime, datetime | None]]:
+    """Spans of the window not covered by compacted hours; the last one is open-ended."""
+    ranges = []
+    cursor = cutoff
+    for hour in compacted:
+        start = hour_start(hour)
+        if cursor < start:
+            ranges.append((cursor, start))
+        cursor = hour_start(hour + 1)
+    ranges.append((cursor, None))
+    return ranges
+
+
+async def compacted_hours(session: AsyncSession, first: int, last: int) -> list[int]:
+    """Compacted hours between ``first`` and ``last`` inclusive, in order."""
+    return list(
+        (
+            await session.scalars(
+                select(OutbreakRollupHour.hour)
+                .where(OutbreakRollupHour.hour.between(first, last))
+                .order_by(OutbreakRollupHour.hour)
+            )
+        ).all()
+    )
+
+
+def _raw_window(cutoff: datetime, compacted: list[int]):
+    return or_(
+        *(
+            and_(OutbreakEvent.created_at >= start, OutbreakEvent.created_at < end)
+            if end is not None
+            else OutbreakEvent.created_at >= start
+            for start, end in _raw_ranges(cutoff, compacted)
+        )
+    )
+
+
+async def cell_hour_counts(session: AsyncSession, since: datetime, now: datetime | None = None) -> dict[str, np.ndarray]:
+    """Events per (cell, hour) since ``since``, with coordinate sums, as parallel arrays.
+
+    Compacted hours come from ``outbreak_cell_hours``; the rest are counted from
+    raw events, so the counts cover every event up to now.
+    """
+    now = now or datetime.now(timezone.utc)
+    compacted = await compacted_hours(session, math.ceil(since.timestamp() / SECONDS_PER_HOUR), hour_of(now) - 1)
+    rows: list[tuple[int, int, int, int, float, float]] = []
+    if compacted:
+        grouped = await session.execute(
+            select(
+                OutbreakCellHour.cell_lat,
+                OutbreakCellHour.cell_lng,
+                OutbreakCellHour.hour,
+                func.sum(OutbreakCellHour.events),
+                func.sum(OutbreakCellHour.sum_lat),
+                func.sum(OutbreakCellHour.sum_lng),
+            )
+            .where(OutbreakCellHour.hour.between(compacted[0], compacted[-1]))
+            .group_by(OutbreakCellHour.cell_lat, OutbreakCellHour.cell_lng, OutbreakCellHour.hour)
+        )
+        rows.extend(tuple(row) for row in grouped.all())
+
+    raw: dict[tuple[Cell, int], list] = {}
+    result = await session.stream(
+        select(OutbreakEvent.lat, OutbreakEvent.lng, OutbreakEvent.created_at).where(_raw_window(since, compacted))
+    )
+    async for lat, lng, created_at in result:
+        entry = raw.setdefault((cell_of(lat, lng), hour_of(created_at)), [0, 0.0, 0.0])
+        entry[0] += 1
+        entry[1] += lat
+        entry[2] += lng
+    rows.extend((cell[0], cell[1], hour, *entry) for (cell, hour), entry in raw.items())
+
+    columns = list(zip(*rows)) if rows else [()] * 6
+    return {
+        "cell_lat": np.array(columns[0], dtype=np.int64),
+        "cell_lng": np.array(columns[1], dtype=np.int64),
+        "hour": np.array(columns[2], dtype=np.int64),
+        "events": np.array(columns[3], dtype=np.int64),
+        "sum_lat": np.array(columns[4], dtype=np.float64),
+        "sum_lng": np.array(columns[5], dtype=np.float64),
+    }
+
+
+async def active_outbreaks(
+    session: AsyncSession,
+    radius_km: int = 5,
+    window_hours: int = 48,
+    min_cases: int = 15,
+    now: datetime | None = None,
+) -> list[dict[str, Any]]:
+    now = now or datetime.now(timezone.utc)
+    cutoff = now - timedelta(hours=window_hours)
+    first_full = math.ceil(cutoff.timestamp() / SECONDS_PER_HOUR)
+    last_full = hour_of(now) - 1
+    compacted = await compacted_hours(session, first_full, last_full)
+
+    cells: dict[Cell, CellAggregate] = {}
+    if compacted:
+        hours = OutbreakCellHour.hour.between(compacted[0], compacted[-1])
+        grouped = await session.execute(
+            select(
+                OutbreakCellHour.cell_lat,
+                OutbreakCellHour.cell_lng,
+                OutbreakCellHour.district_code,
+                func.sum(OutbreakCellHour.events),
+                func.sum(OutbreakCellHour.sum_lat),
+                func.sum(OutbreakCellHour.sum_lng),
+            )
+            .where(hours)
+            .group_by(OutbreakCellHour.cell_lat, OutbreakCellHour.cell_lng, OutbreakCellHour.district_code)
+        )
+        for cell_lat, cell_lng, district_code, events, sum_lat, sum_lng in grouped.all():
+            aggregate = cells.setdefault((cell_lat, cell_lng), CellAggregate())
+            aggregate.events += events
+            aggregate.sum_lat += sum_lat
+            aggregate.sum_lng += sum_lng
+            if district_code:
+                aggregate.districts[district_code] += events
+
+    for row in (await session.execute(_event_columns().where(_raw_window(cutoff, compacted)))).all():
+        cells.setdefault(cell_of(row.lat, row.lng), CellAggregate()).add(
+            row.lat, row.lng, row.symptoms_tokens or (), row.district_code
+        )
+
+    qualifying = [cell for cell, aggregate in cells.items() if aggregate.events >= min_cases]
+    if compacted:
+        for start in range(0, len(qualifying), TOKEN_QUERY_CELLS):
+            chunk = qualifying[start : start + TOKEN_QUERY_CELLS]
+            grouped = await session.execute(
+                select(
+                    OutbreakCellHourToken.cell_lat,
+                    OutbreakCellHourToken.cell_lng,
+                    OutbreakCellHourToken.token,
+                    func.sum(OutbreakCellHourToken.count),
+                )
+                .where(
+                    OutbreakCellHourToken.hour.between(compacted[0], compacted[-1]),
+                    tuple_(OutbreakCellHourToken.cell_lat, OutbreakCellHourToken.cell_lng).in_(chunk),
+                )
+                .group_by(OutbreakCellHourToken.cell_lat, OutbreakCellHourToken.cell_lng, OutbreakCellHourToken.token)
+            )
+            for cell_lat, cell_lng, token, count in grouped.all():
+                cells[(cell_lat, cell_lng)].tokens[token] += count
+
+    outbreaks = []
+    for cell in qualifying:
+        aggregate = cells[cell]
+        district_code = aggregate.districts.most_common(1)[0][0] if aggregate.districts else None
+        outbreaks.append(
+            {
+                "center_lat": aggregate.sum_lat / aggregate.events,
+                "center_lng": aggregate.sum_lng / aggregate.events,
+                "cases": aggregate.events,
+                "radius_km": radius_km,
+                "window_hours": window_hours,
+                "top_symptoms": [
+                    token for token, _ in sorted(aggregate.tokens.items(), key=lambda item: (-item[1], item[0]))[:5]
+                ],
+                "district_code": district_code,
+                "district_name": admin_areas.district_names.get(district_code) if district_code else None,
+            }
+        )
+    outbreaks.sort(key=lambda outbreak: -outbreak["cases"])
+    return outbreaks
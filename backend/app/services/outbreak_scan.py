@@ -0,0 +1,314 @@
+"""Space-time permutation scan statistic over outbreak events.
+
+Clusters are cylinders: a circle made of a centre cell and its nearest cells
+(up to ``max_radius_km``), combined with a time window ending now. Cells are
+the 0.01° rollup cells from app/services/outbreak_rollup.py. A cluster can
+span any number of cells, so an outbreak that sits on a cell border is found
+as one cluster.
+
+The baseline is the event history itself (Kulldorff's space-time permutation
+model). A cell's expected count in a window is its share of all baseline
+events times the events in that window. Busy areas and overall rises in
+volume, such as a seasonal wave, therefore raise the expectation everywhere.
+Only a local excess scores as a cluster, and no population data is needed.
+Each cylinder is scored with the Poisson log-likelihood ratio. Significance
+comes from Monte Carlo replicates that shuffle event times across events while
+keeping each event's cell. A cluster's p-value ranks its score among the
+replicates' maximum scores.
+
+The scan runs as a scheduled job in a worker thread. The latest result is
+kept in memory for ``GET /admin/outbreak-scan``.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.services.admin_areas import admin_areas
+from app.services.geo import KM_PER_DEGREE_LAT, haversine_km_vec
+from app.services.outbreak_rollup import cell_hour_counts, hour_of
+
+logger = logging.getLogger(__name__)
+
+# Study windows, all ending at the current hour.
+WINDOW_HOURS = (6, 12, 24, 48)
+# Cells per circle, nearest first; bounds memory and time per replicate.
+MAX_CIRCLE_CELLS = 64
+# Circles holding more than this share of all baseline events are not scored.
+MAX_POPULATION_SHARE = 0.5
+# Centres scored per array block.
+CENTRE_BLOCK = 2048
+MAX_CLUSTERS = 10
+
+
+def _neighbours(lat: np.ndarray, lng: np.ndarray, max_radius_km: float, max_cells: int) -> tuple[np.ndarray, np.ndarray]:
+    """Nearest cells (index, km) per centre within the radius, nearest first.
+
+    Missing neighbours point at index ``len(lat)``, a padding cell with no
+    events, so cumulative sums along a row simply stop growing.
+    """
+    n = len(lat)
+    index = np.full((n, max_cells), n, dtype=np.int64)
+    distance = np.zeros((n, max_cells), dtype=np.float64)
+    if not n:
+        return index, distance
+    step_lat = max_radius_km / KM_PER_DEGREE_LAT
+    step_lng = step_lat / max(math.cos(math.radians(float(np.abs(lat).max()))), 0.1)
+    rows = np.floor(lat / step_lat).astype(np.int64).tolist()
+    cols = np.floor(lng / step_lng).astype(np.int64).tolist()
+    buckets: dict[tuple[int, int], list[int]] = {}
+    for cell, key in enumerate(zip(rows, cols)):
+        buckets.setdefault(key, []).append(cell)
+
+    for (row, col), members in buckets.items():
+        members = np.array(members)
+        candidates = np.array(
+            [cell for dr in (-1, 0, 1) for dc in (-1, 0, 1) for cell in buckets.get((row + dr, col + dc), ())]
+        )
+        km = haversine_km_vec(lat[members, None], lng[members, None], lat[None, candidates], lng[None, candidates])
+        km[km > max_radius_km] = np.inf
+        take = min(max_cells, len(candidates))
+        nearest = np.argsort(km, axis=1, kind="stable")[:, :take]
+        nearest_km = np.take_along_axis(km, nearest, axis=1)
+        within = np.isfinite(nearest_km)
+        index[members, :take] = np.where(within, candidates[nearest], n)
+        distance[members, :take] = np.where(within, nearest_km, 0.0)
+    return index, distance
+
+
+def _llr(cases: np.ndarray, expected: np.ndarray, total: int) -> np.ndarray:
+    """Poisson log-likelihood ratio per cylinder (cases above expected only)."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        outside = (total - cases) * np.log((total - cases) / (total - expected))
+    return cases * np.log(cases / expected) + np.where(cases < total, outside, 0.0)
+
+
+class _Cylinders:
+    """Circles around each cell, scored against per-cell window counts.
+
+    Only cells with a case in the longest window are used as centres. The rule
+    is the same for the observed data and every replicate, so the Monte Carlo
+    test stays valid while most of the (empty) map is skipped.
+    """
+
+    def __init__(self, neighbours: np.ndarray, cell_events: np.ndarray, window_totals: np.ndarray) -> None:
+        self.neighbours = neighbours
+        self.total = int(cell_events.sum())
+        # float32/int32 halve the memory traffic per replicate; counts stay exact below 2**24.
+        self.rate = (window_totals / max(self.total, 1)).astype(np.float32)
+        population = np.append(cell_events, 0)[neighbours].cumsum(axis=1)
+        self.population = population.astype(np.float32)
+        self.allowed = population <= MAX_POPULATION_SHARE * self.total
+
+    def scores(self, window_counts: np.ndarray, full: bool = True):
+        """Per block of centres: centre ids, cases, expected and LLR per (circle size, window).
+
+        With ``full=False`` the LLR is returned flat, for positive cylinders only.
+        """
+        padded = np.vstack([window_counts, np.zeros((1, window_counts.shape[1]), dtype=window_counts.dtype)]).astype(
+            np.int32
+        )
+        centres = np.flatnonzero(window_counts[:, -1])
+        for start in range(0, len(centres), CENTRE_BLOCK):
+            block = centres[start : start + CENTRE_BLOCK]
+            cases = padded[self.neighbours[block]].cumsum(axis=1, dtype=np.int32)
+            expected = self.population[block][:, :, None] * self.rate
+            positive = (cases > expected) & self.allowed[block][:, :, None]
+            scores = _llr(cases[positive].astype(np.float64), expected[positive].astype(np.float64), self.total)
+            if full:
+                llr = np.zeros(cases.shape)
+                llr[positive] = scores
+                scores = llr
+            yield block, cases, expected, scores
+
+    def max_score(self, window_counts: np.ndarray) -> float:
+        return max(
+            (float(llr.max()) for _, _, _, llr in self.scores(window_counts, full=False) if len(llr)), default=0.0
+        )
+
+
+def scan(
+    counts: dict[str, np.ndarray],
+    now: datetime,
+    window_hours: tuple[int, ...] = WINDOW_HOURS,
+    max_radius_km: float = 10.0,
+    max_cells: int = MAX_CIRCLE_CELLS,
+    replicates: int = 99,
+    alpha: float = 0.05,
+    seed: int | None = None,
+) -> dict[str, Any]:
+    """Significant space-time clusters in per-(cell, hour) counts (see ``cell_hour_counts``)."""
+    started = time.perf_counter()
+    windows = np.array(sorted(window_hours), dtype=np.int64)
+    keys = (counts["cell_lat"] + 9000) * 36001 + (counts["cell_lng"] + 18000)
+    cell_keys, cell_of_row = np.unique(keys, return_inverse=True)
+    n_cells = len(cell_keys)
+    cell_events = np.bincount(cell_of_row, weights=counts["events"], minlength=n_cells).astype(np.int64)
+    with np.errstate(invalid="ignore"):
+        lat = np.bincount(cell_of_row, weights=counts["sum_lat"], minlength=n_cells) / cell_events
+        lng = np.bincount(cell_of_row, weights=counts["sum_lng"], minlength=n_cells) / cell_events
+
+    # Window slot per row: 0 for the shortest window, len(windows) when outside every window.
+    age = hour_of(now) - counts["hour"]
+    slot = np.searchsorted(windows, age, side="right")
+    event_cell = np.repeat(cell_of_row, counts["events"])
+    event_slot = np.repeat(slot, counts["events"])
+    total = len(event_cell)
+
+    def window_counts(slots: np.ndarray) -> np.ndarray:
+        flat = np.bincount(event_cell * (len(windows) + 1) + slots, minlength=n_cells * (len(windows) + 1))
+        return flat.reshape(n_cells, len(windows) + 1)[:, : len(windows)].cumsum(axis=1)
+
+    result: dict[str, Any] = {
+        "computed_at": now.isoformat(),
+        "events": total,
+        "cells": n_cells,
+        "window_hours": windows.tolist(),
+        "max_radius_km": max_radius_km,
+        "replicates": replicates,
+        "alpha": alpha,
+        "clusters": [],
+    }
+    observed_counts = window_counts(event_slot)
+    if total == 0 or not observed_counts[:, -1].any():
+        result["runtime_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        return result
+
+    neighbours, distance = _neighbours(lat, lng, max_radius_km, max_cells)
+    cylinders = _Cylinders(neighbours, cell_events, observed_counts.sum(axis=0))
+
+    # Best cylinder per centre.
+    best_llr = np.zeros(n_cells)
+    best_size = np.zeros(n_cells, dtype=np.int64)
+    best_window = np.zeros(n_cells, dtype=np.int64)
+    best_cases = np.zeros(n_cells)
+    best_expected = np.zeros(n_cells)
+    for block, cases, expected, llr in cylinders.scores(observed_counts):
+        flat = llr.reshape(len(llr), -1).argmax(axis=1)
+        size, window = np.unravel_index(flat, llr.shape[1:])
+        rows = np.arange(len(llr))
+        best_llr[block] = llr[rows, size, window]
+        best_size[block] = size
+        best_window[block] = window
+        best_cases[block] = cases[rows, size, window]
+        best_expected[block] = expected[rows, size, window]
+
+    rng = np.random.default_rng(seed)
+    replicate_max = np.array(
+        [cylinders.max_score(window_counts(rng.permutation(event_slot))) for _ in range(replicates)]
+    )
+
+    # Most likely cluster first, then secondary clusters that share no cells with it.
+    taken: set[int] = set()
+    for centre in np.argsort(-best_llr, kind="stable"):
+        llr = best_llr[centre]
+        if llr <= 0 or len(result["clusters"]) >= MAX_CLUSTERS:
+            break
+        p_value = (1 + int((replicate_max >= llr).sum())) / (replicates + 1)
+        if p_value > alpha:
+            break
+        size = int(best_size[centre])
+        members = {int(cell) for cell in neighbours[centre, : size + 1] if cell < n_cells}
+        if members & taken:
+            continue
+        taken |= members
+        cases, expected = best_cases[centre], best_expected[centre]
+        centre_lat, centre_lng = float(lat[centre]), float(lng[centre])
+        district_code = admin_areas.codes(centre_lat, centre_lng)["district_code"]
+        result["clusters"].append(
+            {
+                "center_lat": centre_lat,
+                "center_lng": centre_lng,
+                "radius_km": round(float(distance[centre, size]), 3),
+                "cells": len(members),
+                "window_hours": int(windows[best_window[centre]]),
+                "cases": int(cases),
+                "expected": round(float(expected), 3),
+                "relative_risk": round(float((cases / expected) / ((total - cases) / (total - expected))), 3)
+                if cases < total
+                else None,
+                "llr": round(float(llr), 3),
+                "p_value": p_value,
+                "district_code": district_code,
+                "district_name": admin_areas.district_names.get(district_code) if district_code else None,
+            }
+        )
+    result["runtime_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return result
+
+
+class OutbreakScanner:
+    """Runs the scan over the baseline period and keeps the latest result."""
+
+    def __init__(
+        self,
+        baseline_days: int = 28,
+        max_radius_km: float = 10.0,
+        replicates: int = 99,
+        alpha: float = 0.05,
+    ) -> None:
+        self.baseline_days = baseline_days
+        self.max_radius_km = max_radius_km
+        self.replicates = replicates
+        self.alpha = alpha
+        self.latest: dict[str, Any] | None = None
+        self.runs = 0
+        self.last_load_ms = 0.0
+
+    async def run(self, session: AsyncSession, now: datetime | None = None, seed: int | None = None) -> dict[str, Any]:
+        now = now or datetime.now(timezone.utc)
+        started = time.perf_counter()
+        counts = await cell_hour_counts(session, now - timedelta(days=self.baseline_days), now)
+        self.last_load_ms = (time.perf_counter() - started) * 1000
+        result = await asyncio.to_thread(
+            scan,
+            counts,
+            now,
+            max_radius_km=self.max_radius_km,
+            replicates=self.replicates,
+            alpha=self.alpha,
+            seed=seed,
+        )
+        result["baseline_days"] = self.baseline_days
+        self.latest = result
+        self.runs += 1
+        logger.info(
+            "Outbreak scan: %s clusters from %s events in %.0f ms",
+            len(result["clusters"]),
+            result["events"],
+            result["runtime_ms"],
+        )
+        return result
+
+    def metrics(self) -> dict:
+        latest = self.latest or {}
+        return {
+            "runs": self.runs,
+            "computed_at": latest.get("computed_at"),
+            "events": latest.get("events"),
+            "cells": latest.get("cells"),
+            "clusters": len(latest.get("clusters", [])),
+            "load_ms": round(self.last_load_ms, 1),
+            "scan_ms": latest.get("runtime_ms"),
+        }
+
+
+def _build_scanner() -> OutbreakScanner:
+    settings = get_settings()
+    return OutbreakScanner(
+        baseline_days=settings.outbreak_scan_baseline_days,
+        max_radius_km=settings.outbreak_scan_max_radius_km,
+        replicates=settings.outbreak_scan_replicates,
+        alpha=settings.outbreak_scan_alpha,
+    )
+
+
+outbreak_scanner = _build_scanner()
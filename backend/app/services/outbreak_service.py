@@ -1,21 +1,24 @@
 from __future__ import annotations
 
 import math
+import uuid
 from collections import Counter
 from datetime import datetime, timedelta, timezone
 from typing import Any
 
-from sqlalchemy import and_, select
+import numpy as np
+from sqlalchemy import and_, case, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import get_settings
 from app.models.outbreak import OutbreakEvent
-
-SYMPTOM_CLUSTERS = [
-    {"fever", "vomiting"},
-    {"fever", "diarrhea"},
-    {"cough", "fever"},
-    {"rash", "fever"},
-]
+from app.models.triage import TriageSession
+from app.services import symptom_vocabulary
+from app.services.admin_areas import admin_areas
+from app.services.geo import haversine_km_vec
+from app.services.outbreak_counter import outbreak_counter
+from app.services.outbreak_rollup import active_outbreaks
+from app.services.similar_cases import similar_case_index
 
 
 class OutbreakService:
@@ -24,14 +27,25 @@ class OutbreakService:
 
     async def record_event(self, lat: float, lng: float, symptoms: str) -> None:
         tokens = self._tokenize(symptoms)
+        mask = symptom_vocabulary.encode(symptoms)
+        event_id = str(uuid.uuid4())
+        created_at = datetime.now(timezone.utc)
+        codes = admin_areas.codes(lat, lng)
         event = OutbreakEvent(
+            id=event_id,
+            created_at=created_at,
             lat=lat,
             lng=lng,
             symptoms_text=symptoms[:500],
             symptoms_tokens=list(tokens),
+            symptoms_mask=mask,
+            **codes,
         )
         self.db.add(event)
         await self.db.commit()
+        outbreak_counter.record(event_id, lat, lng, mask, created_at)
+        if get_settings().similar_case_index_enabled:
+            similar_case_index.add(event_id, mask, codes["district_code"], created_at)
 
     async def detect_outbreak(
         self,
@@ -43,40 +57,69 @@ class OutbreakService:
         min_cases: int = 15,
         similarity_threshold: float = 0.45,
     ) -> dict[str, Any]:
+        target = symptom_vocabulary.encode(symptoms)
+        if (
+            get_settings().outbreak_counter_enabled
+            and outbreak_counter.ready
+            and window_hours <= outbreak_counter.window_hours
+        ):
+            cases = outbreak_counter.count_similar(lat, lng, target, radius_km, window_hours, similarity_threshold)
+        else:
+            cases = await self._count_similar_events(lat, lng, target, radius_km, window_hours, similarity_threshold)
+
+        if cases >= min_cases:
+            return {
+                "outbreak_detected": True,
+                "radius_km": radius_km,
+                "cases": cases,
+                "window_hours": window_hours,
+                "alert_message": "Possible localized outbreak detected in your area.",
+                "recommended_action": "Notify local health officer and increase monitoring.",
+                "symptom_cluster": symptom_vocabulary.terms(target),
+            }
+        return {"outbreak_detected": False}
+
+    async def _count_similar_events(
+        self,
+        lat: float,
+        lng: float,
+        target: int,
+        radius_km: int,
+        window_hours: int,
+        similarity_threshold: float,
+    ) -> int:
+        """Exact scan of the events in the bounding box, used until the in-memory counter has synced.
+
+        Distances and similarities are computed for all rows at once; only rows
+        without a stored mask read their text.
+        """
         cutoff = datetime.now(timezone.utc) - timedelta(hours=window_hours)
         lat_delta = radius_km / 111
         lng_delta = radius_km / max(1, 111 * math.cos(math.radians(lat)))
 
-        stmt = select(OutbreakEvent).where(
+        stmt = select(
+            OutbreakEvent.lat,
+            OutbreakEvent.lng,
+            OutbreakEvent.symptoms_mask,
+            case((OutbreakEvent.symptoms_mask.is_(None), OutbreakEvent.symptoms_text), else_=None),
+        ).where(
             and_(
                 OutbreakEvent.created_at >= cutoff,
                 OutbreakEvent.lat.between(lat - lat_delta, lat + lat_delta),
                 OutbreakEvent.lng.between(lng - lng_delta, lng + lng_delta),
             )
         )
-        rows = (await self.db.execute(stmt)).scalars().all()
-
-        target_tokens = self._tokenize(symptoms)
-        matches = []
-        for row in rows:
-            dist = self._distance_km(lat, lng, row.lat, row.lng)
-            if dist > radius_km:
-                continue
-            similarity = self._symptom_similarity(target_tokens, set(row.symptoms_tokens))
-            if similarity >= similarity_threshold:
-                matches.append(row)
-
-        if len(matches) >= min_cases:
-            return {
-                "outbreak_detected": True,
-                "radius_km": radius_km,
-                "cases": len(matches),
-                "window_hours": window_hours,
-                "alert_message": "Possible localized outbreak detected in your area.",
-                "recommended_action": "Notify local health officer and increase monitoring.",
-                "symptom_cluster": list(target_tokens),
-            }
-        return {"outbreak_detected": False}
+        rows = (await self.db.execute(stmt)).all()
+        if not rows:
+            return 0
+        lats, lngs, masks, texts = zip(*rows)
+        masks = np.array(
+            [mask or symptom_vocabulary.encode(text) for mask, text in zip(masks, texts)],
+            dtype=np.uint64,
+        )
+        within = haversine_km_vec(lat, lng, np.array(lats), np.array(lngs)) <= radius_km
+        similar = symptom_vocabulary.similarity_many(target, masks) >= similarity_threshold
+        return int(np.count_nonzero(within & similar))
 
     async def get_active_outbreaks(
         self,
@@ -84,6 +127,10 @@ class OutbreakService:
         window_hours: int = 48,
         min_cases: int = 15,
     ) -> list[dict[str, Any]]:
+        if get_settings().outbreak_rollup_enabled:
+            return await active_outbreaks(
+                self.db, radius_km=radius_km, window_hours=window_hours, min_cases=min_cases
+            )
         cutoff = datetime.now(timezone.utc) - timedelta(hours=window_hours)
         stmt = select(OutbreakEvent).where(OutbreakEvent.created_at >= cutoff)
         rows = (await self.db.execute(stmt)).scalars().all()
@@ -103,6 +150,8 @@ class OutbreakService:
             for item in items:
                 token_counts.update(item.symptoms_tokens)
             top_tokens = [token for token, _ in token_counts.most_common(5)]
+            districts = Counter(item.district_code for item in items if item.district_code)
+            district_code = districts.most_common(1)[0][0] if districts else None
 
             outbreaks.append(
                 {
@@ -112,37 +161,54 @@ class OutbreakService:
                     "radius_km": radius_km,
                     "window_hours": window_hours,
                     "top_symptoms": top_tokens,
+                    "district_code": district_code,
+                    "district_name": admin_areas.district_names.get(district_code) if district_code else None,
                 }
             )
 
         return outbreaks
 
+    async def district_summary(self, window_hours: int = 48) -> list[dict[str, Any]]:
+        """Triage sessions by urgency and outbreak events per district over the window.
+
+        Codes are stored at write time, so this is two indexed GROUP BYs; rows
+        without a resolved district are reported under ``None``.
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(hours=window_hours)
+        triage_rows = await self.db.execute(
+            select(TriageSession.district_code, TriageSession.urgency_level, func.count())
+            .where(TriageSession.created_at >= cutoff)
+            .group_by(TriageSession.district_code, TriageSession.urgency_level)
+        )
+        event_rows = await self.db.execute(
+            select(OutbreakEvent.district_code, func.count())
+            .where(OutbreakEvent.created_at >= cutoff)
+            .group_by(OutbreakEvent.district_code)
+        )
+
+        districts: dict[str | None, dict[str, Any]] = {}
+
+        def district(code: str | None) -> dict[str, Any]:
+            if code not in districts:
+                districts[code] = {
+                    "district_code": code,
+                    "district_name": admin_areas.district_names.get(code) if code else None,
+                    "triage_sessions": 0,
+                    "by_urgency": {},
+                    "outbreak_events": 0,
+                    "window_hours": window_hours,
+                }
+            return districts[code]
+
+        for code, urgency, count in triage_rows.all():
+            entry = district(code)
+            entry["triage_sessions"] += count
+            entry["by_urgency"][str(urgency)] = count
+        for code, count in event_rows.all():
+            district(code)["outbreak_events"] = count
+        return sorted(districts.values(), key=lambda entry: -entry["triage_sessions"] - entry["outbreak_events"])
+
     def _tokenize(self, symptoms: str) -> set[str]:
         text = symptoms.lower().replace(",", " ").replace("|", " ")
         tokens = {token.strip() for token in text.split() if token.strip()}
         return tokens
-
-    def _symptom_similarity(self, a: set[str], b: set[str]) -> float:
-        if not a or not b:
-            return 0.0
-        intersection = len(a & b)
-        union = len(a | b)
-        jaccard = intersection / union
-        cluster_match = 0.0
-        for cluster in SYMPTOM_CLUSTERS:
-            if cluster.issubset(a) and cluster.issubset(b):
-                cluster_match = 1.0
-                break
-        return 0.7 * jaccard + 0.3 * cluster_match
-
-    def _distance_km(self, lat1: float, lng1: float, lat2: float, lng2: float) -> float:
-        r = 6371
-        dlat = math.radians(lat2 - lat1)
-        dlng = math.radians(lng2 - lng1)
-        a = (
-            math.sin(dlat / 2) ** 2
-            + math.cos(math.radians(lat1))
-            * math.cos(math.radians(lat2))
-            * math.sin(dlng / 2) ** 2
-        )
-        return 2 * r * math.asin(math.sqrt(a))
@@ -0,0 +1,237 @@
+"""Case-density map tiles for the admin dashboard.
+
+Tiles follow the XYZ (Web Mercator) scheme. Each one holds a ``BINS`` x
+``BINS`` grid of case counts over the last ``window_hours`` compacted hours,
+built only from the hourly rollups (``outbreak_cell_hours``). The partial
+hours at the edges of the window, which only raw events cover, are left out,
+so serving a tile never reads ``outbreak_events``.
+
+The cache keeps per-hour cell counts for the hours in the window. A refresh
+reads only newly compacted hours and drops hours that left the window. The
+resulting per-cell deltas are merged into each zoom level's sorted array of
+non-empty bins. Only the tiles touched are re-encoded, on their next request. ETags
+are content hashes, so every worker gives a tile the same ETag, and a tile
+whose counts did not change keeps its ETag (and a 304) across refreshes.
+
+Formats:
+
+* ``bin``: zlib-compressed little-endian ``uint32`` counts, ``BINS`` rows of
+  ``BINS`` columns, north row first;
+* ``png``: a 256 px heatmap. Colour depends only on the bin count (log scale,
+  saturating at ``SATURATION_CASES``), so neighbouring tiles line up.
+"""
+from __future__ import annotations
+
+import hashlib
+import io
+import logging
+import math
+import time
+import zlib
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from PIL import Image
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.models.outbreak import OutbreakCellHour
+from app.services.outbreak_rollup import SECONDS_PER_HOUR, Cell, compacted_hours, hour_of
+
+logger = logging.getLogger(__name__)
+
+BINS = 64
+# Keys pack (x << zoom | y) << BIN_BITS | bin, so one zoom's bins sort by tile.
+BIN_BITS = 12
+TILE_PIXELS = 256
+SATURATION_CASES = 100
+FORMATS = {"bin": "application/octet-stream", "png": "image/png"}
+# Web Mercator stops at ~85.05 degrees.
+MAX_LATITUDE = 85.05112878
+
+TileKey = tuple[int, int, int]
+
+
+def tile_bins(lat: np.ndarray, lng: np.ndarray, zoom: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Tile x, tile y and bin index (row * BINS + column) of each point at ``zoom``."""
+    scale = 2**zoom
+    lat = np.radians(np.clip(lat, -MAX_LATITUDE, MAX_LATITUDE))
+    x = (lng + 180.0) / 360.0 * scale
+    y = (1.0 - np.log(np.tan(lat) + 1.0 / np.cos(lat)) / math.pi) / 2.0 * scale
+    x = np.clip(x, 0, scale - 1e-9)
+    y = np.clip(y, 0, scale - 1e-9)
+    tile_x, tile_y = x.astype(np.int64), y.astype(np.int64)
+    column = ((x - tile_x) * BINS).astype(np.int64)
+    row = ((y - tile_y) * BINS).astype(np.int64)
+    return tile_x, tile_y, row * BINS + column
+
+
+def _heatmap(grid: np.ndarray) -> np.ndarray:
+    """RGBA pixels for a count grid: transparent through yellow to red."""
+    level = np.clip(np.log1p(grid) / math.log1p(SATURATION_CASES), 0.0, 1.0)
+    rgba = np.zeros((*grid.shape, 4), dtype=np.uint8)
+    rgba[..., 0] = 255
+    rgba[..., 1] = np.round(220 * (1.0 - level)).astype(np.uint8)
+    rgba[..., 3] = np.where(grid > 0, np.round(90 + 165 * level), 0).astype(np.uint8)
+    return rgba
+
+
+def encode_tile(grid: np.ndarray, fmt: str) -> bytes:
+    if fmt == "bin":
+        return zlib.compress(grid.astype("<u4").tobytes())
+    image = Image.fromarray(_heatmap(grid), "RGBA").resize((TILE_PIXELS, TILE_PIXELS), Image.NEAREST)
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _etag(body: bytes) -> str:
+    return f'"{hashlib.blake2b(body, digest_size=10).hexdigest()}"'
+
+
+class OutbreakTileCache:
+    def __init__(self, window_hours: int = 48, min_zoom: int = 3, max_zoom: int = 12) -> None:
+        self.window_hours = window_hours
+        self.min_zoom = min_zoom
+        self.max_zoom = max_zoom
+        # compacted hour -> cell -> events
+        self._hours: dict[int, dict[Cell, int]] = {}
+        # zoom -> (sorted packed tile/bin keys, events); see apply()
+        self._bins: dict[int, tuple[np.ndarray, np.ndarray]] = {}
+        self._encoded: dict[tuple[TileKey, str], tuple[str, bytes]] = {}
+        self._empty: dict[str, tuple[str, bytes]] = {}
+        for fmt in FORMATS:
+            body = encode_tile(np.zeros((BINS, BINS), dtype=np.int64), fmt)
+            self._empty[fmt] = (_etag(body), body)
+        self.refreshed_at: datetime | None = None
+        self.last_refresh_ms = 0.0
+        self.tiles_changed = 0
+        self.requests = 0
+        self.encodes = 0
+
+    @property
+    def ready(self) -> bool:
+        return self.refreshed_at is not None
+
+    def zooms(self) -> range:
+        return range(self.min_zoom, self.max_zoom + 1)
+
+    async def refresh(self, session: AsyncSession, now: datetime | None = None) -> int:
+        """Fold newly compacted hours in and expired hours out; returns the number of tiles changed."""
+        started = time.perf_counter()
+        now = now or datetime.now(timezone.utc)
+        first = math.ceil((now - timedelta(hours=self.window_hours)).timestamp() / SECONDS_PER_HOUR)
+        compacted = await compacted_hours(session, first, hour_of(now) - 1)
+        deltas: Counter = Counter()
+        for hour in [hour for hour in self._hours if hour < first]:
+            for cell, events in self._hours.pop(hour).items():
+                deltas[cell] -= events
+        new = [hour for hour in compacted if hour not in self._hours]
+        if new:
+            for hour in new:
+                self._hours[hour] = {}
+            rows = await session.execute(
+                select(
+                    OutbreakCellHour.hour,
+                    OutbreakCellHour.cell_lat,
+                    OutbreakCellHour.cell_lng,
+                    func.sum(OutbreakCellHour.events),
+                )
+                .where(OutbreakCellHour.hour.between(new[0], new[-1]))
+                .group_by(OutbreakCellHour.hour, OutbreakCellHour.cell_lat, OutbreakCellHour.cell_lng)
+            )
+            wanted = set(new)
+            for hour, cell_lat, cell_lng, events in rows.all():
+                if hour in wanted:
+                    self._hours[hour][(cell_lat, cell_lng)] = events
+                    deltas[(cell_lat, cell_lng)] += events
+        changed = self.apply(deltas)
+        self.refreshed_at = now
+        self.tiles_changed = changed
+        self.last_refresh_ms = (time.perf_counter() - started) * 1000
+        if changed:
+            logger.debug("Outbreak tiles: %s new hours, %s tiles changed", len(new), changed)
+        return changed
+
+    def apply(self, deltas: Counter) -> int:
+        """Add per-cell event deltas to every zoom level; returns the number of tiles changed."""
+        deltas = {cell: delta for cell, delta in deltas.items() if delta}
+        if not deltas:
+            return 0
+        cells = np.array(list(deltas), dtype=np.float64) / 100.0
+        values = np.array(list(deltas.values()), dtype=np.int64)
+        changed = 0
+        for zoom in self.zooms():
+            tile_x, tile_y, bins = tile_bins(cells[:, 0], cells[:, 1], zoom)
+            keys = (((tile_x << zoom) | tile_y) << BIN_BITS) | bins
+            old_keys, old_counts = self._bins.get(zoom, (np.zeros(0, np.int64), np.zeros(0, np.int64)))
+            merged, inverse = np.unique(np.concatenate([old_keys, keys]), return_inverse=True)
+            counts = np.bincount(inverse, weights=np.concatenate([old_counts, values])).round().astype(np.int64)
+            self._bins[zoom] = (merged[counts > 0], counts[counts > 0])
+            for tile in np.unique(keys >> BIN_BITS).tolist():
+                key = (zoom, tile >> zoom, tile & ((1 << zoom) - 1))
+                changed += 1
+                for fmt in FORMATS:
+                    self._encoded.pop((key, fmt), None)
+        return changed
+
+    def _span(self, zoom: int, x: int, y: int) -> tuple[np.ndarray, np.ndarray]:
+        keys, counts = self._bins.get(zoom, (np.zeros(0, np.int64), np.zeros(0, np.int64)))
+        tile = ((x << zoom) | y) << BIN_BITS
+        low, high = np.searchsorted(keys, [tile, tile + BINS * BINS])
+        return keys[low:high] & (BINS * BINS - 1), counts[low:high]
+
+    def tile_keys(self, zoom: int) -> list[TileKey]:
+        keys, _ = self._bins.get(zoom, (np.zeros(0, np.int64), None))
+        return [(zoom, tile >> zoom, tile & ((1 << zoom) - 1)) for tile in np.unique(keys >> BIN_BITS).tolist()]
+
+    def grid(self, zoom: int, x: int, y: int) -> np.ndarray:
+        grid = np.zeros(BINS * BINS, dtype=np.int64)
+        bins, counts = self._span(zoom, x, y)
+        grid[bins] = counts
+        return grid.reshape(BINS, BINS)
+
+    def tile(self, zoom: int, x: int, y: int, fmt: str) -> tuple[str, bytes]:
+        """``(etag, body)`` for one tile, encoded on first request after a change."""
+        self.requests += 1
+        key = (zoom, x, y)
+        encoded = self._encoded.get((key, fmt))
+        if encoded is None:
+            grid = self.grid(zoom, x, y)
+            if not grid.any():
+                return self._empty[fmt]
+            body = encode_tile(grid, fmt)
+            encoded = self._encoded[(key, fmt)] = (_etag(body), body)
+            self.encodes += 1
+        return encoded
+
+    def metrics(self) -> dict:
+        return {
+            "ready": self.ready,
+            "refreshed_at": self.refreshed_at.isoformat() if self.refreshed_at else None,
+            "window_hours": self.window_hours,
+            "hours_loaded": len(self._hours),
+            "zoom_levels": [self.min_zoom, self.max_zoom],
+            "bins": BINS,
+            "tiles": sum(len(np.unique(keys >> BIN_BITS)) for keys, _ in self._bins.values()),
+            "bins_nonzero": sum(len(keys) for keys, _ in self._bins.values()),
+            "tiles_changed_last_refresh": self.tiles_changed,
+            "last_refresh_ms": round(self.last_refresh_ms, 1),
+            "encoded_cached": len(self._encoded),
+            "requests": self.requests,
+            "encodes": self.encodes,
+        }
+
+
+def _build_tile_cache() -> OutbreakTileCache:
+    settings = get_settings()
+    return OutbreakTileCache(
+        window_hours=settings.outbreak_tile_window_hours,
+        min_zoom=settings.outbreak_tile_min_zoom,
+        max_zoom=settings.outbreak_tile_max_zoom,
+    )
+
+
+outbreak_tile_cache = _build_tile_cache()
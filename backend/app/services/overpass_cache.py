@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+import httpx
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.core.database import upsert_statement
+from app.core.http_clients import http_clients
+from app.models.facility import Facility
+from app.models.overpass_tile import OverpassTile
+from app.services.facility_search_cache import facility_search_cache
+from app.services.geo import (
+    bounding_box,
+    geohash_bounds,
+    geohash_encode,
+    geohashes_covering,
+    haversine_km,
+)
+
+logger = logging.getLogger(__name__)
+
+AMENITY_FILTER = '["amenity"~"hospital|clinic|doctors|health_centre"]'
+# Treat an OSM facility as a duplicate of a catalogued one with the same name this close by.
+DUPLICATE_DISTANCE_KM = 0.2
+
+
+def map_amenity(amenity: str) -> str:
+    if amenity == "hospital":
+        return "DH"
+    if amenity in {"clinic", "health_centre"}:
+        return "CHC"
+    return "PHC"
+
+
+def element_to_facility(element: dict) -> dict | None:
+    lat = element.get("lat") or element.get("center", {}).get("lat")
+    lng = element.get("lon") or element.get("center", {}).get("lon")
+    if lat is None or lng is None:
+        return None
+    tags = element.get("tags") or {}
+    facility_type = map_amenity(tags.get("amenity", ""))
+    return {
+        "id": f"osm-{element.get('id')}",
+        "name": tags.get("name") or "Health Facility",
+        "facility_type": facility_type,
+        "latitude": lat,
+        "longitude": lng,
+        "address": tags.get("addr:street") or tags.get("addr:full") or "Address unavailable",
+        "district": tags.get("addr:district") or tags.get("addr:city") or "",
+        "state": tags.get("addr:state") or "",
+        "pincode": tags.get("addr:postcode") or "",
+        "contact_number": tags.get("phone") or tags.get("contact:phone") or "",
+        "emergency_available": facility_type in {"DH", "MEDICAL_COLLEGE"},
+        "operating_hours": {"24/7": True} if "24/7" in (tags.get("opening_hours") or "") else None,
+        "specialties": [tags.get("healthcare")] if tags.get("healthcare") else [],
+        "bed_capacity": None,
+        "estimated_wait_time": 30,
+        "is_active": True,
+        "last_updated": None,
+    }
+
+
+def _compact_element(element: dict) -> dict | None:
+    lat = element.get("lat") or element.get("center", {}).get("lat")
+    lng = element.get("lon") or element.get("center", {}).get("lon")
+    if lat is None or lng is None:
+        return None
+    return {"id": element.get("id"), "lat": lat, "lon": lng, "tags": element.get("tags") or {}}
+
+
+class OverpassTileCache:
+    """Serves Overpass facility lookups from geohash tiles cached in the database.
+
+    A search covers its bounding box with fixed-precision geohash tiles. Tiles
+    fetched within the TTL are served from the ``overpass_tiles`` table; the
+    missing ones are requested from Overpass in a single bounding-box query and
+    stored, including empty tiles, so sparse areas stop paying the network hop.
+    """
+
+    def __init__(self, db: AsyncSession, client: httpx.AsyncClient | None = None):
+        self.db = db
+        self.client = client or http_clients.get("overpass")
+        self.settings = get_settings()
+        self.precision = self.settings.overpass_tile_precision
+
+    async def elements_near(self, lat: float, lng: float, radius_km: float) -> list[dict]:
+        tiles = geohashes_covering(*bounding_box(lat, lng, radius_km), self.precision)
+        rows = (
+            await self.db.execute(select(OverpassTile).where(OverpassTile.geohash.in_(tiles)))
+        ).scalars().all()
+        cutoff = datetime.now(timezone.utc) - timedelta(hours=self.settings.overpass_cache_ttl_hours)
+        cached = {row.geohash: row for row in rows}
+        missing = [tile for tile in tiles if not self._is_fresh(cached.get(tile), cutoff)]
+
+        elements_by_tile = {tile: list(row.elements or []) for tile, row in cached.items()}
+        if missing:
+            fetched = await self._fetch_tiles(missing)
+            if fetched is not None:
+                now = datetime.now(timezone.utc)
+                elements_by_tile.update(fetched)
+                # Concurrent searches may fetch the same tile; the last write wins.
+                await self.db.execute(
+                    upsert_statement(self.db, OverpassTile.__table__, ["geohash"]),
+                    [
+                        {"geohash": tile, "fetched_at": now, "elements": elements}
+                        for tile, elements in fetched.items()
+                    ],
+                )
+                await self.db.commit()
+                if self.settings.overpass_ingest:
+                    await self.ingest(
+                        [element for elements in fetched.values() for element in elements]
+                    )
+            else:
+                logger.warning(
+                    "Overpass unavailable; serving %s cached tiles only.", len(elements_by_tile)
+                )
+
+        return [element for elements in elements_by_tile.values() for element in elements]
+
+    def _is_fresh(self, row: OverpassTile | None, cutoff: datetime) -> bool:
+        if row is None or row.fetched_at is None:
+            return False
+        fetched_at = row.fetched_at
+        if fetched_at.tzinfo is None:
+            fetched_at = fetched_at.replace(tzinfo=timezone.utc)
+        return fetched_at >= cutoff
+
+    async def _fetch_tiles(self, tiles: list[str]) -> dict[str, list[dict]] | None:
+        bounds = [geohash_bounds(tile) for tile in tiles]
+        south = min(b[0] for b in bounds)
+        north = max(b[1] for b in bounds)
+        west = min(b[2] for b in bounds)
+        east = max(b[3] for b in bounds)
+        bbox = f"{south},{west},{north},{east}"
+        query = f"""
+        [out:json][timeout:10];
+        (
+          node{AMENITY_FILTER}({bbox});
+          way{AMENITY_FILTER}({bbox});
+          relation{AMENITY_FILTER}({bbox});
+        );
+        out center tags;
+        """
+        try:
+            data = await self._post(query)
+        except Exception as exc:
+            logger.warning("Overpass request failed: %s", exc)
+            return None
+
+        fetched: dict[str, list[dict]] = {tile: [] for tile in tiles}
+        for element in data.get("elements", []):
+            compact = _compact_element(element)
+            if compact is None:
+                continue
+            tile = geohash_encode(compact["lat"], compact["lon"], self.precision)
+            if tile in fetched:
+                fetched[tile].append(compact)
+        return fetched
+
+    async def _post(self, query: str) -> dict[str, Any]:
+        resp = await self.client.post(
+            self.settings.overpass_url,
+            content=query,
+            headers={"Content-Type": "text/plain"},
+        )
+        resp.raise_for_status()
+        return resp.json()
+
+    async def ingest(self, elements: list[dict]) -> int:
+        """Copy newly fetched OSM facilities into ``facilities``, skipping duplicates.
+
+        An element is a duplicate when its ``osm-<id>`` row already exists or a
+        catalogued facility with the same name lies within DUPLICATE_DISTANCE_KM.
+        """
+        candidates = [f for f in (element_to_facility(e) for e in elements) if f]
+        if not candidates:
+            return 0
+        min_lat = min(f["latitude"] for f in candidates)
+        max_lat = max(f["latitude"] for f in candidates)
+        min_lng = min(f["longitude"] for f in candidates)
+        max_lng = max(f["longitude"] for f in candidates)
+        margin = DUPLICATE_DISTANCE_KM / 111
+        existing = (
+            await self.db.execute(
+                select(Facility.id, Facility.name, Facility.latitude, Facility.longitude).where(
+                    Facility.latitude.between(min_lat - margin, max_lat + margin),
+                    Facility.longitude.between(min_lng - margin, max_lng + margin),
+                )
+            )
+        ).all()
+        existing_ids = {row.id for row in existing}
+        by_name: dict[str, list[tuple[float, float]]] = {}
+        for row in existing:
+            by_name.setdefault(row.name.strip().lower(), []).append(
+                (float(row.latitude), float(row.longitude))
+            )
+
+        added = []
+        now = datetime.now(timezone.utc)
+        for facility in candidates:
+            if facility["id"] in existing_ids:
+                continue
+            key = facility["name"].strip().lower()
+            if any(
+                haversine_km(facility["latitude"], facility["longitude"], lat, lng)
+                <= DUPLICATE_DISTANCE_KM
+                for lat, lng in by_name.get(key, [])
+            ):
+                continue
+            self.db.add(
+                Facility(
+                    **{
+                        **facility,
+                        "name": facility["name"][:200],
+                        "pincode": facility["pincode"][:6],
+                        "contact_number": facility["contact_number"][:15],
+                        "last_updated": now,
+                    }
+                )
+            )
+            existing_ids.add(facility["id"])
+            by_name.setdefault(key, []).append((facility["latitude"], facility["longitude"]))
+            added.append((facility["latitude"], facility["longitude"]))
+        if added:
+            await self.db.commit()
+            facility_search_cache.invalidate_points(added)
+            logger.info("Ingested %s OSM facilities.", len(added))
+        return len(added)
@@ -0,0 +1,302 @@
+"""Pincode and village lookup for users who cannot share a GPS fix.
+
+Built offline (scripts/build_place_lookup.py) from a gazetteer CSV and the
+facility catalog: every pincode and village gets a centroid and, per urgency
+tier, its best-ranked facilities with opening hours ignored. The table is held
+in memory and resolved with dict lookups. Requests re-check the stored
+facilities against the clock, live status and any filters before serving them.
+
+The file records the newest facility ``last_updated`` it was built from. Once
+the database holds a newer row, the ranked lists are considered stale and
+searches run from the centroid instead until the table is rebuilt.
+"""
+from __future__ import annotations
+
+import csv
+import logging
+import re
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Iterator
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.facility import Facility
+from app.services.facility_catalog import FacilityCatalog
+
+logger = logging.getLogger(__name__)
+
+TIERS = ("EMERGENCY", "URGENT", "ROUTINE", "SELF_CARE")
+# Facilities stored per place and tier; extra rows absorb request-time filtering.
+CANDIDATES_PER_TIER = 10
+PRECOMPUTE_RADIUS_KM = 50
+KIND_PINCODE, KIND_VILLAGE = 0, 1
+KIND_NAMES = ("pincode", "village")
+AMBIGUOUS = -1
+FORMAT_VERSION = 1
+
+GAZETTEER_ALIASES = {
+    "pincode": ["pincode", "pin", "pin_code", "postcode"],
+    "name": ["village", "village_name", "officename", "office_name", "place", "name"],
+    "district": ["district", "districtname", "district_name"],
+    "latitude": ["latitude", "lat"],
+    "longitude": ["longitude", "lng", "lon", "long"],
+}
+_SPACES = re.compile(r"\s+")
+_NOT_DIGITS = re.compile(r"\D")
+
+
+class AmbiguousPlace(ValueError):
+    """A village name that exists in several districts and needs one to pick from."""
+
+
+def normalize_name(value: str | None) -> str:
+    return _SPACES.sub(" ", (value or "").strip()).casefold()
+
+
+def normalize_pincode(value: str | None) -> str:
+    return _NOT_DIGITS.sub("", value or "")
+
+
+@dataclass(frozen=True)
+class Place:
+    row: int
+    kind: str
+    name: str
+    district: str
+    lat: float
+    lng: float
+
+
+def iter_gazetteer(path: str) -> Iterator[tuple[str, str, str, float, float]]:
+    """Yield ``(pincode, name, district, lat, lng)``, skipping rows without usable coordinates."""
+    with open(path, newline="", encoding="utf-8-sig") as handle:
+        reader = csv.DictReader(handle)
+        headers = {normalize_name(header).replace(" ", "_"): header for header in reader.fieldnames or []}
+        columns = {
+            field: next((headers[alias] for alias in aliases if alias in headers), None)
+            for field, aliases in GAZETTEER_ALIASES.items()
+        }
+        if columns["latitude"] is None or columns["longitude"] is None:
+            raise ValueError(f"{path}: gazetteer needs latitude and longitude columns.")
+        for record in reader:
+            try:
+                lat = float(record[columns["latitude"]])
+                lng = float(record[columns["longitude"]])
+            except (TypeError, ValueError):
+                continue
+            if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+                continue
+            yield (
+                normalize_pincode(record.get(columns["pincode"] or "")),
+                (record.get(columns["name"] or "") or "").strip(),
+                (record.get(columns["district"] or "") or "").strip(),
+                lat,
+                lng,
+            )
+
+
+async def latest_facility_update(session: AsyncSession) -> datetime | None:
+    latest = await session.scalar(
+        select(func.max(Facility.last_updated)).where(Facility.is_active.is_(True))
+    )
+    if latest is not None and latest.tzinfo is None:
+        latest = latest.replace(tzinfo=timezone.utc)
+    return latest
+
+
+class PlaceLookup:
+    """Place keys → centroid and per-tier facility ids, all answered from memory."""
+
+    def __init__(self) -> None:
+        self.kinds = np.array([], dtype=np.int8)
+        self.names = np.array([], dtype=str)
+        self.districts = np.array([], dtype=str)
+        self.lat = np.array([], dtype=np.float64)
+        self.lng = np.array([], dtype=np.float64)
+        self.candidates = np.empty((0, len(TIERS), CANDIDATES_PER_TIER), dtype=np.int32)
+        self.facility_ids = np.array([], dtype=str)
+        self.built_at: float | None = None
+        self.facilities_updated_at: datetime | None = None
+        self.stale = False
+        self.checked_at: float | None = None
+        self._pincodes: dict[str, int] = {}
+        self._villages: dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+
+    @property
+    def loaded(self) -> bool:
+        return len(self.kinds) > 0
+
+    @classmethod
+    def build(
+        cls,
+        gazetteer: Iterator[tuple[str, str, str, float, float]],
+        catalog: FacilityCatalog,
+        facilities_updated_at: datetime | None,
+    ) -> "PlaceLookup":
+        pincode_points: dict[str, list[tuple[float, float]]] = {}
+        village_points: dict[tuple[str, str], tuple[str, str, list[tuple[float, float]]]] = {}
+        for pincode, name, district, lat, lng in gazetteer:
+            if pincode:
+                pincode_points.setdefault(pincode, []).append((lat, lng))
+            if name:
+                key = (normalize_name(name), normalize_name(district))
+                village_points.setdefault(key, (name, district, []))[2].append((lat, lng))
+
+        kinds, names, districts, points = [], [], [], []
+        for pincode, coords in pincode_points.items():
+            kinds.append(KIND_PINCODE)
+            names.append(pincode)
+            districts.append("")
+            points.append(np.mean(coords, axis=0))
+        for name, district, coords in village_points.values():
+            kinds.append(KIND_VILLAGE)
+            names.append(name)
+            districts.append(district)
+            points.append(np.mean(coords, axis=0))
+
+        origins = [(float(lat), float(lng)) for lat, lng in points]
+        candidates = np.full((len(origins), len(TIERS), CANDIDATES_PER_TIER), -1, dtype=np.int32)
+        for tier, urgency in enumerate(TIERS):
+            searches = catalog.ranked_static(origins, urgency, PRECOMPUTE_RADIUS_KM, CANDIDATES_PER_TIER)
+            for place, search in enumerate(searches):
+                rows = [catalog.index_of(facility["id"]) for facility in search.facilities]
+                candidates[place, tier, : len(rows)] = rows
+
+        lookup = cls()
+        lookup._set(
+            kinds=np.array(kinds, dtype=np.int8),
+            names=np.array(names, dtype=str),
+            districts=np.array(districts, dtype=str),
+            lat=np.array([lat for lat, _ in origins], dtype=np.float64),
+            lng=np.array([lng for _, lng in origins], dtype=np.float64),
+            candidates=candidates,
+            facility_ids=np.array([str(catalog.rows[i]["id"]) for i in range(len(catalog))], dtype=str),
+            built_at=time.time(),
+            facilities_updated_at=facilities_updated_at,
+        )
+        return lookup
+
+    def _set(self, **arrays) -> None:
+        for name, value in arrays.items():
+            setattr(self, name, value)
+        self.stale = False
+        self._pincodes = {}
+        self._villages = {}
+        for row, (kind, name, district) in enumerate(zip(self.kinds, self.names, self.districts)):
+            if kind == KIND_PINCODE:
+                self._pincodes[str(name)] = row
+                continue
+            name = normalize_name(str(name))
+            self._villages[f"{name}|{normalize_name(str(district))}"] = row
+            self._villages[name] = AMBIGUOUS if name in self._villages else row
+
+    def save(self, path: str) -> None:
+        updated = self.facilities_updated_at.isoformat() if self.facilities_updated_at else ""
+        np.savez(
+            path,
+            version=np.array(FORMAT_VERSION),
+            kinds=self.kinds,
+            names=self.names,
+            districts=self.districts,
+            lat=self.lat,
+            lng=self.lng,
+            candidates=self.candidates,
+            facility_ids=self.facility_ids,
+            built_at=np.array(self.built_at or 0.0),
+            facilities_updated_at=np.array(updated),
+        )
+
+    def load(self, path: str) -> None:
+        with np.load(path, allow_pickle=False) as data:
+            if int(data["version"]) != FORMAT_VERSION:
+                raise ValueError(f"Unsupported place lookup version {int(data['version'])}.")
+            arrays = {name: data[name] for name in data.files if name != "version"}
+        updated = str(arrays.pop("facilities_updated_at"))
+        built_at = float(arrays.pop("built_at"))
+        self._set(
+            **arrays,
+            built_at=built_at,
+            facilities_updated_at=datetime.fromisoformat(updated) if updated else None,
+        )
+        logger.info(
+            "Place lookup loaded: %s pincodes, %s villages",
+            len(self._pincodes),
+            len(self.kinds) - len(self._pincodes),
+        )
+
+    def resolve(
+        self, pincode: str | None = None, village: str | None = None, district: str | None = None
+    ) -> Place | None:
+        """The place for a pincode, or a village (with its district when the name is shared)."""
+        row = None
+        if pincode:
+            row = self._pincodes.get(normalize_pincode(pincode))
+        if row is None and village:
+            name = normalize_name(village)
+            key = f"{name}|{normalize_name(district)}" if district else name
+            row = self._villages.get(key)
+            if row == AMBIGUOUS:
+                raise AmbiguousPlace(f"Several villages are named {village!r}; include the district.")
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return Place(
+            row=row,
+            kind=KIND_NAMES[int(self.kinds[row])],
+            name=str(self.names[row]),
+            district=str(self.districts[row]),
+            lat=float(self.lat[row]),
+            lng=float(self.lng[row]),
+        )
+
+    def facility_ids_for(self, place: Place, urgency: str) -> list[str] | None:
+        """Precomputed facility ids for the tier, best first; None while the table is stale."""
+        if self.stale:
+            self.stale_hits += 1
+            return None
+        rows = self.candidates[place.row, TIERS.index(urgency)]
+        return [str(self.facility_ids[i]) for i in rows if i >= 0]
+
+    async def check_staleness(self, session: AsyncSession) -> bool:
+        """Mark the table stale when any active facility changed after it was built."""
+        if not self.loaded:
+            return False
+        latest = await latest_facility_update(session)
+        built_from = self.facilities_updated_at
+        if built_from is not None and built_from.tzinfo is None:
+            built_from = built_from.replace(tzinfo=timezone.utc)
+        stale = latest is not None and (built_from is None or latest > built_from)
+        if stale and not self.stale:
+            logger.warning(
+                "Place lookup is stale (facilities updated %s, table built from %s); "
+                "run scripts/build_place_lookup.py",
+                latest,
+                built_from,
+            )
+        self.stale = stale
+        self.checked_at = time.time()
+        return stale
+
+    def metrics(self) -> dict:
+        return {
+            "pincodes": len(self._pincodes),
+            "places": len(self.kinds),
+            "built_at": self.built_at,
+            "facilities_updated_at": self.facilities_updated_at.isoformat() if self.facilities_updated_at else None,
+            "stale": self.stale,
+            "checked_at": self.checked_at,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale_hits": self.stale_hits,
+        }
+
+
+place_lookup = PlaceLookup()
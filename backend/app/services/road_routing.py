@@ -0,0 +1,324 @@
+"""Offline drive-time estimates from a local OpenStreetMap road extract.
+
+Build time (scripts/build_road_router.py):
+
+1. Roads from an OSM XML extract become a directed graph in CSR arrays
+   (``indptr``/``indices``/``seconds``), weighted by travel time at a per-
+   highway-class speed.
+2. For every facility inside the extract, Dijkstra runs on the reversed graph
+   from the facility's nearest road node, giving the drive time *to* the
+   facility from every node within ``max_minutes``.
+3. Those times are rasterised into a per-facility isochrone grid (uint16
+   seconds per cell, default 1 km cells). Empty cells next to reached ones
+   are filled with a short off-road crossing time.
+
+Query time is a grid lookup per (origin, facility) pair, vectorised across
+candidates, so ranking pays no graph search and makes no network calls.
+Origins outside a facility's grid get NaN and callers fall back to the
+straight-line estimate.
+"""
+from __future__ import annotations
+
+import heapq
+import logging
+import math
+import xml.etree.ElementTree as ElementTree
+from typing import Any, Iterable, Sequence
+
+import numpy as np
+
+from app.services.geo import KM_PER_DEGREE_LAT, haversine_km_vec
+
+logger = logging.getLogger(__name__)
+
+ROAD_SPEEDS_KMH = {
+    "motorway": 80, "motorway_link": 50, "trunk": 65, "trunk_link": 45,
+    "primary": 55, "primary_link": 40, "secondary": 45, "secondary_link": 35,
+    "tertiary": 35, "tertiary_link": 30, "unclassified": 25, "residential": 20,
+    "living_street": 10, "service": 15, "road": 25, "track": 12,
+}
+ONEWAY_VALUES = {"yes", "true", "1"}
+UNREACHED = np.iinfo(np.uint16).max
+# Filling an empty grid cell from a reached neighbour costs crossing it at this speed.
+OFF_ROAD_KMH = 15
+FILL_PASSES = 2
+FORMAT_VERSION = 1
+
+
+def _way_speed(tags: dict) -> float | None:
+    speed = ROAD_SPEEDS_KMH.get(tags.get("highway", ""))
+    if speed is None:
+        return None
+    maxspeed = tags.get("maxspeed", "").split(" ")[0]
+    if maxspeed.isdigit():
+        speed = min(speed, int(maxspeed))
+    return float(speed)
+
+
+class RoadGraph:
+    """Directed road graph in CSR form: edges of node ``n`` are ``indptr[n]:indptr[n+1]``."""
+
+    def __init__(
+        self,
+        lat: np.ndarray,
+        lng: np.ndarray,
+        indptr: np.ndarray,
+        indices: np.ndarray,
+        seconds: np.ndarray,
+    ) -> None:
+        self.lat = lat
+        self.lng = lng
+        self.indptr = indptr
+        self.indices = indices
+        self.seconds = seconds
+        self._adjacency: tuple[list, list, list] | None = None
+
+    def __len__(self) -> int:
+        return len(self.lat)
+
+    @classmethod
+    def from_edges(
+        cls, lat: np.ndarray, lng: np.ndarray, tails: np.ndarray, heads: np.ndarray, seconds: np.ndarray
+    ) -> "RoadGraph":
+        order = np.argsort(tails, kind="stable")
+        indptr = np.zeros(len(lat) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(tails, minlength=len(lat)), out=indptr[1:])
+        return cls(
+            lat=lat,
+            lng=lng,
+            indptr=indptr,
+            indices=heads[order].astype(np.int32),
+            seconds=seconds[order].astype(np.float32),
+        )
+
+    @classmethod
+    def from_osm(cls, path: str) -> "RoadGraph":
+        """Parse drivable ways from an OSM XML extract (convert .pbf with ``osmium cat``)."""
+        coords: dict[int, tuple[float, float]] = {}
+        ways: list[tuple[list[int], float, int]] = []
+        for _, element in ElementTree.iterparse(path, events=("end",)):
+            if element.tag == "node":
+                coords[int(element.get("id"))] = (float(element.get("lat")), float(element.get("lon")))
+                element.clear()
+            elif element.tag == "way":
+                tags = {tag.get("k"): tag.get("v") for tag in element.iter("tag")}
+                speed = _way_speed(tags)
+                if speed is not None:
+                    oneway = tags.get("oneway", "")
+                    direction = 1 if oneway in ONEWAY_VALUES or tags.get("junction") == "roundabout" else 0
+                    if oneway == "-1":
+                        direction = -1
+                    ways.append(([int(nd.get("ref")) for nd in element.iter("nd")], speed, direction))
+                element.clear()
+            elif element.tag == "relation":
+                element.clear()
+
+        index: dict[int, int] = {}
+        tails: list[int] = []
+        heads: list[int] = []
+        speeds: list[float] = []
+        for refs, speed, direction in ways:
+            refs = [ref for ref in refs if ref in coords]
+            compact = [index.setdefault(ref, len(index)) for ref in refs]
+            for u, v in zip(compact, compact[1:]):
+                if direction >= 0:
+                    tails.append(u)
+                    heads.append(v)
+                    speeds.append(speed)
+                if direction <= 0:
+                    tails.append(v)
+                    heads.append(u)
+                    speeds.append(speed)
+
+        lat = np.empty(len(index), dtype=np.float64)
+        lng = np.empty(len(index), dtype=np.float64)
+        for ref, node in index.items():
+            lat[node], lng[node] = coords[ref]
+        tails_arr = np.array(tails, dtype=np.int64)
+        heads_arr = np.array(heads, dtype=np.int64)
+        km = haversine_km_vec(lat[tails_arr], lng[tails_arr], lat[heads_arr], lng[heads_arr])
+        seconds = km / np.array(speeds, dtype=np.float64) * 3600
+        return cls.from_edges(lat, lng, tails_arr, heads_arr, seconds)
+
+    def reversed(self) -> "RoadGraph":
+        tails = np.repeat(np.arange(len(self), dtype=np.int64), np.diff(self.indptr))
+        return RoadGraph.from_edges(self.lat, self.lng, self.indices.astype(np.int64), tails, self.seconds)
+
+    def nearest_node(self, lat: float, lng: float) -> tuple[int, float]:
+        distances = haversine_km_vec(np.float64(lat), np.float64(lng), self.lat, self.lng)
+        node = int(np.argmin(distances))
+        return node, float(distances[node])
+
+    def dijkstra(self, source: int, cutoff_seconds: float) -> tuple[np.ndarray, np.ndarray]:
+        """Reached nodes and their travel time from ``source``, up to ``cutoff_seconds``."""
+        if self._adjacency is None:
+            # Plain lists index far faster than NumPy scalars in the inner loop.
+            self._adjacency = (self.indptr.tolist(), self.indices.tolist(), self.seconds.tolist())
+        indptr, indices, weights = self._adjacency
+        best = {source: 0.0}
+        settled: dict[int, float] = {}
+        heap = [(0.0, source)]
+        while heap:
+            cost, node = heapq.heappop(heap)
+            if node in settled:
+                continue
+            settled[node] = cost
+            for edge in range(indptr[node], indptr[node + 1]):
+                head = indices[edge]
+                new_cost = cost + weights[edge]
+                if new_cost <= cutoff_seconds and new_cost < best.get(head, math.inf):
+                    best[head] = new_cost
+                    heapq.heappush(heap, (new_cost, head))
+        nodes = np.fromiter(settled.keys(), dtype=np.int64, count=len(settled))
+        seconds = np.fromiter(settled.values(), dtype=np.float64, count=len(settled))
+        return nodes, seconds
+
+
+def isochrone_grid(
+    lat: np.ndarray, lng: np.ndarray, seconds: np.ndarray, cell_km: float
+) -> tuple[float, float, float, float, int, int, np.ndarray]:
+    """Rasterise reached nodes into a min-seconds grid: (lat0, lng0, dlat, dlng, rows, cols, cells)."""
+    dlat = cell_km / KM_PER_DEGREE_LAT
+    dlng = cell_km / (KM_PER_DEGREE_LAT * max(math.cos(math.radians(float(lat.mean()))), 0.01))
+    lat0 = float(lat.min()) - dlat
+    lng0 = float(lng.min()) - dlng
+    rows = int((lat.max() - lat0) // dlat) + 2
+    cols = int((lng.max() - lng0) // dlng) + 2
+    cells = np.full(rows * cols, UNREACHED, dtype=np.uint16)
+    flat = ((lat - lat0) // dlat).astype(np.int64) * cols + ((lng - lng0) // dlng).astype(np.int64)
+    np.minimum.at(cells, flat, np.minimum(seconds, UNREACHED - 1).astype(np.uint16))
+
+    grid = cells.reshape(rows, cols).astype(np.int64)
+    crossing = int(cell_km / OFF_ROAD_KMH * 3600)
+    for _ in range(FILL_PASSES):
+        padded = np.pad(grid, 1, constant_values=UNREACHED)
+        neighbours = np.min(
+            [padded[1 + dr : 1 + dr + rows, 1 + dc : 1 + dc + cols] for dr in (-1, 0, 1) for dc in (-1, 0, 1)],
+            axis=0,
+        )
+        fill = (grid == UNREACHED) & (neighbours < UNREACHED)
+        grid[fill] = np.minimum(neighbours[fill] + crossing, UNREACHED - 1)
+    return lat0, lng0, dlat, dlng, rows, cols, grid.astype(np.uint16).ravel()
+
+
+class RoadRouter:
+    """Per-facility isochrone grids; answers drive time to a facility from a point."""
+
+    def __init__(self) -> None:
+        self.facility_ids: np.ndarray = np.array([], dtype=str)
+        self.lat0 = self.lng0 = self.dlat = self.dlng = np.array([], dtype=np.float64)
+        self.rows = self.cols = np.array([], dtype=np.int64)
+        self.offsets = np.array([], dtype=np.int64)
+        self.cells = np.array([], dtype=np.uint16)
+        self._grid_by_id: dict[str, int] = {}
+        self._bound_catalog: Any = None
+        self._row_grids: np.ndarray | None = None
+
+    @property
+    def loaded(self) -> bool:
+        return len(self.facility_ids) > 0
+
+    @classmethod
+    def build(
+        cls,
+        graph: RoadGraph,
+        facilities: Sequence[dict],
+        max_minutes: float = 90,
+        cell_km: float = 1.0,
+        max_snap_km: float = 5.0,
+    ) -> "RoadRouter":
+        reverse = graph.reversed()
+        ids, grids = [], []
+        for facility in facilities:
+            node, snap_km = graph.nearest_node(float(facility["latitude"]), float(facility["longitude"]))
+            if snap_km > max_snap_km:
+                continue
+            nodes, seconds = reverse.dijkstra(node, max_minutes * 60)
+            seconds = seconds + snap_km / OFF_ROAD_KMH * 3600
+            ids.append(str(facility["id"]))
+            grids.append(isochrone_grid(graph.lat[nodes], graph.lng[nodes], seconds, cell_km))
+        router = cls()
+        router._set(ids, grids)
+        return router
+
+    def _set(self, ids: list[str], grids: list[tuple]) -> None:
+        self.facility_ids = np.array(ids, dtype=str)
+        self.lat0 = np.array([grid[0] for grid in grids], dtype=np.float64)
+        self.lng0 = np.array([grid[1] for grid in grids], dtype=np.float64)
+        self.dlat = np.array([grid[2] for grid in grids], dtype=np.float64)
+        self.dlng = np.array([grid[3] for grid in grids], dtype=np.float64)
+        self.rows = np.array([grid[4] for grid in grids], dtype=np.int64)
+        self.cols = np.array([grid[5] for grid in grids], dtype=np.int64)
+        sizes = self.rows * self.cols
+        self.offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.int64) if grids else sizes
+        self.cells = np.concatenate([grid[6] for grid in grids]) if grids else np.array([], dtype=np.uint16)
+        self._grid_by_id = {facility_id: grid for grid, facility_id in enumerate(ids)}
+        self._bound_catalog = None
+        self._row_grids = None
+
+    def save(self, path: str) -> None:
+        np.savez(
+            path,
+            version=np.array(FORMAT_VERSION),
+            facility_ids=self.facility_ids,
+            lat0=self.lat0, lng0=self.lng0, dlat=self.dlat, dlng=self.dlng,
+            rows=self.rows, cols=self.cols, offsets=self.offsets, cells=self.cells,
+        )
+
+    def load(self, path: str) -> None:
+        with np.load(path, allow_pickle=False) as data:
+            if int(data["version"]) != FORMAT_VERSION:
+                raise ValueError(f"Unsupported road router version {int(data['version'])}.")
+            arrays = {name: data[name] for name in data.files if name != "version"}
+        for name, array in arrays.items():
+            setattr(self, name, array)
+        self._grid_by_id = {str(facility_id): grid for grid, facility_id in enumerate(self.facility_ids)}
+        self._bound_catalog = None
+        self._row_grids = None
+        logger.info(
+            "Road router loaded: %s facilities, %.1f MiB of grids",
+            len(self.facility_ids),
+            self.cells.nbytes / 2**20,
+        )
+
+    def grid_ids(self, facility_ids: Iterable[Any]) -> np.ndarray:
+        return np.array([self._grid_by_id.get(str(facility_id), -1) for facility_id in facility_ids], dtype=np.int64)
+
+    def grids_for_rows(self, catalog: Any, idx: np.ndarray) -> np.ndarray:
+        """Grid ids for catalog rows (-1 when a facility has no grid), bound once per catalog."""
+        if self._bound_catalog is not catalog:
+            row_grids = np.full(len(catalog), -1, dtype=np.int64)
+            for grid, facility_id in enumerate(self.facility_ids):
+                row = catalog.index_of(facility_id)
+                if row is not None:
+                    row_grids[row] = grid
+            self._bound_catalog, self._row_grids = catalog, row_grids
+        return self._row_grids[idx]
+
+    def drive_minutes(self, grids: np.ndarray, lat: float, lng: float) -> np.ndarray:
+        """Drive minutes from (lat, lng) to each grid's facility; NaN where not covered."""
+        minutes = np.full(len(grids), np.nan)
+        known = np.flatnonzero(grids >= 0)
+        if not len(known):
+            return minutes
+        g = grids[known]
+        row = np.floor((lat - self.lat0[g]) / self.dlat[g]).astype(np.int64)
+        col = np.floor((lng - self.lng0[g]) / self.dlng[g]).astype(np.int64)
+        inside = (row >= 0) & (row < self.rows[g]) & (col >= 0) & (col < self.cols[g])
+        seconds = np.full(len(g), UNREACHED, dtype=np.int64)
+        seconds[inside] = self.cells[self.offsets[g[inside]] + row[inside] * self.cols[g[inside]] + col[inside]]
+        minutes[known] = np.where(seconds == UNREACHED, np.nan, seconds / 60)
+        return minutes
+
+    def annotate(self, facilities: list[dict], lat: float, lng: float) -> list[dict]:
+        """Set ``drive_minutes`` on facility rows that have a grid covering (lat, lng)."""
+        if not self.loaded or not facilities:
+            return facilities
+        minutes = self.drive_minutes(self.grid_ids(f["id"] for f in facilities), lat, lng)
+        for facility, value in zip(facilities, minutes):
+            if not np.isnan(value):
+                facility["drive_minutes"] = float(value)
+        return facilities
+
+
+road_router = RoadRouter()
@@ -0,0 +1,256 @@
+"""Similar-case retrieval over long windows ("cases like this one in 30 days").
+
+Events are indexed by their symptom mask (app/services/symptom_vocabulary.py).
+Each event adds its timestamp to a time-sorted posting list for its (mask,
+district) pair. When a mask is first seen, its MinHash signature is computed
+and filed into LSH band buckets. A query hashes its own mask, collects the
+masks sharing a band bucket (plus masks holding one of the symptom clusters it
+holds, since the cluster bonus can lift low-Jaccard pairs over the
+threshold), re-ranks only those with the exact similarity, and counts their
+events in the window with a binary search per posting list. The cost follows
+the number of candidate masks, not the number of events.
+
+The index lives in memory, is saved to an ``.npz`` snapshot on a schedule and
+at shutdown, and catches up from ``outbreak_events`` after loading.
+"""
+from __future__ import annotations
+
+import bisect
+import logging
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from sqlalchemy import case, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.models.outbreak import OutbreakEvent
+from app.services import symptom_vocabulary
+from app.services.admin_areas import admin_areas
+
+logger = logging.getLogger(__name__)
+
+# 16 bands of 2 rows: a pair with Jaccard 0.64 (the lowest that reaches the
+# default 0.45 threshold without the cluster bonus) shares a bucket with
+# probability above 0.999.
+HASHES = 32
+BAND_ROWS = 2
+HASH_SEED = 20240611
+SYNC_OVERLAP_SECONDS = 120
+SYNC_BATCH_SIZE = 5000
+FORMAT_VERSION = 1
+NO_DISTRICT = ""
+
+_RANKS = np.stack(
+    [np.random.default_rng(HASH_SEED + h).permutation(symptom_vocabulary.MAX_TERMS) for h in range(HASHES)]
+)
+
+
+def minhash(mask: int) -> np.ndarray:
+    """MinHash signature of a mask: per hash, the lowest permuted rank among its bits."""
+    bits = [position for position in range(symptom_vocabulary.MAX_TERMS) if mask >> position & 1]
+    return _RANKS[:, bits].min(axis=1)
+
+
+class SimilarCaseIndex:
+    def __init__(self, window_days: int = 30) -> None:
+        self.window_days = window_days
+        # mask -> district code ("" when unresolved) -> sorted event timestamps
+        self._postings: dict[int, dict[str, list[float]]] = {}
+        self._bands: dict[tuple[int, bytes], set[int]] = {}
+        self._clusters: dict[int, set[int]] = {cluster: set() for cluster in symptom_vocabulary.CLUSTER_MASKS}
+        # ids seen within the sync overlap, for dedupe
+        self._recent_ids: dict[str, float] = {}
+        self.events = 0
+        self.synced_until: datetime | None = None
+        self.ready = False
+        self.queries = 0
+        self.last_query_ms = 0.0
+        self.last_candidates = 0
+
+    def _index_mask(self, mask: int) -> None:
+        signature = minhash(mask)
+        for band in range(HASHES // BAND_ROWS):
+            key = (band, signature[band * BAND_ROWS : (band + 1) * BAND_ROWS].tobytes())
+            self._bands.setdefault(key, set()).add(mask)
+        for cluster, masks in self._clusters.items():
+            if mask & cluster == cluster:
+                masks.add(mask)
+
+    def add(self, event_id: str, mask: int, district_code: str | None, at: datetime | float) -> bool:
+        """Index one event; returns False for duplicates, empty masks and events outside the window."""
+        stamp = at if isinstance(at, float) else (at if at.tzinfo else at.replace(tzinfo=timezone.utc)).timestamp()
+        if not mask or event_id in self._recent_ids or stamp < time.time() - self.window_days * 86400:
+            return False
+        districts = self._postings.get(mask)
+        if districts is None:
+            districts = self._postings[mask] = {}
+            self._index_mask(mask)
+        stamps = districts.setdefault(district_code or NO_DISTRICT, [])
+        if not stamps or stamp >= stamps[-1]:
+            stamps.append(stamp)
+        else:
+            bisect.insort(stamps, stamp)
+        self._recent_ids[event_id] = stamp
+        self.events += 1
+        return True
+
+    def expire(self, now: float | None = None) -> int:
+        """Drop events older than the window and forget ids older than the sync overlap."""
+        now = now or time.time()
+        cutoff = now - self.window_days * 86400
+        dropped = 0
+        for districts in self._postings.values():
+            for stamps in districts.values():
+                old = bisect.bisect_left(stamps, cutoff)
+                if old:
+                    del stamps[:old]
+                    dropped += old
+        self.events -= dropped
+        horizon = (self.synced_until.timestamp() if self.synced_until else now) - 2 * SYNC_OVERLAP_SECONDS
+        self._recent_ids = {event_id: stamp for event_id, stamp in self._recent_ids.items() if stamp >= horizon}
+        return dropped
+
+    def candidates(self, mask: int) -> set[int]:
+        signature = minhash(mask)
+        found: set[int] = set()
+        for band in range(HASHES // BAND_ROWS):
+            found |= self._bands.get((band, signature[band * BAND_ROWS : (band + 1) * BAND_ROWS].tobytes()), set())
+        for cluster, masks in self._clusters.items():
+            if mask & cluster == cluster:
+                found |= masks
+        return found
+
+    def query(
+        self,
+        symptoms: str,
+        days: int | None = None,
+        district_code: str | None = None,
+        similarity_threshold: float = 0.45,
+        limit: int = 10,
+        now: datetime | None = None,
+    ) -> dict:
+        """Events similar to ``symptoms`` in the last ``days``, optionally within one district."""
+        started = time.perf_counter()
+        target = symptom_vocabulary.encode(symptoms)
+        days = min(days or self.window_days, self.window_days)
+        since = (now or datetime.now(timezone.utc)).timestamp() - days * 86400
+        candidates = np.array(sorted(self.candidates(target)) if target else [], dtype=np.uint64)
+        scores = symptom_vocabulary.similarity_many(target, candidates)
+        matches = []
+        for mask, score in zip(candidates.tolist(), scores.tolist()):
+            if score < similarity_threshold:
+                continue
+            districts = self._postings[mask]
+            postings = [districts.get(district_code, [])] if district_code else districts.values()
+            cases = sum(len(stamps) - bisect.bisect_left(stamps, since) for stamps in postings)
+            if cases:
+                matches.append(
+                    {"symptoms": symptom_vocabulary.terms(mask), "similarity": round(score, 3), "cases": cases}
+                )
+        matches.sort(key=lambda match: (-match["cases"], -match["similarity"]))
+        self.queries += 1
+        self.last_candidates = len(candidates)
+        self.last_query_ms = (time.perf_counter() - started) * 1000
+        return {
+            "query_symptoms": symptom_vocabulary.terms(target),
+            "days": days,
+            "district_code": district_code,
+            "district_name": admin_areas.district_names.get(district_code) if district_code else None,
+            "total_cases": sum(match["cases"] for match in matches),
+            "candidates_examined": len(candidates),
+            "matches": matches[:limit],
+        }
+
+    async def sync(self, session: AsyncSession) -> int:
+        """Index events written since the last sync (on startup: the whole window)."""
+        now = datetime.now(timezone.utc)
+        since = now - timedelta(days=self.window_days)
+        if self.synced_until is not None:
+            since = max(since, self.synced_until - timedelta(seconds=SYNC_OVERLAP_SECONDS))
+        statement = (
+            select(
+                OutbreakEvent.id,
+                OutbreakEvent.symptoms_mask,
+                case((OutbreakEvent.symptoms_mask.is_(None), OutbreakEvent.symptoms_text), else_=None).label(
+                    "symptoms_text"
+                ),
+                OutbreakEvent.district_code,
+                OutbreakEvent.created_at,
+            )
+            .where(OutbreakEvent.created_at >= since)
+            .execution_options(yield_per=SYNC_BATCH_SIZE)
+        )
+        added = 0
+        result = await session.stream(statement)
+        async for row in result:
+            mask = row.symptoms_mask
+            if not mask:
+                mask = symptom_vocabulary.encode(row.symptoms_text)
+            if row.created_at is not None and self.add(row.id, mask, row.district_code, row.created_at):
+                added += 1
+        self.synced_until = now
+        self.expire(now.timestamp())
+        self.ready = True
+        return added
+
+    def save(self, path: str) -> None:
+        """Write a snapshot to ``path`` (no suffix is added), replacing any previous one atomically."""
+        masks, districts, stamps = [], [], []
+        for mask, by_district in self._postings.items():
+            for district, times in by_district.items():
+                masks.extend([mask] * len(times))
+                districts.extend([district] * len(times))
+                stamps.extend(times)
+        # Workers share the path, so each writes its own temporary file and renames it in.
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        with open(tmp_path, "wb") as handle:
+            np.savez(
+                handle,
+                version=np.array(FORMAT_VERSION),
+                window_days=np.array(self.window_days),
+                masks=np.array(masks, dtype=np.int64),
+                districts=np.array(districts, dtype=str),
+                stamps=np.array(stamps, dtype=np.float64),
+                recent_ids=np.array(list(self._recent_ids), dtype=str),
+                recent_stamps=np.array(list(self._recent_ids.values()), dtype=np.float64),
+                synced_until=np.array(self.synced_until.timestamp() if self.synced_until else 0.0),
+            )
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp_path, path)
+
+    def load(self, path: str) -> None:
+        with np.load(path, allow_pickle=False) as data:
+            if int(data["version"]) != FORMAT_VERSION:
+                raise ValueError(f"Unsupported similar-case snapshot version {int(data['version'])}.")
+            arrays = {name: data[name] for name in data.files}
+        fresh = SimilarCaseIndex(self.window_days)
+        order = np.argsort(arrays["stamps"], kind="stable")
+        for number, (mask, district, stamp) in enumerate(
+            zip(arrays["masks"][order].tolist(), arrays["districts"][order].tolist(), arrays["stamps"][order].tolist())
+        ):
+            fresh.add(f"snapshot:{number}", mask, district, stamp)
+        fresh._recent_ids = dict(zip(arrays["recent_ids"].tolist(), arrays["recent_stamps"].tolist()))
+        synced_until = float(arrays["synced_until"])
+        fresh.synced_until = datetime.fromtimestamp(synced_until, tz=timezone.utc) if synced_until else None
+        self.__dict__.update(fresh.__dict__)
+        logger.info("Similar-case index loaded: %s events, %s symptom masks", self.events, len(self._postings))
+
+    def metrics(self) -> dict:
+        return {
+            "ready": self.ready,
+            "events": self.events,
+            "distinct_masks": len(self._postings),
+            "lsh_buckets": len(self._bands),
+            "window_days": self.window_days,
+            "synced_until": self.synced_until.isoformat() if self.synced_until else None,
+            "queries": self.queries,
+            "last_candidates": self.last_candidates,
+            "last_query_ms": round(self.last_query_ms, 3),
+        }
+
+
+similar_case_index = SimilarCaseIndex(get_settings().similar_case_window_days)
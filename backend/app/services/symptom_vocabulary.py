@@ -0,0 +1,273 @@
+"""Canonical symptom vocabulary and bitmask similarity for outbreak events.
+
+Each canonical term owns one bit. Free-text symptoms are encoded once, when an
+outbreak event is written, into a 63-bit mask; the ``BIGINT`` column is
+signed, so bit 63 is never used. Synonyms and common phrasings map onto the
+same bit, and words outside the vocabulary ("since", "days", "my") are
+dropped. Similarity between two reports is then popcount(a & b) /
+popcount(a | b) plus the shared-cluster bonus, which ``similarity_many``
+computes for a whole array of masks at once.
+
+A report that names no canonical term at all is not dropped: its remaining
+words, minus filler, are hashed into a word signature instead. Bit 62
+(``SIGNATURE_BIT``) marks the mask as a signature and each word sets two of
+the other bits, so identical reports still match exactly. Signatures are
+only compared with other signatures, never with term masks.
+
+Bit positions are stored in the database: only ever append to
+``CANONICAL_TERMS``, never reorder or remove entries.
+"""
+from __future__ import annotations
+
+import hashlib
+import re
+
+import numpy as np
+
+CANONICAL_TERMS = (
+    "fever",
+    "cough",
+    "cold",
+    "headache",
+    "vomiting",
+    "nausea",
+    "diarrhea",
+    "rash",
+    "chills",
+    "fatigue",
+    "body ache",
+    "stomach pain",
+    "shortness of breath",
+    "sore throat",
+    "runny nose",
+    "chest pain",
+    "dizziness",
+    "jaundice",
+    "joint pain",
+    "muscle pain",
+    "loss of appetite",
+    "red eyes",
+    "itching",
+    "swelling",
+    "bleeding",
+    "seizure",
+    "confusion",
+    "unconsciousness",
+    "back pain",
+    "dehydration",
+    "sweating",
+    "weakness",
+    "blood in stool",
+    "blood in urine",
+    "burning urination",
+    "constipation",
+    "ear pain",
+    "loss of smell",
+    "loss of taste",
+    "wheezing",
+    "sneezing",
+    "stiff neck",
+    "palpitations",
+    "fainting",
+    "blisters",
+    "dark urine",
+    "weight loss",
+    "night sweats",
+    "swollen glands",
+    "mouth ulcers",
+    "difficulty swallowing",
+    "paralysis",
+    "numbness",
+    "coughing blood",
+    "toothache",
+    "pain",
+    "dengue",
+    "malaria",
+    "typhoid",
+    "chikungunya",
+)
+MAX_TERMS = 63
+SIGNATURE_BIT = 1 << (MAX_TERMS - 1)
+assert len(CANONICAL_TERMS) < MAX_TERMS
+
+SYNONYMS = {
+    "fever": ["feverish", "temperature", "high temperature", "pyrexia", "bukhar", "bukhaar", "taap"],
+    "cough": ["coughing", "khansi"],
+    "cold": ["common cold"],
+    "headache": ["head ache", "head pain", "migraine"],
+    "vomiting": ["vomit", "vomited", "throwing up", "puking", "emesis", "ulti"],
+    "nausea": ["nauseous", "nauseated", "queasy"],
+    "diarrhea": [
+        "diarrhoea",
+        "loose motion",
+        "loose motions",
+        "loose stool",
+        "loose stools",
+        "watery stool",
+        "watery stools",
+        "dysentery",
+    ],
+    "rash": ["rashes", "skin rash", "hives", "spots"],
+    "chills": ["shivering", "rigors", "rigor"],
+    "fatigue": ["tired", "tiredness", "exhaustion", "exhausted", "lethargy", "lethargic"],
+    "body ache": ["body pain", "body aches", "bodyache", "aches"],
+    "stomach pain": [
+        "abdominal pain",
+        "abdomen pain",
+        "stomach ache",
+        "stomachache",
+        "belly pain",
+        "tummy pain",
+        "tummy ache",
+        "stomach cramps",
+        "cramps",
+    ],
+    "shortness of breath": [
+        "breathlessness",
+        "breathless",
+        "difficulty breathing",
+        "breathing difficulty",
+        "trouble breathing",
+        "short of breath",
+        "dyspnea",
+        "dyspnoea",
+    ],
+    "sore throat": ["throat pain", "scratchy throat"],
+    "runny nose": ["running nose", "blocked nose", "stuffy nose", "nasal congestion"],
+    "chest pain": ["chest tightness"],
+    "dizziness": ["dizzy", "giddiness", "giddy", "vertigo", "lightheaded"],
+    "jaundice": ["yellow eyes", "yellow skin", "yellowing"],
+    "joint pain": ["joint pains", "arthralgia"],
+    "muscle pain": ["muscle ache", "muscle aches", "myalgia"],
+    "loss of appetite": ["no appetite", "poor appetite"],
+    "red eyes": ["eye redness", "pink eye", "conjunctivitis", "burning eyes", "eye irritation", "watery eyes"],
+    "itching": ["itchy", "itch"],
+    "swelling": ["swollen", "edema", "oedema"],
+    "bleeding": ["bleed"],
+    "seizure": ["fits", "convulsion", "convulsions"],
+    "confusion": ["confused", "disoriented"],
+    "unconsciousness": ["unconscious", "unresponsive"],
+    "dehydration": ["dehydrated"],
+    "sweating": ["sweats"],
+    "weakness": ["weak"],
+    "blood in stool": ["bloody stool", "bloody stools", "bloody diarrhea"],
+    "blood in urine": ["bloody urine"],
+    "burning urination": ["painful urination", "burning micturition"],
+    "wheezing": ["wheeze"],
+    "sneezing": ["sneeze"],
+    "stiff neck": ["neck stiffness"],
+    "palpitations": ["palpitation", "racing heart"],
+    "fainting": ["fainted", "faint", "passed out"],
+    "blisters": ["blister", "vesicles"],
+    "coughing blood": ["blood in cough", "blood in sputum", "hemoptysis"],
+    "toothache": ["tooth pain", "tooth ache"],
+    "pain": ["ache"],
+    "dengue": ["dengue fever", "dengu", "break bone fever"],
+    "malaria": ["malarial", "malaria fever"],
+    "typhoid": ["typhoid fever", "enteric fever"],
+    "chikungunya": ["chikungunia", "chicken gunya"],
+}
+
+# Filler skipped when a report falls back to a word signature.
+SIGNATURE_STOP_WORDS = frozenset(
+    "a an and the of to in on at for from with without since after before my me i we he she it is are was "
+    "has have had having feel feeling very severe mild high low little lot some day days week weeks "
+    "hour hours month months yesterday today morning night last also not no aur hai hain se ko ka ki ke mein "
+    "bhi bahut ho raha rahi".split()
+)
+
+# Symptom pairs that score a bonus when both reports contain the whole pair.
+SYMPTOM_CLUSTERS = [
+    {"fever", "vomiting"},
+    {"fever", "diarrhea"},
+    {"cough", "fever"},
+    {"rash", "fever"},
+]
+JACCARD_WEIGHT = 0.7
+CLUSTER_WEIGHT = 0.3
+
+_NOT_LETTERS = re.compile(r"[^\w]+|_|\d")
+_PHRASES: dict[str, int] = {term: bit for bit, term in enumerate(CANONICAL_TERMS)}
+for _term, _aliases in SYNONYMS.items():
+    for _alias in _aliases:
+        _PHRASES[_alias] = CANONICAL_TERMS.index(_term)
+_LONGEST_PHRASE = max(len(phrase.split()) for phrase in _PHRASES)
+
+
+def bit(term: str) -> int:
+    return 1 << CANONICAL_TERMS.index(term)
+
+
+CLUSTER_MASKS = [sum(bit(term) for term in cluster) for cluster in SYMPTOM_CLUSTERS]
+
+
+def _word_signature(words: list[str]) -> int:
+    mask = 0
+    for word in words:
+        if word in SIGNATURE_STOP_WORDS:
+            continue
+        # A stable hash (not hash(), which is salted per process): masks are stored.
+        digest = int.from_bytes(hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest(), "big")
+        first = digest % (MAX_TERMS - 1)
+        second = (first + 1 + (digest >> 8) % (MAX_TERMS - 2)) % (MAX_TERMS - 1)
+        mask |= 1 << first | 1 << second
+    return mask | SIGNATURE_BIT if mask else 0
+
+
+def is_signature(mask: int) -> bool:
+    return bool(mask & SIGNATURE_BIT)
+
+
+def encode(text: str | None) -> int:
+    """Mask of the canonical terms mentioned in free text (longest phrase wins).
+
+    Text naming no canonical term encodes to a word signature (module docstring).
+    """
+    words = _NOT_LETTERS.sub(" ", (text or "").lower()).split()
+    mask = 0
+    i = 0
+    while i < len(words):
+        for length in range(min(_LONGEST_PHRASE, len(words) - i), 0, -1):
+            phrase = " ".join(words[i : i + length])
+            term = _PHRASES.get(phrase)
+            if term is None and length == 1 and phrase.endswith("s"):
+                term = _PHRASES.get(phrase[:-1])
+            if term is not None:
+                mask |= 1 << term
+                i += length
+                break
+        else:
+            i += 1
+    return mask or _word_signature(words)
+
+
+def terms(mask: int) -> list[str]:
+    if is_signature(mask):
+        return []
+    return [term for position, term in enumerate(CANONICAL_TERMS) if mask >> position & 1]
+
+
+def similarity(a: int, b: int) -> float:
+    if not a or not b or is_signature(a) != is_signature(b):
+        return 0.0
+    shared = a & b
+    jaccard = shared.bit_count() / (a | b).bit_count()
+    cluster_match = any(shared & cluster == cluster for cluster in CLUSTER_MASKS)
+    return JACCARD_WEIGHT * jaccard + CLUSTER_WEIGHT * cluster_match
+
+
+def similarity_many(target: int, masks: np.ndarray) -> np.ndarray:
+    """``similarity(target, mask)`` for every mask in the array."""
+    masks = np.asarray(masks, dtype=np.uint64)
+    if not target:
+        return np.zeros(len(masks))
+    target_bits = np.uint64(target)
+    shared = masks & target_bits
+    union = np.bitwise_count(masks | target_bits)
+    scores = JACCARD_WEIGHT * np.bitwise_count(shared) / union
+    cluster_match = np.zeros(len(masks), dtype=bool)
+    for cluster in CLUSTER_MASKS:
+        if target & cluster == cluster:
+            cluster_match |= (shared & np.uint64(cluster)) == np.uint64(cluster)
+    other_kind = (masks & np.uint64(SIGNATURE_BIT) != 0) != is_signature(target)
+    return np.where((masks == 0) | other_kind, 0.0, scores + CLUSTER_WEIGHT * cluster_match)
@@ -6,7 +6,10 @@ from datetime import datetime, timezone, timedelta
 from statistics import mean
 from typing import Any
 
+from app.core.config import get_settings
 from app.core.security import sanitize_input
+from app.services.admin_areas import admin_areas
+from app.services.outbreak_alert_map import outbreak_alert_map
 from app.services.outbreak_service import OutbreakService
 from app.services.red_flags import RED_FLAG_RULES
 
@@ -92,6 +95,7 @@ class TriageEngine:
 
         if location:
             community_context = await self.check_community_patterns(location, symptoms)
+            results["community_alert_map_age_seconds"] = community_context.get("map_age_seconds")
             if community_context.get("outbreak_detected"):
                 results["community_alert"] = community_context
                 results["features_used"].append("outbreak_detection")
@@ -222,6 +226,9 @@ class TriageEngine:
 
     async def check_community_patterns(self, location: dict, symptoms: str) -> dict:
         await asyncio.sleep(0)
+        settings = get_settings()
+        if settings.outbreak_alert_map_enabled and outbreak_alert_map.ready:
+            return outbreak_alert_map.lookup(location["lat"], location["lng"], symptoms)
         if not self.db:
             return {"outbreak_detected": False}
         service = OutbreakService(self.db)
@@ -229,9 +236,10 @@ class TriageEngine:
             lat=location["lat"],
             lng=location["lng"],
             symptoms=symptoms,
-            radius_km=5,
-            window_hours=48,
-            min_cases=15,
+            radius_km=settings.outbreak_alert_radius_km,
+            window_hours=settings.outbreak_counter_window_hours,
+            min_cases=settings.outbreak_alert_min_cases,
+            similarity_threshold=settings.outbreak_alert_similarity,
         )
 
     def validate_and_finalize(self, ai_result: dict, red_flag_result: dict) -> dict:
@@ -271,6 +279,10 @@ class TriageEngine:
                     image_analysis=results.get("visual_analysis"),
                     location_lat=(results.get("location") or {}).get("lat"),
                     location_lng=(results.get("location") or {}).get("lng"),
+                    **admin_areas.codes(
+                        (results.get("location") or {}).get("lat"),
+                        (results.get("location") or {}).get("lng"),
+                    ),
                     offline_mode=False,
                     ai_model_used=triage.get("ai_model", "llama-3.3-70b-groq"),
                     processing_time_ms=triage.get("processing_time_ms", 0),
@@ -8,10 +8,10 @@ import uuid
 from dataclasses import dataclass
 from datetime import datetime, timezone
 
-import httpx
 from PIL import Image, ImageFilter, ImageStat
 
 from app.core.config import get_settings
+from app.core.http_clients import http_clients
 
 logger = logging.getLogger("app.services.visual_skin")
 
@@ -143,12 +143,11 @@ class VisualSkinService:
         headers = {"Authorization": f"Bearer {self.settings.groq_api_key}"}
 
         try:
-            async with httpx.AsyncClient(timeout=20.0) as client:
-                response = await client.post(
-                    "https://api.groq.com/openai/v1/chat/completions",
-                    headers=headers,
-                    json=payload,
-                )
+            response = await http_clients.get("groq").post(
+                "https://api.groq.com/openai/v1/chat/completions",
+                headers=headers,
+                json=payload,
+            )
             response.raise_for_status()
             content = response.json()["choices"][0]["message"]["content"]
             data = json.loads(content)
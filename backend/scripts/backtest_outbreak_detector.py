@@ -0,0 +1,210 @@
+"""Replay an outbreak event log through the detector and compare settings.
+
+Usage:
+    python -m scripts.backtest_outbreak_detector --synthetic 100000 --days 14 --outbreaks 5 \\
+        --radius-km 3 5 8 --window-hours 24 48 --min-cases 10 15 20 --similarity 0.35 0.45 \\
+        [--detector counter|map] [--workers 4] [--json results.json]
+    python -m scripts.backtest_outbreak_detector --events-file events.jsonl --truth outbreaks.json ...
+    python -m scripts.backtest_outbreak_detector --database-url postgresql+asyncpg://... \\
+        --since 2026-01-01 --truth outbreaks.json ...
+
+Event sources (pick one):
+
+* ``--synthetic N``: N background reports plus ``--outbreaks`` injected
+  outbreaks, which are also the ground truth;
+* ``--events-file``: JSON lines or CSV with ``created_at`` (ISO 8601),
+  ``lat``, ``lng`` and either ``symptoms_mask`` or ``symptoms``;
+* ``--database-url``: ``outbreak_events`` since ``--since``, read once in a
+  single streamed query.
+
+``--truth`` is a JSON list of ``{"lat", "lng", "radius_km", "start", "end"}``
+objects. Without it, only alert counts and throughput are reported.
+
+Every combination of the parameter lists is replayed in its own process
+(``--workers``, default one per CPU). Results are sorted by outbreaks
+detected, then false alarm episodes, then latency.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import csv
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.models.outbreak import OutbreakEvent
+from app.services import symptom_vocabulary
+from app.services.outbreak_backtest import DETECTORS, DetectorParams, EventLog, TrueOutbreak, replay, synthetic_log
+
+COLUMNS = [
+    ("radius_km", "radius"),
+    ("window_hours", "window"),
+    ("min_cases", "min"),
+    ("similarity_threshold", "sim"),
+    ("alerts", "alerts"),
+    ("outbreaks_detected", "found"),
+    ("median_latency_hours", "lat_h"),
+    ("max_latency_hours", "max_h"),
+    ("false_alarm_episodes", "false_ep"),
+    ("false_alarm_events", "false_ev"),
+    ("events_per_second", "ev/s"),
+]
+
+_worker_state: dict = {}
+
+
+def read_events_file(path: str) -> EventLog:
+    with open(path, newline="", encoding="utf-8") as handle:
+        if path.endswith(".csv"):
+            records = list(csv.DictReader(handle))
+        else:
+            records = [json.loads(line) for line in handle if line.strip()]
+    rows = []
+    for record in records:
+        mask = record.get("symptoms_mask")
+        mask = int(mask) if mask not in (None, "") else symptom_vocabulary.encode(record.get("symptoms"))
+        rows.append((datetime.fromisoformat(record["created_at"]), float(record["lat"]), float(record["lng"]), mask))
+    return EventLog.from_rows(rows)
+
+
+async def read_database(database_url: str, since: datetime | None) -> EventLog:
+    engine = create_async_engine(database_url)
+    statement = select(
+        OutbreakEvent.created_at,
+        OutbreakEvent.lat,
+        OutbreakEvent.lng,
+        OutbreakEvent.symptoms_mask,
+        OutbreakEvent.symptoms_text,
+    ).execution_options(yield_per=10_000)
+    if since is not None:
+        statement = statement.where(OutbreakEvent.created_at >= since)
+    rows = []
+    try:
+        async with engine.connect() as connection:
+            result = await connection.stream(statement)
+            async for created_at, lat, lng, mask, text in result:
+                if created_at is not None:
+                    rows.append(
+                        (created_at, lat, lng, mask if mask is not None else symptom_vocabulary.encode(text))
+                    )
+    finally:
+        await engine.dispose()
+    return EventLog.from_rows(rows)
+
+
+def read_truth(path: str) -> list[TrueOutbreak]:
+    with open(path, encoding="utf-8") as handle:
+        return [
+            TrueOutbreak(
+                lat=float(item["lat"]),
+                lng=float(item["lng"]),
+                radius_km=float(item.get("radius_km", 5)),
+                start=datetime.fromisoformat(item["start"]),
+                end=datetime.fromisoformat(item["end"]),
+                symptoms=item.get("symptoms", ""),
+            )
+            for item in json.load(handle)
+        ]
+
+
+def _init_worker(log: EventLog, truth: list[TrueOutbreak], detector: str, map_seconds: int) -> None:
+    # The log is sent once per process rather than once per parameter set.
+    _worker_state.update(log=log, truth=truth, detector=detector, map_seconds=map_seconds)
+
+
+def _run(params: DetectorParams) -> dict:
+    state = _worker_state
+    return replay(state["log"], params, state["truth"], state["detector"], state["map_seconds"])
+
+
+def run_grid(
+    log: EventLog,
+    truth: list[TrueOutbreak],
+    grid: list[DetectorParams],
+    detector: str = "counter",
+    map_seconds: int = 60,
+    workers: int | None = None,
+) -> list[dict]:
+    workers = min(workers or os.cpu_count() or 1, len(grid))
+    if workers <= 1:
+        return [replay(log, params, truth, detector, map_seconds) for params in grid]
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(log, truth, detector, map_seconds)) as pool:
+        return list(pool.map(_run, grid))
+
+
+def ranked(results: list[dict]) -> list[dict]:
+    return sorted(
+        results,
+        key=lambda r: (
+            -r["outbreaks_detected"],
+            r["false_alarm_episodes"],
+            r["median_latency_hours"] if r["median_latency_hours"] is not None else float("inf"),
+        ),
+    )
+
+
+def print_table(results: list[dict]) -> None:
+    print("  ".join(f"{label:>8}" for _, label in COLUMNS))
+    for result in results:
+        print("  ".join(f"{'-' if result[key] is None else result[key]:>8}" for key, _ in COLUMNS))
+
+
+def main(args: argparse.Namespace) -> None:
+    truth: list[TrueOutbreak] = []
+    if args.synthetic:
+        log, truth = synthetic_log(args.synthetic, args.days, args.outbreaks, args.cases_per_outbreak, seed=args.seed)
+    elif args.events_file:
+        log = read_events_file(args.events_file)
+    else:
+        since = datetime.fromisoformat(args.since) if args.since else None
+        log = asyncio.run(read_database(args.database_url, since))
+    if args.truth:
+        truth = read_truth(args.truth)
+    if not len(log):
+        raise SystemExit("No events to replay.")
+
+    grid = [
+        DetectorParams(radius, window, min_cases, similarity)
+        for radius, window, min_cases, similarity in itertools.product(
+            args.radius_km, args.window_hours, args.min_cases, args.similarity
+        )
+    ]
+    span_days = (log.at[-1] - log.at[0]) / 86400
+    print(
+        f"{len(log)} events over {span_days:.1f} days, {len(truth)} known outbreaks, "
+        f"{len(grid)} parameter sets, detector={args.detector}"
+    )
+    results = ranked(run_grid(log, truth, grid, args.detector, args.map_seconds, args.workers))
+    print_table(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--synthetic", type=int, metavar="EVENTS", help="generate this many background events")
+    source.add_argument("--events-file", help="JSON lines or CSV event log")
+    source.add_argument("--database-url", help="read outbreak_events from this database")
+    parser.add_argument("--since", help="with --database-url: first event time (ISO 8601)")
+    parser.add_argument("--truth", help="JSON list of known outbreaks")
+    parser.add_argument("--days", type=int, default=14, help="synthetic log length")
+    parser.add_argument("--outbreaks", type=int, default=5, help="synthetic outbreaks to inject")
+    parser.add_argument("--cases-per-outbreak", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--radius-km", type=float, nargs="+", default=[5.0])
+    parser.add_argument("--window-hours", type=int, nargs="+", default=[48])
+    parser.add_argument("--min-cases", type=int, nargs="+", default=[15])
+    parser.add_argument("--similarity", type=float, nargs="+", default=[0.45])
+    parser.add_argument("--detector", choices=DETECTORS, default="counter")
+    parser.add_argument("--map-seconds", type=int, default=60, help="simulated alert map refresh interval")
+    parser.add_argument("--workers", type=int, help="processes for the grid (default: CPU count)")
+    parser.add_argument("--json", help="also write the results here")
+    main(parser.parse_args())
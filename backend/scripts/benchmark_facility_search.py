@@ -0,0 +1,112 @@
+"""Benchmark nearest-facility queries at increasing catalog sizes.
+
+Usage:
+    python -m scripts.benchmark_facility_search --database-url postgresql+asyncpg://... \\
+        --sizes 10000 100000 1000000 --backends bbox postgis
+
+The facilities table in the target database is TRUNCATED and reseeded for
+every size, so point this at a scratch database only. The PostGIS backend needs
+scripts/migrate_facilities_postgis.py to have been applied to that database.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+import uuid
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.models import Base
+from app.services.facility_service import FacilitySearchService
+
+# Bounding box roughly covering India, matching the spread of a national registry.
+LAT_RANGE = (8.0, 32.0)
+LNG_RANGE = (69.0, 89.0)
+
+INSERT_SQL = text(
+    """
+    INSERT INTO facilities (
+        id, name, facility_type, latitude, longitude, address, district, state,
+        pincode, contact_number, emergency_available, is_active
+    )
+    VALUES (
+        :id, :name, :facility_type, :latitude, :longitude, :address, :district, :state,
+        :pincode, :contact_number, :emergency_available, :is_active
+    )
+    """
+)
+
+
+def synthetic_rows(start: int, count: int) -> list[dict]:
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "name": f"Facility {start + i}",
+            "facility_type": random.choice(["PHC", "PHC", "CHC", "DH"]),
+            "latitude": random.uniform(*LAT_RANGE),
+            "longitude": random.uniform(*LNG_RANGE),
+            "address": "Benchmark road",
+            "district": "Benchmark",
+            "state": "Benchmark",
+            "pincode": "000000",
+            "contact_number": "+91 9000000000",
+            "emergency_available": random.random() < 0.15,
+            "is_active": True,
+        }
+        for i in range(count)
+    ]
+
+
+async def reseed(engine, size: int, batch_size: int = 10000) -> None:
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+        await connection.execute(text("DELETE FROM facilities"))
+    for start in range(0, size, batch_size):
+        async with engine.begin() as connection:
+            await connection.execute(INSERT_SQL, synthetic_rows(start, min(batch_size, size - start)))
+    async with engine.begin() as connection:
+        await connection.execute(text("ANALYZE facilities" if engine.dialect.name == "postgresql" else "ANALYZE"))
+
+
+async def time_queries(engine, backend: str, queries: int, radius_km: int) -> list[float]:
+    timings = []
+    async with AsyncSession(engine) as session:
+        service = FacilitySearchService(session, spatial_backend=backend)
+        for _ in range(queries):
+            lat = random.uniform(*LAT_RANGE)
+            lng = random.uniform(*LNG_RANGE)
+            start = time.perf_counter()
+            await service._query_nearby(lat, lng, radius_km=radius_km, max_results=10)
+            timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+async def run(args: argparse.Namespace) -> None:
+    engine = create_async_engine(args.database_url)
+    try:
+        print(f"{'size':>9} {'backend':>8} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}")
+        for size in args.sizes:
+            await reseed(engine, size)
+            for backend in args.backends:
+                timings = sorted(await time_queries(engine, backend, args.queries, args.radius_km))
+                p95 = timings[int(len(timings) * 0.95) - 1]
+                print(
+                    f"{size:>9} {backend:>8} {statistics.median(timings):>8.2f} "
+                    f"{p95:>8.2f} {timings[-1]:>8.2f}"
+                )
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", required=True)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--backends", nargs="+", default=["bbox"], choices=["bbox", "postgis"])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--radius-km", type=int, default=50)
+    asyncio.run(run(parser.parse_args()))
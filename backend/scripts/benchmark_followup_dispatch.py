@@ -0,0 +1,201 @@
+"""Benchmark follow-up dispatch against a backlog of due reminders.
+
+Usage:
+    python -m scripts.benchmark_followup_dispatch --reminders 100000 [--page-size 500] [--legacy-limit 10000]
+
+Seeds a temporary SQLite database with one patient, triage session and due
+reminder per backlog entry. Patients are 10% opted out and 10% have triaged
+again since, and 10% of sessions ended in a hospital visit. A copy of the
+database is drained by the paged dispatch (one joined query per page plus
+bulk UPDATEs) and another by the previous per-reminder loop. The loop is
+timed over the first ``--legacy-limit`` reminders and its drain time for the
+whole backlog extrapolated, as a full run takes many minutes. Messages go
+through the simulated sender, so Twilio must not be configured.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.core.config import get_settings
+from app.models import Base
+from app.models.follow_up import FollowUpReminder
+from app.models.patient import Patient
+from app.models.triage import TriageSession
+from app.services.followup_reminder_service import FollowUpReminderService
+
+INSERT_BATCH = 5000
+
+
+async def seed(path: str, reminders: int, seed: int) -> None:
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+        patients, sessions, due = [], [], []
+        for i in range(reminders):
+            patient_id, session_id = f"p{i:07d}", f"t{i:07d}"
+            scheduled = now - timedelta(minutes=rng.uniform(1, 6 * 60))
+            patients.append(
+                {
+                    "id": patient_id,
+                    "phone_number": f"+9190{i:08d}",
+                    "age": 30,
+                    "gender": "female",
+                    "preferred_language": "hi",
+                    "is_active": True,
+                    "opted_out": rng.random() < 0.1,
+                }
+            )
+            triage = {
+                "patient_id": patient_id,
+                "symptoms": {},
+                "urgency_level": "ROUTINE",
+                "confidence_score": 0.8,
+                "reasoning": "",
+                "red_flags": [],
+                "care_pathway": "",
+                "follow_up_questions": [],
+                "offline_mode": False,
+                "ai_model_used": "benchmark",
+                "processing_time_ms": 0,
+            }
+            sessions.append(
+                {
+                    **triage,
+                    "id": session_id,
+                    "visited_hospital": rng.random() < 0.1,
+                    "created_at": scheduled - timedelta(hours=24),
+                }
+            )
+            if rng.random() < 0.1:
+                newer = scheduled + timedelta(minutes=1)
+                sessions.append({**triage, "id": f"n{i:07d}", "visited_hospital": False, "created_at": newer})
+            due.append(
+                {
+                    "id": f"r{i:07d}",
+                    "token": f"token{i:07d}",
+                    "patient_id": patient_id,
+                    "triage_session_id": session_id,
+                    "urgency_level": "ROUTINE",
+                    "scheduled_time": scheduled,
+                    "escalated": False,
+                    "channel": "whatsapp",
+                    "message_language": "hi",
+                    "deep_link": f"http://localhost:5173/followup/token{i:07d}",
+                }
+            )
+        for model, rows in ((Patient, patients), (TriageSession, sessions), (FollowUpReminder, due)):
+            for start in range(0, len(rows), INSERT_BATCH):
+                await connection.execute(insert(model), rows[start : start + INSERT_BATCH])
+    await engine.dispose()
+
+
+async def legacy_dispatch(service: FollowUpReminderService, limit: int) -> int:
+    """The per-reminder loop dispatch_due replaced: 5+ round trips and a commit per reminder."""
+    session = service.session
+    now = datetime.now(timezone.utc)
+    result = await session.execute(
+        select(FollowUpReminder)
+        .where(FollowUpReminder.sent_at.is_(None))
+        .where(FollowUpReminder.scheduled_time <= now)
+        .order_by(FollowUpReminder.scheduled_time, FollowUpReminder.id)
+        .limit(limit)
+    )
+    sent_count = 0
+    for reminder in result.scalars().all():
+        patient = await session.get(Patient, reminder.patient_id)
+        skip = not patient or patient.opted_out
+        if not skip:
+            newer = await session.execute(
+                select(TriageSession.id)
+                .where(TriageSession.patient_id == reminder.patient_id)
+                .where(TriageSession.created_at > reminder.scheduled_time)
+                .limit(1)
+            )
+            skip = newer.scalar_one_or_none() is not None
+        if not skip:
+            triage = await session.get(TriageSession, reminder.triage_session_id)
+            skip = bool(triage and triage.visited_hospital)
+        if skip:
+            reminder.sent_at = datetime.now(timezone.utc)
+            reminder.response_status = "skipped"
+            await session.commit()
+            continue
+        patient = await session.get(Patient, reminder.patient_id)
+        delivered = await service._send_message(
+            patient.phone_number, service._build_message(reminder.deep_link, reminder.message_language)
+        )
+        if delivered:
+            reminder.sent_at = datetime.now(timezone.utc)
+            reminder.channel = delivered
+            await session.commit()
+            sent_count += 1
+    return sent_count
+
+
+async def drain(path: str, page_size: int | None, legacy_limit: int | None) -> tuple[float, int, dict]:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    try:
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            service = FollowUpReminderService(session)
+            started = time.perf_counter()
+            if legacy_limit is None:
+                sent = await service.dispatch_due(page_size=page_size)
+            else:
+                sent = await legacy_dispatch(service, legacy_limit)
+            elapsed = time.perf_counter() - started
+            outcome = await session.execute(
+                select(FollowUpReminder.response_status, func.count())
+                .where(FollowUpReminder.sent_at.is_not(None))
+                .group_by(FollowUpReminder.response_status)
+            )
+            return elapsed, sent, {status or "sent": count for status, count in outcome.all()}
+    finally:
+        await engine.dispose()
+
+
+async def main(reminders: int, page_size: int, legacy_limit: int, seed_value: int) -> None:
+    settings = get_settings()
+    if settings.twilio_account_sid and settings.twilio_auth_token:
+        raise SystemExit("Unset the Twilio credentials first; the benchmark would send real messages.")
+    logging.getLogger("app").setLevel(logging.WARNING)
+    with tempfile.TemporaryDirectory() as directory:
+        batched, legacy = os.path.join(directory, "batched.db"), os.path.join(directory, "legacy.db")
+        started = time.perf_counter()
+        await seed(batched, reminders, seed_value)
+        shutil.copy(batched, legacy)
+        print(f"Seeded {reminders} due reminders in {time.perf_counter() - started:.1f} s")
+
+        elapsed, sent, outcome = await drain(batched, page_size, None)
+        print(
+            f"paged dispatch (page {page_size}): {elapsed:.1f} s, {reminders / elapsed:,.0f} reminders/s, "
+            f"{sent} sent, {outcome}"
+        )
+        limit = min(legacy_limit, reminders)
+        elapsed, sent, outcome = await drain(legacy, None, limit)
+        print(
+            f"per-reminder loop: {elapsed:.1f} s for {limit}, {limit / elapsed:,.0f} reminders/s, "
+            f"~{elapsed * reminders / limit:.0f} s for the backlog, {sent} sent, {outcome}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reminders", type=int, default=100_000)
+    parser.add_argument("--page-size", type=int, default=500)
+    parser.add_argument("--legacy-limit", type=int, default=10_000, help="reminders the per-reminder loop drains")
+    parser.add_argument("--seed", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.reminders, args.page_size, args.legacy_limit, args.seed))
@@ -0,0 +1,73 @@
+"""Benchmark the precomputed outbreak alert map against per-request detection.
+
+Usage:
+    python -m scripts.benchmark_outbreak_alert_map --events 50000 [--lookups 10000]
+
+Fills an in-memory outbreak counter with synthetic events from the last 48
+hours. Most are scattered over a 6 x 6 degree region with random 1-3 term
+symptom combinations, and one in ten sits in a cluster near Lucknow. The
+benchmark then times one alert map build and compares a triage-time lookup
+with ``count_similar`` on the counter, the per-request path the map replaces.
+No database is needed.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import resource
+import time
+from datetime import datetime, timedelta, timezone
+
+from app.services.outbreak_alert_map import OutbreakAlertMap
+from app.services.outbreak_counter import OutbreakCounter
+from app.services.symptom_vocabulary import CANONICAL_TERMS, encode
+
+CENTRE = (26.85, 80.95)
+QUERY = "fever and vomiting"
+
+
+def fill(counter: OutbreakCounter, events: int) -> None:
+    rng = random.Random(1)
+    now = datetime.now(timezone.utc)
+    terms = CANONICAL_TERMS[:20]
+    for i in range(events):
+        if i % 10:
+            lat, lng = rng.uniform(24, 30), rng.uniform(78, 84)
+        else:
+            lat, lng = CENTRE[0] + rng.gauss(0, 0.02), CENTRE[1] + rng.gauss(0, 0.02)
+        symptoms = " ".join(rng.sample(terms, rng.randint(1, 3)))
+        counter.record(f"e{i}", lat, lng, encode(symptoms), now - timedelta(hours=rng.uniform(0, 47)))
+    counter.ready = True
+
+
+def main(events: int, lookups: int) -> None:
+    counter = OutbreakCounter()
+    fill(counter, events)
+    alert_map = OutbreakAlertMap()
+    alert_map.build(dict(counter._totals))
+    metrics = alert_map.metrics()
+    print(
+        f"{events} events: build {metrics['build_ms']:.0f} ms, {metrics['hot_cells']} hot cells, "
+        f"{metrics['alerts']} (cell, mask) alerts, {metrics['symptom_masks']} masks"
+    )
+
+    started = time.perf_counter()
+    for _ in range(lookups):
+        found = alert_map.lookup(*CENTRE, QUERY, counter=counter)
+    lookup_us = (time.perf_counter() - started) / lookups * 1e6
+    mask = encode(QUERY)
+    started = time.perf_counter()
+    for _ in range(lookups // 10):
+        live = counter.count_similar(*CENTRE, mask, 5, 48, 0.45)
+    live_us = (time.perf_counter() - started) / (lookups // 10) * 1e6
+    print(f"map lookup     cases={found.get('cases', 0):>6}  {lookup_us:9.1f} us")
+    print(f"count_similar  cases={live:>6}  {live_us:9.1f} us")
+    print(f"peak RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=50_000)
+    parser.add_argument("--lookups", type=int, default=10_000)
+    args = parser.parse_args()
+    main(args.events, args.lookups)
@@ -0,0 +1,91 @@
+"""Benchmark the space-time outbreak scan on synthetic event histories.
+
+Usage:
+    python -m scripts.benchmark_outbreak_scan --events 1000000 --replicates 99
+
+Events are spread over the baseline period around synthetic villages, with one
+injected cluster in the last 12 hours. They are aggregated to (cell, hour)
+counts as the scheduled job reads them from the rollups, so no database is
+needed. The scan itself is timed, and the script reports whether the injected
+cluster was found.
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from app.services.outbreak_rollup import SECONDS_PER_HOUR, hour_of
+from app.services.outbreak_scan import scan
+
+# A state-sized area with one village per ~25 km².
+LAT_RANGE = (24.0, 28.0)
+LNG_RANGE = (78.0, 84.0)
+VILLAGES = 8000
+OUTBREAK = (26.5, 81.0)
+
+
+def synthetic_counts(events: int, baseline_days: int, now: datetime, seed: int) -> dict[str, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    hours = baseline_days * 24
+    village_lat = rng.uniform(*LAT_RANGE, VILLAGES)
+    village_lng = rng.uniform(*LNG_RANGE, VILLAGES)
+    weights = rng.pareto(1.5, VILLAGES) + 1
+    village = rng.choice(VILLAGES, size=events, p=weights / weights.sum())
+    lat = village_lat[village] + rng.normal(0, 0.01, events)
+    lng = village_lng[village] + rng.normal(0, 0.01, events)
+    # A gentle upward trend over the baseline, which the permutation model absorbs.
+    age = (hours * (1 - np.sqrt(rng.uniform(0, 1, events)))).astype(np.int64)
+
+    extra = max(events // 2000, 30)
+    lat = np.concatenate([lat, OUTBREAK[0] + rng.normal(0, 0.015, extra)])
+    lng = np.concatenate([lng, OUTBREAK[1] + rng.normal(0, 0.015, extra)])
+    age = np.concatenate([age, rng.integers(0, 12, extra)])
+
+    hour = hour_of(now) - age
+    cell_lat = np.round(np.round(lat, 2) * 100).astype(np.int64)
+    cell_lng = np.round(np.round(lng, 2) * 100).astype(np.int64)
+    keys, inverse = np.unique(np.stack([cell_lat, cell_lng, hour], axis=1), axis=0, return_inverse=True)
+    inverse = inverse.ravel()
+    return {
+        "cell_lat": keys[:, 0],
+        "cell_lng": keys[:, 1],
+        "hour": keys[:, 2],
+        "events": np.bincount(inverse, minlength=len(keys)).astype(np.int64),
+        "sum_lat": np.bincount(inverse, weights=lat, minlength=len(keys)),
+        "sum_lng": np.bincount(inverse, weights=lng, minlength=len(keys)),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--replicates", type=int, default=99)
+    parser.add_argument("--baseline-days", type=int, default=28)
+    parser.add_argument("--max-radius-km", type=float, default=10.0)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    now = datetime.fromtimestamp((time.time() // SECONDS_PER_HOUR) * SECONDS_PER_HOUR + 1800, tz=timezone.utc)
+    for events in args.events:
+        counts = synthetic_counts(events, args.baseline_days, now, args.seed)
+        started = time.perf_counter()
+        result = scan(
+            counts, now, max_radius_km=args.max_radius_km, replicates=args.replicates, seed=args.seed
+        )
+        elapsed = time.perf_counter() - started
+        top = result["clusters"][0] if result["clusters"] else None
+        found = top is not None and abs(top["center_lat"] - OUTBREAK[0]) < 0.05 and abs(top["center_lng"] - OUTBREAK[1]) < 0.05
+        print(
+            f"{result['events']:>9} events  {result['cells']:>7} cells  {len(counts['events']):>8} cell-hours  "
+            f"{args.replicates} replicates  {elapsed:7.1f} s  clusters={len(result['clusters'])}  "
+            f"injected cluster {'found' if found else 'NOT found'}"
+        )
+        if top:
+            print(f"    top: {top}")
+
+
+if __name__ == "__main__":
+    main()
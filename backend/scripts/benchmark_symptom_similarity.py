@@ -0,0 +1,168 @@
+"""Benchmark outbreak similarity counting over a 48-hour window.
+
+Usage:
+    python -m scripts.benchmark_symptom_similarity --events 100000 \\
+        [--database-url sqlite+aiosqlite:///./similarity_bench.db]
+
+Writes synthetic outbreak events around one point, all inside the last 48
+hours and inside the 5 km detection radius. Then it counts the events similar
+to a report in two ways:
+
+* the previous per-row path: read the JSON token lists, build a set per row,
+  then compute Jaccard plus the cluster check in Python;
+* the bitmask path: read ``symptoms_mask`` and score every row with one NumPy
+  popcount pass (``OutbreakService._count_similar_events``).
+
+The scoring step is also timed on its own, from rows already in memory.
+
+The outbreak_events table in the target database is DELETED first, so point
+this at a scratch database only.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from sqlalchemy import and_, delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.models import Base
+from app.models.outbreak import OutbreakEvent
+from app.services.geo import haversine_km
+from app.services.outbreak_service import OutbreakService
+from app.services.symptom_vocabulary import SYMPTOM_CLUSTERS, encode, similarity_many
+
+CENTRE = (26.85, 80.95)
+REPORTS = [
+    "fever, vomiting since 2 days",
+    "high fever with chills and body ache",
+    "cough fever sore throat",
+    "loose motions and stomach pain",
+    "rash with fever and itching",
+    "headache and dizziness",
+    "fever vomiting headache",
+    "cough and cold",
+]
+QUERY = "fever and vomiting"
+
+
+def synthetic_rows(count: int, now: datetime) -> list[dict]:
+    rng = random.Random(3)
+    rows = []
+    for _ in range(count):
+        text = rng.choice(REPORTS)
+        rows.append(
+            {
+                "id": str(uuid.uuid4()),
+                "created_at": now - timedelta(minutes=rng.uniform(0, 47 * 60)),
+                "lat": CENTRE[0] + rng.uniform(-0.03, 0.03),
+                "lng": CENTRE[1] + rng.uniform(-0.03, 0.03),
+                "symptoms_text": text,
+                "symptoms_tokens": sorted(OutbreakService._tokenize(None, text)),
+                "symptoms_mask": encode(text),
+            }
+        )
+    return rows
+
+
+def legacy_similarity(a: set[str], b: set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    jaccard = len(a & b) / len(a | b)
+    cluster_match = 0.0
+    for cluster in SYMPTOM_CLUSTERS:
+        if cluster.issubset(a) and cluster.issubset(b):
+            cluster_match = 1.0
+            break
+    return 0.7 * jaccard + 0.3 * cluster_match
+
+
+async def legacy_count(session: AsyncSession, radius_km: float = 5, window_hours: int = 48) -> int:
+    lat, lng = CENTRE
+    target = OutbreakService._tokenize(None, QUERY)
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=window_hours)
+    lat_delta = radius_km / 111
+    lng_delta = radius_km / max(1, 111 * math.cos(math.radians(lat)))
+    rows = (
+        await session.execute(
+            select(OutbreakEvent.lat, OutbreakEvent.lng, OutbreakEvent.symptoms_tokens).where(
+                and_(
+                    OutbreakEvent.created_at >= cutoff,
+                    OutbreakEvent.lat.between(lat - lat_delta, lat + lat_delta),
+                    OutbreakEvent.lng.between(lng - lng_delta, lng + lng_delta),
+                )
+            )
+        )
+    ).all()
+    matches = 0
+    for row in rows:
+        if haversine_km(lat, lng, row.lat, row.lng) > radius_km:
+            continue
+        if legacy_similarity(target, set(row.symptoms_tokens)) >= 0.45:
+            matches += 1
+    return matches
+
+
+async def timed(label: str, func, repeats: int) -> None:
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = await func()
+        timings.append((time.perf_counter() - started) * 1000)
+    print(f"{label:<16} matches={result:>7}  median {statistics.median(timings):8.1f} ms  min {min(timings):8.1f} ms")
+
+
+async def main(database_url: str, events: int, repeats: int) -> None:
+    engine = create_async_engine(database_url)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    now = datetime.now(timezone.utc)
+    try:
+        async with AsyncSession(engine) as session:
+            await session.execute(delete(OutbreakEvent))
+            rows = synthetic_rows(events, now)
+            for start in range(0, len(rows), 10_000):
+                await session.execute(insert(OutbreakEvent), rows[start : start + 10_000])
+            await session.commit()
+
+            service = OutbreakService(session)
+            print(f"{events} events in the 48 h window, all within 5 km")
+            await timed("per-row", lambda: legacy_count(session), repeats)
+            await timed(
+                "bitmask",
+                lambda: service._count_similar_events(CENTRE[0], CENTRE[1], encode(QUERY), 5, 48, 0.45),
+                repeats,
+            )
+    finally:
+        await engine.dispose()
+
+    target = OutbreakService._tokenize(None, QUERY)
+    token_json = [json.dumps(row["symptoms_tokens"]) for row in rows]
+    masks = np.array([row["symptoms_mask"] for row in rows], dtype=np.uint64)
+    await timed(
+        "per-row scoring",
+        lambda: _value(sum(legacy_similarity(target, set(json.loads(tokens))) >= 0.45 for tokens in token_json)),
+        repeats,
+    )
+    await timed("bitmask scoring", lambda: _value(int((similarity_many(encode(QUERY), masks) >= 0.45).sum())), repeats)
+
+
+async def _value(value):
+    return value
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite+aiosqlite:///./similarity_bench.db")
+    parser.add_argument("--events", type=int, default=100_000)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.database_url, args.events, args.repeats))
@@ -0,0 +1,44 @@
+"""Write the memory-mapped facility snapshot shared by all API workers.
+
+Usage:
+    python -m scripts.build_facility_snapshot [--output facilities.snap]
+
+Defaults to FACILITY_SNAPSHOT_PATH. The new file is swapped in atomically;
+running workers pick it up on their next catalog refresh.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+from app.core.config import get_settings
+from app.core.database import AsyncSessionFactory
+from app.services.facility_catalog import FacilityCatalog, load_active_facilities
+from app.services.facility_snapshot import write_snapshot
+
+
+async def build(output: str) -> None:
+    started = time.perf_counter()
+    async with AsyncSessionFactory() as session:
+        rows = await load_active_facilities(session)
+    catalog = FacilityCatalog.from_rows(rows)
+    last_updated = [str(row["last_updated"]) for row in rows if row.get("last_updated")]
+    size = write_snapshot(
+        output,
+        catalog,
+        metadata={"max_last_updated": max(last_updated) if last_updated else None},
+    )
+    print(
+        f"Wrote {len(catalog)} facilities to {output} "
+        f"({size / 1024:.0f} KiB) in {time.perf_counter() - started:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", default=get_settings().facility_snapshot_path)
+    args = parser.parse_args()
+    if not args.output:
+        parser.error("--output is required when FACILITY_SNAPSHOT_PATH is not set.")
+    asyncio.run(build(args.output))
@@ -0,0 +1,49 @@
+"""Build the pincode/village lookup used when users have no GPS fix.
+
+Usage:
+    python -m scripts.build_place_lookup gazetteer.csv [--output places.npz]
+
+The gazetteer is a CSV with latitude/longitude and a pincode and/or village
+name column (the India Post pincode directory works as-is). Defaults to
+PLACE_LOOKUP_PATH. Re-run whenever the staleness check reports that
+facilities changed after the last build; workers load the file on startup.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import time
+
+from app.core.config import get_settings
+from app.core.database import AsyncSessionFactory
+from app.services.facility_catalog import FacilityCatalog, load_active_facilities
+from app.services.place_lookup import PlaceLookup, iter_gazetteer, latest_facility_update
+
+
+async def build(gazetteer: str, output: str) -> None:
+    started = time.perf_counter()
+    async with AsyncSessionFactory() as session:
+        rows = await load_active_facilities(session)
+        updated_at = await latest_facility_update(session)
+    catalog = FacilityCatalog.from_rows(rows)
+    lookup = PlaceLookup.build(iter_gazetteer(gazetteer), catalog, updated_at)
+    tmp_path = f"{output}.tmp.npz"
+    lookup.save(tmp_path)
+    os.replace(tmp_path, output)
+    pincodes = lookup.metrics()["pincodes"]
+    print(
+        f"Wrote {pincodes} pincodes and {len(lookup.kinds) - pincodes} villages against "
+        f"{len(catalog)} facilities to {output} ({os.path.getsize(output) / 2**20:.1f} MiB) "
+        f"in {time.perf_counter() - started:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("gazetteer")
+    parser.add_argument("--output", default=get_settings().place_lookup_path)
+    args = parser.parse_args()
+    if not args.output:
+        parser.error("--output is required when PLACE_LOOKUP_PATH is not set.")
+    asyncio.run(build(args.gazetteer, args.output))
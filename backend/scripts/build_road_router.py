@@ -0,0 +1,59 @@
+"""Precompute road-network drive times to facilities from a local OSM extract.
+
+Usage:
+    python -m scripts.build_road_router --osm district.osm --output roads.npz \\
+        [--max-minutes 90] [--cell-km 1.0]
+
+Takes an OSM XML extract (convert .pbf first: ``osmium cat in.osm.pbf -o
+out.osm``). Every active facility inside the extract gets an isochrone grid.
+Point ROAD_ROUTER_PATH at the output; workers load it on startup.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import time
+
+from sqlalchemy import select
+
+from app.core.database import AsyncSessionFactory
+from app.models.facility import Facility
+from app.services.road_routing import RoadGraph, RoadRouter
+
+
+async def load_facilities(graph: RoadGraph) -> list[dict]:
+    async with AsyncSessionFactory() as session:
+        rows = (
+            await session.execute(
+                select(Facility.id, Facility.latitude, Facility.longitude).where(
+                    Facility.is_active.is_(True),
+                    Facility.latitude.between(float(graph.lat.min()), float(graph.lat.max())),
+                    Facility.longitude.between(float(graph.lng.min()), float(graph.lng.max())),
+                )
+            )
+        ).all()
+    return [{"id": row.id, "latitude": row.latitude, "longitude": row.longitude} for row in rows]
+
+
+def main(args: argparse.Namespace) -> None:
+    started = time.perf_counter()
+    graph = RoadGraph.from_osm(args.osm)
+    print(f"Road graph: {len(graph)} nodes, {len(graph.indices)} edges ({time.perf_counter() - started:.1f}s)")
+    facilities = asyncio.run(load_facilities(graph))
+    started = time.perf_counter()
+    router = RoadRouter.build(graph, facilities, max_minutes=args.max_minutes, cell_km=args.cell_km)
+    router.save(args.output)
+    print(
+        f"Isochrone grids for {len(router.facility_ids)} of {len(facilities)} facilities "
+        f"in {time.perf_counter() - started:.1f}s; {os.path.getsize(args.output) / 2**20:.1f} MiB written"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--osm", required=True)
+    parser.add_argument("--output", required=True)
+    parser.add_argument("--max-minutes", type=float, default=90)
+    parser.add_argument("--cell-km", type=float, default=1.0)
+    main(parser.parse_args())
@@ -0,0 +1,86 @@
+"""Add district_code/block_code to triage_sessions and outbreak_events.
+
+Usage:
+    python -m scripts.migrate_admin_area_codes [--backfill boundaries.geojson]
+
+Adds the columns and their (district_code, created_at) indexes when missing.
+With --backfill, existing rows that have a location but no district code are
+resolved against the boundary file in batches. Safe to run more than once.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+
+from sqlalchemy import inspect, text
+
+from app.core.database import engine
+from app.services.admin_areas import AdminAreaIndex
+
+BACKFILL_BATCH_SIZE = 5000
+TABLES = {
+    # table: (latitude column, longitude column, index name)
+    "triage_sessions": ("location_lat", "location_lng", "ix_triage_district_created"),
+    "outbreak_events": ("lat", "lng", "ix_outbreak_events_district_created"),
+}
+
+
+async def add_columns() -> None:
+    async with engine.begin() as connection:
+        for table, (_, _, index) in TABLES.items():
+            existing = await connection.run_sync(
+                lambda sync: {column["name"] for column in inspect(sync).get_columns(table)}
+            )
+            for column in ("district_code", "block_code"):
+                if column not in existing:
+                    await connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} VARCHAR(16)"))
+            await connection.execute(
+                text(f"CREATE INDEX IF NOT EXISTS {index} ON {table} (district_code, created_at)")
+            )
+
+
+async def backfill(index: AdminAreaIndex) -> None:
+    for table, (lat_column, lng_column, _) in TABLES.items():
+        update = text(
+            f"UPDATE {table} SET district_code = :district_code, block_code = :block_code WHERE id = :id"
+        )
+        last_id, resolved, total = "", 0, 0
+        while True:
+            async with engine.begin() as connection:
+                rows = (
+                    await connection.execute(
+                        text(
+                            f"SELECT id, {lat_column} AS lat, {lng_column} AS lng FROM {table} "
+                            f"WHERE id > :last_id AND district_code IS NULL AND {lat_column} IS NOT NULL "
+                            "ORDER BY id LIMIT :limit"
+                        ),
+                        {"last_id": last_id, "limit": BACKFILL_BATCH_SIZE},
+                    )
+                ).all()
+                if not rows:
+                    break
+                last_id = rows[-1].id
+                total += len(rows)
+                updates = []
+                for row in rows:
+                    codes = index.codes(row.lat, row.lng)
+                    if codes["district_code"]:
+                        updates.append({"id": row.id, **codes})
+                if updates:
+                    await connection.execute(update, updates)
+                resolved += len(updates)
+        print(f"{table}: resolved {resolved} of {total} rows without a district code")
+
+
+async def migrate(boundaries: str | None) -> None:
+    await add_columns()
+    if boundaries:
+        index = AdminAreaIndex()
+        index.load(boundaries)
+        await backfill(index)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backfill", metavar="GEOJSON")
+    asyncio.run(migrate(parser.parse_args().backfill))
@@ -0,0 +1,27 @@
+"""Rebuild ix_facilities_geo as a B-tree on (latitude, longitude).
+
+Earlier schemas declared the index with ``USING gist`` on two Numeric columns,
+which Postgres cannot use for range predicates. Safe to run more than once.
+"""
+from __future__ import annotations
+
+import asyncio
+
+from sqlalchemy import text
+
+from app.core.database import engine
+
+
+async def migrate() -> None:
+    async with engine.begin() as connection:
+        await connection.execute(text("DROP INDEX IF EXISTS ix_facilities_geo"))
+        await connection.execute(
+            text(
+                "CREATE INDEX IF NOT EXISTS ix_facilities_geo "
+                "ON facilities (latitude, longitude)"
+            )
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
@@ -0,0 +1,88 @@
+"""Add a PostGIS geography(Point) column to facilities and backfill it.
+
+Postgres only. The column is populated from the existing latitude/longitude
+Numeric columns in batches, indexed with GiST, and kept in sync afterwards by a
+trigger so inserts and updates through the ORM need no changes. Safe to re-run.
+Workers started after it finishes search with the column.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+
+from sqlalchemy import text
+
+from app.core.database import engine
+
+BACKFILL_SQL = text(
+    """
+    UPDATE facilities
+    SET geog = ST_SetSRID(
+        ST_MakePoint(longitude::float8, latitude::float8), 4326
+    )::geography
+    WHERE id IN (
+        SELECT id FROM facilities
+        WHERE geog IS NULL AND latitude IS NOT NULL AND longitude IS NOT NULL
+        LIMIT :batch_size
+    )
+    """
+)
+
+SYNC_FUNCTION_SQL = """
+CREATE OR REPLACE FUNCTION facilities_sync_geog() RETURNS trigger AS $$
+BEGIN
+    IF NEW.latitude IS NULL OR NEW.longitude IS NULL THEN
+        NEW.geog := NULL;
+    ELSE
+        NEW.geog := ST_SetSRID(
+            ST_MakePoint(NEW.longitude::float8, NEW.latitude::float8), 4326
+        )::geography;
+    END IF;
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql
+"""
+
+
+async def migrate(batch_size: int = 10000) -> None:
+    if engine.dialect.name != "postgresql":
+        raise SystemExit("PostGIS migration requires a postgresql database_url.")
+
+    async with engine.begin() as connection:
+        await connection.execute(text("CREATE EXTENSION IF NOT EXISTS postgis"))
+        await connection.execute(
+            text("ALTER TABLE facilities ADD COLUMN IF NOT EXISTS geog geography(Point, 4326)")
+        )
+        await connection.execute(text(SYNC_FUNCTION_SQL))
+        await connection.execute(
+            text("DROP TRIGGER IF EXISTS trg_facilities_sync_geog ON facilities")
+        )
+        await connection.execute(
+            text(
+                "CREATE TRIGGER trg_facilities_sync_geog "
+                "BEFORE INSERT OR UPDATE OF latitude, longitude ON facilities "
+                "FOR EACH ROW EXECUTE FUNCTION facilities_sync_geog()"
+            )
+        )
+
+    total = 0
+    while True:
+        async with engine.begin() as connection:
+            result = await connection.execute(BACKFILL_SQL, {"batch_size": batch_size})
+        if not result.rowcount:
+            break
+        total += result.rowcount
+        print(f"Backfilled {total} facilities")
+
+    async with engine.begin() as connection:
+        await connection.execute(
+            text("CREATE INDEX IF NOT EXISTS ix_facilities_geog ON facilities USING gist (geog)")
+        )
+        await connection.execute(text("ANALYZE facilities"))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-size", type=int, default=10000)
+    args = parser.parse_args()
+    asyncio.run(migrate(batch_size=args.batch_size))
@@ -0,0 +1,20 @@
+"""Create the facility_live_status table used to persist live queue/bed reports.
+
+SQLite development databases get it from ``init_db``; Postgres needs this
+script. Safe to run more than once.
+"""
+from __future__ import annotations
+
+import asyncio
+
+from app.core.database import engine
+from app.models.facility_status import FacilityLiveStatus
+
+
+async def migrate() -> None:
+    async with engine.begin() as connection:
+        await connection.run_sync(FacilityLiveStatus.__table__.create, checkfirst=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
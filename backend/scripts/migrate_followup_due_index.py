@@ -0,0 +1,26 @@
+"""Add the partial index follow-up dispatch pages through.
+
+SQLite development databases get it from ``init_db``; Postgres needs this
+script. Safe to run more than once.
+"""
+from __future__ import annotations
+
+import asyncio
+
+from sqlalchemy import text
+
+from app.core.database import engine
+
+
+async def migrate() -> None:
+    async with engine.begin() as connection:
+        await connection.execute(
+            text(
+                "CREATE INDEX IF NOT EXISTS ix_follow_up_reminders_due "
+                "ON follow_up_reminders (scheduled_time, id) WHERE sent_at IS NULL"
+            )
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
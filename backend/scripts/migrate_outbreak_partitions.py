@@ -0,0 +1,73 @@
+"""Add the outbreak_events window indexes and, on Postgres, weekly partitions.
+
+Usage:
+    python -m scripts.migrate_outbreak_partitions [--partition]
+
+Creates ``ix_outbreak_events_created`` and ``ix_outbreak_events_lat_lng_created``
+when missing (SQLite and Postgres). With --partition on Postgres, the table is
+rebuilt as ``PARTITION BY RANGE (created_at)``. The rebuild adds a weekly
+partition per week from the oldest event to a few weeks ahead, plus a DEFAULT
+partition for anything outside them. Existing rows are copied over in the same
+transaction. Run the rebuild in a quiet period: it locks outbreak_events while
+it copies. Safe to run more than once.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import text
+
+from app.core.database import engine
+from app.services.outbreak_retention import PARTITIONS_AHEAD, ensure_partitions, is_partitioned
+
+INDEXES = {
+    "ix_outbreak_events_created": "created_at",
+    "ix_outbreak_events_lat_lng_created": "lat, lng, created_at",
+    "ix_outbreak_events_district_created": "district_code, created_at",
+}
+
+
+async def add_indexes(connection) -> None:
+    for name, columns in INDEXES.items():
+        await connection.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON outbreak_events ({columns})"))
+
+
+async def partition(connection) -> None:
+    now = datetime.now(timezone.utc)
+    oldest = await connection.scalar(text("SELECT min(created_at) FROM outbreak_events")) or now
+    # Index names belong to the old table until it is dropped below.
+    for name in INDEXES:
+        await connection.execute(text(f"DROP INDEX IF EXISTS {name}"))
+    await connection.execute(text("ALTER TABLE outbreak_events RENAME TO outbreak_events_unpartitioned"))
+    await connection.execute(
+        text(
+            "CREATE TABLE outbreak_events (LIKE outbreak_events_unpartitioned INCLUDING DEFAULTS) "
+            "PARTITION BY RANGE (created_at)"
+        )
+    )
+    await connection.execute(text("UPDATE outbreak_events_unpartitioned SET created_at = now() WHERE created_at IS NULL"))
+    await connection.execute(text("ALTER TABLE outbreak_events ALTER COLUMN created_at SET NOT NULL"))
+    await connection.execute(text("CREATE TABLE outbreak_events_default PARTITION OF outbreak_events DEFAULT"))
+    created = await ensure_partitions(connection, oldest, now + timedelta(weeks=PARTITIONS_AHEAD + 1))
+    await connection.execute(text("INSERT INTO outbreak_events SELECT * FROM outbreak_events_unpartitioned"))
+    await connection.execute(text("DROP TABLE outbreak_events_unpartitioned"))
+    # A partitioned table's primary key must include the partition key.
+    await connection.execute(text("ALTER TABLE outbreak_events ADD PRIMARY KEY (id, created_at)"))
+    print(f"outbreak_events partitioned by week: {created} partitions")
+
+
+async def migrate(partitioned: bool) -> None:
+    async with engine.begin() as connection:
+        if partitioned and connection.dialect.name == "postgresql" and not await is_partitioned(connection):
+            await partition(connection)
+        elif partitioned and connection.dialect.name != "postgresql":
+            print("Partitioning needs Postgres; only adding indexes.")
+        await add_indexes(connection)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--partition", action="store_true", help="rebuild outbreak_events as weekly partitions")
+    asyncio.run(migrate(parser.parse_args().partition))
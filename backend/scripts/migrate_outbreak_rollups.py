@@ -0,0 +1,22 @@
+"""Create the hourly outbreak rollup tables used by /admin/outbreaks.
+
+SQLite development databases get them from ``init_db``; Postgres needs this
+script. Safe to run more than once. The scheduled compactor fills them in
+from the oldest outbreak event onwards, at most a week of hours per run.
+"""
+from __future__ import annotations
+
+import asyncio
+
+from app.core.database import engine
+from app.models.outbreak import OutbreakCellHour, OutbreakCellHourToken, OutbreakRollupHour
+
+
+async def migrate() -> None:
+    async with engine.begin() as connection:
+        for model in (OutbreakCellHour, OutbreakCellHourToken, OutbreakRollupHour):
+            await connection.run_sync(model.__table__.create, checkfirst=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
@@ -0,0 +1,20 @@
+"""Create the overpass_tiles table behind the Overpass fallback search.
+
+SQLite development databases get it from ``init_db``; Postgres needs this
+script. Safe to run more than once.
+"""
+from __future__ import annotations
+
+import asyncio
+
+from app.core.database import engine
+from app.models.overpass_tile import OverpassTile
+
+
+async def migrate() -> None:
+    async with engine.begin() as connection:
+        await connection.run_sync(OverpassTile.__table__.create, checkfirst=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
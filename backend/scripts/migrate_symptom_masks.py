@@ -0,0 +1,66 @@
+"""Add outbreak_events.symptoms_mask and fill it in for existing rows.
+
+Usage:
+    python -m scripts.migrate_symptom_masks
+
+Adds the BIGINT column when missing, then encodes ``symptoms_text`` of rows
+without a mask, or with an empty one, in batches
+(app/services/symptom_vocabulary.py). Until a row is backfilled, detection
+encodes its text on the fly. Safe to run more than once; rerun it after
+appending terms to the vocabulary with ``--recompute``.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+
+from sqlalchemy import inspect, text
+
+from app.core.database import engine
+from app.services.symptom_vocabulary import encode
+
+BACKFILL_BATCH_SIZE = 5000
+
+
+async def add_column() -> None:
+    async with engine.begin() as connection:
+        existing = await connection.run_sync(
+            lambda sync: {column["name"] for column in inspect(sync).get_columns("outbreak_events")}
+        )
+        if "symptoms_mask" not in existing:
+            await connection.execute(text("ALTER TABLE outbreak_events ADD COLUMN symptoms_mask BIGINT"))
+
+
+async def backfill(recompute: bool) -> None:
+    # Empty masks predate word signatures for text outside the vocabulary.
+    condition = "" if recompute else "AND (symptoms_mask IS NULL OR symptoms_mask = 0) "
+    update = text("UPDATE outbreak_events SET symptoms_mask = :mask WHERE id = :id")
+    last_id, total = "", 0
+    while True:
+        async with engine.begin() as connection:
+            rows = (
+                await connection.execute(
+                    text(
+                        "SELECT id, symptoms_text FROM outbreak_events "
+                        f"WHERE id > :last_id {condition}ORDER BY id LIMIT :limit"
+                    ),
+                    {"last_id": last_id, "limit": BACKFILL_BATCH_SIZE},
+                )
+            ).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+            await connection.execute(update, [{"id": row.id, "mask": encode(row.symptoms_text)} for row in rows])
+            total += len(rows)
+    print(f"outbreak_events: encoded {total} rows")
+
+
+async def migrate(recompute: bool) -> None:
+    await add_column()
+    await backfill(recompute)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--recompute", action="store_true", help="re-encode rows that already have a mask")
+    asyncio.run(migrate(parser.parse_args().recompute))
@@ -0,0 +1,76 @@
+"""Local stand-in for the Overpass API interpreter endpoint.
+
+Serves facility elements from a JSON fixture (an Overpass response or a bare
+list of elements) and answers bounding-box queries the way Overpass would, so
+the facility fallback and its tile cache can be exercised offline:
+
+    OVERPASS_STUB_FIXTURE=fixture.json uvicorn scripts.overpass_stub:app --port 8081
+    OVERPASS_URL=http://localhost:8081/api/interpreter uvicorn app.main:app
+
+Without a fixture a small synthetic set of facilities around Lucknow is served.
+"""
+from __future__ import annotations
+
+import json
+import os
+import re
+
+from fastapi import FastAPI, Request
+
+BBOX_PATTERN = re.compile(r"\((-?[\d.]+),(-?[\d.]+),(-?[\d.]+),(-?[\d.]+)\)")
+
+SAMPLE_ELEMENTS = [
+    {"type": "node", "id": 1001, "lat": 26.8467, "lon": 80.9462,
+     "tags": {"amenity": "hospital", "name": "Civil Hospital", "opening_hours": "24/7"}},
+    {"type": "node", "id": 1002, "lat": 26.8721, "lon": 80.9905,
+     "tags": {"amenity": "clinic", "name": "Community Clinic"}},
+    {"type": "way", "id": 2001, "center": {"lat": 26.7606, "lon": 80.8893},
+     "tags": {"amenity": "doctors", "name": "Village Health Post"}},
+]
+
+
+def _position(element: dict) -> tuple[float, float] | None:
+    lat = element.get("lat") or element.get("center", {}).get("lat")
+    lng = element.get("lon") or element.get("center", {}).get("lon")
+    if lat is None or lng is None:
+        return None
+    return float(lat), float(lng)
+
+
+def create_app(elements: list[dict] | None = None) -> FastAPI:
+    stub = FastAPI(title="Overpass stub")
+    stub.state.elements = SAMPLE_ELEMENTS if elements is None else elements
+    stub.state.requests = 0
+
+    @stub.post("/api/interpreter")
+    async def interpreter(request: Request):
+        stub.state.requests += 1
+        query = (await request.body()).decode("utf-8")
+        match = BBOX_PATTERN.search(query)
+        selected = []
+        for element in stub.state.elements:
+            position = _position(element)
+            if position is None:
+                continue
+            lat, lng = position
+            if match:
+                south, west, north, east = (float(v) for v in match.groups())
+                if south <= lat <= north and west <= lng <= east:
+                    selected.append(element)
+            else:
+                selected.append(element)
+        return {"version": 0.6, "generator": "overpass-stub", "elements": selected}
+
+    return stub
+
+
+def _load_fixture() -> list[dict] | None:
+    path = os.getenv("OVERPASS_STUB_FIXTURE")
+    if not path:
+        return None
+    with open(path, encoding="utf-8") as handle:
+        data = json.load(handle)
+    return data.get("elements", []) if isinstance(data, dict) else data
+
+
+app = create_app(_load_fixture())
@@ -0,0 +1,94 @@
+"""Push simulated live queue/bed/ER reports to the facility status API.
+
+Usage:
+    python -m scripts.simulate_facility_status --api-url http://localhost:8000 \
+        [--facilities 200] [--rate 500] [--batch 100] [--duration 60]
+
+Picks facilities from the database and random-walks their queue length and
+free beds, sending ``--rate`` updates per second in batches of ``--batch``.
+Sends FACILITY_STATUS_TOKEN, which the API requires.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime, timezone
+
+import httpx
+from sqlalchemy import select
+
+from app.core.config import get_settings
+from app.core.database import AsyncSessionFactory
+from app.models.facility import Facility
+
+
+async def load_facilities(limit: int) -> list[dict]:
+    async with AsyncSessionFactory() as session:
+        rows = (
+            await session.execute(
+                select(Facility.id, Facility.bed_capacity, Facility.emergency_available)
+                .where(Facility.is_active.is_(True))
+                .limit(limit)
+            )
+        ).all()
+    return [
+        {
+            "facility_id": row.id,
+            "queue_length": random.randint(0, 20),
+            "beds": row.bed_capacity or 10,
+            "beds_free": random.randint(0, row.bed_capacity or 10),
+            "er_open": bool(row.emergency_available),
+        }
+        for row in rows
+    ]
+
+
+def step(state: dict) -> dict:
+    state["queue_length"] = max(0, state["queue_length"] + random.choice([-2, -1, 0, 1, 2]))
+    state["beds_free"] = min(state["beds"], max(0, state["beds_free"] + random.choice([-1, 0, 1])))
+    if random.random() < 0.01:
+        state["er_open"] = not state["er_open"]
+    return {
+        "facility_id": state["facility_id"],
+        "queue_length": state["queue_length"],
+        "beds_free": state["beds_free"],
+        "er_open": state["er_open"],
+        "reported_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+async def simulate(api_url: str, facilities: int, rate: int, batch: int, duration: float) -> None:
+    states = await load_facilities(facilities)
+    if not states:
+        raise SystemExit("No active facilities found; seed the database first.")
+    token = get_settings().facility_status_token
+    if not token:
+        raise SystemExit("Set FACILITY_STATUS_TOKEN; the status API rejects reports without it.")
+    headers = {"X-Facility-Token": token}
+    interval = batch / rate
+    sent = ignored = 0
+    started = time.perf_counter()
+    async with httpx.AsyncClient(base_url=api_url, headers=headers, timeout=10) as client:
+        while time.perf_counter() - started < duration:
+            tick = time.perf_counter()
+            updates = [step(random.choice(states)) for _ in range(batch)]
+            response = await client.post("/facilities/status", json={"updates": updates})
+            response.raise_for_status()
+            sent += response.json()["applied"]
+            ignored += response.json()["ignored"]
+            await asyncio.sleep(max(0.0, interval - (time.perf_counter() - tick)))
+    elapsed = time.perf_counter() - started
+    print(f"Sent {sent} updates ({ignored} ignored) in {elapsed:.1f}s: {sent / elapsed:.0f} updates/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--api-url", default="http://localhost:8000")
+    parser.add_argument("--facilities", type=int, default=200)
+    parser.add_argument("--rate", type=int, default=500, help="updates per second")
+    parser.add_argument("--batch", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=60, help="seconds")
+    args = parser.parse_args()
+    asyncio.run(simulate(args.api_url, args.facilities, args.rate, args.batch, args.duration))
@@ -0,0 +1,94 @@
+import asyncio
+import random
+import unittest
+from unittest import mock
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.models import Base
+from app.services.admin_areas import AdminAreaIndex
+from app.services.outbreak_service import OutbreakService
+
+
+def square(lng0: float, lat0: float, lng1: float, lat1: float) -> list[list[float]]:
+    return [[lng0, lat0], [lng1, lat0], [lng1, lat1], [lng0, lat1], [lng0, lat0]]
+
+
+def feature(geometry: dict, **properties) -> dict:
+    return {"type": "Feature", "geometry": geometry, "properties": properties}
+
+
+# Lucknow (with the Kakori enclave cut out as a hole) and Barabanki to its east;
+# Lucknow also has two blocks split along a diagonal.
+BOUNDARIES = {
+    "type": "FeatureCollection",
+    "features": [
+        feature(
+            {"type": "Polygon", "coordinates": [square(80.6, 26.6, 81.1, 27.1), square(80.7, 26.7, 80.8, 26.8)]},
+            dtcode="157", dtname="Lucknow",
+        ),
+        feature({"type": "Polygon", "coordinates": [square(80.7, 26.7, 80.8, 26.8)]}, dtcode="158", dtname="Kakori"),
+        feature(
+            {"type": "MultiPolygon", "coordinates": [[square(81.1, 26.6, 81.6, 27.1)], [square(81.7, 26.6, 81.8, 26.7)]]},
+            DTCODE="159", DTNAME="Barabanki",
+        ),
+        feature(
+            {"type": "Polygon", "coordinates": [[[80.9, 26.9], [81.1, 26.9], [81.1, 27.1], [80.9, 26.9]]]},
+            dtcode="157", dtname="Lucknow", sdtcode="0801", sdtname="Bakshi Ka Talab",
+        ),
+    ],
+}
+
+
+async def record_and_summarise(index: AdminAreaIndex, points: list[tuple[float, float]]) -> list[dict]:
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    try:
+        with mock.patch("app.services.outbreak_service.admin_areas", index):
+            async with AsyncSession(engine) as session:
+                service = OutbreakService(session)
+                for lat, lng in points:
+                    await service.record_event(lat, lng, "fever, cough")
+                return await service.district_summary(window_hours=1)
+    finally:
+        await engine.dispose()
+
+
+class AdminAreaIndexTests(unittest.TestCase):
+    def setUp(self):
+        self.index = AdminAreaIndex.from_geojson(BOUNDARIES, degrees=0.03)
+
+    def test_resolves_blocks_holes_and_multipart_districts(self):
+        self.assertEqual(self.index.resolve(26.9, 80.65).district_code, "157")
+        self.assertIsNone(self.index.resolve(26.9, 80.65).block_code)
+        self.assertEqual(self.index.resolve(26.75, 80.75).district_code, "158")
+        self.assertEqual(self.index.resolve(26.65, 81.75).district_code, "159")
+        block = self.index.resolve(27.0, 81.05)
+        self.assertEqual((block.district_code, block.block_code), ("157", "0801"))
+        self.assertEqual(self.index.resolve(27.05, 80.95).block_code, None)
+        self.assertIsNone(self.index.resolve(20.0, 75.0))
+        self.assertEqual(self.index.district_names["159"], "Barabanki")
+
+    def test_grid_matches_brute_force_point_in_polygon(self):
+        rng = random.Random(3)
+        layers = [self.index._blocks, self.index._districts]
+        for _ in range(2000):
+            lat, lng = rng.uniform(26.55, 27.15), rng.uniform(80.55, 81.85)
+            expected = None
+            for layer in layers:
+                hits = [p.area for p in layer.polygons if p.contains(lat, lng)]
+                if hits:
+                    expected = hits[0]
+                    break
+            self.assertEqual(self.index.resolve(lat, lng), expected, (lat, lng))
+
+    def test_events_store_codes_for_group_by_reporting(self):
+        summary = asyncio.run(record_and_summarise(self.index, [(26.9, 80.65), (26.95, 80.62), (26.8, 81.3), (20.0, 75.0)]))
+        counts = {entry["district_code"]: entry["outbreak_events"] for entry in summary}
+        self.assertEqual(counts, {"157": 2, "159": 1, None: 1})
+        self.assertEqual(summary[0]["district_name"], "Lucknow")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+import os
+import random
+import tempfile
+import unittest
+from datetime import datetime
+from unittest import mock
+
+from app.services import operating_hours
+from app.services.facility_catalog import FacilityCatalog
+from app.services.facility_ranking import top_k
+from app.services.facility_service import FacilitySearchService
+from app.services.facility_snapshot import open_snapshot, write_snapshot
+from app.services.geo import haversine_km
+from app.services.operating_hours import IST, SCHEDULE_KEY, ClockReading
+
+OFFICE_HOURS = {"monday": "09:00-17:00", "tuesday": "09:00-17:00"}
+
+
+def synthetic_rows(count: int, seed: int = 7) -> list[dict]:
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        rows.append(
+            {
+                "id": f"f{i}",
+                "name": f"Facility {i}",
+                "facility_type": rng.choice(["PHC", "CHC", "DH", "PRIVATE"]),
+                "latitude": 26.85 + rng.uniform(-0.6, 0.6),
+                "longitude": 80.95 + rng.uniform(-0.6, 0.6),
+                "emergency_available": rng.random() < 0.3,
+                "estimated_wait_time": rng.choice([None, 10, 30, 60]),
+                "operating_hours": rng.choice([None, {"24/7": True}, OFFICE_HOURS]),
+            }
+        )
+    return rows
+
+
+class FacilityCatalogTests(unittest.TestCase):
+    def setUp(self):
+        self.rows = synthetic_rows(500)
+        self.catalog = FacilityCatalog.from_rows(self.rows)
+        self.service = FacilitySearchService(db_session=None, spatial_backend="bbox")
+        self.clock = ClockReading.at(datetime(2026, 1, 5, 18, 0, tzinfo=IST))
+
+    def expected(self, urgency: str, radius_km: float, max_results: int, **filters) -> list[str]:
+        rows = []
+        for row in self.rows:
+            distance = haversine_km(26.85, 80.95, row["latitude"], row["longitude"])
+            if distance <= radius_km:
+                rows.append({**row, "distance_km": distance})
+        rows.sort(key=lambda row: row["distance_km"])
+        filtered = self.service.filter_by_urgency(rows, urgency, clock=self.clock, **filters)
+        return [row["id"] for row in filtered[:max_results]]
+
+    def test_matches_row_by_row_filtering(self):
+        cases = [
+            ("ROUTINE", 30, 5, {}),
+            ("EMERGENCY", 50, 5, {}),
+            ("URGENT", 40, 10, {"max_wait_minutes": 30}),
+            ("ROUTINE", 50, 8, {"open_now": True, "facility_types": ["PHC", "CHC"]}),
+        ]
+        for urgency, radius, limit, filters in cases:
+            with self.subTest(urgency=urgency, filters=filters):
+                facilities, total = self.catalog.nearest(
+                    26.85, 80.95, urgency, radius, limit, clock=self.clock, **filters
+                )
+                self.assertEqual([f["id"] for f in facilities], self.expected(urgency, radius, limit, **filters))
+                self.assertGreater(total, 0)
+
+    def test_only_requested_rows_are_materialised(self):
+        facilities, _ = self.catalog.nearest(26.85, 80.95, "ROUTINE", 80, 3, clock=self.clock)
+        self.assertEqual(len(facilities), 3)
+        self.assertLessEqual(facilities[0]["distance_km"], facilities[-1]["distance_km"])
+
+    def test_ranked_widens_until_enough_qualify(self):
+        # The cluster spans 26.25-27.45N, so nothing lies within 5 km of 27.95N.
+        search = self.catalog.ranked(27.95, 80.95, "EMERGENCY", 5, 3, clock=self.clock)
+        self.assertEqual(len(search.facilities), 3)
+        self.assertGreater(search.widen_steps, 0)
+        self.assertGreater(search.search_radius, 5)
+
+    def test_ranked_matches_heap_top_k(self):
+        for urgency, filters in [("ROUTINE", {}), ("URGENT", {"max_wait_minutes": 30})]:
+            with self.subTest(urgency=urgency):
+                search = self.catalog.ranked(26.85, 80.95, urgency, 30, 5, clock=self.clock, **filters)
+                candidates = []
+                for row in self.rows:
+                    distance = haversine_km(26.85, 80.95, row["latitude"], row["longitude"])
+                    if distance <= search.search_radius:
+                        candidates.append({**row, "distance_km": distance})
+                filtered = self.service.filter_by_urgency(candidates, urgency, clock=self.clock, **filters)
+                expected = [row["id"] for row in top_k(filtered, 5, urgency)]
+                self.assertEqual([f["id"] for f in search.facilities], expected)
+
+    def test_ranked_many_matches_single_searches(self):
+        rng = random.Random(3)
+        origins = [
+            (26.85 + rng.uniform(-0.5, 0.5), 80.95 + rng.uniform(-0.5, 0.5), urgency)
+            for urgency in ["ROUTINE", "URGENT", "EMERGENCY"] * 10
+        ]
+        batch = list(self.catalog.ranked_many(origins, 10, 2, clock=self.clock, max_wait_minutes=45))
+        self.assertEqual(len(batch), len(origins))
+        for (lat, lng, urgency), search in zip(origins, batch):
+            single = self.catalog.ranked(lat, lng, urgency, 10, 2, clock=self.clock, max_wait_minutes=45)
+            self.assertEqual(search, single)
+
+    def test_rows_carry_the_schedule_compiled_at_load(self):
+        facilities, _ = self.catalog.nearest(26.85, 80.95, "ROUTINE", 80, 50, clock=self.clock)
+        for facility in facilities:
+            schedule = facility[SCHEDULE_KEY]
+            if facility["operating_hours"] is None:
+                self.assertIsNone(schedule)
+            else:
+                self.assertIn(schedule, self.catalog.schedules)
+        with mock.patch.object(operating_hours, "compile_hours", side_effect=AssertionError("recompiled")):
+            self.service.filter_by_urgency(facilities, "URGENT", clock=self.clock, open_now=True)
+            self.service.check_operating_hours(facilities[0], self.clock)
+
+    def test_snapshot_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "facilities.snap")
+            write_snapshot(path, self.catalog, metadata={"source": "test"})
+            mapped, header = open_snapshot(path)
+            self.assertEqual(header["count"], len(self.rows))
+            self.assertEqual(header["metadata"], {"source": "test"})
+            for urgency, filters in [("URGENT", {}), ("ROUTINE", {"open_now": True})]:
+                expected, _ = self.catalog.nearest(26.85, 80.95, urgency, 40, 6, clock=self.clock, **filters)
+                actual, _ = mapped.nearest(26.85, 80.95, urgency, 40, 6, clock=self.clock, **filters)
+                self.assertEqual(actual, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+import asyncio
+import csv
+import json
+import os
+import tempfile
+import unittest
+from datetime import datetime, timezone
+from unittest import mock
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.models import Base
+from app.models.facility import Facility
+from app.services.facility_import import (
+    FacilityBatchWriter,
+    ImportRowError,
+    import_facilities,
+    iter_geojson_records,
+    normalize_record,
+)
+
+NOW = datetime(2026, 1, 1, tzinfo=timezone.utc)
+TYPES = ["Primary Health Centre", "CHC", "District Hospital", "Sub-District Hospital", "private"]
+
+
+def registry_rows(count: int) -> list[dict]:
+    return [
+        {
+            "facility_id": f"REG-{i}",
+            "facility_name": f"Facility {i}",
+            "category": TYPES[i % len(TYPES)],
+            "lat": 26 + i / 1000,
+            "lon": 80 + i / 1000,
+            "pin": "226 001",
+            "beds": "30",
+        }
+        for i in range(count)
+    ]
+
+
+async def run_import(db_path: str, source: str, runs: int = 1, fail_on_batch: int | None = None):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+    write = FacilityBatchWriter.write
+    calls = []
+
+    async def flaky_write(self, rows):
+        calls.append(len(rows))
+        if len(calls) == fail_on_batch:
+            raise RuntimeError("connection lost")
+        await write(self, rows)
+
+    results = []
+    try:
+        for _ in range(runs):
+            with mock.patch.object(FacilityBatchWriter, "write", flaky_write):
+                try:
+                    results.append(await import_facilities(factory, source, batch_size=40))
+                except RuntimeError:
+                    results.append(None)
+        async with factory() as session:
+            count = await session.scalar(select(func.count()).select_from(Facility))
+    finally:
+        await engine.dispose()
+    return results, count
+
+
+class FacilityImportTests(unittest.TestCase):
+    def test_normalizes_registry_spellings(self):
+        row = normalize_record(registry_rows(3)[2], NOW)
+        self.assertEqual(row["facility_type"], "DH")
+        self.assertTrue(row["emergency_available"])
+        self.assertEqual((row["pincode"], row["bed_capacity"]), ("226001", 30))
+        self.assertEqual(normalize_record({**registry_rows(1)[0], "category": "Sub Divisional Hospital"}, NOW)["facility_type"], "SDH")
+        with self.assertRaises(ImportRowError):
+            normalize_record({**registry_rows(1)[0], "category": "Pharmacy"}, NOW)
+        anonymous = {**registry_rows(1)[0], "facility_id": ""}
+        self.assertEqual(normalize_record(anonymous, NOW)["id"], normalize_record(anonymous, NOW)["id"])
+
+    def test_geojson_is_parsed_feature_by_feature(self):
+        features = [
+            {"type": "Feature", "geometry": {"type": "Point", "coordinates": [row["lon"], row["lat"]]},
+             "properties": {k: v for k, v in row.items() if k not in {"lat", "lon"}}}
+            for row in registry_rows(25)
+        ]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "registry.geojson")
+            with open(path, "w") as handle:
+                json.dump({"type": "FeatureCollection", "name": "test", "features": features}, handle, indent=1)
+            records = list(iter_geojson_records(path, chunk_size=13))
+        self.assertEqual(len(records), 25)
+        self.assertEqual(records[-1]["facility_id"], "REG-24")
+        self.assertEqual((records[3]["latitude"], records[3]["longitude"]), (26.003, 80.003))
+
+    def test_import_resumes_after_failure_and_is_idempotent(self):
+        rows = registry_rows(200) + [{"facility_name": "No coordinates", "category": "PHC"}]
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, "registry.csv")
+            with open(source, "w", newline="") as handle:
+                writer = csv.DictWriter(handle, fieldnames=list(rows[0]))
+                writer.writeheader()
+                writer.writerows(rows)
+            db_path = os.path.join(tmp, "facilities.db")
+            results, count = asyncio.run(run_import(db_path, source, runs=2, fail_on_batch=3))
+            self.assertIsNone(results[0])
+            self.assertEqual(results[1].skipped, 80)
+            self.assertEqual(results[1].rejected, 1)
+            self.assertEqual(count, 200)
+            self.assertFalse(os.path.exists(f"{source}.import-state.json"))
+
+            results, count = asyncio.run(run_import(db_path, source))
+            self.assertEqual((results[0].skipped, results[0].upserted, count), (0, 200, 200))
+
+    def test_methods_are_checked_against_the_dialect(self):
+        for dialect, method in [(postgresql.dialect(), "multirow"), (sqlite.dialect(), "copy")]:
+            session = mock.Mock()
+            session.get_bind.return_value.dialect = dialect
+            with self.subTest(method=method), self.assertRaises(ValueError):
+                FacilityBatchWriter(session, method)
+
+
+if __name__ == "__main__":
+    unittest.main()
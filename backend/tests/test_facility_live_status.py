@@ -0,0 +1,149 @@
+import asyncio
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.api.routes import facilities
+from app.models import Base
+from app.models.facility_status import FacilityLiveStatus
+from app.services.facility_catalog import FacilityCatalog, facility_catalog
+from app.services.facility_live_status import MINUTES_PER_QUEUED_PATIENT, FacilityLiveState
+from app.services.operating_hours import ClockReading
+
+ROWS = [
+    {"id": "near", "name": "Near DH", "facility_type": "DH", "latitude": 26.85, "longitude": 80.95,
+     "emergency_available": True, "estimated_wait_time": 10},
+    {"id": "far", "name": "Far DH", "facility_type": "DH", "latitude": 26.95, "longitude": 80.95,
+     "emergency_available": True, "estimated_wait_time": 10},
+]
+
+
+async def flush_and_reload(state: FacilityLiveState) -> tuple[int, int, int, FacilityLiveState]:
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    try:
+        async with AsyncSession(engine) as session:
+            flushed = await state.flush(session)
+            again = await state.flush(session)
+            stored = await session.scalar(select(func.count()).select_from(FacilityLiveStatus))
+        restored = FacilityLiveState()
+        async with AsyncSession(engine) as session:
+            await restored.sync(session)
+    finally:
+        await engine.dispose()
+    return flushed, again, stored, restored
+
+
+async def two_workers() -> dict:
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    first, second = FacilityLiveState(), FacilityLiveState()
+    now = datetime.now(timezone.utc)
+    try:
+        async with AsyncSession(engine) as session:
+            first.apply([{"facility_id": "near", "queue_length": 4, "reported_at": now - timedelta(minutes=2)}])
+            second.apply([{"facility_id": "far", "er_open": False, "reported_at": now - timedelta(minutes=1)}])
+            await first.flush(session)
+            await second.flush(session)
+            picked_up = (await first.sync(session), await second.sync(session))
+            seen = (first.get("far").er_open, second.get("near").queue_length)
+            # A newer report on one worker is not overwritten by an older flush from the other.
+            second.apply([{"facility_id": "near", "queue_length": 9, "reported_at": now}])
+            await second.flush(session)
+            first._status["near"].queue_length = 1
+            first._dirty.add("near")
+            await first.flush(session)
+            stored = await session.scalar(
+                select(FacilityLiveStatus.queue_length).where(FacilityLiveStatus.facility_id == "near")
+            )
+            again = await first.sync(session)
+    finally:
+        await engine.dispose()
+    return {"first": first, "second": second, "picked_up": picked_up, "seen": seen, "stored": stored, "again": again}
+
+
+class FacilityLiveStateTests(unittest.TestCase):
+    def setUp(self):
+        self.state = FacilityLiveState()
+        facility_catalog.replace(FacilityCatalog.from_rows(ROWS))
+        self.clock = ClockReading.at()
+
+    def tearDown(self):
+        facility_catalog._catalog = None
+
+    def ranked_ids(self, urgency: str) -> list[str]:
+        search = facility_catalog.current().ranked(26.85, 80.95, urgency, 20, 2, clock=self.clock)
+        return [facility["id"] for facility in search.facilities]
+
+    def test_updates_change_ranking_without_touching_the_database(self):
+        self.assertEqual(self.ranked_ids("ROUTINE"), ["near", "far"])
+        applied, ignored = self.state.apply([{"facility_id": "near", "queue_length": 20, "beds_free": 2}])
+        self.assertEqual((applied, ignored), (1, 0))
+        self.assertEqual(self.ranked_ids("ROUTINE"), ["far", "near"])
+        row = facility_catalog.current().row(facility_catalog.current().index_of("near"))
+        self.assertEqual(row["estimated_wait_time"], 20 * MINUTES_PER_QUEUED_PATIENT)
+        self.assertEqual(row["beds_free"], 2)
+
+        self.state.apply([{"facility_id": "far", "er_open": False}])
+        self.assertEqual(self.ranked_ids("EMERGENCY"), ["near"])
+        self.assertEqual(self.state.metrics()["pending_flush"], 2)
+
+    def test_unknown_and_out_of_order_reports_are_ignored(self):
+        now = datetime.now(timezone.utc)
+        self.state.apply([{"facility_id": "near", "queue_length": 5, "reported_at": now}])
+        applied, ignored = self.state.apply(
+            [
+                {"facility_id": "near", "queue_length": 50, "reported_at": now - timedelta(minutes=1)},
+                {"facility_id": "missing", "queue_length": 1},
+            ]
+        )
+        self.assertEqual((applied, ignored), (0, 2))
+        self.assertEqual(self.state.get("near").queue_length, 5)
+
+    def test_flush_writes_changed_facilities_once_and_reloads(self):
+        self.state.apply([{"facility_id": "near", "queue_length": 3}, {"facility_id": "far", "beds_free": 7}])
+        flushed, again, stored, restored = asyncio.run(flush_and_reload(self.state))
+        self.assertEqual((flushed, again, stored), (2, 0, 2))
+        self.assertEqual(restored.get("far").beds_free, 7)
+        self.assertEqual(restored.metrics()["pending_flush"], 0)
+
+    def test_workers_pick_up_each_others_flushed_reports(self):
+        result = asyncio.run(two_workers())
+        self.assertEqual(result["picked_up"], (1, 1))
+        self.assertEqual(result["seen"], (False, 4))
+        self.assertEqual(result["stored"], 9)
+        self.assertEqual(result["again"], 1)
+        self.assertEqual(result["first"].get("near").queue_length, 9)
+        self.assertEqual(result["first"].metrics()["pending_flush"], 0)
+
+    def test_status_endpoint_requires_a_configured_token(self):
+        async def post(configured: str | None, sent: str | None) -> httpx.Response:
+            app = FastAPI()
+            app.include_router(facilities.router)
+            headers = {"X-Facility-Token": sent} if sent else {}
+            settings = mock.Mock(facility_status_token=configured)
+            with mock.patch.object(facilities, "get_settings", return_value=settings), mock.patch.object(
+                facilities, "facility_live_state", self.state
+            ):
+                async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                    payload = {"updates": [{"facility_id": "near", "er_open": False}]}
+                    return await client.post("/facilities/status", json=payload, headers=headers)
+
+        self.assertEqual(asyncio.run(post(None, None)).status_code, 503)
+        self.assertEqual(asyncio.run(post(None, "anything")).status_code, 503)
+        self.assertEqual(asyncio.run(post("secret", None)).status_code, 401)
+        self.assertEqual(asyncio.run(post("secret", "wrong")).status_code, 401)
+        self.assertIsNone(self.state.get("near"))
+        accepted = asyncio.run(post("secret", "secret"))
+        self.assertEqual((accepted.status_code, accepted.json()), (202, {"applied": 1, "ignored": 0}))
+
+
+if __name__ == "__main__":
+    unittest.main()
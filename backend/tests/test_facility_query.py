@@ -0,0 +1,175 @@
+import asyncio
+import os
+import unittest
+import uuid
+from unittest import mock
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.models import Base
+from app.services import facility_service
+from app.services.facility_search_cache import facility_search_cache
+from app.services.facility_service import (
+    NEARBY_FACILITIES_SQL,
+    FacilitySearchService,
+    SpatialBackend,
+    choose_spatial_backend,
+    nearby_query_params,
+)
+from app.services.operating_hours import ClockReading
+
+POSTGRES_URL = os.getenv("TEST_POSTGRES_URL")
+
+
+def facility_row(name: str, lat: float, lng: float, is_active: bool = True) -> dict:
+    return {
+        "id": str(uuid.uuid4()),
+        "name": name,
+        "facility_type": "PHC",
+        "latitude": lat,
+        "longitude": lng,
+        "address": "Main road",
+        "district": "District 1",
+        "state": "UP",
+        "pincode": "226001",
+        "contact_number": "+91 9000000000",
+        "emergency_available": False,
+        "is_active": is_active,
+    }
+
+
+INSERT_SQL = text(
+    """
+    INSERT INTO facilities (
+        id, name, facility_type, latitude, longitude, address, district, state,
+        pincode, contact_number, emergency_available, is_active
+    )
+    VALUES (
+        :id, :name, :facility_type, :latitude, :longitude, :address, :district, :state,
+        :pincode, :contact_number, :emergency_available, :is_active
+    )
+    """
+)
+
+
+async def run_nearby_and_plan(url: str, explain_prefix: str, setup: list[str]):
+    engine = create_async_engine(url)
+    try:
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.drop_all)
+            await connection.run_sync(Base.metadata.create_all)
+            await connection.execute(
+                INSERT_SQL,
+                [
+                    facility_row("Origin PHC", 26.85, 80.95),
+                    facility_row("Near PHC", 26.88, 80.97),
+                    facility_row("Inactive PHC", 26.86, 80.95, is_active=False),
+                    facility_row("Far PHC", 27.60, 80.95),
+                ],
+            )
+        async with AsyncSession(engine) as session:
+            service = FacilitySearchService(session, spatial_backend="bbox")
+            rows = await service._query_nearby(26.85, 80.95, radius_km=10, max_results=10)
+        async with engine.connect() as connection:
+            for statement in setup:
+                await connection.execute(text(statement))
+            plan = await connection.execute(
+                text(f"{explain_prefix} {NEARBY_FACILITIES_SQL.element.text}"),
+                nearby_query_params(26.85, 80.95, 10, 10),
+            )
+            plan_text = "\n".join(" ".join(str(col) for col in row) for row in plan.all())
+            await connection.run_sync(Base.metadata.drop_all)
+        return rows, plan_text
+    finally:
+        await engine.dispose()
+
+
+class NearbyQueryTests(unittest.TestCase):
+    def assert_nearby_rows(self, rows):
+        self.assertEqual([row["name"] for row in rows], ["Origin PHC", "Near PHC"])
+        self.assertAlmostEqual(float(rows[0]["distance_km"]), 0.0, places=3)
+
+    def test_sqlite_uses_geo_index(self):
+        rows, plan = asyncio.run(
+            run_nearby_and_plan("sqlite+aiosqlite://", "EXPLAIN QUERY PLAN", [])
+        )
+        self.assert_nearby_rows(rows)
+        self.assertIn("ix_facilities_geo", plan)
+
+    @unittest.skipUnless(POSTGRES_URL, "TEST_POSTGRES_URL not set")
+    def test_postgres_uses_geo_index(self):
+        # The fixture table is tiny, so disable seq scans to confirm the index is usable.
+        rows, plan = asyncio.run(
+            run_nearby_and_plan(POSTGRES_URL, "EXPLAIN", ["SET enable_seqscan = off"])
+        )
+        self.assert_nearby_rows(rows)
+        self.assertIn("ix_facilities_geo", plan)
+
+
+async def detect_on_sqlite() -> str:
+    engine = create_async_engine("sqlite+aiosqlite://")
+    try:
+        async with AsyncSession(engine) as session:
+            return await SpatialBackend().detect(session)
+    finally:
+        await engine.dispose()
+
+
+async def strict_filter_searches() -> tuple:
+    """More than SQL_CANDIDATE_POOL non-emergency facilities lie closer than any emergency one."""
+    engine = create_async_engine("sqlite+aiosqlite://")
+    try:
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+            crowd = [facility_row(f"PHC {i}", 26.85 + i * 0.00005, 80.95) for i in range(150)]
+            emergency = [
+                {**facility_row(f"Emergency {i}", 26.877 + i * 0.001, 80.95), "emergency_available": True}
+                for i in range(3)
+            ]
+            await connection.execute(INSERT_SQL, crowd + emergency)
+        clock = ClockReading.at()
+        async with AsyncSession(engine) as session:
+            service = FacilitySearchService(session, spatial_backend="bbox")
+            ranked = await service._ranked_sql_search(
+                26.85, 80.95, "ROUTINE", 5, 3, clock=clock, emergency_only=True
+            )
+            with mock.patch.object(facility_service.facility_catalog, "current", return_value=None):
+                cell = facility_search_cache.cell_for(26.85, 80.95)
+                entry = await service._cell_candidates(cell, "ROUTINE", 5, 3, clock=clock, emergency_only=True)
+            cached = entry.search(26.85, 80.95, 5, 3)
+        return ranked, cached
+    finally:
+        await engine.dispose()
+
+
+class StrictFilterTests(unittest.TestCase):
+    def test_limit_grows_past_nearby_rows_that_fail_the_filters(self):
+        ranked, cached = asyncio.run(strict_filter_searches())
+        expected = ["Emergency 0", "Emergency 1", "Emergency 2"]
+        for search in (ranked, cached):
+            self.assertEqual(sorted(f["name"] for f in search.facilities), expected)
+            # Found within the requested radius, without widening the ring.
+            self.assertEqual((search.search_radius, search.widen_steps), (5, 0))
+
+
+class SpatialBackendTests(unittest.TestCase):
+    def test_postgis_is_chosen_on_a_migrated_postgres(self):
+        self.assertEqual(choose_spatial_backend("postgresql", True), "postgis")
+        self.assertEqual(choose_spatial_backend("postgresql", False), "bbox")
+        self.assertEqual(choose_spatial_backend("sqlite", False), "bbox")
+        self.assertEqual(asyncio.run(detect_on_sqlite()), "bbox")
+
+    def test_setting_overrides_the_choice(self):
+        self.assertEqual(choose_spatial_backend("postgresql", True, "bbox"), "bbox")
+        self.assertEqual(choose_spatial_backend("postgresql", True, "postgis"), "postgis")
+        with self.assertLogs("app.services.facility_service", "WARNING"):
+            self.assertEqual(choose_spatial_backend("postgresql", False, "postgis"), "bbox")
+        with self.assertLogs("app.services.facility_service", "WARNING"):
+            self.assertEqual(choose_spatial_backend("sqlite", False, "postgis"), "bbox")
+        with self.assertLogs("app.services.facility_service", "WARNING"):
+            self.assertEqual(choose_spatial_backend("postgresql", True, "auto"), "postgis")
+
+
+if __name__ == "__main__":
+    unittest.main()
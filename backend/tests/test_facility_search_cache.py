@@ -0,0 +1,89 @@
+import asyncio
+import random
+import unittest
+from datetime import datetime
+from unittest import mock
+
+from app.services.facility_catalog import FacilityCatalog, facility_catalog
+from app.services.facility_search_cache import FacilitySearchCache
+from app.services.facility_service import FacilitySearchService
+from app.services.operating_hours import IST, ClockReading
+
+OFFICE_HOURS = {day: "09:00-17:00" for day in ["monday", "tuesday", "wednesday"]}
+
+
+def facility_rows(count: int, seed: int = 11) -> list[dict]:
+    rng = random.Random(seed)
+    return [
+        {
+            "id": f"f{i}",
+            "name": f"Facility {i}",
+            "facility_type": rng.choice(["PHC", "CHC", "DH", "PRIVATE"]),
+            "latitude": 26.85 + rng.uniform(-0.4, 0.4),
+            "longitude": 80.95 + rng.uniform(-0.4, 0.4),
+            "emergency_available": rng.random() < 0.3,
+            "estimated_wait_time": rng.choice([None, 10, 30, 60]),
+            "operating_hours": rng.choice([None, {"24/7": True}, OFFICE_HOURS]),
+        }
+        for i in range(count)
+    ]
+
+
+class FacilitySearchCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.rows = facility_rows(400)
+        self.cache = FacilitySearchCache(max_entries=100, ttl_seconds=60, precision=6)
+        self.patch = mock.patch(
+            "app.services.facility_service.facility_search_cache", self.cache
+        )
+        self.patch.start()
+        facility_catalog.add_listener(self.cache.catalog_replaced)
+        facility_catalog.replace(FacilityCatalog.from_rows(self.rows))
+        self.service = FacilitySearchService(db_session=None, spatial_backend="bbox")
+
+    def tearDown(self):
+        self.patch.stop()
+        facility_catalog._listeners.remove(self.cache.catalog_replaced)
+        facility_catalog._catalog = None
+
+    def search(self, lat, lng, urgency, clock, **filters):
+        return asyncio.run(self.service._search(lat, lng, urgency, 10, 3, clock=clock, **filters))
+
+    def test_cached_results_match_direct_ranking(self):
+        clock = ClockReading.at(datetime(2026, 1, 5, 11, 0, tzinfo=IST))
+        rng = random.Random(5)
+        for _ in range(40):
+            lat = 26.85 + rng.uniform(-0.3, 0.3)
+            lng = 80.95 + rng.uniform(-0.3, 0.3)
+            for urgency, filters in [("URGENT", {}), ("ROUTINE", {"max_wait_minutes": 30})]:
+                # A second origin a few metres away lands in the same cell.
+                for origin in [(lat, lng), (lat + 0.0004, lng - 0.0004)]:
+                    expected = facility_catalog.current().ranked(
+                        *origin, urgency, 10, 3, clock=clock, **filters
+                    )
+                    self.assertEqual(self.search(*origin, urgency, clock, **filters), expected)
+        self.assertGreater(self.cache.metrics()["hits"], 0)
+
+    def test_facility_change_invalidates_covering_entries(self):
+        clock = ClockReading.at(datetime(2026, 1, 5, 11, 0, tzinfo=IST))
+        before = self.search(26.85, 80.95, "ROUTINE", clock)
+        nearest = before.facilities[0]["id"]
+        rows = [
+            {**row, "estimated_wait_time": 240} if row["id"] == nearest else row for row in self.rows
+        ]
+        facility_catalog.replace(FacilityCatalog.from_rows(rows))
+        self.assertGreater(self.cache.metrics()["invalidated"], 0)
+        after = self.search(26.85, 80.95, "ROUTINE", clock)
+        self.assertNotEqual(after.facilities[0]["id"], nearest)
+
+    def test_open_state_epoch_ends_at_the_next_schedule_change(self):
+        self.search(26.85, 80.95, "URGENT", ClockReading.at(datetime(2026, 1, 5, 16, 59, tzinfo=IST)))
+        # Clinics listed until 17:00 are open through 17:00 and close at 17:01.
+        self.search(26.85, 80.95, "URGENT", ClockReading.at(datetime(2026, 1, 5, 17, 0, tzinfo=IST)))
+        self.assertEqual(self.cache.metrics()["hits"], 1)
+        self.search(26.85, 80.95, "URGENT", ClockReading.at(datetime(2026, 1, 5, 17, 1, tzinfo=IST)))
+        self.assertEqual(self.cache.metrics()["expired"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,192 @@
+import asyncio
+import contextlib
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.models import Base
+from app.models.follow_up import FollowUpReminder
+from app.models.patient import Patient
+from app.models.triage import TriageSession
+from app.services import followup_reminder_service
+from app.services.followup_reminder_service import FollowUpReminderService
+
+# reminder id -> (patient opted out, hospital visited, triaged again since)
+CASES = {
+    "send-1": (False, False, False),
+    "send-2": (False, False, False),
+    "send-3": (False, False, False),
+    "send-4": (False, False, False),
+    "opted-out": (True, False, False),
+    "visited": (False, True, False),
+    "new-triage": (False, False, True),
+    "fails": (False, False, False),
+}
+
+
+def triage(session_id: str, patient_id: str, created_at: datetime, visited: bool = False) -> TriageSession:
+    return TriageSession(
+        id=session_id,
+        patient_id=patient_id,
+        symptoms={},
+        urgency_level="ROUTINE",
+        confidence_score=0.8,
+        reasoning="",
+        care_pathway="",
+        ai_model_used="test",
+        processing_time_ms=0,
+        visited_hospital=visited,
+        created_at=created_at,
+    )
+
+
+async def seed(session: AsyncSession, now: datetime) -> None:
+    for i, (reminder_id, (opted_out, visited, triaged_again)) in enumerate(CASES.items()):
+        scheduled = now - timedelta(hours=1, minutes=i)
+        session.add(
+            Patient(
+                id=f"p-{reminder_id}",
+                phone_number=f"+91{i:010d}",
+                age=40,
+                gender="male",
+                preferred_language="en",
+                opted_out=opted_out,
+            )
+        )
+        session.add(triage(f"t-{reminder_id}", f"p-{reminder_id}", scheduled - timedelta(hours=4), visited))
+        if triaged_again:
+            session.add(triage(f"n-{reminder_id}", f"p-{reminder_id}", scheduled + timedelta(minutes=5)))
+        session.add(
+            FollowUpReminder(
+                id=reminder_id,
+                token=f"token-{reminder_id}",
+                patient_id=f"p-{reminder_id}",
+                triage_session_id=f"t-{reminder_id}",
+                urgency_level="ROUTINE",
+                scheduled_time=scheduled,
+                deep_link=f"http://app/followup/{reminder_id}",
+            )
+        )
+    session.add(
+        FollowUpReminder(
+            id="later",
+            token="token-later",
+            patient_id="p-send-1",
+            triage_session_id="t-send-1",
+            urgency_level="ROUTINE",
+            scheduled_time=now + timedelta(hours=2),
+            deep_link="http://app/followup/later",
+        )
+    )
+    await session.commit()
+
+
+async def scenario() -> dict:
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    now = datetime.now(timezone.utc)
+    statements: list[str] = []
+    try:
+        async with AsyncSession(engine) as session:
+            await seed(session, now)
+            service = FollowUpReminderService(session)
+            messages: list[tuple[str, str]] = []
+
+            async def send(phone_number: str, message: str) -> str | None:
+                messages.append((phone_number, message))
+                return None if message.endswith("/fails") else "sms"
+
+            listen = lambda conn, cursor, statement, *args: statements.append(statement)
+            event.listen(engine.sync_engine, "before_cursor_execute", listen)
+            with mock.patch.object(service, "_send_message", side_effect=send):
+                sent = await service.dispatch_due(page_size=3)
+                event.remove(engine.sync_engine, "before_cursor_execute", listen)
+                retried = await service.dispatch_due(page_size=3)
+            rows = (await session.execute(select(FollowUpReminder))).scalars().all()
+            state = {row.id: (row.sent_at is not None, row.response_status, row.channel) for row in rows}
+    finally:
+        await engine.dispose()
+    return {"sent": sent, "retried": retried, "messages": messages, "state": state, "statements": statements}
+
+
+async def crash_mid_page() -> dict:
+    """Dispatch dies on the fourth send of a page, then the next run finishes it."""
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    try:
+        async with AsyncSession(engine) as session:
+            await seed(session, datetime.now(timezone.utc))
+        links: list[str] = []
+
+        async def send(phone_number: str, message: str) -> str | None:
+            links.append(message.rsplit("/", 1)[1])
+            if len(links) == 4:
+                raise asyncio.CancelledError()
+            return None if message.endswith("/fails") else "sms"
+
+        with mock.patch.object(followup_reminder_service, "SEND_COMMIT_SIZE", 2):
+            async with AsyncSession(engine) as session:
+                service = FollowUpReminderService(session)
+                with mock.patch.object(service, "_send_message", side_effect=send):
+                    with contextlib.suppress(asyncio.CancelledError):
+                        await service.dispatch_due(page_size=10)
+            crashed_at = len(links)
+            async with AsyncSession(engine) as session:
+                service = FollowUpReminderService(session)
+                with mock.patch.object(service, "_send_message", side_effect=send):
+                    sent = await service.dispatch_due(page_size=10)
+                rows = (await session.execute(select(FollowUpReminder))).scalars().all()
+                state = {row.id: (row.sent_at is not None, row.response_status) for row in rows}
+    finally:
+        await engine.dispose()
+    return {"first_run": links[:crashed_at], "second_run": links[crashed_at:], "sent": sent, "state": state}
+
+
+class FollowUpDispatchTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.result = asyncio.run(scenario())
+
+    def test_due_reminders_are_sent_or_skipped(self):
+        state = self.result["state"]
+        self.assertEqual(self.result["sent"], 4)
+        for reminder_id in ("send-1", "send-2", "send-3", "send-4"):
+            self.assertEqual(state[reminder_id], (True, None, "sms"))
+        for reminder_id in ("opted-out", "visited", "new-triage"):
+            self.assertEqual(state[reminder_id], (True, "skipped", "whatsapp"))
+        self.assertFalse(state["later"][0])
+        sent_links = [message.rsplit("/", 1)[1] for _, message in self.result["messages"]]
+        self.assertNotIn("later", sent_links)
+        self.assertEqual(sorted(set(sent_links)), ["fails", "send-1", "send-2", "send-3", "send-4"])
+
+    def test_failed_send_stays_unsent_and_is_retried_next_run(self):
+        self.assertFalse(self.result["state"]["fails"][0])
+        self.assertEqual(self.result["retried"], 0)
+        sent_links = [message.rsplit("/", 1)[1] for _, message in self.result["messages"]]
+        self.assertEqual(sent_links.count("fails"), 2)
+
+    def test_each_page_is_one_query_and_bulk_updates(self):
+        statements = [statement.lstrip().split()[0].upper() for statement in self.result["statements"]]
+        # Eight due reminders in pages of three.
+        self.assertEqual(statements.count("SELECT"), 3)
+        self.assertLessEqual(statements.count("UPDATE"), 2 * 3)
+        self.assertTrue(any("EXISTS" in statement for statement in self.result["statements"]))
+
+    def test_a_crash_mid_page_resends_only_the_uncommitted_sends(self):
+        result = asyncio.run(crash_mid_page())
+        # Oldest first: "fails" fails, send-4 and send-3 are committed, the crash hits send-2.
+        self.assertEqual(result["first_run"], ["fails", "send-4", "send-3", "send-2"])
+        self.assertEqual(result["second_run"], ["fails", "send-2", "send-1"])
+        self.assertEqual(result["sent"], 2)
+        for reminder_id in ("opted-out", "visited", "new-triage"):
+            self.assertEqual(result["state"][reminder_id], (True, "skipped"))
+        self.assertTrue(all(result["state"][f"send-{n}"][0] for n in range(1, 5)))
+
+
+if __name__ == "__main__":
+    unittest.main()
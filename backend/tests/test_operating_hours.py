@@ -0,0 +1,66 @@
+import unittest
+from datetime import datetime
+
+from app.services.operating_hours import IST, SCHEDULE_KEY, ClockReading, compile_hours, schedule_of
+
+WEEKDAY_HOURS = {
+    "monday": "09:00-17:00",
+    "tuesday": "09:00-17:00",
+    "saturday": "09:00-14:00",
+}
+
+
+def clock(day: int, hour: int, minute: int = 0) -> ClockReading:
+    # 2026-01-05 is a Monday.
+    return ClockReading.at(datetime(2026, 1, 5 + day, hour, minute, tzinfo=IST))
+
+
+class OperatingHoursTests(unittest.TestCase):
+    def test_missing_and_always_open(self):
+        self.assertIsNone(compile_hours(None))
+        self.assertEqual(compile_hours({"24/7": True}).status(clock(6, 3)), (True, None))
+
+    def test_day_ranges(self):
+        schedule = compile_hours(WEEKDAY_HOURS)
+        self.assertEqual(schedule.status(clock(0, 10)), (True, None))
+        self.assertEqual(schedule.status(clock(0, 7, 30)), (False, "Opens at 09:00"))
+        self.assertEqual(schedule.status(clock(0, 18)), (False, "Closed now"))
+        self.assertEqual(schedule.status(clock(2, 10)), (False, "Closed today"))
+        self.assertFalse(schedule.is_open(clock(5, 14, 1)))
+
+    def test_closing_minute_counts_as_open(self):
+        schedule = compile_hours(WEEKDAY_HOURS)
+        self.assertTrue(schedule.is_open(clock(0, 17)))
+        self.assertEqual(schedule.status(clock(0, 17, 1)), (False, "Closed now"))
+        self.assertEqual(schedule.minutes_until_change(clock(0, 16, 59)), 2)
+
+    def test_overnight_ranges_spill_into_next_day(self):
+        schedule = compile_hours({"monday": "20:00-08:00", "sunday": "22:00-06:00"})
+        self.assertTrue(schedule.is_open(clock(0, 23)))
+        self.assertTrue(schedule.is_open(clock(1, 7, 59)))
+        self.assertTrue(schedule.is_open(clock(1, 8)))
+        self.assertFalse(schedule.is_open(clock(1, 8, 1)))
+        # Sunday night wraps around to Monday morning.
+        self.assertTrue(schedule.is_open(clock(0, 5)))
+        self.assertTrue(schedule.is_open(clock(6, 23)))
+
+    def test_holidays_close_the_whole_day(self):
+        schedule = compile_hours({**WEEKDAY_HOURS, "holidays": ["2026-01-05"]})
+        self.assertEqual(schedule.status(clock(0, 10)), (False, "Closed today"))
+        self.assertTrue(schedule.is_open(clock(1, 10)))
+
+    def test_identical_timetables_compile_once(self):
+        self.assertIs(compile_hours(dict(WEEKDAY_HOURS)), compile_hours(dict(WEEKDAY_HOURS)))
+
+    def test_schedule_is_kept_on_the_facility_record(self):
+        facility = {"operating_hours": dict(WEEKDAY_HOURS)}
+        schedule = schedule_of(facility)
+        self.assertIs(facility[SCHEDULE_KEY], schedule)
+        # Later reads use the stored schedule, not the JSON.
+        facility["operating_hours"] = {"24/7": True}
+        self.assertIs(schedule_of(facility), schedule)
+        self.assertIsNone(schedule_of({"operating_hours": None}))
+
+
+if __name__ == "__main__":
+    unittest.main()
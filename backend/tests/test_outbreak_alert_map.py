@@ -0,0 +1,99 @@
+import asyncio
+import random
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.models import Base
+from app.models.outbreak import OutbreakEvent
+from app.services.outbreak_alert_map import OutbreakAlertMap
+from app.services.outbreak_counter import OutbreakCounter
+from app.services.symptom_vocabulary import encode
+
+SYMPTOMS = ["fever, vomiting", "fever vomiting headache", "cough, fever", "rash", "fever diarrhea", "back pain"]
+
+
+def populate(count: int) -> list[tuple[str, float, float, str, datetime]]:
+    rng = random.Random(5)
+    now = datetime.now(timezone.utc)
+    events = []
+    for i in range(count):
+        # A cluster around Lucknow, and scattered cases further out.
+        if i % 3:
+            lat, lng = 26.85 + rng.uniform(-0.03, 0.03), 80.95 + rng.uniform(-0.03, 0.03)
+        else:
+            lat, lng = 27.4 + rng.uniform(-0.2, 0.2), 81.5 + rng.uniform(-0.2, 0.2)
+        events.append((f"e{i}", lat, lng, rng.choice(SYMPTOMS), now - timedelta(minutes=rng.uniform(0, 47 * 60))))
+    return events
+
+
+async def database_map(events) -> OutbreakAlertMap:
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    try:
+        async with AsyncSession(engine) as session:
+            session.add_all(
+                OutbreakEvent(id=event_id, lat=lat, lng=lng, symptoms_text=text, created_at=at)
+                for event_id, lat, lng, text, at in events
+            )
+            await session.commit()
+            alert_map = OutbreakAlertMap(min_cases=10)
+            await alert_map.refresh(session, counter=OutbreakCounter())
+    finally:
+        await engine.dispose()
+    return alert_map
+
+
+class OutbreakAlertMapTests(unittest.TestCase):
+    def setUp(self):
+        self.events = populate(400)
+        self.counter = OutbreakCounter()
+        for event_id, lat, lng, text, at in self.events:
+            self.counter.record(event_id, lat, lng, encode(text), at)
+        self.counter.ready = True
+        self.alert_map = OutbreakAlertMap(min_cases=10)
+        asyncio.run(self.alert_map.refresh(None, counter=self.counter))
+
+    def test_lookups_match_live_counts_at_cell_centres(self):
+        self.assertEqual(self.alert_map.source, "counter")
+        self.assertGreater(len(self.alert_map._alerts), 0)
+        alerts = 0
+        for row in range(2675, 2696):
+            for col in range(8085, 8106):
+                lat, lng = (row + 0.5) * 0.01, (col + 0.5) * 0.01
+                for symptoms in ("fever vomiting", "cough fever", "rash", "back pain"):
+                    live = self.counter.count_similar(lat, lng, encode(symptoms), 5, 48, 0.45)
+                    found = self.alert_map.lookup(lat, lng, symptoms, counter=self.counter)
+                    self.assertEqual(found["outbreak_detected"], live >= 10, (row, col, symptoms))
+                    if found["outbreak_detected"]:
+                        self.assertEqual(found["cases"], live)
+                        self.assertEqual(found["source"], "map")
+                        alerts += 1
+        self.assertGreater(alerts, 0)
+
+    def test_database_build_matches_counter_build(self):
+        from_database = asyncio.run(database_map(self.events))
+        self.assertEqual(from_database.source, "database")
+        self.assertEqual(from_database._alerts, self.alert_map._alerts)
+
+    def test_unseen_symptoms_are_counted_live_and_freshness_is_reported(self):
+        found = self.alert_map.lookup(26.85, 80.95, "fever vomiting cough", counter=self.counter)
+        self.assertEqual(found["source"], "counter")
+        self.assertEqual(found["cases"], self.counter.count_similar(26.85, 80.95, encode("fever vomiting cough"), 5, 48, 0.45))
+        self.assertFalse(found["map_stale"])
+        self.assertLess(found["map_age_seconds"], 60)
+        self.alert_map.computed_at -= timedelta(minutes=10)
+        self.assertTrue(self.alert_map.lookup(26.85, 80.95, "rash", counter=self.counter)["map_stale"])
+        self.assertEqual(self.alert_map.metrics()["live_counts"], 1)
+
+    def test_empty_window_builds_an_empty_map(self):
+        alert_map = OutbreakAlertMap()
+        alert_map.build({})
+        self.assertTrue(alert_map.ready)
+        self.assertFalse(alert_map.lookup(26.85, 80.95, "fever", counter=OutbreakCounter())["outbreak_detected"])
+
+
+if __name__ == "__main__":
+    unittest.main()
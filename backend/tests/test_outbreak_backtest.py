@@ -0,0 +1,95 @@
+import json
+import os
+import tempfile
+import unittest
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from app.services.outbreak_alert_map import OutbreakAlertMap
+from app.services.outbreak_backtest import DetectorParams, EventLog, TrueOutbreak, alerts, replay, score, synthetic_log
+from app.services.outbreak_counter import OutbreakCounter
+from scripts.backtest_outbreak_detector import ranked, read_events_file, run_grid
+
+LOG, TRUTH = synthetic_log(events=3000, days=4, outbreaks=3, cases_per_outbreak=30, seed=3)
+
+
+def rebuilt_map_alerts(log: EventLog, params: DetectorParams, map_seconds: int) -> list[bool]:
+    """Replay against a real alert map rebuilt every ``map_seconds``."""
+    counter = OutbreakCounter(0.01, 15, params.window_hours)
+    counter.ready = True
+    alert_map = OutbreakAlertMap(
+        0.01, params.window_hours, params.radius_km, params.min_cases, params.similarity_threshold
+    )
+    next_build, alerted = None, []
+    for i, (at, lat, lng, mask) in enumerate(zip(log.at, log.lat, log.lng, log.mask.tolist())):
+        now = datetime.fromtimestamp(at, tz=timezone.utc)
+        if next_build is None or at >= next_build:
+            counter.expire(now)
+            alert_map.build({cell: Counter(masks) for cell, masks in counter._totals.items()}, now=now)
+            next_build = at + map_seconds
+        alerted.append(alert_map.cases(lat, lng, mask, counter, now=now)[0] >= params.min_cases)
+        counter.record(f"e{i}", lat, lng, mask, now, now=now)
+    return alerted
+
+
+class OutbreakBacktestTests(unittest.TestCase):
+    def test_injected_outbreaks_are_detected_without_false_alarms(self):
+        result = replay(LOG, DetectorParams(min_cases=10))
+        self.assertEqual(result["events"], len(LOG))
+        result = replay(LOG, DetectorParams(min_cases=10), TRUTH)
+        self.assertEqual(result["outbreaks_detected"], 3)
+        self.assertGreater(result["median_latency_hours"], 0)
+        self.assertLessEqual(result["max_latency_hours"], 48)
+        self.assertEqual(result["false_alarm_events"], 0)
+        # Background reports spread over ~200 km never reach a low threshold on their own.
+        noisy = replay(LOG, DetectorParams(min_cases=2, similarity_threshold=0.1), TRUTH)
+        self.assertGreater(noisy["false_alarm_episodes"], 0)
+        self.assertGreaterEqual(noisy["false_alarm_events"], noisy["false_alarm_episodes"])
+
+    def test_map_replay_matches_a_rebuilt_alert_map(self):
+        params = DetectorParams(min_cases=8)
+        log = EventLog(LOG.at[:1500], LOG.lat[:1500], LOG.lng[:1500], LOG.mask[:1500])
+        expected = rebuilt_map_alerts(log, params, map_seconds=1800)
+        self.assertGreater(sum(expected), 0)
+        self.assertEqual(alerts(log, params, "map", map_seconds=1800).tolist(), expected)
+
+    def test_alert_map_replay_lags_the_exact_count(self):
+        params = DetectorParams(min_cases=10)
+        exact = replay(LOG, params, TRUTH, detector="counter")
+        mapped = replay(LOG, params, TRUTH, detector="map", map_seconds=900)
+        self.assertEqual(mapped["outbreaks_detected"], exact["outbreaks_detected"])
+        self.assertGreaterEqual(mapped["median_latency_hours"], exact["median_latency_hours"])
+        with self.assertRaises(ValueError):
+            replay(LOG, params, detector="scan")
+
+    def test_score_counts_latency_from_the_outbreak_start(self):
+        start = datetime(2026, 3, 1, tzinfo=timezone.utc)
+        log = EventLog.from_rows(
+            [(start + timedelta(hours=hour), 26.85, 80.95, 1) for hour in range(4)]
+            + [(start + timedelta(hours=1), 28.6, 77.2, 1)]
+        )
+        outbreak = TrueOutbreak(26.85, 80.95, 5.0, start, start + timedelta(hours=2))
+        alerted = log.lat > 0
+        alerted[0] = False
+        result = score(log, alerted, [outbreak], DetectorParams(window_hours=1))
+        self.assertEqual(result["median_latency_hours"], 1.0)
+        self.assertEqual((result["false_alarm_events"], result["false_alarm_episodes"]), (1, 1))
+
+    def test_grid_runs_in_a_process_pool_and_reads_event_files(self):
+        grid = [DetectorParams(min_cases=10), DetectorParams(min_cases=400)]
+        results = ranked(run_grid(LOG, TRUTH, grid, workers=2))
+        self.assertEqual([r["min_cases"] for r in results], [10, 400])
+        self.assertEqual(results[1]["alerts"], 0)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "events.jsonl")
+            with open(path, "w", encoding="utf-8") as handle:
+                handle.write(json.dumps({"created_at": "2026-03-01T10:00:00", "lat": 1, "lng": 2, "symptoms": "fever"}))
+                handle.write("\n")
+                handle.write(json.dumps({"created_at": "2026-03-01T09:00:00", "lat": 1, "lng": 2, "symptoms_mask": 6}))
+            events = read_events_file(path)
+        self.assertEqual(events.mask[0], 6)
+        self.assertGreater(events.mask[1], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import asyncio
+import random
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.models import Base
+from app.services.outbreak_counter import OutbreakCounter
+from app.services.outbreak_service import OutbreakService
+from app.services.symptom_vocabulary import encode
+
+SYMPTOMS = ["fever, vomiting", "fever vomiting headache", "cough, fever", "rash", "fever diarrhea", "back pain"]
+
+
+def jitter(rng: random.Random, lat: float, lng: float, degrees: float) -> tuple[float, float]:
+    return lat + rng.uniform(-degrees, degrees), lng + rng.uniform(-degrees, degrees)
+
+
+async def record_and_compare(count: int) -> list[tuple[int, int, int]]:
+    rng = random.Random(11)
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    live = OutbreakCounter()
+    try:
+        with mock.patch("app.services.outbreak_service.outbreak_counter", live):
+            async with AsyncSession(engine) as session:
+                service = OutbreakService(session)
+                for i in range(count):
+                    # A cluster within ~2 km of Lucknow, and scattered cases 30+ km away.
+                    if i % 3:
+                        lat, lng = jitter(rng, 26.85, 80.95, 0.015)
+                    else:
+                        lat, lng = jitter(rng, 27.4, 81.5, 0.2)
+                    await service.record_event(lat, lng, rng.choice(SYMPTOMS))
+
+                restored = OutbreakCounter()
+                added = await restored.sync(session)
+                again = await restored.sync(session)
+                results = []
+                for symptoms in ("fever vomiting", "cough fever", "rash"):
+                    mask = encode(symptoms)
+                    exact = await service._count_similar_events(26.85, 80.95, mask, 5, 48, 0.45)
+                    counted = [
+                        counter.count_similar(26.85, 80.95, mask, 5, 48, 0.45) for counter in (live, restored)
+                    ]
+                    results.append((exact, *counted))
+    finally:
+        await engine.dispose()
+    return results, added, again
+
+
+class OutbreakCounterTests(unittest.TestCase):
+    def test_counts_match_the_event_scan_and_survive_a_resync(self):
+        results, added, again = asyncio.run(record_and_compare(300))
+        self.assertEqual((added, again), (300, 0))
+        for exact, live, restored in results:
+            self.assertEqual(live, exact)
+            self.assertEqual(restored, exact)
+        self.assertGreater(results[0][0], 15)
+
+    def test_old_buckets_slide_out_of_the_window(self):
+        counter = OutbreakCounter(window_hours=48)
+        now = datetime.now(timezone.utc)
+        fever = encode("fever")
+        self.assertTrue(counter.record("old", 26.85, 80.95, fever, now - timedelta(hours=47)))
+        self.assertTrue(counter.record("new", 26.85, 80.95, fever, now))
+        self.assertFalse(counter.record("new", 26.85, 80.95, fever, now))
+        self.assertFalse(counter.record("expired", 26.85, 80.95, fever, now - timedelta(hours=49)))
+
+        def count(at):
+            return counter.count_similar(26.85, 80.95, fever, 5, 48, 0.5, now=at)
+
+        self.assertEqual(count(now), 2)
+        self.assertEqual(count(now + timedelta(hours=2)), 1)
+        self.assertEqual(counter.metrics()["events"], 1)
+        self.assertTrue(counter.record("old", 26.85, 80.95, fever, now))
+
+
+if __name__ == "__main__":
+    unittest.main()
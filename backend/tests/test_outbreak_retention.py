@@ -0,0 +1,92 @@
+import asyncio
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.models import Base
+from app.models.outbreak import OutbreakEvent
+from app.services.outbreak_retention import partition_ranges, purge_outbreak_events
+from app.services.outbreak_rollup import active_outbreaks, compact_outbreak_hours
+
+NOW = datetime(2026, 3, 4, 12, 30, tzinfo=timezone.utc)
+
+
+async def compact_all(session: AsyncSession, now: datetime) -> None:
+    while await compact_outbreak_hours(session, now=now):
+        pass
+
+
+async def purge_scenario():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    try:
+        async with AsyncSession(engine) as session:
+            session.add_all(
+                OutbreakEvent(
+                    created_at=NOW - timedelta(hours=hours),
+                    lat=26.85,
+                    lng=80.95,
+                    symptoms_text="fever",
+                    symptoms_tokens=["fever"],
+                )
+                for hours in range(0, 60 * 24, 6)
+            )
+            await session.commit()
+
+            async def oldest():
+                return (await session.scalar(select(func.min(OutbreakEvent.created_at)))).replace(tzinfo=timezone.utc)
+
+            async def count():
+                return await session.scalar(select(func.count()).select_from(OutbreakEvent))
+
+            # Only the first ten days are rolled up: nothing newer may be deleted.
+            await compact_all(session, NOW - timedelta(days=50))
+            partial = await purge_outbreak_events(session, retention_days=35, batch_size=7, now=NOW)
+            after_partial = (await count(), await oldest())
+
+            await compact_all(session, NOW)
+            before = await active_outbreaks(session, window_hours=60 * 24, min_cases=1, now=NOW)
+            full = await purge_outbreak_events(session, retention_days=35, batch_size=7, now=NOW)
+            after = await active_outbreaks(session, window_hours=60 * 24, min_cases=1, now=NOW)
+            after_full = (await count(), await oldest())
+            floored = await purge_outbreak_events(session, retention_days=1, batch_size=7, now=NOW)
+    finally:
+        await engine.dispose()
+    return partial, after_partial, full, after_full, before, after, floored
+
+
+class OutbreakRetentionTests(unittest.TestCase):
+    def test_purges_only_rolled_up_history_in_batches(self):
+        partial, after_partial, full, after_full, before, after, floored = asyncio.run(purge_scenario())
+
+        # Events every 6 hours for 60 days; rollups reach 50 days back (up to 12:00).
+        self.assertEqual(partial["deleted"], 39)
+        self.assertEqual(after_partial[0], 240 - 39)
+        self.assertGreaterEqual(after_partial[1], NOW - timedelta(days=50, hours=1))
+
+        self.assertEqual(full["deleted"], 60)
+        self.assertEqual(after_full[0], 35 * 4 + 1)
+        self.assertGreaterEqual(after_full[1], NOW - timedelta(days=35))
+        # Outbreak counts over the whole period still come from the rollups.
+        self.assertEqual([o["cases"] for o in after], [o["cases"] for o in before])
+        self.assertEqual(after[0]["cases"], 240)
+        # Never below what the in-memory indexes reload on startup (30 days by default).
+        self.assertEqual(floored["deleted"], 20)
+
+    def test_weekly_partition_ranges(self):
+        ranges = partition_ranges(
+            datetime(2026, 3, 4, 9, tzinfo=timezone.utc), datetime(2026, 3, 17, tzinfo=timezone.utc)
+        )
+        self.assertEqual(
+            [name for name, _, _ in ranges],
+            ["outbreak_events_w20260302", "outbreak_events_w20260309", "outbreak_events_w20260316"],
+        )
+        self.assertEqual(ranges[0][1].weekday(), 0)
+        self.assertEqual(ranges[0][2], ranges[1][1])
+
+
+if __name__ == "__main__":
+    unittest.main()
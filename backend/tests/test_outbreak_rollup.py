@@ -0,0 +1,85 @@
+import asyncio
+import random
+import unittest
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest import mock
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.models import Base
+from app.models.outbreak import OutbreakEvent, OutbreakRollupHour
+from app.services.outbreak_rollup import active_outbreaks, compact_outbreak_hours
+from app.services.outbreak_service import OutbreakService
+
+CELLS = [(26.85, 80.95, "157"), (26.91, 81.02, "157"), (27.3, 81.4, "159")]
+EXTRA_TOKENS = [("cough", 2), ("rash", 3), ("vomiting", 5), ("headache", 7), ("chills", 11)]
+
+
+def events(now: datetime) -> list[OutbreakEvent]:
+    rng = random.Random(5)
+    rows = []
+    for n, (lat, lng, district) in enumerate(CELLS):
+        for i in range(50 - 10 * n):
+            # Distinct token frequencies per cell keep the top-5 order unambiguous;
+            # the last ten events fall outside the 48-hour window.
+            tokens = ["fever"] + [token for token, every in EXTRA_TOKENS if i % every == 0]
+            age_hours = rng.uniform(0, 47.9) if i < 40 - 10 * n else rng.uniform(48.1, 52)
+            rows.append(
+                OutbreakEvent(
+                    created_at=now - timedelta(hours=age_hours),
+                    lat=lat + rng.uniform(-0.004, 0.004),
+                    lng=lng + rng.uniform(-0.004, 0.004),
+                    symptoms_text=" ".join(tokens),
+                    symptoms_tokens=tokens,
+                    district_code=district,
+                )
+            )
+    return rows
+
+
+def by_centre(outbreaks: list[dict]) -> dict:
+    return {
+        (round(o["center_lat"], 9), round(o["center_lng"], 9)): (o["cases"], o["top_symptoms"], o["district_code"])
+        for o in outbreaks
+    }
+
+
+async def compare() -> tuple[list, list, list, int, int]:
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    now = datetime.now(timezone.utc)
+    try:
+        async with AsyncSession(engine) as session:
+            session.add_all(events(now))
+            await session.commit()
+            with mock.patch(
+                "app.services.outbreak_service.get_settings",
+                return_value=SimpleNamespace(outbreak_rollup_enabled=False),
+            ):
+                expected = await OutbreakService(session).get_active_outbreaks(min_cases=20)
+            before = await active_outbreaks(session, min_cases=20, now=now)
+            compacted = await compact_outbreak_hours(session, now=now)
+            again = await compact_outbreak_hours(session, now=now)
+            after = await active_outbreaks(session, min_cases=20, now=now)
+            markers = await session.scalar(select(func.count()).select_from(OutbreakRollupHour))
+    finally:
+        await engine.dispose()
+    return expected, before, after, compacted + again, markers
+
+
+class OutbreakRollupTests(unittest.TestCase):
+    def test_rollup_answers_match_the_per_event_algorithm(self):
+        expected, before, after, compacted, markers = asyncio.run(compare())
+        self.assertEqual(len(expected), 3)
+        self.assertEqual(by_centre(before), by_centre(expected))
+        self.assertEqual(by_centre(after), by_centre(expected))
+        self.assertEqual(after[0]["top_symptoms"], ["fever", "cough", "rash", "vomiting", "headache"])
+        self.assertGreaterEqual(compacted, 48)
+        self.assertEqual(compacted, markers)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+import asyncio
+import unittest
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.models import Base
+from app.models.outbreak import OutbreakEvent
+from app.services.outbreak_rollup import cell_hour_counts, compact_outbreak_hours, hour_of
+from app.services.outbreak_scan import OutbreakScanner, scan
+
+NOW = datetime(2026, 3, 1, 12, 30, tzinfo=timezone.utc)
+# Sits on the border between the 26.50 and 26.51 rows of 0.01° cells.
+OUTBREAK = (26.505, 80.955)
+
+
+def counts(lat: np.ndarray, lng: np.ndarray, age_hours: np.ndarray) -> dict[str, np.ndarray]:
+    cell_lat = np.round(np.round(lat, 2) * 100).astype(np.int64)
+    cell_lng = np.round(np.round(lng, 2) * 100).astype(np.int64)
+    hour = hour_of(NOW) - age_hours.astype(np.int64)
+    keys, inverse = np.unique(np.stack([cell_lat, cell_lng, hour], axis=1), axis=0, return_inverse=True)
+    inverse = inverse.ravel()
+    return {
+        "cell_lat": keys[:, 0],
+        "cell_lng": keys[:, 1],
+        "hour": keys[:, 2],
+        "events": np.bincount(inverse, minlength=len(keys)),
+        "sum_lat": np.bincount(inverse, weights=lat, minlength=len(keys)),
+        "sum_lng": np.bincount(inverse, weights=lng, minlength=len(keys)),
+    }
+
+
+def background(rng: np.random.Generator, events: int = 6000):
+    return (
+        rng.uniform(26.3, 26.7, events),
+        rng.uniform(80.7, 81.2, events),
+        rng.uniform(0, 28 * 24, events),
+    )
+
+
+class OutbreakScanTests(unittest.TestCase):
+    def test_finds_a_cluster_straddling_cell_borders(self):
+        rng = np.random.default_rng(3)
+        lat, lng, age = background(rng)
+        lat = np.concatenate([lat, OUTBREAK[0] + rng.uniform(-0.008, 0.008, 40)])
+        lng = np.concatenate([lng, OUTBREAK[1] + rng.uniform(-0.008, 0.008, 40)])
+        age = np.concatenate([age, rng.uniform(0, 10, 40)])
+
+        result = scan(counts(lat, lng, age), NOW, max_radius_km=3, replicates=49, seed=1)
+
+        self.assertEqual(result["events"], 6040)
+        top = result["clusters"][0]
+        self.assertAlmostEqual(top["center_lat"], OUTBREAK[0], delta=0.01)
+        self.assertAlmostEqual(top["center_lng"], OUTBREAK[1], delta=0.01)
+        self.assertGreater(top["cells"], 1)
+        self.assertLessEqual(top["window_hours"], 12)
+        self.assertGreaterEqual(top["cases"], 35)
+        self.assertEqual(top["p_value"], 0.02)
+
+    def test_uniform_history_has_no_significant_cluster(self):
+        lat, lng, age = background(np.random.default_rng(4))
+        result = scan(counts(lat, lng, age), NOW, max_radius_km=3, replicates=49, seed=1)
+        self.assertEqual(result["clusters"], [])
+
+    def test_a_busy_area_is_not_an_outbreak(self):
+        # Twice the usual volume, but in that area throughout the baseline.
+        rng = np.random.default_rng(5)
+        lat, lng, age = background(rng)
+        busy = 600
+        lat = np.concatenate([lat, OUTBREAK[0] + rng.uniform(-0.01, 0.01, busy)])
+        lng = np.concatenate([lng, OUTBREAK[1] + rng.uniform(-0.01, 0.01, busy)])
+        age = np.concatenate([age, rng.uniform(0, 28 * 24, busy)])
+        result = scan(counts(lat, lng, age), NOW, max_radius_km=3, replicates=49, seed=1)
+        self.assertEqual(result["clusters"], [])
+
+    def test_scanner_reads_rollups_and_raw_events(self):
+        async def run():
+            engine = create_async_engine("sqlite+aiosqlite://")
+            async with engine.begin() as connection:
+                await connection.run_sync(Base.metadata.create_all)
+            try:
+                async with AsyncSession(engine) as session:
+                    session.add_all(
+                        OutbreakEvent(
+                            created_at=NOW - timedelta(hours=hours),
+                            lat=26.5 + 0.001 * hours,
+                            lng=80.9,
+                            symptoms_text="fever",
+                            symptoms_tokens=["fever"],
+                        )
+                        for hours in range(0, 72, 3)
+                    )
+                    await session.commit()
+                    before = await cell_hour_counts(session, NOW - timedelta(days=28), NOW)
+                    await compact_outbreak_hours(session, now=NOW - timedelta(hours=20))
+                    after = await cell_hour_counts(session, NOW - timedelta(days=28), NOW)
+                    scanner = OutbreakScanner(baseline_days=28, max_radius_km=3, replicates=9)
+                    result = await scanner.run(session, now=NOW, seed=1)
+            finally:
+                await engine.dispose()
+            return before, after, result, scanner.metrics()
+
+        before, after, result, metrics = asyncio.run(run())
+        self.assertEqual(int(before["events"].sum()), 24)
+        self.assertEqual(int(after["events"].sum()), 24)
+        self.assertAlmostEqual(float(after["sum_lat"].sum()), float(before["sum_lat"].sum()))
+        self.assertEqual(result["events"], 24)
+        self.assertEqual(result["baseline_days"], 28)
+        self.assertEqual(metrics["runs"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
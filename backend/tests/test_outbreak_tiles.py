@@ -0,0 +1,154 @@
+import asyncio
+import random
+import unittest
+import zlib
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+import httpx
+import numpy as np
+from fastapi import FastAPI
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.api.routes import admin
+from app.models import Base
+from app.models.outbreak import OutbreakEvent
+from app.services.outbreak_rollup import compact_outbreak_hours, hour_of, hour_start
+from app.services.outbreak_tiles import BINS, OutbreakTileCache, tile_bins
+
+CELLS = [(26.85, 80.95), (26.91, 81.02), (27.3, 81.4), (12.97, 77.59)]
+
+
+def events(start: datetime, hours: int, rng: random.Random) -> list[OutbreakEvent]:
+    rows = []
+    for hour in range(hours):
+        # Bengaluru only in the early hours, so some tiles stay untouched by a refresh.
+        for lat, lng in [CELLS[hour % 3]] + CELLS[3:] * (hour < 10):
+            for _ in range(rng.randint(1, 4)):
+                rows.append(
+                    OutbreakEvent(
+                        created_at=start + timedelta(hours=hour, minutes=rng.uniform(0, 59)),
+                        lat=lat + rng.uniform(-0.004, 0.004),
+                        lng=lng + rng.uniform(-0.004, 0.004),
+                        symptoms_text="fever",
+                        symptoms_tokens=["fever"],
+                    )
+                )
+    return rows
+
+
+def totals(cache: OutbreakTileCache, zoom: int) -> int:
+    return int(cache._bins[zoom][1].sum())
+
+
+def all_tiles(cache: OutbreakTileCache) -> dict:
+    return {key: cache.tile(*key, "bin") for zoom in cache.zooms() for key in cache.tile_keys(zoom)}
+
+
+async def scenario() -> dict:
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    rng = random.Random(9)
+    now = hour_start(hour_of(datetime.now(timezone.utc))) + timedelta(minutes=30)
+    start = hour_start(hour_of(now) - 30)
+    statements: list[str] = []
+    try:
+        async with AsyncSession(engine) as session:
+            rows = events(start, 30, rng)
+            stamps = [row.created_at for row in rows]
+            session.add_all(rows)
+            await session.commit()
+            # Compact the first 26 hours only; the 24-hour window holds whole hours 3-25.
+            await compact_outbreak_hours(session, now=start + timedelta(hours=26, minutes=10))
+            cache = OutbreakTileCache(window_hours=24, min_zoom=3, max_zoom=12)
+            first_changed = await cache.refresh(session, now=start + timedelta(hours=26, minutes=5))
+            first = {
+                "changed": first_changed,
+                "total": totals(cache, 3),
+                "expected": sum(
+                    1 for at in stamps if start + timedelta(hours=3) <= at < start + timedelta(hours=26)
+                ),
+                "tiles": all_tiles(cache),
+            }
+            # An hour later: one hour leaves the window and one more is compacted.
+            await compact_outbreak_hours(session, now=start + timedelta(hours=27, minutes=10))
+            listen = lambda conn, cursor, statement, *args: statements.append(statement)
+            event.listen(engine.sync_engine, "before_cursor_execute", listen)
+            second_changed = await cache.refresh(session, now=start + timedelta(hours=27, minutes=5))
+            event.remove(engine.sync_engine, "before_cursor_execute", listen)
+            second = {
+                "changed": second_changed,
+                "total": totals(cache, 3),
+                "expected": sum(
+                    1 for at in stamps if start + timedelta(hours=4) <= at < start + timedelta(hours=27)
+                ),
+                "tiles": all_tiles(cache),
+            }
+            unchanged = await cache.refresh(session, now=start + timedelta(hours=27, minutes=6))
+    finally:
+        await engine.dispose()
+    return {"first": first, "second": second, "unchanged": unchanged, "statements": statements, "cache": cache}
+
+
+class OutbreakTileTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.result = asyncio.run(scenario())
+
+    def test_counts_cover_the_compacted_hours_at_every_zoom(self):
+        for state in ("first", "second"):
+            self.assertEqual(self.result[state]["total"], self.result[state]["expected"])
+        cache = self.result["cache"]
+        for zoom in cache.zooms():
+            self.assertEqual(totals(cache, zoom), self.result["second"]["expected"])
+
+    def test_refresh_reads_rollups_only_and_keeps_etags_of_untouched_tiles(self):
+        self.assertFalse(any("outbreak_events" in statement for statement in self.result["statements"]))
+        first, second = self.result["first"]["tiles"], self.result["second"]["tiles"]
+        self.assertGreater(self.result["second"]["changed"], 0)
+        self.assertLess(self.result["second"]["changed"], len(second))
+        kept = [key for key in second if key in first and first[key][0] == second[key][0]]
+        self.assertEqual(len(kept), len(second) - self.result["second"]["changed"])
+        self.assertEqual(self.result["unchanged"], 0)
+
+    def test_binary_tile_decodes_to_the_bin_counts(self):
+        cache = self.result["cache"]
+        zoom, x, y = cache.tile_keys(12)[0]
+        grid = np.frombuffer(zlib.decompress(cache.tile(zoom, x, y, "bin")[1]), dtype="<u4").reshape(BINS, BINS)
+        self.assertTrue((grid == cache.grid(zoom, x, y)).all())
+        self.assertEqual(sum(int(cache.grid(*key).sum()) for key in cache.tile_keys(12)), totals(cache, 12))
+        tile_x, tile_y, _ = tile_bins(np.array([26.85]), np.array([80.95]), 12)
+        self.assertEqual((int(tile_x[0]), int(tile_y[0])), (2969, 1730))
+        self.assertEqual(cache.tile(zoom, x, y, "png")[1][:8], b"\x89PNG\r\n\x1a\n")
+
+    def test_endpoint_answers_304_for_a_matching_etag(self):
+        cache = self.result["cache"]
+        zoom, x, y = cache.tile_keys(10)[0]
+
+        async def fetch():
+            app = FastAPI()
+            app.include_router(admin.router)
+            transport = httpx.ASGITransport(app=app)
+            with mock.patch.object(admin, "outbreak_tile_cache", cache):
+                async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                    first = await client.get(f"/admin/outbreak-tiles/{zoom}/{x}/{y}.png")
+                    again = await client.get(
+                        f"/admin/outbreak-tiles/{zoom}/{x}/{y}.png", headers={"If-None-Match": first.headers["etag"]}
+                    )
+                    missing = await client.get(f"/admin/outbreak-tiles/{zoom}/{x}/{y + 1}.bin")
+                    outside = await client.get("/admin/outbreak-tiles/15/0/0.png")
+            return first, again, missing, outside
+
+        first, again, missing, outside = asyncio.run(fetch())
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.headers["content-type"], "image/png")
+        self.assertEqual((again.status_code, again.content), (304, b""))
+        self.assertEqual(missing.status_code, 200)
+        self.assertEqual(np.frombuffer(zlib.decompress(missing.content), dtype="<u4").sum(), 0)
+        self.assertEqual(outside.status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
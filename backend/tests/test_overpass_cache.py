@@ -0,0 +1,95 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import httpx
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.core.config import get_settings
+from app.models import Base
+from app.models.facility import Facility
+from app.models.overpass_tile import OverpassTile
+from app.services.facility_service import FacilitySearchService
+from app.services.overpass_cache import OverpassTileCache
+from scripts.overpass_stub import create_app
+
+
+async def run_searches(searches: list[tuple[float, float]]):
+    stub = create_app()
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    transport = httpx.ASGITransport(app=stub)
+    results = []
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://stub") as client:
+            async with AsyncSession(engine) as session:
+                service = FacilitySearchService(session, spatial_backend="bbox", http_client=client)
+                for lat, lng in searches:
+                    results.append(await service._fetch_overpass(lat, lng, radius_km=15))
+                ingested = await session.scalar(select(func.count()).select_from(Facility))
+    finally:
+        await engine.dispose()
+    return results, stub.state.requests, ingested
+
+
+async def racing_searches() -> tuple[int, int, int]:
+    """Two searches miss the same tiles; the second writes them while the first is still fetching."""
+    stub = create_app()
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(directory, 'tiles.db')}")
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        try:
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=stub), base_url="http://stub") as client:
+                async with AsyncSession(engine) as first, AsyncSession(engine) as second:
+                    slow = OverpassTileCache(first, client)
+                    fast = OverpassTileCache(second, client)
+                    fetch = slow._fetch_tiles
+
+                    async def fetch_after_the_other_search(tiles):
+                        fetched = await fetch(tiles)
+                        await fast.elements_near(26.85, 80.95, 15)
+                        return fetched
+
+                    with mock.patch.object(slow, "_fetch_tiles", fetch_after_the_other_search):
+                        elements = await slow.elements_near(26.85, 80.95, 15)
+                    tiles = await first.scalar(select(func.count()).select_from(OverpassTile))
+        finally:
+            await engine.dispose()
+    return len(elements), tiles, stub.state.requests
+
+
+class OverpassTileCacheTests(unittest.TestCase):
+    def test_repeat_searches_are_served_from_cached_tiles(self):
+        results, requests, _ = asyncio.run(run_searches([(26.85, 80.95), (26.851, 80.951)]))
+        self.assertEqual(requests, 1)
+        self.assertEqual(
+            [f["name"] for f in results[0]], ["Civil Hospital", "Community Clinic", "Village Health Post"]
+        )
+        self.assertEqual([f["id"] for f in results[0]], [f["id"] for f in results[1]])
+        self.assertTrue(all(f["distance_km"] <= 15 for f in results[0]))
+
+    def test_empty_tiles_are_cached_too(self):
+        results, requests, _ = asyncio.run(run_searches([(20.0, 75.0), (20.0, 75.0)]))
+        self.assertEqual(results, [[], []])
+        self.assertEqual(requests, 1)
+
+    def test_fetched_facilities_are_ingested_once(self):
+        with mock.patch.object(get_settings(), "overpass_ingest", True):
+            _, requests, ingested = asyncio.run(run_searches([(26.85, 80.95), (26.85, 80.95)]))
+        self.assertEqual(requests, 1)
+        self.assertEqual(ingested, 3)
+
+    def test_concurrent_searches_for_the_same_tiles_both_succeed(self):
+        elements, tiles, requests = asyncio.run(racing_searches())
+        self.assertEqual(elements, 3)
+        self.assertGreater(tiles, 0)
+        self.assertEqual(requests, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
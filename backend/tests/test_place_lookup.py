@@ -0,0 +1,120 @@
+import asyncio
+import csv
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.api.routes import triage
+from app.models import Base
+from app.models.facility import Facility
+from app.schemas.triage import SymptomInput
+from app.services.facility_catalog import FacilityCatalog, facility_catalog
+from app.services.facility_service import FacilitySearchService
+from app.services.place_lookup import AmbiguousPlace, PlaceLookup, iter_gazetteer
+from tests.test_facility_catalog import synthetic_rows
+
+BUILT_FROM = datetime(2026, 1, 1, tzinfo=timezone.utc)
+GAZETTEER = [
+    {"officename": "Chinhat B.O", "pincode": "226028", "district": "Lucknow", "latitude": "26.88", "longitude": "81.02"},
+    {"officename": "Malhaur S.O", "pincode": "226028", "district": "Lucknow", "latitude": "26.86", "longitude": "81.00"},
+    {"officename": "Rampur", "pincode": "226301", "district": "Lucknow", "latitude": "26.80", "longitude": "80.90"},
+    {"officename": "Rampur", "pincode": "227101", "district": "Barabanki", "latitude": "26.95", "longitude": "81.20"},
+    {"officename": "No coordinates", "pincode": "226999", "district": "Lucknow", "latitude": "NA", "longitude": "NA"},
+]
+
+
+async def staleness_after_update(lookup: PlaceLookup, updated_at: datetime) -> tuple[bool, bool]:
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    try:
+        async with AsyncSession(engine) as session:
+            session.add(
+                Facility(
+                    id="f-new", name="New PHC", facility_type="PHC", latitude=26.85, longitude=80.95,
+                    address="", district="Lucknow", state="UP", pincode="226028", contact_number="",
+                    last_updated=BUILT_FROM,
+                )
+            )
+            await session.commit()
+            before = await lookup.check_staleness(session)
+            facility = await session.get(Facility, "f-new")
+            facility.last_updated = updated_at
+            await session.commit()
+            after = await lookup.check_staleness(session)
+    finally:
+        await engine.dispose()
+    return before, after
+
+
+class PlaceLookupTests(unittest.TestCase):
+    def setUp(self):
+        rows = [{**row, "address": "", "contact_number": ""} for row in synthetic_rows(500)]
+        self.catalog = FacilityCatalog.from_rows(rows)
+        facility_catalog.replace(self.catalog)
+        with tempfile.TemporaryDirectory() as tmp:
+            gazetteer = os.path.join(tmp, "pincodes.csv")
+            with open(gazetteer, "w", newline="") as handle:
+                writer = csv.DictWriter(handle, fieldnames=list(GAZETTEER[0]))
+                writer.writeheader()
+                writer.writerows(GAZETTEER)
+            built = PlaceLookup.build(iter_gazetteer(gazetteer), self.catalog, BUILT_FROM)
+            path = os.path.join(tmp, "places.npz")
+            built.save(path)
+            self.lookup = PlaceLookup()
+            self.lookup.load(path)
+        patcher = mock.patch("app.services.facility_service.place_lookup", self.lookup)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.service = FacilitySearchService(db_session=None, spatial_backend="bbox")
+
+    def tearDown(self):
+        facility_catalog._catalog = None
+
+    def test_resolves_pincodes_and_villages(self):
+        place = self.lookup.resolve(pincode="226 028")
+        self.assertEqual(place.kind, "pincode")
+        self.assertAlmostEqual(place.lat, 26.87)
+        self.assertIsNone(self.lookup.resolve(pincode="226999"))
+        with self.assertRaises(AmbiguousPlace):
+            self.lookup.resolve(village="rampur")
+        self.assertEqual(self.lookup.resolve(village=" Rampur", district="barabanki").lat, 26.95)
+        self.assertEqual(self.lookup.facilities_updated_at, BUILT_FROM)
+
+    def test_precomputed_lists_match_a_search_from_the_centroid(self):
+        place = self.lookup.resolve(pincode="226028")
+        for urgency in ("EMERGENCY", "ROUTINE", "SELF_CARE"):
+            served = asyncio.run(self.service.find_nearest_for_place(place, urgency, max_results=3))
+            expected = asyncio.run(self.service.find_nearest(place.lat, place.lng, urgency, max_results=3))
+            self.assertEqual(served["location_source"], "pincode")
+            self.assertEqual([f["id"] for f in served["facilities"]], [f["id"] for f in expected["facilities"]])
+
+    def test_newer_facility_rows_mark_the_table_stale(self):
+        before, after = asyncio.run(staleness_after_update(self.lookup, BUILT_FROM + timedelta(hours=1)))
+        self.assertEqual((before, after), (False, True))
+        place = self.lookup.resolve(pincode="226028")
+        self.assertIsNone(self.lookup.facility_ids_for(place, "ROUTINE"))
+        served = asyncio.run(self.service.find_nearest_for_place(place, "ROUTINE", max_results=3))
+        self.assertEqual(len(served["facilities"]), 3)
+
+    def test_triage_with_an_ambiguous_village_runs_without_a_location(self):
+        result = {"triage": {"urgency_level": "ROUTINE", "reasoning": "", "care_pathway": ""}}
+        analyze = mock.AsyncMock(return_value=result)
+        payload = SymptomInput(
+            symptoms="fever", patient_age=30, patient_gender="female", language="en", village="Rampur"
+        )
+        with mock.patch.object(triage, "place_lookup", self.lookup), mock.patch.object(
+            triage, "GroqTriageService"
+        ), mock.patch.object(triage, "TriageEngine") as engine:
+            engine.return_value.analyze = analyze
+            response = asyncio.run(triage.run_triage(payload, session=None))
+        self.assertEqual(response["urgency_level"], "ROUTINE")
+        self.assertIsNone(analyze.call_args.kwargs["location"])
+
+
+if __name__ == "__main__":
+    unittest.main()
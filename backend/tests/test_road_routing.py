@@ -0,0 +1,80 @@
+import os
+import tempfile
+import unittest
+
+from app.services.facility_catalog import FacilityCatalog
+from app.services.operating_hours import ClockReading
+from app.services.road_routing import RoadGraph, RoadRouter, road_router
+
+# A river runs north-south at lng 80.97; the only bridge is ~22 km upstream.
+NODES = {
+    1: (26.85, 80.90),
+    2: (26.85, 80.95),
+    3: (26.85, 80.965),
+    4: (27.05, 80.965),
+    5: (27.05, 80.975),
+    6: (26.85, 80.975),
+    7: (26.85, 80.99),
+}
+WAYS = [[1, 2, 3, 4], [4, 5], [5, 6, 7]]
+
+ROWS = [
+    {"id": "across", "name": "Across the river DH", "facility_type": "DH", "latitude": 26.85, "longitude": 80.99,
+     "emergency_available": True, "estimated_wait_time": 10},
+    {"id": "same-bank", "name": "Same bank DH", "facility_type": "DH", "latitude": 26.85, "longitude": 80.90,
+     "emergency_available": True, "estimated_wait_time": 10},
+]
+
+
+def write_osm(path: str) -> None:
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>', '<osm version="0.6">']
+    lines += [f'  <node id="{node}" lat="{lat}" lon="{lng}"/>' for node, (lat, lng) in NODES.items()]
+    for way_id, refs in enumerate(WAYS, start=100):
+        lines.append(f'  <way id="{way_id}">')
+        lines += [f'    <nd ref="{ref}"/>' for ref in refs]
+        lines += ['    <tag k="highway" v="primary"/>', "  </way>"]
+    lines += ['  <way id="200"><nd ref="1"/><nd ref="7"/><tag k="waterway" v="river"/></way>', "</osm>"]
+    with open(path, "w") as handle:
+        handle.write("\n".join(lines))
+
+
+class RoadRoutingTests(unittest.TestCase):
+    def setUp(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            osm_path = os.path.join(tmp, "roads.osm")
+            write_osm(osm_path)
+            self.graph = RoadGraph.from_osm(osm_path)
+            built = RoadRouter.build(self.graph, ROWS, max_minutes=90, cell_km=1.0)
+            router_path = os.path.join(tmp, "roads.npz")
+            built.save(router_path)
+            road_router.load(router_path)
+        self.catalog = FacilityCatalog.from_rows(ROWS)
+        self.clock = ClockReading.at()
+
+    def tearDown(self):
+        road_router._set([], [])
+
+    def ranked(self):
+        return self.catalog.ranked(26.85, 80.95, "ROUTINE", 20, 2, clock=self.clock).facilities
+
+    def test_graph_skips_non_roads(self):
+        self.assertEqual(len(self.graph), len(NODES))
+        self.assertEqual(len(self.graph.indices), 2 * sum(len(refs) - 1 for refs in WAYS))
+
+    def test_routed_ranking_prefers_the_reachable_facility(self):
+        facilities = self.ranked()
+        self.assertEqual([facility["id"] for facility in facilities], ["same-bank", "across"])
+        drive = {facility["id"]: facility["drive_minutes"] for facility in facilities}
+        self.assertLess(drive["same-bank"], 10)
+        self.assertGreater(drive["across"], 45)
+
+        road_router._set([], [])
+        self.assertEqual([facility["id"] for facility in self.ranked()], ["across", "same-bank"])
+
+    def test_uncovered_origin_falls_back_to_straight_line(self):
+        minutes = road_router.drive_minutes(road_router.grid_ids(["across", "missing"]), 20.0, 75.0)
+        self.assertTrue(all(value != value for value in minutes))
+
+
+if __name__ == "__main__":
+    unittest.main()
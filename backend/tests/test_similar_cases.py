@@ -0,0 +1,141 @@
+import asyncio
+import os
+import random
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.models import Base
+from app.models.outbreak import OutbreakEvent
+from app.services.similar_cases import SimilarCaseIndex
+from app.services.symptom_vocabulary import CANONICAL_TERMS, encode, similarity
+
+TERMS = CANONICAL_TERMS[:14]
+QUERIES = ["fever vomiting", "cough, fever and sore throat", "rash", "loose motions stomach pain fever"]
+
+
+def synthetic_events(now: datetime, count: int = 3000) -> list[tuple[str, int, str | None, datetime]]:
+    rng = random.Random(8)
+    events = []
+    for number in range(count):
+        text = " ".join(rng.sample(TERMS, rng.randint(1, 4)))
+        district = rng.choice(["157", "159", None])
+        events.append((f"e{number}", encode(text), district, now - timedelta(hours=rng.uniform(0, 40 * 24))))
+    return events
+
+
+def brute_force(events, symptoms, days, district, now, threshold=0.45) -> int:
+    target = encode(symptoms)
+    since = now - timedelta(days=days)
+    return sum(
+        1
+        for _, mask, code, at in events
+        if at >= since and (district is None or code == district) and similarity(target, mask) >= threshold
+    )
+
+
+class SimilarCaseIndexTests(unittest.TestCase):
+    def setUp(self):
+        self.now = datetime.now(timezone.utc)
+        self.events = synthetic_events(self.now)
+        self.index = SimilarCaseIndex(window_days=30)
+        for event in self.events:
+            self.index.add(*event)
+
+    def test_lsh_query_matches_an_exhaustive_scan(self):
+        for symptoms in QUERIES:
+            for days, district in ((30, None), (7, "157"), (1, None)):
+                with self.subTest(symptoms=symptoms, days=days, district=district):
+                    result = self.index.query(symptoms, days=days, district_code=district, now=self.now)
+                    self.assertEqual(
+                        result["total_cases"], brute_force(self.events, symptoms, days, district, self.now)
+                    )
+        self.assertLess(result["candidates_examined"], len(self.index._postings))
+
+    def test_events_outside_the_window_and_duplicates_are_skipped(self):
+        self.assertFalse(self.index.add("e0", encode("fever"), None, self.now))
+        self.assertFalse(self.index.add("old", encode("fever"), None, self.now - timedelta(days=31)))
+        self.assertFalse(self.index.add("blank", 0, None, self.now))
+        in_window = sum(1 for *_, at in self.events if at >= self.now - timedelta(days=30))
+        self.assertEqual(self.index.events, in_window)
+
+    def test_out_of_vocabulary_reports_are_indexed_and_matched(self):
+        index = SimilarCaseIndex(window_days=30)
+        for n in range(3):
+            self.assertTrue(index.add(f"oov-{n}", encode("jalan aur kamzori"), "157", self.now))
+        index.add("other", encode("fever"), "157", self.now)
+        self.assertEqual(index.query("Jalan, kamzori", now=self.now)["total_cases"], 3)
+
+    def test_snapshot_round_trip(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "similar_cases.npz")
+            self.index.synced_until = self.now
+            self.index.save(path)
+            restored = SimilarCaseIndex(window_days=30)
+            restored.load(path)
+        self.assertEqual(restored.events, self.index.events)
+        for symptoms in QUERIES:
+            self.assertEqual(
+                restored.query(symptoms, district_code="159", now=self.now),
+                self.index.query(symptoms, district_code="159", now=self.now),
+            )
+
+    def test_snapshot_is_written_to_the_exact_path_and_truncated_files_are_rejected(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "similar_cases")
+            self.index.save(path)
+            self.index.save(path)
+            self.assertEqual(os.listdir(directory), ["similar_cases"])
+            with open(path, "r+b") as handle:
+                handle.truncate(os.path.getsize(path) // 2)
+            restored = SimilarCaseIndex(window_days=30)
+            with self.assertRaises(Exception):
+                restored.load(path)
+        self.assertEqual(restored.events, 0)
+        self.assertIsNone(restored.synced_until)
+
+    def test_sync_reads_masks_or_text_from_outbreak_events(self):
+        async def run():
+            engine = create_async_engine("sqlite+aiosqlite://")
+            async with engine.begin() as connection:
+                await connection.run_sync(Base.metadata.create_all)
+            index = SimilarCaseIndex(window_days=30)
+            try:
+                async with AsyncSession(engine) as session:
+                    session.add_all(
+                        [
+                            OutbreakEvent(
+                                created_at=self.now - timedelta(days=2),
+                                lat=26.8,
+                                lng=80.9,
+                                symptoms_text="fever, vomiting",
+                                symptoms_mask=encode("fever vomiting"),
+                                district_code="157",
+                            ),
+                            # Written before masks existed: encoded from its text.
+                            OutbreakEvent(
+                                created_at=self.now - timedelta(days=20),
+                                lat=26.8,
+                                lng=80.9,
+                                symptoms_text="bukhar aur ulti",
+                                district_code="157",
+                            ),
+                        ]
+                    )
+                    await session.commit()
+                    added = await index.sync(session)
+                    again = await index.sync(session)
+            finally:
+                await engine.dispose()
+            return added, again, index.query("fever and vomiting", district_code="157")
+
+        added, again, result = asyncio.run(run())
+        self.assertEqual((added, again), (2, 0))
+        self.assertEqual(result["total_cases"], 2)
+        self.assertEqual(result["query_symptoms"], ["fever", "vomiting"])
+
+
+if __name__ == "__main__":
+    unittest.main()
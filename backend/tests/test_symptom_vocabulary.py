@@ -0,0 +1,58 @@
+import unittest
+
+import numpy as np
+
+from app.services.symptom_vocabulary import (
+    CANONICAL_TERMS,
+    MAX_TERMS,
+    SIGNATURE_BIT,
+    encode,
+    similarity,
+    similarity_many,
+    terms,
+)
+
+
+class SymptomVocabularyTests(unittest.TestCase):
+    def test_synonyms_and_phrases_map_to_canonical_terms(self):
+        self.assertEqual(terms(encode("High Fever since 3 days, loose motions")), ["fever", "diarrhea"])
+        self.assertEqual(terms(encode("bukhar aur ulti")), ["fever", "vomiting"])
+        self.assertEqual(terms(encode("stomach ache and headaches")), ["headache", "stomach pain"])
+        self.assertEqual(terms(encode("back pain")), ["back pain"])
+        self.assertEqual(encode("since yesterday"), 0)
+        self.assertEqual(terms(encode("dengue fever, burning eyes")), ["red eyes", "dengue"])
+        self.assertEqual(terms(encode("typhoid")), ["typhoid"])
+
+    def test_identical_out_of_vocabulary_reports_still_match(self):
+        report = encode("jalan aur kamzori since 3 days")
+        self.assertNotEqual(report, 0)
+        self.assertEqual(terms(report), [])
+        self.assertEqual(encode("Jalan, kamzori"), report)
+        self.assertAlmostEqual(similarity(report, encode("kamzori jalan")), 0.7)
+        masks = np.array([report, encode("sujan"), encode("fever vomiting"), 0], dtype=np.uint64)
+        scores = similarity_many(report, masks)
+        self.assertAlmostEqual(scores[0], 0.7)
+        self.assertLess(scores[1], 0.45)
+        # Word signatures never match term masks, in either direction.
+        self.assertEqual((scores[2], scores[3]), (0.0, 0.0))
+        self.assertEqual(similarity(encode("fever vomiting"), report), 0.0)
+
+    def test_masks_fit_a_signed_bigint(self):
+        self.assertLess(len(CANONICAL_TERMS), MAX_TERMS)
+        self.assertLess(encode(" ".join(CANONICAL_TERMS)), SIGNATURE_BIT)
+        self.assertLess(encode("jalan kamzori sujan chakkar ghabrahat"), 2**63)
+        self.assertEqual(terms(encode(" ".join(CANONICAL_TERMS))), list(CANONICAL_TERMS))
+
+    def test_vectorised_similarity_matches_the_scalar_one(self):
+        reports = ["fever, vomiting", "fever vomiting headache", "cough fever", "rash", "back pain", "", "fever"]
+        reports += ["jalan", "jalan sujan"]
+        masks = np.array([encode(report) for report in reports], dtype=np.uint64)
+        for target in reports:
+            expected = [similarity(encode(target), int(mask)) for mask in masks]
+            np.testing.assert_allclose(similarity_many(encode(target), masks), expected)
+        # Jaccard 2/3 plus the fever+vomiting cluster bonus.
+        self.assertAlmostEqual(similarity(encode("fever vomiting"), encode("fever, vomiting and headache")), 0.7 * 2 / 3 + 0.3)
+
+
+if __name__ == "__main__":
+    unittest.main()